@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Agent 上下文消息删除性能测试
+
+在 10k 条消息的上下文上对比 RPGAgentContext 的两种删除方式：
+1. equality：原实现，remove_messages 用 `msg not in messages`、remove_message_range 用 list.index（Pydantic 逐字段深比较）
+2. index：当前实现，AgentContext.index（按对象身份登记位置，O(1) 查找）
+
+场景与游戏内调用方一致：
+- 状态效果通知替换（AddStatusEffectsActionSystem）：删除少量旧通知消息
+- 战斗归档（CombatArchiveSystem）：删除上下文末尾的一段战斗消息
+
+uv run python scripts/benchmark_agent_context_removal.py --messages 10000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ai_rpg.models import AgentContext
+from ai_rpg.models.messages import AIMessage, BaseMessage, ContextMessage, HumanMessage
+
+_CONTENT = "回合记录：" + "角色行动与场景描述。" * 40
+
+
+#######################################################################################################
+def _build(messages: int) -> AgentContext:
+    context: List[ContextMessage] = []
+    for i in range(messages):
+        if i % 2 == 0:
+            context.append(HumanMessage(content=f"{_CONTENT}{i}"))
+        else:
+            context.append(AIMessage(content=f"{_CONTENT}{i}"))
+    return AgentContext(name="hero", context=context)
+
+
+#######################################################################################################
+def _equality_remove(
+    context: List[ContextMessage], messages: Sequence[BaseMessage]
+) -> int:
+    original_length = len(context)
+    context[:] = [msg for msg in context if msg not in messages]
+    return original_length - len(context)
+
+
+#######################################################################################################
+def _equality_remove_range(
+    context: List[ContextMessage], begin: ContextMessage, end: ContextMessage
+) -> List[ContextMessage]:
+    begin_index = context.index(begin)
+    end_index = context.index(end) + 1
+    removed = context[begin_index:end_index]
+    del context[begin_index:end_index]
+    return removed
+
+
+#######################################################################################################
+def _measure(name: str, rounds: int, run: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        run()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"  {name:<10} {elapsed * 1000:9.3f} ms/op")
+    return elapsed
+
+
+#######################################################################################################
+def _bench_notifications(messages: int, notifications: int, rounds: int) -> None:
+    print(f"remove_messages: {notifications} notifications in {messages} messages")
+    results = []
+    for name in ("equality", "index"):
+        agent_context = _build(messages)
+        context = agent_context.context
+        step = max(1, messages // notifications)
+
+        def run() -> None:
+            # 删除分散的旧通知，再把同样数量的新通知追加到末尾（上下文长度保持不变）
+            targets = context[::step][:notifications]
+            if name == "equality":
+                removed = _equality_remove(context, targets)
+            else:
+                removed = agent_context.index.remove(targets)
+            assert removed == len(targets)
+            context.extend(HumanMessage(content=_CONTENT) for _ in targets)
+
+        results.append(_measure(name, rounds, run))
+    print(f"  speedup    {results[0] / results[1]:9.1f}x")
+
+
+#######################################################################################################
+def _bench_range(messages: int, span: int, rounds: int) -> None:
+    print(f"remove_message_range: last {span} of {messages} messages")
+    results = []
+    for name in ("equality", "index"):
+        agent_context = _build(messages)
+        context = agent_context.context
+
+        def run() -> None:
+            # 归档末尾的一段战斗消息，再重新插回（模拟下一场战斗）
+            begin, end = context[-span], context[-1]
+            if name == "equality":
+                removed = _equality_remove_range(context, begin, end)
+                context.extend(removed)
+            else:
+                removed = agent_context.index.remove_range(begin, end)
+                agent_context.index.insert(len(context), removed)
+            assert len(removed) == span
+
+        results.append(_measure(name, rounds, run))
+    print(f"  speedup    {results[0] / results[1]:9.1f}x")
+
+
+#######################################################################################################
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agent 上下文消息删除性能测试")
+    parser.add_argument("--messages", type=int, default=10_000, help="上下文消息条数")
+    parser.add_argument(
+        "--notifications", type=int, default=8, help="每次删除的通知条数"
+    )
+    parser.add_argument("--span", type=int, default=200, help="战斗归档的消息段长度")
+    parser.add_argument("--rounds", type=int, default=20, help="每种方式的重复次数")
+    args = parser.parse_args()
+
+    _bench_notifications(args.messages, args.notifications, args.rounds)
+    _bench_range(args.messages, args.span, args.rounds)
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
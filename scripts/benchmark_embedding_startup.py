@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+嵌入模型启动时间 / 内存基准
+
+每个场景在独立子进程中运行，报告导入耗时、首次 encode 耗时与进程峰值 RSS：
+1. import-only：导入 ai_rpg.systems.query_action_system（模型懒加载，不应导入 torch）
+2. local-torch：导入后首次 encode（本地 PyTorch 模型）
+3. local-onnx / local-onnx-qint8：本地 ONNX Runtime（需要 optimum[onnxruntime]）
+4. remote：通过共享编码服务 encode（服务进程单独加载模型，worker 进程不加载）
+
+uv run python scripts/benchmark_embedding_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 子进程驱动：参数为 JSON（backend / quantized / socket / encode）
+_DRIVER = """
+import json, resource, sys, time
+sys.path.insert(0, "src")
+config = json.loads(sys.argv[1])
+start = time.perf_counter()
+import ai_rpg.systems.query_action_system
+from ai_rpg.embedding_model import EmbeddingModelConfig, embedding_encoder
+import_seconds = time.perf_counter() - start
+encode_seconds = None
+if config["encode"]:
+    embedding_encoder.configure(EmbeddingModelConfig(
+        backend=config["backend"],
+        quantized=config["quantized"],
+        encoder_socket=config["socket"],
+    ))
+    start = time.perf_counter()
+    embedding_encoder.encode(["你好，世界"])
+    encode_seconds = time.perf_counter() - start
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "encode_seconds": encode_seconds,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "torch_imported": "torch" in sys.modules,
+}))
+"""
+
+
+#######################################################################################################
+def _run_scenario(
+    name: str,
+    encode: bool,
+    backend: str = "torch",
+    quantized: bool = False,
+    socket: Optional[str] = None,
+) -> Dict[str, Any]:
+    config = json.dumps(
+        {"encode": encode, "backend": backend, "quantized": quantized, "socket": socket}
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", _DRIVER, config],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"name": name, "error": completed.stderr.strip().splitlines()[-1:]}
+    result: Dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["name"] = name
+    return result
+
+
+#######################################################################################################
+def _run_remote_scenario() -> Dict[str, Any]:
+    socket_path = os.path.join(tempfile.mkdtemp(), "encoder.sock")
+    service = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT_DIR / "scripts" / "run_encoder_service.py"),
+            "--socket",
+            socket_path,
+        ],
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        while not os.path.exists(socket_path):
+            if service.poll() is not None or time.monotonic() > deadline:
+                return {"name": "remote", "error": ["编码服务启动失败"]}
+            time.sleep(0.2)
+        return _run_scenario("remote", encode=True, socket=socket_path)
+    finally:
+        service.terminate()
+        service.wait()
+
+
+#######################################################################################################
+def main() -> None:
+    results: List[Dict[str, Any]] = [
+        _run_scenario("import-only", encode=False),
+        _run_scenario("local-torch", encode=True),
+        _run_scenario("local-onnx", encode=True, backend="onnx"),
+        _run_scenario("local-onnx-qint8", encode=True, backend="onnx", quantized=True),
+        _run_remote_scenario(),
+    ]
+
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']:<18} 失败: {result['error']}")
+            continue
+        encode = result["encode_seconds"]
+        print(
+            f"{result['name']:<18} import={result['import_seconds']:6.2f}s  "
+            f"first_encode={'-' if encode is None else f'{encode:6.2f}s':>7}  "
+            f"max_rss={result['max_rss_mb']:7.1f}MB  "
+            f"torch={'yes' if result['torch_imported'] else 'no'}"
+        )
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+PlayerSession 增量读取基准
+
+模拟长会话 + 多个观察者（SSE 连接）轮询：每写入一条事件，每个观察者读取一次增量。
+对比：
+1. linear：原实现，遍历全部会话消息过滤 sequence_id
+2. bisect：二分定位起点（当前 get_messages_since）
+3. bisect + window：二分 + 内存窗口（已存档的旧消息移出内存），报告内存中的消息条数
+
+uv run python scripts/benchmark_player_session_reads.py --preload 100000 --watchers 20
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ai_rpg.game.world_store import WorldArchiver, snapshot_player_session
+from ai_rpg.models import PlayerSession, WorldState
+from ai_rpg.models.agent_event import AgentEvent
+from ai_rpg.models.session_message import SessionMessage
+
+Reader = Callable[[PlayerSession, int], List[SessionMessage]]
+
+
+#######################################################################################################
+def _linear_read(session: PlayerSession, last_id: int) -> List[SessionMessage]:
+    return [m for m in session.session_messages if m.sequence_id > last_id]
+
+
+#######################################################################################################
+def _bisect_read(session: PlayerSession, last_id: int) -> List[SessionMessage]:
+    return session.get_messages_since(last_id)
+
+
+#######################################################################################################
+def _run(
+    name: str,
+    reader: Reader,
+    events: int,
+    watchers: int,
+    preload: int,
+    window_size: Optional[int],
+    archive_every: int,
+) -> None:
+    session = PlayerSession(name="bench", actor="hero", game="bench")
+    session.configure_window(window_size)
+    world = WorldState(entity_counter=0)
+    world.blueprint.name = "bench"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archiver = WorldArchiver(Path(tmp) / "save")
+
+        def archive() -> None:
+            sequence = session.event_sequence
+            archiver.archive(world, snapshot_player_session(session))
+            session.mark_durable(archiver.save_dir / "player_session.jsonl", sequence)
+
+        # 长会话历史（不计时）
+        for i in range(preload):
+            session.add_agent_event(AgentEvent(message=f"history {i}"))
+            if (i + 1) % archive_every == 0:
+                archive()
+
+        cursors = [session.event_sequence] * watchers
+        read_seconds = 0.0
+        delivered = 0
+        for i in range(events):
+            session.add_agent_event(AgentEvent(message=f"event {i}"))
+            if (i + 1) % archive_every == 0:
+                archive()
+
+            start = time.perf_counter()
+            for w in range(watchers):
+                messages = reader(session, cursors[w])
+                if messages:
+                    cursors[w] = messages[-1].sequence_id
+                    delivered += len(messages)
+            read_seconds += time.perf_counter() - start
+
+    polls = events * watchers
+    print(
+        f"{name:<16} polls={polls:>8}  delivered={delivered:>8}  "
+        f"read={read_seconds:7.3f}s  per_poll={read_seconds / polls * 1e6:8.2f}us  "
+        f"in_memory={len(session.session_messages):>7}"
+    )
+
+
+#######################################################################################################
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PlayerSession 增量读取基准")
+    parser.add_argument("--preload", type=int, default=100_000, help="已有历史事件数")
+    parser.add_argument("--events", type=int, default=2_000, help="计时阶段新增事件数")
+    parser.add_argument("--watchers", type=int, default=20, help="并发观察者数")
+    parser.add_argument("--window", type=int, default=2048, help="内存窗口大小")
+    parser.add_argument("--archive-every", type=int, default=500, help="存档间隔")
+    args = parser.parse_args()
+
+    scenarios: List[Tuple[str, Reader, Optional[int]]] = [
+        ("linear", _linear_read, None),
+        ("bisect", _bisect_read, None),
+        ("bisect+window", _bisect_read, args.window),
+    ]
+    for name, reader, window_size in scenarios:
+        _run(
+            name,
+            reader,
+            events=args.events,
+            watchers=args.watchers,
+            preload=args.preload,
+            window_size=window_size,
+            archive_every=args.archive_every,
+        )
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+SSE 推送端点空闲负载测试
+
+在进程内打开大量会话 SSE 流（直接消费 StreamingResponse 的 body_iterator），统计空闲期间的
+进程 CPU 时间，并测量一条新事件推送到全部流的延迟。对比：
+1. polling：原实现，每条连接每 0.3s 唤醒一次、查找房间并扫描会话消息
+2. push：当前实现，等待 PlayerSession.notifier，空闲时只按心跳间隔发送保活注释行
+
+uv run python scripts/benchmark_sse_idle.py --streams 500 --idle 5
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncGenerator, AsyncIterator, List, cast
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from loguru import logger
+
+from ai_rpg.game.game_server import GameServer
+from ai_rpg.models import PlayerSession
+from ai_rpg.models.agent_event import AgentEvent
+from ai_rpg.services.player_session import stream_session_messages
+
+_USER = "bench"
+_GAME = "bench"
+
+
+#######################################################################################################
+async def _polling_stream(
+    game_server: GameServer, last_sequence_id: int, interval: float
+) -> AsyncGenerator[str, None]:
+    """原轮询实现（仅用于对比）"""
+    current_last_id = last_sequence_id
+    while True:
+        current_room = game_server.get_room(_USER)
+        if current_room is None or current_room._dbg_game is None:
+            return
+        player_session = current_room._dbg_game._player_session
+        for msg in [
+            m
+            for m in player_session.session_messages
+            if m.sequence_id > current_last_id
+        ]:
+            current_last_id = msg.sequence_id
+            yield f"data: {msg.model_dump_json()}\n\n"
+        await asyncio.sleep(interval)
+
+
+#######################################################################################################
+async def _consume(stream: AsyncIterator[str], received: List[float]) -> None:
+    async for chunk in stream:
+        if chunk.startswith("data:"):
+            received.append(time.perf_counter())
+
+
+#######################################################################################################
+async def _run(name: str, streams: int, idle: float, history: int) -> None:
+    game_server = GameServer()
+    session = PlayerSession(name=_USER, actor="hero", game=_GAME)
+    for i in range(history):
+        session.add_agent_event(AgentEvent(message=f"history {i}"))
+    room = game_server.create_room(_USER)
+    room._dbg_game = SimpleNamespace(  # type: ignore[assignment]
+        name=_GAME, _player_session=session
+    )
+
+    received: List[float] = []
+    consumers: List["asyncio.Task[None]"] = []
+    for _ in range(streams):
+        stream: AsyncIterator[str]
+        if name == "polling":
+            stream = _polling_stream(game_server, session.event_sequence, 0.3)
+        else:
+            response = await stream_session_messages(
+                game_server, _USER, _GAME, session.event_sequence, 15.0
+            )
+            stream = cast(AsyncIterator[str], response.body_iterator)
+        consumers.append(asyncio.create_task(_consume(stream, received)))
+    await asyncio.sleep(0.5)  # 等待全部连接进入等待状态
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu = time.process_time() - cpu_start
+
+    published = time.perf_counter()
+    session.add_agent_event(AgentEvent(message="new event"))
+    while len(received) < streams:
+        await asyncio.sleep(0.001)
+    latency = max(received) - published
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+    print(
+        f"{name:<8} streams={streams:>5}  idle_cpu={idle_cpu:6.3f}s / {idle:.0f}s "
+        f"({idle_cpu / idle * 100:5.1f}%)  fan_out_latency={latency * 1000:7.1f}ms"
+    )
+
+
+#######################################################################################################
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SSE 推送端点空闲负载测试")
+    parser.add_argument("--streams", type=int, default=500, help="并发 SSE 连接数")
+    parser.add_argument("--idle", type=float, default=5.0, help="空闲统计时长（秒）")
+    parser.add_argument("--history", type=int, default=2000, help="会话历史事件数")
+    args = parser.parse_args()
+
+    logger.remove()
+    for name in ("polling", "push"):
+        asyncio.run(_run(name, args.streams, args.idle, args.history))
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
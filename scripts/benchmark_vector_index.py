@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+pgvector ANN 索引召回率 / 延迟基准（需要本地 PostgreSQL + pgvector）
+
+在独立的 collection 中写入带聚类结构的合成向量，以 numpy 精确检索结果为基准，
+分别测量：
+1. 无索引（顺序扫描）的检索延迟
+2. HNSW 部分索引在不同 hnsw.ef_search 下的 recall@k 与延迟
+3. IVFFlat 部分索引在不同 ivfflat.probes 下的 recall@k 与延迟
+
+用法:
+    python scripts/benchmark_vector_index.py --docs 20000 --queries 200 --top-k 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# 将 src 目录添加到模块搜索路径
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+from loguru import logger
+
+from ai_rpg.pgsql import (
+    VectorIndexConfig,
+    VectorSearchParams,
+    bulk_save_vector_documents,
+    compute_content_hash,
+    delete_vector_documents_except,
+    drop_collection_index,
+    pgsql_ensure_database_tables,
+    rebuild_collection_index,
+    search_vector_documents,
+)
+from ai_rpg.pgsql.vector_document import EMBEDDING_DIMENSION
+
+BENCHMARK_COLLECTION = "benchmark_vector_index"
+
+
+#######################################################################################################
+def _normalize(vectors: NDArray[np.float64]) -> NDArray[np.float64]:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+#######################################################################################################
+def _make_dataset(
+    doc_count: int, query_count: int, clusters: int, seed: int
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """生成带聚类结构的归一化文档向量与查询向量（查询取自同一分布）"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, EMBEDDING_DIMENSION))
+    doc_labels = rng.integers(0, clusters, doc_count)
+    docs = centers[doc_labels] + 0.5 * rng.standard_normal(
+        (doc_count, EMBEDDING_DIMENSION)
+    )
+    query_labels = rng.integers(0, clusters, query_count)
+    queries = centers[query_labels] + 0.5 * rng.standard_normal(
+        (query_count, EMBEDDING_DIMENSION)
+    )
+    return _normalize(docs), _normalize(queries)
+
+
+#######################################################################################################
+def _load_dataset(docs: NDArray[np.float64], batch_size: int = 1000) -> None:
+    delete_vector_documents_except(BENCHMARK_COLLECTION, [])
+    for start in range(0, len(docs), batch_size):
+        chunk = docs[start : start + batch_size]
+        contents = [str(start + i) for i in range(len(chunk))]
+        metadatas = [None] * len(chunk)
+        bulk_save_vector_documents(
+            collection=BENCHMARK_COLLECTION,
+            contents=contents,
+            embeddings=chunk.tolist(),
+            metadatas=metadatas,
+            content_hashes=[compute_content_hash(c, None) for c in contents],
+        )
+    logger.info(f"📥 已写入 {len(docs)} 个基准文档")
+
+
+#######################################################################################################
+def _run_queries(
+    queries: NDArray[np.float64],
+    exact: Sequence[Sequence[int]],
+    top_k: int,
+    params: Optional[VectorSearchParams],
+) -> Tuple[float, float, float]:
+    """逐条执行查询，返回 (recall@k, p50 毫秒, p95 毫秒)"""
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(queries.tolist(), exact):
+        start = time.perf_counter()
+        results = search_vector_documents(
+            query,
+            limit=top_k,
+            collection_filter=BENCHMARK_COLLECTION,
+            similarity_threshold=-1.0,
+            search_params=params,
+        )
+        latencies.append((time.perf_counter() - start) * 1e3)
+        hits += len({int(r.content) for r in results} & set(expected))
+
+    latencies.sort()
+    recall = hits / (len(exact) * top_k)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return recall, statistics.median(latencies), p95
+
+
+#######################################################################################################
+def _report(label: str, recall: float, p50: float, p95: float) -> None:
+    logger.info(
+        f"{label:<28} recall@k={recall:6.3f}  p50={p50:7.2f}ms  p95={p95:7.2f}ms"
+    )
+
+
+#######################################################################################################
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pgvector ANN 索引召回率 / 延迟基准")
+    parser.add_argument("--docs", type=int, default=20000, help="文档数量")
+    parser.add_argument("--queries", type=int, default=200, help="查询数量")
+    parser.add_argument("--top-k", type=int, default=10, help="每个查询的返回数量")
+    parser.add_argument("--clusters", type=int, default=50, help="合成数据聚类数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument(
+        "--ef-search",
+        type=int,
+        nargs="+",
+        default=[10, 20, 40, 80, 160],
+        help="HNSW 查询参数 hnsw.ef_search 取值",
+    )
+    parser.add_argument(
+        "--probes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 5, 10, 20],
+        help="IVFFlat 查询参数 ivfflat.probes 取值",
+    )
+    parser.add_argument("--hnsw-m", type=int, default=16, help="HNSW 构建参数 m")
+    parser.add_argument(
+        "--hnsw-ef-construction",
+        type=int,
+        default=64,
+        help="HNSW 构建参数 ef_construction",
+    )
+    parser.add_argument(
+        "--ivfflat-lists", type=int, default=None, help="IVFFlat 聚类数（默认自动）"
+    )
+    parser.add_argument("--keep", action="store_true", help="结束后保留基准数据与索引")
+    args = parser.parse_args()
+
+    pgsql_ensure_database_tables()
+
+    docs, queries = _make_dataset(args.docs, args.queries, args.clusters, args.seed)
+    exact = [np.argsort(-(docs @ query))[: args.top_k].tolist() for query in queries]
+    _load_dataset(docs)
+
+    try:
+        drop_collection_index(BENCHMARK_COLLECTION)
+        _report("seqscan (exact)", *_run_queries(queries, exact, args.top_k, None))
+
+        start = time.perf_counter()
+        rebuild_collection_index(
+            BENCHMARK_COLLECTION,
+            VectorIndexConfig(
+                method="hnsw",
+                m=args.hnsw_m,
+                ef_construction=args.hnsw_ef_construction,
+            ),
+        )
+        logger.info(f"🏗️ HNSW 构建耗时 {time.perf_counter() - start:.2f}s")
+        for ef_search in args.ef_search:
+            _report(
+                f"hnsw ef_search={ef_search}",
+                *_run_queries(
+                    queries,
+                    exact,
+                    args.top_k,
+                    VectorSearchParams(ef_search=ef_search),
+                ),
+            )
+
+        start = time.perf_counter()
+        rebuild_collection_index(
+            BENCHMARK_COLLECTION,
+            VectorIndexConfig(method="ivfflat", lists=args.ivfflat_lists),
+        )
+        logger.info(f"🏗️ IVFFlat 构建耗时 {time.perf_counter() - start:.2f}s")
+        for probes in args.probes:
+            _report(
+                f"ivfflat probes={probes}",
+                *_run_queries(
+                    queries, exact, args.top_k, VectorSearchParams(probes=probes)
+                ),
+            )
+    finally:
+        if not args.keep:
+            drop_collection_index(BENCHMARK_COLLECTION)
+            delete_vector_documents_except(BENCHMARK_COLLECTION, [])
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,6 @@ assert LOGS_DIR.exists(), f"找不到目录: {LOGS_DIR}"
 ###########################################################################################################################################
 # 游戏服务器配置
 GAME_SERVER_PORT: Final[int] = 8000
+
+# 分片部署的 worker 数（大于 1 时 GAME_SERVER_PORT 由前端路由监听，worker 依次使用其后的端口）
+GAME_SERVER_WORKERS: Final[int] = 1
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
-"""生成 ecosystem.config.js，启动游戏服务器（uvicorn）。"""
-
+"""生成 ecosystem.config.js，启动游戏服务器（uvicorn）；分片部署时另外启动前端路由。"""
 
 import os
 import sys
@@ -11,35 +10,83 @@ sys.path.insert(
 )
 
 # from ai_rpg.services import server_configuration
-from config import GAME_SERVER_PORT
+from typing import List
 
+from config import GAME_SERVER_PORT, GAME_SERVER_WORKERS
 
-def main(target_directory: str = ".") -> None:
-    """
-    生成 PM2 进程管理配置文件
-    """
-    ecosystem_config_content = f"""module.exports = {{
-  apps: [
-    // 游戏服务器实例 - 端口 {GAME_SERVER_PORT}
+
+def _game_server_app(port: int, worker_id: str = "") -> str:
+    """单个游戏服务器（uvicorn）进程的 PM2 配置；分片 worker 崩溃后自动重启"""
+    name = f"game-server-{port}"
+    extra_env = f",\n        AI_RPG_WORKER_ID: '{worker_id}'" if worker_id else ""
+    autorestart = "true" if worker_id else "false"
+    return f"""    // 游戏服务器实例 - 端口 {port}
     {{
-      name: 'game-server-{GAME_SERVER_PORT}',
+      name: '{name}',
       script: 'uvicorn',
-      args: 'scripts.run_game_server:app --host 0.0.0.0 --port {GAME_SERVER_PORT}',
+      args: 'scripts.run_game_server:app --host 0.0.0.0 --port {port}',
       interpreter: 'python',
       cwd: process.cwd(),
       env: {{
         PYTHONPATH: `${{process.cwd()}}`,
-        PORT: '{GAME_SERVER_PORT}'
+        PORT: '{port}'{extra_env}
       }},
       instances: 1,
-      autorestart: false,
+      autorestart: {autorestart},
       watch: false,
       max_memory_restart: '2G',
-      log_file: './logs/game-server-{GAME_SERVER_PORT}.log',
-      error_file: './logs/game-server-{GAME_SERVER_PORT}-error.log',
-      out_file: './logs/game-server-{GAME_SERVER_PORT}-out.log',
+      log_file: './logs/{name}.log',
+      error_file: './logs/{name}-error.log',
+      out_file: './logs/{name}-out.log',
       time: true
-    }}
+    }}"""
+
+
+def _game_router_app(port: int, workers: str) -> str:
+    """分片部署的前端路由进程的 PM2 配置"""
+    return f"""    // 前端路由 - 端口 {port}
+    {{
+      name: 'game-router-{port}',
+      script: 'scripts/run_game_router.py',
+      interpreter: 'python',
+      cwd: process.cwd(),
+      env: {{
+        PYTHONPATH: `${{process.cwd()}}`,
+        AI_RPG_WORKERS: '{workers}'
+      }},
+      instances: 1,
+      autorestart: true,
+      watch: false,
+      log_file: './logs/game-router-{port}.log',
+      error_file: './logs/game-router-{port}-error.log',
+      out_file: './logs/game-router-{port}-out.log',
+      time: true
+    }}"""
+
+
+def main(target_directory: str = ".", workers: int = GAME_SERVER_WORKERS) -> None:
+    """
+    生成 PM2 进程管理配置文件
+
+    workers 为 1 时只启动一个游戏服务器；大于 1 时启动 workers 个按玩家分片的 worker
+    （端口 GAME_SERVER_PORT+1 起，崩溃后自动重启并从 .worlds 存档迁移房间）与监听 GAME_SERVER_PORT 的前端路由。
+    """
+    apps: List[str] = []
+    if workers <= 1:
+        apps.append(_game_server_app(GAME_SERVER_PORT))
+    else:
+        worker_specs: List[str] = []
+        for index in range(workers):
+            port = GAME_SERVER_PORT + 1 + index
+            worker_id = f"w{index}"
+            worker_specs.append(f"{worker_id}=http://127.0.0.1:{port}")
+            apps.append(_game_server_app(port, worker_id))
+        apps.append(_game_router_app(GAME_SERVER_PORT, ",".join(worker_specs)))
+
+    apps_content = ",\n".join(apps)
+    ecosystem_config_content = f"""module.exports = {{
+  apps: [
+{apps_content}
   ]
 }};
 """
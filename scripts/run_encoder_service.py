@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+启动共享文本编码服务（多个 uvicorn worker 共用一份嵌入模型）
+
+uv run python scripts/run_encoder_service.py
+uv run python scripts/run_encoder_service.py --backend onnx --quantized
+
+游戏服务器进程设置环境变量 AI_RPG_ENCODER_SOCKET=<socket 路径> 后即通过该服务编码。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# 将 src 目录添加到模块搜索路径
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+from loguru import logger
+
+from ai_rpg.embedding_model import EmbeddingModelConfig, LazyEmbeddingModel
+from ai_rpg.embedding_model.encoder_service import (
+    DEFAULT_ENCODER_SOCKET,
+    EncoderServer,
+)
+
+
+#######################################################################################################
+async def _serve(args: argparse.Namespace) -> None:
+    encoder = LazyEmbeddingModel()
+    encoder.configure(
+        EmbeddingModelConfig(backend=args.backend, quantized=args.quantized)
+    )
+    # 服务进程启动时即加载模型并预热，避免第一个请求承担加载时间
+    encoder.encode(["warmup"])
+
+    server = EncoderServer(
+        encoder, args.socket, max_batch_sentences=args.max_batch_sentences
+    )
+    await server.start()
+    try:
+        await server.serve_forever()
+    finally:
+        await server.aclose()
+
+
+#######################################################################################################
+def main() -> None:
+    parser = argparse.ArgumentParser(description="共享文本编码服务")
+    parser.add_argument(
+        "--socket", default=DEFAULT_ENCODER_SOCKET, help="Unix socket 路径"
+    )
+    parser.add_argument(
+        "--backend", choices=["torch", "onnx"], default="torch", help="推理后端"
+    )
+    parser.add_argument(
+        "--quantized", action="store_true", help="onnx 后端使用动态量化（qint8）模型"
+    )
+    parser.add_argument(
+        "--max-batch-sentences",
+        type=int,
+        default=256,
+        help="合并并发请求时单次 encode 的句子数上限",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        logger.info("🛑 编码服务已停止")
+
+
+#######################################################################################################
+# Main execution
+if __name__ == "__main__":
+    main()
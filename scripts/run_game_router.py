@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+启动分片部署的前端路由（按玩家把请求与 SSE 转发到所属的游戏服务器 worker）
+
+每个 worker 是一个 scripts/run_game_server.py 进程，启动时设置 AI_RPG_WORKER_ID：
+AI_RPG_WORKER_ID=w0 uv run uvicorn scripts.run_game_server:app --port 8001
+AI_RPG_WORKER_ID=w1 uv run uvicorn scripts.run_game_server:app --port 8002
+
+前端路由通过 AI_RPG_WORKERS 指定全部 worker（worker_id 须与各 worker 的 AI_RPG_WORKER_ID 一致）：
+AI_RPG_WORKERS="w0=http://127.0.0.1:8001,w1=http://127.0.0.1:8002" uv run python scripts/run_game_router.py
+
+scripts/generate_pm2_config.py 在 GAME_SERVER_WORKERS 大于 1 时生成上述全部进程。
+"""
+
+import os
+import sys
+
+# 将 src 目录添加到模块搜索路径
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+# 将 scripts 目录添加到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import GAME_SERVER_PORT
+from loguru import logger
+
+from ai_rpg.game.worker_shard import WorkerShardConfig
+from ai_rpg.services.worker_router import create_worker_router_app
+
+app = create_worker_router_app(
+    WorkerShardConfig(
+        workers=WorkerShardConfig.parse_workers(os.getenv("AI_RPG_WORKERS", ""))
+    )
+)
+
+
+def main() -> None:
+
+    logger.info(f"启动前端路由，端口: {GAME_SERVER_PORT}")
+
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=GAME_SERVER_PORT,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 import sys
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
 
 # 将 src 目录添加到模块搜索路径
 sys.path.insert(
@@ -34,13 +35,28 @@ from ai_rpg.services.dungeon_state import dungeon_state_api_router
 from ai_rpg.services.stages_state import stages_state_api_router
 from ai_rpg.services.background_tasks import background_tasks_api_router
 from ai_rpg.services.player_session import player_session_api_router
+from ai_rpg.services.pipeline_profile import pipeline_profile_api_router
+from ai_rpg.services.worker_cluster import worker_cluster_api_router
+from ai_rpg.services.game_server_dependencies import get_game_server
 from config import LOGS_DIR
 from ai_rpg.replicate import (
     GENERATED_IMAGES_OUTPUT_DIR,
     GENERATED_IMAGES_URL_PREFIX,
 )
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """服务器生命周期：启动/关闭 GameServer 持有的共享资源（如 LLM 连接池）"""
+    game_server = get_game_server()
+    await game_server.startup()
+    try:
+        yield
+    finally:
+        await game_server.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get(path="/")
@@ -103,6 +119,8 @@ app.include_router(router=home_api_router)
 app.include_router(router=dungeon_lifecycle_api_router)
 app.include_router(router=dungeon_combat_api_router)
 app.include_router(router=dungeon_entry_api_router)
+app.include_router(router=pipeline_profile_api_router)
+app.include_router(router=worker_cluster_api_router)
 
 
 def main() -> None:
@@ -3,6 +3,7 @@
 开发环境初始化脚本
 """
 
+import argparse
 import os
 import sys
 from typing import Final, final, List, Dict
@@ -21,14 +22,15 @@ from demo import (
     create_shrine_ruins_dungeon,
 )
 from ai_rpg.pgsql import (
+    create_collection_index,
     pgsql_create_database,
     pgsql_drop_database,
     pgsql_ensure_database_tables,
     postgresql_config,
 )
 from ai_rpg.pgsql.user_operations import has_user, save_user
-from ai_rpg.rag import add_documents
-from ai_rpg.embedding_model.sentence_transformer import embedding_model
+from ai_rpg.rag import ingest_documents
+from ai_rpg.embedding_model import embedding_encoder
 
 
 #######################################################################################################
@@ -109,7 +111,8 @@ def _setup_rag() -> None:
     """
     初始化 RAG 系统
 
-    注意：vector_documents 表已在 PostgreSQL 初始化阶段随数据库一并重建，此处无需再清空。
+    按内容哈希增量导入：数据库被重建时全量导入；保留数据库（--keep-db）重复运行时，
+    只向量化并写入新增或修改过的文档，并清理蓝图中已不存在的旧文档。
     """
     logger.info("🚀 初始化RAG系统...")
 
@@ -141,16 +144,21 @@ def _setup_rag() -> None:
                 metadatas_list.append({"category": category})
 
         logger.info(f"📚 为 {blueprint.name} 加载知识库...")
-        success = add_documents(
+        report = ingest_documents(
             collection=blueprint.name,
-            embedding_model=embedding_model,
+            embedding_model=embedding_encoder,
             documents=documents_list,
             metadatas=metadatas_list,
+            prune=True,
         )
-        if not success:
-            logger.error(f"❌ {blueprint.name} 知识库加载失败!")
-            raise Exception(f"{blueprint.name} 知识库加载失败")
-        logger.success(f"✅ {blueprint.name} 知识库加载成功!")
+        logger.success(
+            f"✅ {blueprint.name} 知识库加载成功! 新增 {report.inserted}，"
+            f"未变化 {report.unchanged}，清理 {report.pruned}，"
+            f"{report.docs_per_second:.1f} docs/s"
+        )
+
+        # 数据写入后再建 HNSW 部分索引（已存在时跳过，后续写入由 HNSW 增量维护）
+        create_collection_index(blueprint.name)
 
     logger.success("✅ RAG系统初始化完成!")
 
@@ -160,6 +168,14 @@ def _setup_rag() -> None:
 ########################################################################################################
 def main() -> None:
     """主函数：执行完整的开发环境初始化流程"""
+    parser = argparse.ArgumentParser(description="开发环境初始化")
+    parser.add_argument(
+        "--keep-db",
+        action="store_true",
+        help="保留现有数据库，只增量更新知识库（默认删除并重建数据库）",
+    )
+    args = parser.parse_args()
+
     logger.info("🚀 开始初始化开发环境...")
 
     # 保存演示游戏蓝图
@@ -176,11 +192,12 @@ def main() -> None:
 
     # PostgreSQL 相关操作
     try:
-        logger.info("�️ 删除旧数据库（如果存在）...")
-        pgsql_drop_database(postgresql_config.database)
+        if not args.keep_db:
+            logger.info("�️ 删除旧数据库（如果存在）...")
+            pgsql_drop_database(postgresql_config.database)
 
-        logger.info("📦 创建新数据库...")
-        pgsql_create_database(postgresql_config.database)
+            logger.info("📦 创建新数据库...")
+            pgsql_create_database(postgresql_config.database)
 
         logger.info("📋 创建数据库表结构...")
         pgsql_ensure_database_tables()
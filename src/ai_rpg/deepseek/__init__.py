@@ -2,17 +2,85 @@
 
 from .agent_loop import agent_loop
 from .batch import AgentLoopConfig, batch_chat, batch_agent_loop
-from .client import DeepSeekClient, ToolFunction, ToolDefinition, ToolCall
+from .client import (
+    ChatStreamChunk,
+    DeepSeekClient,
+    ToolFunction,
+    ToolDefinition,
+    ToolCall,
+)
 from .config import MODEL_FLASH, MODEL_PRO
+from .http_pool import HttpPoolConfig, HttpPoolStats, SharedHttpPool, shared_http_pool
+from .llm_timing import LLMWaitTimer, llm_wait, track_llm_wait
+from .resilience import (
+    CircuitBreakerConfig,
+    HedgePolicy,
+    LLMCircuitOpenError,
+    ResilienceConfig,
+    ResilienceLayer,
+    ResilienceStats,
+    RetryPolicy,
+    llm_resilience,
+)
+from .response_cache import (
+    ContextHasher,
+    ResponseCache,
+    ResponseCacheConfig,
+    ResponseCacheStats,
+    llm_response_cache,
+)
+from .token_counter import (
+    ChatUsage,
+    estimate_message_tokens,
+    estimate_messages_tokens,
+    estimate_text_tokens,
+)
+from .scheduler import (
+    LLMPriority,
+    LLMScheduler,
+    LLMSchedulerStats,
+    llm_request_context,
+    llm_scheduler,
+)
 
 __all__ = [
     "AgentLoopConfig",
     "agent_loop",
     "batch_chat",
     "batch_agent_loop",
+    "ChatStreamChunk",
     "DeepSeekClient",
     "MODEL_FLASH",
     "MODEL_PRO",
+    "HttpPoolConfig",
+    "HttpPoolStats",
+    "SharedHttpPool",
+    "shared_http_pool",
+    "LLMWaitTimer",
+    "llm_wait",
+    "track_llm_wait",
+    "CircuitBreakerConfig",
+    "HedgePolicy",
+    "LLMCircuitOpenError",
+    "ResilienceConfig",
+    "ResilienceLayer",
+    "ResilienceStats",
+    "RetryPolicy",
+    "llm_resilience",
+    "ContextHasher",
+    "ResponseCache",
+    "ResponseCacheConfig",
+    "ResponseCacheStats",
+    "llm_response_cache",
+    "LLMPriority",
+    "LLMScheduler",
+    "LLMSchedulerStats",
+    "llm_request_context",
+    "llm_scheduler",
+    "ChatUsage",
+    "estimate_message_tokens",
+    "estimate_messages_tokens",
+    "estimate_text_tokens",
     "BaseMessage",
     "ToolFunction",
     "ToolDefinition",
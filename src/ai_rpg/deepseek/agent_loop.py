@@ -43,13 +43,14 @@ async def agent_loop(
         )
 
         # 发起 LLM 请求，捕获异常以防止整个循环崩溃
+        # chat() 内部已按 llm_resilience 策略重试，仍失败说明重试耗尽或已熔断，继续下一轮只会白白消耗轮次
         try:
             await client.chat()
         except Exception as e:
             logger.error(
                 f"[agent_loop:{name}] LLM 请求失败，第 {round_num} 轮，中止: {e}"
             )
-            continue  # 继续下一轮，而不是中止整个循环
+            return False
 
         # 首轮将 prompt 追加进历史（后续轮次 current_prompt 已置空，走 continuation 模式）
         if current_prompt:
@@ -7,13 +7,13 @@ import asyncio
 import time
 from typing import Callable, Dict, List, Literal
 
-import httpx
 from loguru import logger
 from pydantic import BaseModel, ConfigDict
 
 from ..models.messages import ContextMessage
 from .agent_loop import agent_loop
 from .client import DeepSeekClient, ToolDefinition
+from .http_pool import shared_http_pool
 
 
 ############################################################################################################
@@ -38,18 +38,18 @@ class AgentLoopConfig(BaseModel):
 async def batch_chat(clients: List[DeepSeekClient]) -> None:
     """批量并发发送聊天请求。
 
-    创建一个共享 httpx.AsyncClient，所有 chat() 复用同一连接池，
-    batch 结束后自动关闭。
+    所有 chat() 复用进程级共享连接池（shared_http_pool），
+    不再为每个 batch 单独创建和销毁连接池。
     """
     if not clients:
         return
 
     start_time = time.time()
-    async with httpx.AsyncClient() as shared_client:
-        results = await asyncio.gather(
-            *[c.chat(client=shared_client) for c in clients],
-            return_exceptions=True,
-        )
+    shared_client = shared_http_pool.get_client()
+    results = await asyncio.gather(
+        *[c.chat(client=shared_client) for c in clients],
+        return_exceptions=True,
+    )
     elapsed = time.time() - start_time
     logger.debug(f"batch_chat: {len(clients)} clients, {elapsed:.2f}s")
 
@@ -73,6 +73,7 @@ async def batch_agent_loop(
 ) -> List[bool]:
     """批量并发执行 agent_loop。
 
+    各 agent_loop 内部的 chat() 均复用进程级共享连接池。
     每个元素是一个 AgentLoopConfig，参数含义与 agent_loop() 一致。
     agent_loop 会原地修改每个 config.context，调用结束后可通过 cfg.context 读取最终历史。
     注意：Pydantic 在构造 config 时会复制传入的 list，因此多个 config 共享同一基础列表是安全的，
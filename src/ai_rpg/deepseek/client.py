@@ -14,10 +14,22 @@ temperature 参数默认为 1.0。
 
 """
 
+import json
 import os
 import time
 from datetime import datetime
-from typing import Any, Dict, Final, List, Literal, Optional, Sequence, final
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    final,
+)
 
 import httpx
 import requests
@@ -34,6 +46,12 @@ from ..models.messages import (
 )
 from . import config
 from .config import CHAT_DUMP_DIR, MODEL_FLASH
+from .http_pool import shared_http_pool
+from .llm_timing import llm_wait
+from .resilience import llm_resilience
+from .response_cache import llm_response_cache
+from .scheduler import llm_scheduler
+from .token_counter import ChatUsage, estimate_messages_tokens, estimate_text_tokens
 
 load_dotenv()
 
@@ -81,6 +99,16 @@ class ToolCall(BaseModel):
     function: Function  # 函数调用信息
 
 
+############################################################################################################
+class ChatStreamChunk(BaseModel):
+    """流式（SSE）模式下服务端推送的单个增量块"""
+
+    content: str = ""  # 本块新增的回复文本
+    reasoning_content: str = ""  # 本块新增的思考过程文本（thinking mode）
+    tool_calls: List[Dict[str, Any]] = []  # 本块的 tool_call 片段（按 index 拼接）
+    finish_reason: str = ""  # 最后一块携带结束原因，其余为空字符串
+
+
 ############################################################################################################
 @final
 class DeepSeekClient:
@@ -175,8 +203,16 @@ class DeepSeekClient:
         tools: Optional[Sequence[ToolDefinition]] = None,
         tool_choice: Optional[Literal["auto", "none", "required"]] = None,
         reasoning_effort: Optional[Literal["low", "high", "max"]] = None,
+        on_stream_chunk: Optional[Callable[[ChatStreamChunk], None]] = None,
+        cacheable: bool = False,
     ) -> None:
-        """初始化 DeepSeek 直连客户端"""
+        """初始化 DeepSeek 直连客户端
+
+        传入 on_stream_chunk 时 chat() 改用流式（SSE）模式，每收到一个增量块即回调一次，
+        用于把生成中的文本实时推送给玩家。
+        cacheable 为 True 时 chat() 会查询 / 写入全局 llm_response_cache，
+        仅用于相同上下文与提示词可以复用结果的确定性生成任务。
+        """
         assert name != "", "name should not be empty"
         _tools: List[ToolDefinition] = list(tools) if tools else []
         assert (
@@ -210,11 +246,16 @@ class DeepSeekClient:
         self._reasoning_effort: Final[Optional[Literal["low", "high", "max"]]] = (
             reasoning_effort
         )
+        self._on_stream_chunk: Final[Optional[Callable[[ChatStreamChunk], None]]] = (
+            on_stream_chunk
+        )
+        self._cacheable: Final[bool] = cacheable
 
         # 输出
         self._response_ai_message: Optional[AIMessage] = None
         self._finish_reason: str = ""
         self._tool_calls: List[ToolCall] = []
+        self._usage: ChatUsage = ChatUsage()
 
     ################################################################################################################################################################################
     @property
@@ -270,7 +311,13 @@ class DeepSeekClient:
         return self._tool_calls
 
     ################################################################################################################################################################################
-    def _build_payload(self) -> Dict[str, Any]:
+    @property
+    def usage(self) -> ChatUsage:
+        """最近一次请求的 token 用量（发送前估算值 + 响应 usage）"""
+        return self._usage
+
+    ################################################################################################################################################################################
+    def _build_payload(self, stream: bool = False) -> Dict[str, Any]:
         """将 context + prompt 转换为 DeepSeek API payload"""
         messages: List[Dict[str, Any]] = []
         for msg in self._context:
@@ -313,7 +360,7 @@ class DeepSeekClient:
             "thinking": {"type": "enabled" if self._thinking else "disabled"},
             "max_tokens": 16384,
             "response_format": {"type": "text"},
-            "stream": False,
+            "stream": stream,
             "temperature": self._temperature,
             "tools": [t.model_dump() for t in self._tools] if self._tools else None,
             "tool_choice": self._tool_choice,
@@ -321,6 +368,9 @@ class DeepSeekClient:
         # reasoning_effort 仅当显式指定时传入
         if self._reasoning_effort is not None:
             payload["reasoning_effort"] = self._reasoning_effort
+        # 流式模式下让服务端在最后一块附带 usage
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
         return payload
 
     ################################################################################################################################################################################
@@ -409,42 +459,68 @@ class DeepSeekClient:
     async def chat(self, client: Optional[httpx.AsyncClient] = None) -> None:
         """异步发送聊天请求（直连 DeepSeek 平台）。
 
-        单独调用时不传 client，内部临时创建；
-        batch_chat 时传入共享 client 以复用连接池。
+        不传 client 时使用进程级共享连接池（shared_http_pool），复用 keep-alive 连接；
+        也可显式传入自定义 client。请求发出前会向全局 llm_scheduler 申请并发名额。
+        构造时传入 on_stream_chunk 则以流式模式请求，并逐块回调；cacheable 时先查响应缓存。
         """
+        cache_key = (
+            llm_response_cache.make_key(self._context, self._cache_request())
+            if self._cacheable and llm_response_cache.enabled
+            else None
+        )
+        if cache_key is not None:
+            cached = llm_response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"{self._name}: response cache hit")
+                self._start_usage()
+                self._parse_response(cached)
+                self._emit_stream_chunk(
+                    ChatStreamChunk(
+                        content=self.response_content,
+                        finish_reason=self._finish_reason,
+                    )
+                )
+                return
+
+        with llm_wait():
+            await self._chat(client)
+
+        # 只缓存正常结束（stop）的响应
+        if cache_key is not None and self._finish_reason == "stop":
+            llm_response_cache.put(cache_key, self._response_data())
+
+    ################################################################################################################################################################################
+    async def _chat(self, client: Optional[httpx.AsyncClient]) -> None:
+        if self._on_stream_chunk is not None:
+            async for chunk in self.stream(client):
+                self._emit_stream_chunk(chunk)
+            return
+
         logger.debug(f"{self._name} a_request full_prompt:\n{self._full_prompt}")
         start_time = time.time()
+        self._start_usage()
 
-        async def _do_post(http_client: httpx.AsyncClient) -> httpx.Response:
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "Authorization": f"Bearer {DeepSeekClient.get_api_key()}",
-            }
-            return await http_client.post(
-                url=_DEEPSEEK_API_URL,
-                headers=headers,
-                json=self._build_payload(),
-                timeout=self._timeout,
+        try:
+            http_client = (
+                client if client is not None else shared_http_pool.get_client()
             )
+            payload = self._build_payload()
+
+            async def _send() -> httpx.Response:
+                # 每次尝试（含重试、对冲副本）都经全局调度器排队获取并发名额
+                async with llm_scheduler.slot():
+                    return await http_client.post(
+                        url=_DEEPSEEK_API_URL,
+                        headers=self._build_headers(),
+                        json=payload,
+                        timeout=self._timeout,
+                    )
 
-        try:
-            if client is not None:
-                response = await _do_post(client)
-            else:
-                async with httpx.AsyncClient() as tmp_client:
-                    response = await _do_post(tmp_client)
+            # 经弹性层发送：失败退避重试、交互请求对冲、熔断
+            response = await llm_resilience.execute(_send)
 
-        except httpx.TimeoutException as e:
-            logger.error(f"{self._name}: async timeout: {type(e).__name__}: {e}")
-            raise
-        except httpx.ConnectError as e:
-            logger.error(
-                f"{self._name}: async connection error: {type(e).__name__}: {e}"
-            )
-            raise
         except httpx.RequestError as e:
-            logger.error(f"{self._name}: async request error: {type(e).__name__}: {e}")
+            self._log_request_error(e)
             raise
 
         elapsed = time.time() - start_time
@@ -453,24 +529,7 @@ class DeepSeekClient:
         if response.status_code == 200:
 
             # 解析响应并填充 response_content 和相关属性
-            self._parse_response(response.json())
-
-            # 直接打印完整的 response
-            logger.debug(f"{self._name} full response:\n{response.json()}")
-
-            # 仅打印 response_content 和 reasoning_content，方便用户查看
-            logger.info(f"{self._name} response_content:\n{self.response_content}")
-
-            # deepseek-reasoner 模型的思考过程内容通常较长，我们单独记录在 info 级别日志中，方便用户查看但不干扰主要输出
-            if self.response_reasoning_content:
-                logger.info(
-                    f"\n💭 {self._name} 思考过程:\n{self.response_reasoning_content}\n"
-                )
-                logger.info("=" * 60)
-
-            # 记录完整对话内容以供调试分析
-            if config.CHAT_DUMP_ENABLED:
-                self._dump_chat()
+            self._handle_response_data(response.json())
 
         else:
 
@@ -484,6 +543,231 @@ class DeepSeekClient:
                 response=response,
             )
 
+    ################################################################################################################################################################################
+    async def stream(
+        self, client: Optional[httpx.AsyncClient] = None
+    ) -> AsyncIterator[ChatStreamChunk]:
+        """以流式（SSE）模式发送聊天请求，逐块产出服务端推送的增量。
+
+        迭代结束后与 chat() 一样填充 response_ai_message / finish_reason / tool_calls。
+        """
+        logger.debug(f"{self._name} a_stream full_prompt:\n{self._full_prompt}")
+        start_time = time.time()
+        self._start_usage()
+        usage: Optional[Dict[str, Any]] = None
+
+        content_parts: List[str] = []
+        reasoning_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        finish_reason = ""
+
+        try:
+            http_client = (
+                client if client is not None else shared_http_pool.get_client()
+            )
+            request = http_client.build_request(
+                "POST",
+                url=_DEEPSEEK_API_URL,
+                headers=self._build_headers(stream=True),
+                json=self._build_payload(stream=True),
+                timeout=self._timeout,
+            )
+            async with llm_scheduler.slot():
+                # 建立流之前的失败经弹性层重试；流开始后的中断不重试（增量已交给调用方）
+                response = await llm_resilience.execute(
+                    lambda: http_client.send(request, stream=True), hedge=False
+                )
+                try:
+                    if response.status_code != 200:
+                        await response.aread()
+                        self._handle_error_response(response.status_code, response.text)
+                        raise httpx.HTTPStatusError(
+                            f"HTTP {response.status_code}",
+                            request=response.request,
+                            response=response,
+                        )
+
+                    async for line in response.aiter_lines():
+                        line_usage = self._parse_stream_usage(line)
+                        if line_usage is not None:
+                            usage = line_usage
+                        chunk = self._parse_stream_line(line)
+                        if chunk is None:
+                            continue
+
+                        # 累积增量，流结束后拼装为完整响应
+                        content_parts.append(chunk.content)
+                        reasoning_parts.append(chunk.reasoning_content)
+                        _merge_tool_call_fragments(tool_calls, chunk.tool_calls)
+                        if chunk.finish_reason:
+                            finish_reason = chunk.finish_reason
+
+                        yield chunk
+                finally:
+                    await response.aclose()
+
+        except httpx.RequestError as e:
+            self._log_request_error(e)
+            raise
+
+        elapsed = time.time() - start_time
+        logger.debug(f"{self._name} a_stream time: {elapsed:.2f}s")
+
+        message: Dict[str, Any] = {"content": "".join(content_parts)}
+        reasoning = "".join(reasoning_parts)
+        if reasoning:
+            message["reasoning_content"] = reasoning
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+
+        data: Dict[str, Any] = {
+            "choices": [{"finish_reason": finish_reason, "message": message}]
+        }
+        if usage is not None:
+            data["usage"] = usage
+        self._handle_response_data(data)
+
+    ################################################################################################################################################################################
+    def _emit_stream_chunk(self, chunk: ChatStreamChunk) -> None:
+        if self._on_stream_chunk is None:
+            return
+        try:
+            self._on_stream_chunk(chunk)
+        except Exception as e:
+            logger.warning(
+                f"{self._name}: on_stream_chunk failed: {type(e).__name__}: {e}"
+            )
+
+    ################################################################################################################################################################################
+    def _cache_request(self) -> Dict[str, Any]:
+        """参与缓存 key 计算的请求参数（上下文由滚动哈希单独计算）"""
+        return {
+            "model": self._model,
+            "thinking": self._thinking,
+            "temperature": self._temperature,
+            "reasoning_effort": self._reasoning_effort,
+            "tools": [t.model_dump() for t in self._tools],
+            "tool_choice": self._tool_choice,
+            "prompt": self._full_prompt,
+        }
+
+    ################################################################################################################################################################################
+    def _response_data(self) -> Dict[str, Any]:
+        """把当前响应还原为 _parse_response 可解析的数据（用于写入缓存）"""
+        message: Dict[str, Any] = {"content": self.response_content}
+        if self._response_ai_message is not None:
+            message.update(self._response_ai_message.additional_kwargs)
+        return {"choices": [{"finish_reason": self._finish_reason, "message": message}]}
+
+    ################################################################################################################################################################################
+    def _build_headers(self, stream: bool = False) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if stream else "application/json",
+            "Authorization": f"Bearer {DeepSeekClient.get_api_key()}",
+        }
+
+    ################################################################################################################################################################################
+    def _start_usage(self) -> None:
+        """发送前估算本次请求的输入 token（上下文 + 提示词）"""
+        self._usage = ChatUsage(
+            estimated_prompt_tokens=estimate_messages_tokens(self._context)
+            + estimate_text_tokens(self._full_prompt)
+        )
+
+    ################################################################################################################################################################################
+    def _record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """记录响应中的 usage 字段并输出本次请求的 token 用量"""
+        if usage:
+            self._usage = self._usage.model_copy(
+                update={
+                    "prompt_tokens": usage.get("prompt_tokens"),
+                    "completion_tokens": usage.get("completion_tokens"),
+                    "total_tokens": usage.get("total_tokens"),
+                    "prompt_cache_hit_tokens": usage.get("prompt_cache_hit_tokens"),
+                }
+            )
+        logger.info(
+            f"{self._name} tokens: context_messages = {len(self._context)}, "
+            f"estimated_prompt = {self._usage.estimated_prompt_tokens}, "
+            f"prompt = {self._usage.prompt_tokens}, "
+            f"completion = {self._usage.completion_tokens}, "
+            f"cache_hit = {self._usage.prompt_cache_hit_tokens}"
+        )
+
+    ################################################################################################################################################################################
+    def _parse_stream_usage(self, line: str) -> Optional[Dict[str, Any]]:
+        """流式响应最后一块（stream_options.include_usage）携带的 usage；其他行返回 None"""
+        if not line.startswith("data:") or '"usage"' not in line:
+            return None
+        data = line[len("data:") :].strip()
+        try:
+            usage = json.loads(data).get("usage")
+        except ValueError:
+            return None
+        return usage if isinstance(usage, dict) else None
+
+    ################################################################################################################################################################################
+    def _parse_stream_line(self, line: str) -> Optional[ChatStreamChunk]:
+        """解析一行 SSE 数据；空行、注释（keep-alive）与 [DONE] 返回 None"""
+        if not line.startswith("data:"):
+            return None
+
+        data = line[len("data:") :].strip()
+        if data == "" or data == "[DONE]":
+            return None
+
+        choices = json.loads(data).get("choices") or []
+        if not choices:
+            return None
+
+        choice = choices[0]
+        delta = choice.get("delta") or {}
+        return ChatStreamChunk(
+            content=delta.get("content") or "",
+            reasoning_content=delta.get("reasoning_content") or "",
+            tool_calls=delta.get("tool_calls") or [],
+            finish_reason=choice.get("finish_reason") or "",
+        )
+
+    ################################################################################################################################################################################
+    def _handle_response_data(self, data: Dict[str, Any]) -> None:
+        """解析完整响应并记录日志（chat() 与 stream() 共用）"""
+
+        # 解析响应并填充 response_content 和相关属性
+        self._parse_response(data)
+
+        # 记录本次请求的 token 用量
+        self._record_usage(data.get("usage"))
+
+        # 直接打印完整的 response
+        logger.debug(f"{self._name} full response:\n{data}")
+
+        # 仅打印 response_content 和 reasoning_content，方便用户查看
+        logger.info(f"{self._name} response_content:\n{self.response_content}")
+
+        # deepseek-reasoner 模型的思考过程内容通常较长，我们单独记录在 info 级别日志中，方便用户查看但不干扰主要输出
+        if self.response_reasoning_content:
+            logger.info(
+                f"\n💭 {self._name} 思考过程:\n{self.response_reasoning_content}\n"
+            )
+            logger.info("=" * 60)
+
+        # 记录完整对话内容以供调试分析
+        if config.CHAT_DUMP_ENABLED:
+            self._dump_chat()
+
+    ################################################################################################################################################################################
+    def _log_request_error(self, e: httpx.RequestError) -> None:
+        if isinstance(e, httpx.TimeoutException):
+            logger.error(f"{self._name}: async timeout: {type(e).__name__}: {e}")
+        elif isinstance(e, httpx.ConnectError):
+            logger.error(
+                f"{self._name}: async connection error: {type(e).__name__}: {e}"
+            )
+        else:
+            logger.error(f"{self._name}: async request error: {type(e).__name__}: {e}")
+
     ################################################################################################################################################################################
     def _dump_chat(self) -> None:
         """将本次 chat() 完整对话写入 .chat_dumps/ 下的 Markdown 文件。"""
@@ -531,3 +815,22 @@ class DeepSeekClient:
             )
 
     ################################################################################################################################################################################
+
+
+############################################################################################################
+def _merge_tool_call_fragments(
+    tool_calls: Dict[int, Dict[str, Any]], fragments: List[Dict[str, Any]]
+) -> None:
+    """按 index 拼接流式 tool_call 片段（id/name 首块给出，arguments 分块追加）"""
+    for fragment in fragments:
+        merged = tool_calls.setdefault(
+            fragment.get("index", 0),
+            {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+        )
+        if fragment.get("id"):
+            merged["id"] = fragment["id"]
+        if fragment.get("type"):
+            merged["type"] = fragment["type"]
+        function = fragment.get("function") or {}
+        merged["function"]["name"] += function.get("name") or ""
+        merged["function"]["arguments"] += function.get("arguments") or ""
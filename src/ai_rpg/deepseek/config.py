@@ -13,3 +13,6 @@ CHAT_DUMP_ENABLED: bool = False
 # chat dump 存储目录（项目根目录下）
 CHAT_DUMP_DIR: Path = Path(".chat_dumps")
 CHAT_DUMP_DIR.mkdir(parents=True, exist_ok=True)
+
+# LLM 响应缓存的 SQLite 文件路径（项目根目录下）
+LLM_RESPONSE_CACHE_PATH: Path = Path(".llm_cache") / "responses.sqlite3"
@@ -0,0 +1,187 @@
+"""进程级共享 HTTP 连接池
+
+DeepSeekClient / batch_chat / agent_loop / batch_agent_loop 默认复用同一个
+httpx.AsyncClient，避免每次 LLM 调用都重新建立 TCP + TLS 连接。
+
+生命周期由 GameServer 管理：启动时 start()，关闭时 aclose()。
+未显式启动时（脚本、测试）首次使用会按默认配置懒创建。
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, Final, Optional
+
+import httpx
+from loguru import logger
+from pydantic import BaseModel
+
+
+############################################################################################################
+class HttpPoolConfig(BaseModel):
+    """共享连接池配置"""
+
+    max_connections: int = 100  # 同时打开的最大连接数
+    max_keepalive_connections: int = 20  # 保持空闲（keep-alive）的最大连接数
+    keepalive_expiry: float = 30.0  # 空闲连接保活时长（秒）
+    http2: bool = True  # 是否启用 HTTP/2（需安装 h2，否则自动回退 HTTP/1.1）
+
+
+############################################################################################################
+class HttpPoolStats(BaseModel):
+    """共享连接池的连接复用统计"""
+
+    requests: int = 0  # 经连接池发出的请求总数
+    connections_opened: int = 0  # 新建 TCP 连接数
+    clients_created: int = 0  # 创建过的 httpx.AsyncClient 数量
+    clients_discarded: int = 0  # 原事件循环已结束、无法关闭而直接丢弃的 client 数量
+    http2: bool = False  # 当前是否使用 HTTP/2
+
+    @property
+    def reused_requests(self) -> int:
+        """复用已有连接的请求数"""
+        return max(self.requests - self.connections_opened, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """连接复用率（0.0 ~ 1.0）"""
+        if self.requests == 0:
+            return 0.0
+        return self.reused_requests / self.requests
+
+
+############################################################################################################
+class _TracingTransport(httpx.AsyncBaseTransport):
+    """包装底层 transport，通过 httpcore trace 扩展统计请求数与新建连接数"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, stats: HttpPoolStats) -> None:
+        self._inner: Final[httpx.AsyncBaseTransport] = inner
+        self._stats: Final[HttpPoolStats] = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats.requests += 1
+        previous_trace = request.extensions.get("trace")
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self._stats.connections_opened += 1
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = _trace
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+############################################################################################################
+class SharedHttpPool:
+    """进程级共享的 httpx.AsyncClient 管理器
+
+    httpx.AsyncClient 绑定创建它的事件循环；若在另一个事件循环中使用
+    （例如测试中每个用例独立的 loop），会自动为新循环重建 client。
+    旧 client 的原事件循环仍在运行时在该循环中关闭；原循环已结束时无法再关闭，记录后丢弃。
+    """
+
+    def __init__(self) -> None:
+        self._config: HttpPoolConfig = HttpPoolConfig()
+        self._stats: HttpPoolStats = HttpPoolStats()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    ############################################################################################################
+    @property
+    def config(self) -> HttpPoolConfig:
+        return self._config
+
+    ############################################################################################################
+    @property
+    def stats(self) -> HttpPoolStats:
+        """连接复用统计（返回副本）"""
+        return self._stats.model_copy()
+
+    ############################################################################################################
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    ############################################################################################################
+    async def start(self, config: Optional[HttpPoolConfig] = None) -> None:
+        """按指定配置（重新）创建连接池；已存在的连接池会先关闭"""
+        await self.aclose()
+        if config is not None:
+            self._config = config
+        self.get_client()
+
+    ############################################################################################################
+    def get_client(self) -> httpx.AsyncClient:
+        """获取当前事件循环可用的共享 client，不存在则按配置懒创建"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed:
+            if self._loop is loop:
+                return self._client
+            logger.debug("SharedHttpPool: 事件循环已变更，为当前循环重建 client")
+            assert self._loop is not None
+            self._release_client(self._client, self._loop)
+
+        self._client = self._create_client()
+        self._loop = loop
+        return self._client
+
+    ############################################################################################################
+    async def aclose(self) -> None:
+        """关闭连接池，释放所有连接"""
+        client = self._client
+        self._client = None
+        self._loop = None
+        if client is None or client.is_closed:
+            return
+
+        await client.aclose()
+        stats = self._stats
+        logger.info(
+            f"SharedHttpPool closed: requests={stats.requests}, "
+            f"connections_opened={stats.connections_opened}, "
+            f"reuse_ratio={stats.reuse_ratio:.2%}"
+        )
+
+    ############################################################################################################
+    def _release_client(
+        self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """释放绑定在另一个事件循环上的旧 client"""
+        if loop.is_running() and not loop.is_closed():
+            # 原事件循环在其他线程中运行：把关闭交给它执行
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        self._stats.clients_discarded += 1
+        logger.warning(
+            "SharedHttpPool: 旧 client 的事件循环已结束，无法关闭，直接丢弃"
+            "（应在循环结束前调用 aclose()）"
+        )
+
+    ############################################################################################################
+    def _create_client(self) -> httpx.AsyncClient:
+        config = self._config
+        http2 = config.http2 and importlib.util.find_spec("h2") is not None
+        if config.http2 and not http2:
+            logger.debug("SharedHttpPool: 未安装 h2，回退为 HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        transport = _TracingTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=http2), self._stats
+        )
+
+        self._stats.clients_created += 1
+        self._stats.http2 = http2
+        return httpx.AsyncClient(transport=transport)
+
+
+############################################################################################################
+# 全局共享连接池实例
+shared_http_pool: Final[SharedHttpPool] = SharedHttpPool()
@@ -0,0 +1,82 @@
+"""LLM 等待时间统计
+
+性能分析时需要区分一段代码的耗时中有多少是在等待 LLM 响应。调用方创建 LLMWaitTimer，
+用 track_llm_wait() 把它绑定到当前上下文（contextvars，asyncio 子任务自动继承），
+DeepSeekClient.chat() 发出请求时通过 llm_wait() 计时。
+
+并发请求（batch_chat）按时间区间的并集计时：同一时刻有多个请求在途只计一次，
+因此 wait_seconds 不会超过对应代码段的墙钟时间。未绑定计时器时 llm_wait() 只多一次 ContextVar 读取。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+############################################################################################################
+class LLMWaitTimer:
+    """累计至少有一个 LLM 请求在途的时间"""
+
+    def __init__(self) -> None:
+        self._in_flight: int = 0
+        self._busy_since: float = 0.0
+        self._wait_seconds: float = 0.0
+        self._requests: int = 0
+
+    ############################################################################################################
+    @property
+    def wait_seconds(self) -> float:
+        """已结束的在途区间总时长（秒）"""
+        return self._wait_seconds
+
+    ############################################################################################################
+    @property
+    def requests(self) -> int:
+        """发起的 LLM 请求数"""
+        return self._requests
+
+    ############################################################################################################
+    def begin(self) -> None:
+        if self._in_flight == 0:
+            self._busy_since = time.perf_counter()
+        self._in_flight += 1
+        self._requests += 1
+
+    ############################################################################################################
+    def end(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._wait_seconds += time.perf_counter() - self._busy_since
+
+
+############################################################################################################
+_current_timer: ContextVar[Optional[LLMWaitTimer]] = ContextVar(
+    "llm_wait_timer", default=None
+)
+
+
+############################################################################################################
+@contextmanager
+def track_llm_wait(timer: LLMWaitTimer) -> Iterator[LLMWaitTimer]:
+    """在当前上下文内把 LLM 请求的等待时间记入 timer"""
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+############################################################################################################
+@contextmanager
+def llm_wait() -> Iterator[None]:
+    """标记一次 LLM 请求的等待区间（当前上下文未绑定计时器时不做任何事）"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    timer.begin()
+    try:
+        yield
+    finally:
+        timer.end()
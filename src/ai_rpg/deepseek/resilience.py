@@ -0,0 +1,348 @@
+"""LLM 请求弹性层：重试退避、对冲请求与熔断
+
+DeepSeekClient 的每次 HTTP 请求都经由全局 llm_resilience 执行：
+
+- 重试：传输错误（超时、连接失败等）与 429/500/502/503/504 按指数退避 + 随机抖动重试，
+  429/503 带 Retry-After 时以其为下限；
+- 对冲（hedging）：仅对 INTERACTIVE 优先级的请求生效，首个请求超过近期 p95 延迟仍未返回时
+  再发出一个重复请求，取先成功者，压缩长尾延迟；
+- 熔断：连续失败达到阈值后熔断一段时间，期间请求直接失败（LLMCircuitOpenError），
+  冷却后只放行一个试探请求（其余请求仍直接失败），试探成功即恢复，失败则重新熔断。
+
+各项计数见 ResilienceStats，用于观察服务商带来的额外延迟。
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Final, FrozenSet, Optional, Set
+
+import httpx
+from loguru import logger
+from pydantic import BaseModel
+
+from .scheduler import LLMPriority, current_llm_priority
+
+
+############################################################################################################
+class RetryPolicy(BaseModel):
+    """重试策略"""
+
+    max_attempts: int = 3  # 最多尝试次数（含首次）
+    base_delay: float = 0.5  # 首次重试的基础退避时长（秒），之后按 2 的幂增长
+    max_delay: float = 8.0  # 单次退避上限（秒）
+    jitter: float = 0.5  # 抖动比例：实际退避在 [delay * (1 - jitter), delay] 内随机
+    max_retry_after: float = 30.0  # Retry-After 的采纳上限（秒）
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+
+############################################################################################################
+class HedgePolicy(BaseModel):
+    """对冲请求策略（仅 INTERACTIVE 优先级）"""
+
+    enabled: bool = False
+    percentile: float = 0.95  # 以近期成功延迟的该分位数作为对冲触发阈值
+    min_samples: int = 20  # 延迟样本不足时不对冲
+    min_delay: float = 1.0  # 对冲触发阈值下限（秒），避免对本就很快的请求翻倍发送
+
+
+############################################################################################################
+class CircuitBreakerConfig(BaseModel):
+    """熔断器配置"""
+
+    failure_threshold: int = 5  # 连续失败次数达到该值即熔断
+    recovery_timeout: float = 30.0  # 熔断持续时长（秒），之后放行试探请求
+
+
+############################################################################################################
+class ResilienceConfig(BaseModel):
+    """弹性层配置"""
+
+    retry: RetryPolicy = RetryPolicy()
+    hedge: HedgePolicy = HedgePolicy()
+    breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+
+
+############################################################################################################
+class ResilienceStats(BaseModel):
+    """弹性层计数"""
+
+    requests: int = 0  # 经弹性层执行的逻辑请求数
+    attempts: int = 0  # 实际尝试次数（不含对冲副本）
+    retries: int = 0  # 重试次数
+    retry_after_honored: int = 0  # 采纳 Retry-After 的次数
+    backoff_seconds: float = 0.0  # 累计退避等待时长（秒）
+    hedges_launched: int = 0  # 发出的对冲请求数
+    hedges_won: int = 0  # 对冲请求先于原请求成功的次数
+    failures: int = 0  # 失败的尝试次数（传输错误或可重试状态码）
+    circuit_opens: int = 0  # 熔断次数
+    circuit_rejections: int = 0  # 熔断期间被直接拒绝的请求数
+    circuit_state: str = "closed"  # closed / open / half_open
+    p95_latency_seconds: float = 0.0  # 近期成功请求的 p95 延迟
+
+
+############################################################################################################
+class LLMCircuitOpenError(RuntimeError):
+    """熔断期间请求被拒绝"""
+
+
+############################################################################################################
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+############################################################################################################
+async def _close_response(task: "asyncio.Future[httpx.Response]") -> None:
+    """关闭已完成但不会交给调用方的请求的响应"""
+    if task.exception() is None:
+        await task.result().aclose()
+
+
+############################################################################################################
+class ResilienceLayer:
+    """LLM 请求弹性层（重试 + 对冲 + 熔断）"""
+
+    _LATENCY_WINDOW: Final[int] = 200
+
+    def __init__(self, config: Optional[ResilienceConfig] = None) -> None:
+        self._config: ResilienceConfig = (
+            config if config is not None else ResilienceConfig()
+        )
+        self._stats: ResilienceStats = ResilienceStats()
+        self._latencies: Deque[float] = deque(maxlen=self._LATENCY_WINDOW)
+
+        # 熔断器状态
+        self._consecutive_failures: int = 0
+        self._opened_at: Optional[float] = None
+        self._half_open: bool = False
+        self._probe_in_flight: bool = False  # 半开状态下放行的试探请求尚无结果
+
+    ############################################################################################################
+    @property
+    def config(self) -> ResilienceConfig:
+        return self._config
+
+    ############################################################################################################
+    @property
+    def stats(self) -> ResilienceStats:
+        """弹性层计数（返回副本）"""
+        stats = self._stats.model_copy()
+        stats.p95_latency_seconds = self._latency_percentile(0.95) or 0.0
+        stats.circuit_state = (
+            "half_open"
+            if self._half_open
+            else ("open" if self._opened_at is not None else "closed")
+        )
+        return stats
+
+    ############################################################################################################
+    def configure(self, config: ResilienceConfig) -> None:
+        """替换配置并重置熔断器状态"""
+        self._config = config
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._half_open = False
+        self._probe_in_flight = False
+
+    ############################################################################################################
+    async def execute(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        hedge: Optional[bool] = None,
+    ) -> httpx.Response:
+        """执行一次逻辑请求：熔断检查 → 发送（可能对冲）→ 失败按策略退避重试。
+
+        send 每次调用都应发出一个全新的请求。非可重试状态码的响应原样返回，由调用方处理。
+        hedge 为 None 时按当前 LLM 优先级决定（仅 INTERACTIVE 对冲）。
+        """
+        if hedge is None:
+            hedge = current_llm_priority() == LLMPriority.INTERACTIVE
+        policy = self._config.retry
+        self._stats.requests += 1
+
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self._check_circuit()
+            self._stats.attempts += 1
+            start = time.monotonic()
+
+            retry_after: Optional[float] = None
+            try:
+                response = await (self._send_hedged(send) if hedge else send())
+            except httpx.TransportError as e:
+                self._record_failure()
+                if attempt >= policy.max_attempts:
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            except BaseException:
+                if probe:
+                    # 试探请求被取消或出现非传输错误：没有结论，交给下一个请求重新试探
+                    self._probe_in_flight = False
+                raise
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    self._record_success(time.monotonic() - start)
+                    return response
+
+                self._record_failure()
+                if attempt >= policy.max_attempts:
+                    return response
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+                await response.aclose()
+
+            delay = self._backoff_delay(attempt, retry_after)
+            self._stats.retries += 1
+            self._stats.backoff_seconds += delay
+            logger.warning(
+                f"LLM 请求失败（{reason}），{delay:.2f}s 后重试 "
+                f"({attempt}/{policy.max_attempts})"
+            )
+            await asyncio.sleep(delay)
+
+    ############################################################################################################
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        policy = self._config.retry
+        delay: float = min(policy.max_delay, policy.base_delay * 2.0 ** (attempt - 1))
+        delay = random.uniform(delay * (1.0 - policy.jitter), delay)
+        if retry_after is not None:
+            self._stats.retry_after_honored += 1
+            delay = max(delay, min(retry_after, policy.max_retry_after))
+        return delay
+
+    ############################################################################################################
+    async def _send_hedged(
+        self, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """首个请求超过 p95 延迟仍未返回时发出对冲副本，取先成功（非可重试状态）的响应"""
+        threshold = self._hedge_threshold()
+        if threshold is None:
+            return await send()
+
+        primary: "asyncio.Future[httpx.Response]" = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result()
+
+        self._stats.hedges_launched += 1
+        hedged: "asyncio.Future[httpx.Response]" = asyncio.ensure_future(send())
+        pending: Set["asyncio.Future[httpx.Response]"] = {primary, hedged}
+        fallback: Optional["asyncio.Future[httpx.Response]"] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next(
+                    (
+                        task
+                        for task in done
+                        if task.exception() is None
+                        and task.result().status_code
+                        not in self._config.retry.retry_statuses
+                    ),
+                    None,
+                )
+                for task in done:
+                    if task is winner:
+                        continue
+                    # 被替换的可重试响应不会再交给调用方，关闭以归还连接（stream=True 时尤其重要）
+                    if fallback is not None:
+                        await _close_response(fallback)
+                    fallback = task
+                if winner is not None:
+                    if fallback is not None:
+                        await _close_response(fallback)
+                    if winner is hedged:
+                        self._stats.hedges_won += 1
+                    return winner.result()
+
+            # 两个请求都失败：交回最后一个结果（异常或可重试响应），由重试逻辑处理
+            assert fallback is not None
+            return fallback.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    ############################################################################################################
+    def _hedge_threshold(self) -> Optional[float]:
+        policy = self._config.hedge
+        if not policy.enabled or len(self._latencies) < policy.min_samples:
+            return None
+        percentile = self._latency_percentile(policy.percentile)
+        assert percentile is not None
+        return max(percentile, policy.min_delay)
+
+    ############################################################################################################
+    def _latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * percentile), len(ordered) - 1)
+        return ordered[index]
+
+    ############################################################################################################
+    def _check_circuit(self) -> bool:
+        """熔断检查，熔断期间抛出 LLMCircuitOpenError；返回本次尝试是否为半开状态的试探请求"""
+        if self._opened_at is None:
+            return False
+        if (
+            not self._probe_in_flight
+            and time.monotonic() - self._opened_at
+            >= self._config.breaker.recovery_timeout
+        ):
+            # 冷却结束：进入半开状态，只放行一个试探请求
+            self._half_open = True
+            self._probe_in_flight = True
+            return True
+        self._stats.circuit_rejections += 1
+        raise LLMCircuitOpenError("LLM circuit breaker is open")
+
+    ############################################################################################################
+    def _record_success(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        if self._opened_at is not None:
+            logger.info("LLM 熔断器恢复（closed）")
+        self._opened_at = None
+        self._half_open = False
+        self._probe_in_flight = False
+
+    ############################################################################################################
+    def _record_failure(self) -> None:
+        self._stats.failures += 1
+        self._consecutive_failures += 1
+        if self._half_open or (
+            self._opened_at is None
+            and self._consecutive_failures >= self._config.breaker.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._half_open = False
+            self._probe_in_flight = False
+            self._stats.circuit_opens += 1
+            logger.error(
+                f"LLM 熔断器打开：连续失败 {self._consecutive_failures} 次，"
+                f"{self._config.breaker.recovery_timeout:.0f}s 内请求将直接失败"
+            )
+
+
+############################################################################################################
+# 全局 LLM 弹性层实例
+llm_resilience: Final[ResilienceLayer] = ResilienceLayer()
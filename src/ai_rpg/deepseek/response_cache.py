@@ -0,0 +1,357 @@
+"""LLM 响应缓存
+
+面向确定性 / 低温度提示词（场景描述、外观生成、卡组生成等）的生产级响应缓存，
+由 utils.debug_cache 的思路推广而来：
+
+- 缓存 key：对话上下文按前缀滚动哈希（h_i = sha256(h_{i-1} || digest(msg_i))），
+  同一个 context 列表只对新增消息计算哈希，代价为 O(新增消息数)；
+  再与本次请求参数（模型、温度、prompt、工具等）组合得到最终 key；
+- 两级存储：进程内 LRU + 单个 SQLite 文件，磁盘层按总字节数淘汰最久未访问的条目；
+- 命中 / 未命中 / 淘汰计数见 ResponseCacheStats。
+
+缓存默认关闭，由 GameServer.startup() 调用 open() 启用。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Final, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..models.messages import BaseMessage, ToolMessage
+from .config import LLM_RESPONSE_CACHE_PATH
+
+
+############################################################################################################
+class ResponseCacheConfig(BaseModel):
+    """响应缓存配置"""
+
+    memory_max_entries: int = 1024  # 进程内 LRU 容量（条）
+    disk_path: Optional[Path] = (
+        LLM_RESPONSE_CACHE_PATH  # SQLite 文件路径，None 表示仅内存
+    )
+    disk_max_bytes: int = 256 * 1024 * 1024  # 磁盘层容量上限（字节）
+    max_tracked_contexts: int = 512  # 滚动哈希链最多跟踪的 context 列表数
+
+
+############################################################################################################
+class ResponseCacheStats(BaseModel):
+    """响应缓存计数"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0  # 磁盘层淘汰条目数
+    disk_entries: int = 0
+    disk_bytes: int = 0
+    hashed_messages: int = 0  # 累计计算过摘要的消息数（衡量滚动哈希的增量效果）
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+############################################################################################################
+def _message_digest(message: BaseMessage) -> bytes:
+    """单条消息的摘要，只覆盖实际发送给 LLM 的字段"""
+    parts: List[str] = [message.type, message.content]
+    if isinstance(message, ToolMessage):
+        parts.append(message.tool_call_id)
+    tool_calls = message.additional_kwargs.get("tool_calls")
+    if tool_calls:
+        parts.append(json.dumps(tool_calls, ensure_ascii=False, sort_keys=True))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+
+
+############################################################################################################
+class _HashChain:
+    """一个 context 列表的前缀哈希链：messages[i] 对应 digests[i]（前 i+1 条消息的滚动哈希）"""
+
+    __slots__ = ("messages", "digests")
+
+    def __init__(self) -> None:
+        self.messages: List[BaseMessage] = []
+        self.digests: List[bytes] = []
+
+
+############################################################################################################
+class ContextHasher:
+    """对话上下文的增量滚动哈希
+
+    以 context 列表对象为单位缓存前缀哈希链。再次计算同一列表时，若其前缀仍是上次见到的
+    消息对象（以最后一条已哈希消息的对象身份校验），只对新增消息计算摘要。
+    约定：已进入上下文的消息不会被原地修改（RPGAgentContext 只追加 / 删除 / 整体替换）。
+    """
+
+    _EMPTY: Final[bytes] = hashlib.sha256(b"").digest()
+
+    def __init__(self, max_tracked_contexts: int = 512) -> None:
+        self._max_tracked_contexts: int = max_tracked_contexts
+        self._chains: "OrderedDict[int, _HashChain]" = OrderedDict()
+        self.hashed_messages: int = 0
+
+    ############################################################################################################
+    def digest(self, context: Sequence[BaseMessage]) -> bytes:
+        """返回整个 context 的滚动哈希"""
+        if not context:
+            return self._EMPTY
+
+        chain = self._chains.get(id(context))
+        if chain is None:
+            chain = _HashChain()
+            self._chains[id(context)] = chain
+            if len(self._chains) > self._max_tracked_contexts:
+                self._chains.popitem(last=False)
+        else:
+            self._chains.move_to_end(id(context))
+
+        valid = self._valid_prefix(chain, context)
+        if valid < len(chain.messages):
+            del chain.messages[valid:]
+            del chain.digests[valid:]
+
+        previous = chain.digests[-1] if chain.digests else self._EMPTY
+        for message in context[valid:]:
+            previous = hashlib.sha256(previous + _message_digest(message)).digest()
+            chain.messages.append(message)
+            chain.digests.append(previous)
+            self.hashed_messages += 1
+
+        return previous
+
+    ############################################################################################################
+    def _valid_prefix(self, chain: _HashChain, context: Sequence[BaseMessage]) -> int:
+        """链中仍与 context 一致的前缀长度"""
+        known = len(chain.messages)
+        if known == 0:
+            return 0
+        if (
+            len(context) >= known
+            and context[known - 1] is chain.messages[-1]
+            and context[0] is chain.messages[0]
+        ):
+            return known
+
+        # 列表被截断或中间有删除：逐个比对对象身份，找到仍然有效的最长前缀
+        valid = 0
+        for cached, current in zip(chain.messages, context):
+            if cached is not current:
+                break
+            valid += 1
+        return valid
+
+
+############################################################################################################
+class ResponseCache:
+    """两级（内存 LRU + SQLite）LLM 响应缓存"""
+
+    def __init__(self) -> None:
+        self._config: ResponseCacheConfig = ResponseCacheConfig()
+        self._enabled: bool = False
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._hasher: ContextHasher = ContextHasher()
+        self._stats: ResponseCacheStats = ResponseCacheStats()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock: threading.Lock = threading.Lock()
+
+    ############################################################################################################
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    ############################################################################################################
+    @property
+    def stats(self) -> ResponseCacheStats:
+        """缓存计数（返回副本）"""
+        stats = self._stats.model_copy()
+        stats.hashed_messages = self._hasher.hashed_messages
+        return stats
+
+    ############################################################################################################
+    def open(self, config: Optional[ResponseCacheConfig] = None) -> None:
+        """按配置启用缓存；已启用时先关闭"""
+        self.close()
+        if config is not None:
+            self._config = config
+        self._hasher = ContextHasher(self._config.max_tracked_contexts)
+
+        if self._config.disk_path is not None:
+            self._config.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self._config.disk_path), check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access"
+                " ON responses (last_access)"
+            )
+            self._db.commit()
+            self._refresh_disk_stats()
+
+        self._enabled = True
+        logger.info(f"ResponseCache opened: {self._config}")
+
+    ############################################################################################################
+    def close(self) -> None:
+        """关闭缓存（磁盘数据保留）"""
+        self._enabled = False
+        self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    ############################################################################################################
+    def make_key(self, context: Sequence[BaseMessage], request: Dict[str, Any]) -> str:
+        """由上下文滚动哈希与请求参数（不含上下文）组合出缓存 key"""
+        request_bytes = json.dumps(
+            request, ensure_ascii=False, sort_keys=True, default=str
+        ).encode("utf-8")
+        return hashlib.sha256(self._hasher.digest(context) + request_bytes).hexdigest()
+
+    ############################################################################################################
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询缓存，命中返回响应数据"""
+        if not self._enabled:
+            return None
+
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self._stats.memory_hits += 1
+            return self._decode(value)
+
+        value = self._disk_get(key)
+        if value is not None:
+            self._stats.disk_hits += 1
+            self._memory_put(key, value)
+            return self._decode(value)
+
+        self._stats.misses += 1
+        return None
+
+    ############################################################################################################
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """写入缓存"""
+        if not self._enabled:
+            return
+        value = json.dumps(data, ensure_ascii=False)
+        self._memory_put(key, value)
+        self._disk_put(key, value)
+        self._stats.stores += 1
+
+    ############################################################################################################
+    def _decode(self, value: str) -> Optional[Dict[str, Any]]:
+        try:
+            data: Dict[str, Any] = json.loads(value)
+            return data
+        except json.JSONDecodeError:
+            return None
+
+    ############################################################################################################
+    def _memory_put(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._config.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    ############################################################################################################
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row: Optional[Tuple[str]] = self._db.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._db.commit()
+        return row[0]
+
+    ############################################################################################################
+    def _disk_put(self, key: str, value: str) -> None:
+        if self._db is None:
+            return
+        size = len(value.encode("utf-8"))
+        with self._db_lock:
+            previous: Optional[Tuple[int]] = self._db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._db.commit()
+
+        if previous is None:
+            self._stats.disk_entries += 1
+            self._stats.disk_bytes += size
+        else:
+            self._stats.disk_bytes += size - previous[0]
+
+        if self._stats.disk_bytes > self._config.disk_max_bytes:
+            self._evict()
+
+    ############################################################################################################
+    def _evict(self) -> None:
+        """按最久未访问淘汰，直到磁盘层降到容量上限的 90%"""
+        assert self._db is not None
+        target = int(self._config.disk_max_bytes * 0.9)
+        victims: List[Tuple[str]] = []
+        freed = 0
+        with self._db_lock:
+            cursor = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access"
+            )
+            for key, size in cursor:
+                if self._stats.disk_bytes - freed <= target:
+                    break
+                victims.append((key,))
+                freed += size
+            cursor.close()
+            self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+            self._db.commit()
+
+        for (key,) in victims:
+            self._memory.pop(key, None)
+        self._stats.evictions += len(victims)
+        self._stats.disk_entries -= len(victims)
+        self._stats.disk_bytes -= freed
+
+    ############################################################################################################
+    def _refresh_disk_stats(self) -> None:
+        assert self._db is not None
+        with self._db_lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        self._stats.disk_entries = int(entries)
+        self._stats.disk_bytes = int(total)
+
+
+############################################################################################################
+# 全局 LLM 响应缓存实例（默认关闭）
+llm_response_cache: Final[ResponseCache] = ResponseCache()
@@ -0,0 +1,266 @@
+"""全服 LLM 请求调度器
+
+所有 DeepSeekClient.chat() 在真正发出 HTTP 请求前都要向调度器申请一个并发名额：
+
+- 全局在途（in-flight）请求数上限，避免少数玩家打满服务商速率限制；
+- 优先级分级：战斗交互 > 家园规划 > 副本生成，高优先级请求先获得名额；
+- 同一优先级内按玩家轮转（round-robin），单个玩家的大批量请求不会饿死其他玩家。
+
+请求所属的玩家与优先级通过 contextvars 传递（见 llm_request_context），
+由 RPGGameProcessPipeline.process() 在执行管道时设置，asyncio.gather 派生的子任务会自动继承。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator, Deque, Dict, Final, Iterator, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+############################################################################################################
+class LLMPriority(IntEnum):
+    """LLM 请求优先级，数值越小越优先"""
+
+    INTERACTIVE = 0  # 战斗等玩家实时等待的交互
+    PLANNING = 1  # 家园规划、制作等
+    GENERATION = 2  # 副本生成等后台批量生成
+
+
+############################################################################################################
+_current_user: ContextVar[str] = ContextVar("llm_request_user", default="")
+_current_priority: ContextVar[LLMPriority] = ContextVar(
+    "llm_request_priority", default=LLMPriority.PLANNING
+)
+
+
+############################################################################################################
+@contextmanager
+def llm_request_context(
+    user: Optional[str] = None, priority: Optional[LLMPriority] = None
+) -> Iterator[None]:
+    """在当前上下文内设置 LLM 请求所属玩家与优先级（None 表示沿用外层设置）"""
+    user_token = _current_user.set(user) if user is not None else None
+    priority_token = _current_priority.set(priority) if priority is not None else None
+    try:
+        yield
+    finally:
+        if priority_token is not None:
+            _current_priority.reset(priority_token)
+        if user_token is not None:
+            _current_user.reset(user_token)
+
+
+############################################################################################################
+def current_llm_priority() -> LLMPriority:
+    """当前上下文的 LLM 请求优先级"""
+    return _current_priority.get()
+
+
+############################################################################################################
+class LLMSchedulerStats(BaseModel):
+    """调度器运行统计"""
+
+    max_in_flight: int  # 全局在途上限
+    in_flight: int  # 当前在途请求数
+    queue_depth: int  # 当前排队请求总数
+    queue_depth_by_priority: Dict[str, int]  # 各优先级排队数
+    queued_users: int  # 当前有排队请求的玩家数
+    granted: int  # 累计获得名额的请求数
+    avg_wait_seconds_by_priority: Dict[str, float]  # 各优先级平均排队时长
+    max_wait_seconds: float  # 最长排队时长
+
+
+############################################################################################################
+class _Waiter:
+    """排队中的单个请求"""
+
+    __slots__ = ("future", "enqueued_at")
+
+    def __init__(self, future: "asyncio.Future[None]") -> None:
+        self.future: Final["asyncio.Future[None]"] = future
+        self.enqueued_at: Final[float] = time.monotonic()
+
+
+############################################################################################################
+class LLMScheduler:
+    """全局 LLM 并发调度器（全局上限 + 优先级 + 玩家公平排队）"""
+
+    def __init__(self, max_in_flight: int = 16) -> None:
+        assert max_in_flight > 0, "max_in_flight should be positive"
+        self._max_in_flight: int = max_in_flight
+        self._in_flight: int = 0
+
+        # 每个优先级一个有序字典：玩家 -> 该玩家的等待队列；字典顺序即轮转顺序
+        self._queues: Dict[LLMPriority, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in LLMPriority
+        }
+
+        self._granted: int = 0
+        self._wait_totals: Dict[LLMPriority, float] = {p: 0.0 for p in LLMPriority}
+        self._wait_counts: Dict[LLMPriority, int] = {p: 0 for p in LLMPriority}
+        self._max_wait: float = 0.0
+
+    ############################################################################################################
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    ############################################################################################################
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    ############################################################################################################
+    @property
+    def queue_depth(self) -> int:
+        return sum(
+            len(waiters)
+            for queue in self._queues.values()
+            for waiters in queue.values()
+        )
+
+    ############################################################################################################
+    def configure(self, max_in_flight: int) -> None:
+        """调整全局在途上限；调大时立即放行排队请求"""
+        assert max_in_flight > 0, "max_in_flight should be positive"
+        self._max_in_flight = max_in_flight
+        self._dispatch()
+
+    ############################################################################################################
+    @property
+    def stats(self) -> LLMSchedulerStats:
+        return LLMSchedulerStats(
+            max_in_flight=self._max_in_flight,
+            in_flight=self._in_flight,
+            queue_depth=self.queue_depth,
+            queue_depth_by_priority={
+                priority.name: sum(len(w) for w in queue.values())
+                for priority, queue in self._queues.items()
+            },
+            queued_users=len(
+                {user for queue in self._queues.values() for user in queue}
+            ),
+            granted=self._granted,
+            avg_wait_seconds_by_priority={
+                priority.name: (
+                    self._wait_totals[priority] / self._wait_counts[priority]
+                    if self._wait_counts[priority]
+                    else 0.0
+                )
+                for priority in LLMPriority
+            },
+            max_wait_seconds=self._max_wait,
+        )
+
+    ############################################################################################################
+    @asynccontextmanager
+    async def slot(
+        self, user: Optional[str] = None, priority: Optional[LLMPriority] = None
+    ) -> AsyncIterator[None]:
+        """申请一个并发名额，退出时释放；未指定时使用 llm_request_context 的设置"""
+        await self.acquire(user, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    ############################################################################################################
+    async def acquire(
+        self, user: Optional[str] = None, priority: Optional[LLMPriority] = None
+    ) -> None:
+        """申请一个并发名额；名额不足时按优先级与玩家轮转排队等待"""
+        user = user if user is not None else _current_user.get()
+        priority = priority if priority is not None else _current_priority.get()
+
+        # 快速路径：有空闲名额且无人排队
+        if self._in_flight < self._max_in_flight and self.queue_depth == 0:
+            self._grant(priority, 0.0)
+            return
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future())
+        queue = self._queues[priority]
+        queue.setdefault(user, deque()).append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已获得名额但调用方被取消：归还名额
+                self.release()
+            else:
+                self._remove_waiter(priority, user, waiter)
+            raise
+
+    ############################################################################################################
+    def release(self) -> None:
+        """释放一个并发名额并放行下一个排队请求"""
+        assert self._in_flight > 0, "release() called without matching acquire()"
+        self._in_flight -= 1
+        self._dispatch()
+
+    ############################################################################################################
+    def _dispatch(self) -> None:
+        """在名额允许范围内，按优先级 + 玩家轮转放行排队请求"""
+        while self._in_flight < self._max_in_flight:
+            waiter_priority = self._pop_next_waiter()
+            if waiter_priority is None:
+                return
+            waiter, priority = waiter_priority
+            if waiter.future.done():
+                continue
+            self._grant(priority, time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    ############################################################################################################
+    def _pop_next_waiter(self) -> Optional[tuple[_Waiter, LLMPriority]]:
+        for priority in LLMPriority:
+            queue = self._queues[priority]
+            if not queue:
+                continue
+
+            # 取轮转队首玩家的第一个请求，然后把该玩家移到队尾
+            user, waiters = next(iter(queue.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                queue.move_to_end(user)
+            else:
+                del queue[user]
+            return waiter, priority
+        return None
+
+    ############################################################################################################
+    def _remove_waiter(self, priority: LLMPriority, user: str, waiter: _Waiter) -> None:
+        waiters = self._queues[priority].get(user)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        if not waiters:
+            del self._queues[priority][user]
+
+    ############################################################################################################
+    def _grant(self, priority: LLMPriority, waited: float) -> None:
+        self._in_flight += 1
+        self._granted += 1
+        self._wait_totals[priority] += waited
+        self._wait_counts[priority] += 1
+        if waited > self._max_wait:
+            self._max_wait = waited
+        if waited > 1.0:
+            logger.debug(
+                f"LLMScheduler: {priority.name} 请求排队 {waited:.2f}s，"
+                f"in_flight={self._in_flight}/{self._max_in_flight}, queue={self.queue_depth}"
+            )
+
+
+############################################################################################################
+# 全局 LLM 调度器实例
+llm_scheduler: Final[LLMScheduler] = LLMScheduler()
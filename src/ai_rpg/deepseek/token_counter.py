@@ -0,0 +1,63 @@
+"""LLM 上下文 token 估算
+
+本地不加载 DeepSeek 分词器，按官方给出的经验比例估算：
+1 个英文字符 ≈ 0.3 token，1 个中文字符 ≈ 0.6 token；每条消息另计固定的格式开销。
+估算值只用于上下文预算与监控，实际用量以响应中的 usage 为准（见 ChatUsage）。
+"""
+
+from typing import Final, Optional, Sequence
+
+from pydantic import BaseModel
+
+from ..models.messages import BaseMessage
+
+_ASCII_TOKENS_PER_CHAR: Final[float] = 0.3
+_NON_ASCII_TOKENS_PER_CHAR: Final[float] = 0.6
+_MESSAGE_OVERHEAD_TOKENS: Final[int] = 4
+
+
+############################################################################################################
+class ChatUsage(BaseModel):
+    """单次 LLM 请求的 token 用量"""
+
+    estimated_prompt_tokens: int = 0  # 发送前按上下文估算的输入 token
+    prompt_tokens: Optional[int] = None  # 以下为响应 usage 字段，响应未携带时为 None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    prompt_cache_hit_tokens: Optional[int] = None  # DeepSeek 上下文硬盘缓存命中部分
+
+
+############################################################################################################
+def estimate_text_tokens(text: str) -> int:
+    """估算一段文本的 token 数"""
+    if not text:
+        return 0
+    length = len(text)
+    if text.isascii():
+        return int(length * _ASCII_TOKENS_PER_CHAR) + 1
+    # 非 ASCII 字符（中文为主）在 UTF-8 中占 2~4 字节：按 3 字节近似，避免逐字符遍历
+    non_ascii = min(length, (len(text.encode("utf-8")) - length) // 2)
+    ascii_chars = length - non_ascii
+    return (
+        int(
+            ascii_chars * _ASCII_TOKENS_PER_CHAR
+            + non_ascii * _NON_ASCII_TOKENS_PER_CHAR
+        )
+        + 1
+    )
+
+
+############################################################################################################
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """估算单条消息的 token 数（正文 + tool_calls + 格式开销）"""
+    tokens = _MESSAGE_OVERHEAD_TOKENS + estimate_text_tokens(message.content)
+    tool_calls = message.additional_kwargs.get("tool_calls")
+    if tool_calls:
+        tokens += estimate_text_tokens(str(tool_calls))
+    return tokens
+
+
+############################################################################################################
+def estimate_messages_tokens(messages: Sequence[BaseMessage]) -> int:
+    """估算消息序列的 token 总数"""
+    return sum(estimate_message_tokens(message) for message in messages)
@@ -2,10 +2,30 @@
 嵌入模型模块
 """
 
+from typing import Any
+
 from .sentence_transformer import (
-    embedding_model,
+    EMBEDDING_MODEL_PATH,
+    EmbeddingModelConfig,
+    LazyEmbeddingModel,
+    TextEncoder,
+    embedding_encoder,
+    load_sentence_transformer,
 )
 
 __all__ = [
+    "EMBEDDING_MODEL_PATH",
+    "EmbeddingModelConfig",
+    "LazyEmbeddingModel",
+    "TextEncoder",
+    "embedding_encoder",
+    "load_sentence_transformer",
     "embedding_model",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # 兼容旧接口：embedding_model 为本地 SentenceTransformer 实例，访问时才加载
+    if name == "embedding_model":
+        return embedding_encoder.model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
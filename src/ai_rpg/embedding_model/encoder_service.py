@@ -0,0 +1,234 @@
+"""
+共享文本编码服务（独立进程，Unix socket）
+
+多个 uvicorn worker 各自加载 SentenceTransformer 时，每个进程都要付出模型加载时间与数百 MB 内存。
+编码服务进程只加载一份模型，worker 通过 RemoteEncoder 以同步接口调用（RAG 检索本来就在
+asyncio.to_thread 的工作线程中调用 encode）。
+
+协议（大端序）：
+- 请求：uint32 长度 + UTF-8 JSON 字符串数组
+- 响应：uint8 状态 + uint32 行数 + uint32 维度 + float32 向量数据；
+  状态非 0 时行数字段为错误信息长度，随后是 UTF-8 错误信息
+
+服务端把同时到达的多个请求合并为一次 encode 调用（按句子数上限 max_batch_sentences）。
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Final, List, Optional, final
+
+import numpy as np
+from loguru import logger
+
+from .sentence_transformer import TextEncoder
+
+_REQUEST_HEADER: Final[struct.Struct] = struct.Struct("!I")
+_RESPONSE_HEADER: Final[struct.Struct] = struct.Struct("!BII")
+_STATUS_OK: Final[int] = 0
+_STATUS_ERROR: Final[int] = 1
+
+# 默认 socket 路径
+DEFAULT_ENCODER_SOCKET: Final[str] = "/tmp/ai-rpg-encoder.sock"
+
+
+###############################################################################################################################################
+@dataclass
+class _PendingRequest:
+    sentences: List[str]
+    future: "asyncio.Future[Any]" = field(repr=False)
+
+
+###############################################################################################################################################
+@final
+class EncoderServer:
+    """编码服务端：asyncio Unix socket 服务，合并并发请求后在专用线程中 encode"""
+
+    def __init__(
+        self,
+        encoder: TextEncoder,
+        socket_path: str = DEFAULT_ENCODER_SOCKET,
+        max_batch_sentences: int = 256,
+    ) -> None:
+        self._encoder = encoder
+        self._socket_path = socket_path
+        self._max_batch_sentences = max_batch_sentences
+        self._queue: "asyncio.Queue[_PendingRequest]" = asyncio.Queue()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        # 模型推理串行执行在专用线程中，不占用默认线程池
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="encoder-service"
+        )
+        self.requests: int = 0
+        self.batches: int = 0
+
+    ###############################################################################################################################################
+    @property
+    def socket_path(self) -> str:
+        return self._socket_path
+
+    ###############################################################################################################################################
+    async def start(self) -> None:
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=self._socket_path
+        )
+        self._batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"🧠 [ENCODER] 编码服务已启动: {self._socket_path}")
+
+    ###############################################################################################################################################
+    async def serve_forever(self) -> None:
+        assert self._server is not None, "EncoderServer 未启动"
+        await self._server.serve_forever()
+
+    ###############################################################################################################################################
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        self._executor.shutdown(wait=False)
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        logger.info(
+            f"🧠 [ENCODER] 编码服务已关闭: {self.requests} 个请求，{self.batches} 次 encode"
+        )
+
+    ###############################################################################################################################################
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = _REQUEST_HEADER.unpack(header)
+                sentences = json.loads(await reader.readexactly(length))
+
+                future: "asyncio.Future[Any]" = (
+                    asyncio.get_running_loop().create_future()
+                )
+                self.requests += 1
+                await self._queue.put(_PendingRequest(sentences, future))
+                try:
+                    vectors = np.asarray(await future, dtype=np.float32)
+                    rows, dim = vectors.shape if vectors.size else (0, 0)
+                    writer.write(_RESPONSE_HEADER.pack(_STATUS_OK, rows, dim))
+                    writer.write(vectors.tobytes())
+                except Exception as e:
+                    message = str(e).encode("utf-8")
+                    writer.write(_RESPONSE_HEADER.pack(_STATUS_ERROR, len(message), 0))
+                    writer.write(message)
+                await writer.drain()
+        except Exception as e:
+            logger.error(f"❌ [ENCODER] 连接处理失败: {e}")
+        finally:
+            writer.close()
+
+    ###############################################################################################################################################
+    async def _batch_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            total = len(batch[0].sentences)
+            while not self._queue.empty() and total < self._max_batch_sentences:
+                request = self._queue.get_nowait()
+                batch.append(request)
+                total += len(request.sentences)
+
+            sentences = [s for request in batch for s in request.sentences]
+            try:
+                vectors = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._encoder.encode, sentences
+                )
+                self.batches += 1
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                count = len(request.sentences)
+                if not request.future.done():
+                    request.future.set_result(vectors[offset : offset + count])
+                offset += count
+
+
+###############################################################################################################################################
+@final
+class RemoteEncoder:
+    """编码服务客户端（同步、线程安全，保持一条长连接，断开后自动重连一次）"""
+
+    def __init__(self, socket_path: str, timeout: float = 30.0) -> None:
+        self._socket_path = socket_path
+        self._timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    ###############################################################################################################################################
+    def encode(self, sentences: List[str]) -> Any:
+        payload = json.dumps(list(sentences), ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            try:
+                return self._request(payload)
+            except (ConnectionError, OSError):
+                self._close_socket()
+                return self._request(payload)
+
+    ###############################################################################################################################################
+    def close(self) -> None:
+        with self._lock:
+            self._close_socket()
+
+    ###############################################################################################################################################
+    def _request(self, payload: bytes) -> Any:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect(self._socket_path)
+            self._sock = sock
+
+        self._sock.sendall(_REQUEST_HEADER.pack(len(payload)) + payload)
+        status, rows, dim = _RESPONSE_HEADER.unpack(
+            self._recv_exactly(_RESPONSE_HEADER.size)
+        )
+        if status != _STATUS_OK:
+            raise RuntimeError(
+                f"编码服务返回错误: {self._recv_exactly(rows).decode('utf-8')}"
+            )
+        data = self._recv_exactly(rows * dim * 4)
+        return np.frombuffer(data, dtype=np.float32).reshape(rows, dim)
+
+    ###############################################################################################################################################
+    def _recv_exactly(self, size: int) -> bytes:
+        assert self._sock is not None
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = self._sock.recv(size - len(chunks))
+            if not chunk:
+                raise ConnectionError("编码服务连接已断开")
+            chunks.extend(chunk)
+        return bytes(chunks)
+
+    ###############################################################################################################################################
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
@@ -1,28 +1,177 @@
 """
 嵌入模型管理模块
+
+模型在第一次 encode 时才加载（导入本模块不会导入 torch / sentence_transformers），
+避免每个服务器进程、每个测试进程在导入 systems 包时就付出模型加载时间与数百 MB 内存。
+
+推理后端：
+- torch（默认）：SentenceTransformer 原生 PyTorch 推理
+- onnx：ONNX Runtime CPU 推理，可选动态量化（qint8）模型；依赖 optimum[onnxruntime]，
+  未安装时回退到 torch
+
+配置 encoder_socket 后，encode 请求通过 Unix socket 发给独立的编码服务进程
+（见 encoder_service.py），多个 uvicorn worker 共享同一份模型。
 """
 
-from loguru import logger
-from sentence_transformers import SentenceTransformer
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, List, Literal, Optional, Protocol, final
+
+from loguru import logger
+from pydantic import BaseModel
 
-try:
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
-    cache_model_path = (
-        Path(".sentence_transformers") / "paraphrase-multilingual-MiniLM-L12-v2"
-    )
-    if not cache_model_path.exists():
+    from .encoder_service import RemoteEncoder
+
+# 本地模型缓存目录（由 scripts/download_sentence_transformers_models.py 下载）
+EMBEDDING_MODEL_PATH: Final[Path] = (
+    Path(".sentence_transformers") / "paraphrase-multilingual-MiniLM-L12-v2"
+)
+
+# 动态量化 ONNX 模型使用的指令集（avx2 兼容绝大多数 x86 CPU）
+_ONNX_QUANTIZATION: Final[Literal["avx2"]] = "avx2"
+
+
+###############################################################################################################################################
+class TextEncoder(Protocol):
+    """文本编码器：本地模型、懒加载包装与远程编码服务的共同接口"""
+
+    def encode(self, sentences: List[str]) -> Any: ...
+
+
+###############################################################################################################################################
+@final
+class EmbeddingModelConfig(BaseModel):
+    """嵌入模型配置"""
+
+    backend: Literal["torch", "onnx"] = "torch"
+    quantized: bool = False  # onnx 后端使用动态量化（qint8）模型
+    encoder_socket: Optional[str] = None  # 共享编码服务的 Unix socket 路径
+
+
+###############################################################################################################################################
+def load_sentence_transformer(
+    config: Optional[EmbeddingModelConfig] = None,
+    model_path: Path = EMBEDDING_MODEL_PATH,
+) -> "SentenceTransformer":
+    """按配置加载 SentenceTransformer（同步、耗时，调用方负责只加载一次）"""
+    config = config if config is not None else EmbeddingModelConfig()
+
+    if not model_path.exists():
         logger.warning(
-            f"⚠️ [EMBEDDING] 模型缓存目录不存在: {cache_model_path}，请先运行 scripts/download_sentence_transformers_models.py 下载模型"
+            f"⚠️ [EMBEDDING] 模型缓存目录不存在: {model_path}，请先运行 scripts/download_sentence_transformers_models.py 下载模型"
         )
         raise FileNotFoundError(
-            f"模型缓存目录不存在: {cache_model_path}，请先运行 scripts/download_sentence_transformers_models.py 下载模型"
+            f"模型缓存目录不存在: {model_path}，请先运行 scripts/download_sentence_transformers_models.py 下载模型"
+        )
+
+    from sentence_transformers import SentenceTransformer
+
+    if config.backend == "onnx":
+        try:
+            return _load_onnx_model(model_path, config.quantized)
+        except ImportError as e:
+            logger.warning(f"⚠️ [EMBEDDING] ONNX 后端不可用（{e}），回退到 torch")
+
+    return SentenceTransformer(str(model_path))
+
+
+###############################################################################################################################################
+def _load_onnx_model(model_path: Path, quantized: bool) -> "SentenceTransformer":
+    """加载 ONNX 模型；量化模型不存在时先从本地模型导出"""
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    if not quantized:
+        return SentenceTransformer(str(model_path), backend="onnx")
+
+    file_name = f"onnx/model_qint8_{_ONNX_QUANTIZATION}.onnx"
+    if not (model_path / file_name).exists():
+        logger.info(f"📦 [EMBEDDING] 导出动态量化 ONNX 模型: {file_name}")
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(str(model_path), backend="onnx"),
+            _ONNX_QUANTIZATION,
+            str(model_path),
         )
 
-    # 全局嵌入模型实例：将文本编码为向量，供 RAG 语义检索使用
-    embedding_model: SentenceTransformer = SentenceTransformer(str(cache_model_path))
-    logger.info("✅ [EMBEDDING] 预加载多语言模型成功")
+    return SentenceTransformer(
+        str(model_path), backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+###############################################################################################################################################
+@final
+class LazyEmbeddingModel:
+    """
+    进程级嵌入编码器（懒加载）
+
+    第一次 encode（通常发生在 asyncio.to_thread 的工作线程中）时才加载模型，
+    并发的首次调用只会加载一次；配置了 encoder_socket 时改为调用共享编码服务。
+    """
+
+    def __init__(self) -> None:
+        self._config: EmbeddingModelConfig = EmbeddingModelConfig()
+        self._model: Optional["SentenceTransformer"] = None
+        self._remote: Optional["RemoteEncoder"] = None
+        self._lock = threading.Lock()
+        self._load_seconds: float = 0.0
+
+    ###############################################################################################################################################
+    def configure(self, config: EmbeddingModelConfig) -> None:
+        """更新配置（只影响尚未加载的模型 / 尚未建立的连接）"""
+        with self._lock:
+            self._config = config
+            if self._remote is not None:
+                self._remote.close()
+                self._remote = None
+
+    ###############################################################################################################################################
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    ###############################################################################################################################################
+    @property
+    def load_seconds(self) -> float:
+        return self._load_seconds
+
+    ###############################################################################################################################################
+    @property
+    def model(self) -> "SentenceTransformer":
+        """本地模型实例（首次访问时加载）"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = load_sentence_transformer(self._config)
+                    self._load_seconds = time.perf_counter() - start
+                    logger.info(
+                        f"✅ [EMBEDDING] 加载多语言模型成功 ({self._config.backend}"
+                        f"{', qint8' if self._config.quantized else ''})，"
+                        f"耗时 {self._load_seconds:.2f}s"
+                    )
+        return self._model
+
+    ###############################################################################################################################################
+    def encode(self, sentences: List[str]) -> Any:
+        """将文本编码为向量（numpy 数组，行与 sentences 一一对应）"""
+        if self._config.encoder_socket is None:
+            return self.model.encode(sentences)
+
+        if self._remote is None:
+            from .encoder_service import RemoteEncoder
+
+            with self._lock:
+                if self._remote is None:
+                    self._remote = RemoteEncoder(self._config.encoder_socket)
+        return self._remote.encode(sentences)
+
 
-except Exception as e:
-    logger.error(f"❌ [EMBEDDING] 预加载多语言模型失败: {e}")
-    raise e
+###############################################################################################################################################
+# 全局嵌入编码器实例：将文本编码为向量，供 RAG 语义检索使用（首次使用时加载）
+embedding_encoder: Final[LazyEmbeddingModel] = LazyEmbeddingModel()
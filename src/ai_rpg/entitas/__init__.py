@@ -1,3 +1,4 @@
+from .archetype import ComponentIndex
 from .collector import Collector
 from .components import Component
 
@@ -17,10 +18,15 @@ from .matcher import Matcher
 from .processors import (
     CleanupProcessor,
     ExecuteProcessor,
+    ExecutionMode,
+    ExecutionTrace,
     InitializeProcessor,
     Processors,
     ReactiveProcessor,
+    StageTrace,
     TearDownProcessor,
+    plan_execution_stages,
+    processors_conflict,
 )
 
 __all__ = [
@@ -31,12 +37,18 @@ __all__ = [
     "GroupEvent",
     "Collector",
     "Component",
+    "ComponentIndex",
     "Processors",
     "InitializeProcessor",
     "ExecuteProcessor",
     "CleanupProcessor",
     "TearDownProcessor",
     "ReactiveProcessor",
+    "ExecutionMode",
+    "ExecutionTrace",
+    "StageTrace",
+    "plan_execution_stages",
+    "processors_conflict",
     "Event",
     "AlreadyAddedComponent",
     "MissingComponent",
@@ -0,0 +1,84 @@
+"""
+entitas.archetype
+~~~~~~~~~~~~~~~~~
+Optional archetype support for the ECS framework.
+
+A component index assigns every component type a bit so that the set of
+components attached to an entity (its archetype) can be represented as a
+single integer. Matchers then evaluate entities with a couple of integer
+operations, and a context can populate groups per archetype instead of
+scanning every entity.
+"""
+
+from typing import Dict, Iterable, Optional, Type
+
+from .components import Component
+
+
+class ComponentIndex(object):
+    """Maps component types to bit flags used in archetype bitmasks.
+
+    Types can be registered up front (e.g. from a component registry) or are
+    assigned a bit lazily the first time they are seen. Once assigned, a bit
+    never changes for the lifetime of the index.
+    """
+
+    def __init__(self, comp_types: Iterable[Type[Component]] = ()) -> None:
+        """Initializes the index and registers the given component types.
+
+        :param comp_types: Component types to register in order
+        """
+        #: Dictionary mapping component type to its bit flag.
+        self._bits: Dict[Type[Component], int] = {}
+
+        for comp_type in comp_types:
+            self.register(comp_type)
+
+    def register(self, comp_type: Type[Component]) -> int:
+        """Registers a component type and returns its bit flag.
+
+        Registering an already known type returns the existing bit.
+
+        :param comp_type: Component type to register
+        :return: Bit flag assigned to the component type
+        """
+        bit = self._bits.get(comp_type)
+        if bit is None:
+            bit = 1 << len(self._bits)
+            self._bits[comp_type] = bit
+        return bit
+
+    def bit(self, comp_type: Type[Component]) -> int:
+        """Gets the bit flag of a component type, registering it if needed.
+
+        :param comp_type: Component type to look up
+        :return: Bit flag of the component type
+        """
+        bit = self._bits.get(comp_type)
+        if bit is None:
+            return self.register(comp_type)
+        return bit
+
+    def mask(self, comp_types: Optional[Iterable[Type[Component]]]) -> int:
+        """Combines the bit flags of several component types into one mask.
+
+        :param comp_types: Component types to combine, or None
+        :return: Bitmask of all given component types (0 if None)
+        """
+        mask = 0
+        if comp_types is not None:
+            for comp_type in comp_types:
+                mask |= self.bit(comp_type)
+        return mask
+
+    def __contains__(self, comp_type: object) -> bool:
+        """Checks if a component type has been assigned a bit."""
+        return comp_type in self._bits
+
+    def __len__(self) -> int:
+        """Gets the number of registered component types."""
+        return len(self._bits)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the component index."""
+        return f"<ComponentIndex ({len(self._bits)} types)>"
@@ -1,6 +1,7 @@
 from collections import deque
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set, Type
 
+from .archetype import ComponentIndex
 from .components import Component
 from .entity import Entity
 from .exceptions import MissingEntity
@@ -14,9 +15,18 @@ class Context(object):
     The context manages the lifecycle of entities and provides
     functionality for creating, destroying, and organizing entities
     into groups based on component patterns.
+
+    When created with a component index, the context runs in archetype
+    mode: every entity carries a component bitmask, matchers compare
+    bitmasks instead of looking up components, and new groups are
+    populated per archetype rather than by scanning every entity.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, component_index: Optional[ComponentIndex] = None) -> None:
+        """Initializes a new context.
+
+        :param component_index: Component bit index enabling archetype mode (optional)
+        """
 
         #: Entities retained by this context.
         self._entities: Set[Entity] = set()
@@ -30,6 +40,19 @@ class Context(object):
         #: Dictionary of matchers mapping groups.
         self._groups: Dict[Matcher, Group] = {}
 
+        #: Reverse index mapping component types to the groups whose
+        #: matcher references them.
+        self._groups_for_type: Dict[Type[Component], List[Group]] = {}
+
+        #: Component bit index, None unless running in archetype mode.
+        self._component_index: Optional[ComponentIndex] = component_index
+
+        #: Active entities bucketed by archetype bitmask (archetype mode only).
+        self._archetypes: Dict[int, Set[Entity]] = {}
+
+        #: Number of group updates triggered by component changes.
+        self._group_update_count: int = 0
+
     @property
     def entities(self) -> Set[Entity]:
         """Gets the set of all active entities in this context.
@@ -38,6 +61,22 @@ class Context(object):
         """
         return self._entities
 
+    @property
+    def component_index(self) -> Optional[ComponentIndex]:
+        """Gets the component bit index used in archetype mode.
+
+        :return: The component index, or None if archetype mode is disabled
+        """
+        return self._component_index
+
+    @property
+    def archetype_count(self) -> int:
+        """Gets the number of distinct archetypes among active entities.
+
+        :return: Number of archetypes (always 0 outside archetype mode)
+        """
+        return len(self._archetypes)
+
     @property
     def entity_count(self) -> int:
         """Gets the number of active entities in this context.
@@ -46,6 +85,17 @@ class Context(object):
         """
         return len(self._entities)
 
+    @property
+    def group_update_count(self) -> int:
+        """Gets the number of group updates caused by component changes so far.
+
+        Every add, remove or replace of a component counts once per group
+        whose matcher references the component type.
+
+        :return: Cumulative number of group updates
+        """
+        return self._group_update_count
+
     @property
     def reusable_entity_count(self) -> int:
         """Gets the number of entities available for reuse.
@@ -78,6 +128,10 @@ class Context(object):
 
         self._entities.add(entity)
 
+        if self._component_index is not None:
+            entity._component_index = self._component_index
+            self._archetypes.setdefault(entity.archetype, set()).add(entity)
+
         entity.on_component_added += self._comp_added_or_removed
         entity.on_component_removed += self._comp_added_or_removed
         entity.on_component_replaced += self._comp_replaced
@@ -101,6 +155,8 @@ class Context(object):
         entity.destroy()
 
         self._entities.remove(entity)
+        if self._component_index is not None:
+            self._discard_from_archetype(entity, entity.archetype)
         self._reusable_entities.append(entity)
 
     def get_group(self, matcher: Matcher) -> Group:
@@ -118,39 +174,89 @@ class Context(object):
 
         group = Group(matcher)
 
-        for entity in self._entities:
-            group.handle_entity_silently(entity)
+        if self._component_index is not None:
+            for archetype, entities in self._archetypes.items():
+                if matcher.matches_archetype(archetype, self._component_index):
+                    group.add_entities_silently(entities)
+        else:
+            for entity in self._entities:
+                group.handle_entity_silently(entity)
 
         self._groups[matcher] = group
 
+        for comp_type in matcher.component_types:
+            self._groups_for_type.setdefault(comp_type, []).append(group)
+
         return group
 
     def _comp_added_or_removed(self, entity: Entity, comp: Component) -> None:
         """Handles component addition or removal events.
 
-        Updates all groups to reflect the component change.
+        Only groups whose matcher references the component type are
+        updated, since the match result of any other group cannot change.
 
         :param entity: Entity that had a component added or removed
         :param comp: Component that was added or removed
         """
-        for matcher in self._groups:
-            self._groups[matcher].handle_entity(entity, comp)
+        if self._component_index is not None:
+            self._update_archetype(entity, comp)
+
+        groups = self._groups_for_type.get(type(comp))
+        if groups is None:
+            return
+
+        self._group_update_count += len(groups)
+        for group in groups:
+            group.handle_entity(entity, comp)
 
     def _comp_replaced(
         self, entity: Entity, previous_comp: Component, new_comp: Component
     ) -> None:
         """Handles component replacement events.
 
-        Updates all groups to reflect the component replacement.
+        Only groups whose matcher references the component type are
+        notified about the replacement.
 
         :param entity: Entity that had a component replaced
         :param previous_comp: The component that was replaced
         :param new_comp: The new component
         """
-        for matcher in self._groups:
-            group = self._groups[matcher]
+        groups = self._groups_for_type.get(type(new_comp))
+        if groups is None:
+            return
+
+        self._group_update_count += len(groups)
+        for group in groups:
             group.update_entity(entity, previous_comp, new_comp)
 
+    def _update_archetype(self, entity: Entity, comp: Component) -> None:
+        """Moves an entity to its new archetype bucket after an add or remove.
+
+        The entity has already updated its bitmask, so the previous
+        archetype differs from the current one by the component's bit.
+
+        :param entity: Entity whose archetype changed
+        :param comp: Component that was added or removed
+        """
+        assert self._component_index is not None
+        previous = entity.archetype ^ self._component_index.bit(type(comp))
+        self._discard_from_archetype(entity, previous)
+        self._archetypes.setdefault(entity.archetype, set()).add(entity)
+
+    def _discard_from_archetype(self, entity: Entity, archetype: int) -> None:
+        """Removes an entity from an archetype bucket, dropping empty buckets.
+
+        :param entity: Entity to remove
+        :param archetype: Archetype bucket the entity belongs to
+        """
+        bucket = self._archetypes.get(archetype)
+        if bucket is None:
+            return
+
+        bucket.discard(entity)
+        if not bucket:
+            del self._archetypes[archetype]
+
     def __repr__(self) -> str:
         """Returns a string representation of the context.
 
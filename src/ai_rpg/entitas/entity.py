@@ -10,7 +10,8 @@ Pydantic BaseModel classes for enhanced functionality including
 data validation, serialization, and documentation.
 """
 
-from typing import Any, Dict, Tuple, Type, TypeVar, cast
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Type, TypeVar, cast
+from .archetype import ComponentIndex
 from .components import Component
 from .event import Event
 from .exceptions import AlreadyAddedComponent, EntityNotEnabled, MissingComponent
@@ -19,6 +20,69 @@ from .exceptions import AlreadyAddedComponent, EntityNotEnabled, MissingComponen
 ComponentT = TypeVar("ComponentT", bound=Component)
 
 
+class _ComponentPlan(object):
+    """Cached per-type constructor plan for components.
+
+    Entity.add/replace pass field values positionally, so the ordered field
+    names are resolved once per component type instead of on every call.
+    The plan also knows whether trusted data can be stored straight into the
+    model, which skips both Pydantic validation and model_construct overhead.
+    That direct path writes Pydantic's instance slots itself, so the Pydantic
+    version is capped in pyproject.toml and tests/unit/test_entity.py checks
+    the result against model_construct for every registered component type.
+    """
+
+    __slots__ = ("field_names", "fields_set", "direct_construct")
+
+    def __init__(self, comp_type: Type[Component]) -> None:
+        self.field_names: Tuple[str, ...] = tuple(comp_type.model_fields.keys())
+        self.fields_set: FrozenSet[str] = frozenset(self.field_names)
+
+        # Post-init hooks, private attributes and extra fields need the full
+        # model_construct path to be initialized correctly.
+        self.direct_construct: bool = (
+            comp_type.__pydantic_post_init__ is None
+            and not comp_type.__private_attributes__
+            and comp_type.model_config.get("extra") != "allow"
+        )
+
+    def construct(
+        self, comp_type: Type[Component], kwargs: Dict[str, Any]
+    ) -> Component:
+        """Builds a component from already-validated field values.
+
+        :param comp_type: Component type to instantiate
+        :param kwargs: Values for every field of the component
+        :return: Component instance created without validation
+        """
+        if not self.direct_construct:
+            return comp_type.model_construct(**kwargs)
+
+        comp = comp_type.__new__(comp_type)
+        object.__setattr__(comp, "__dict__", kwargs)
+        object.__setattr__(comp, "__pydantic_fields_set__", set(self.fields_set))
+        object.__setattr__(comp, "__pydantic_extra__", None)
+        object.__setattr__(comp, "__pydantic_private__", None)
+        return comp
+
+
+#: Constructor plans cached per component type.
+_component_plans: Dict[Type[Component], _ComponentPlan] = {}
+
+
+def _get_component_plan(comp_type: Type[Component]) -> _ComponentPlan:
+    """Gets the constructor plan of a component type, building it on first use.
+
+    :param comp_type: Component type (Pydantic BaseModel subclass)
+    :return: Cached constructor plan
+    """
+    plan = _component_plans.get(comp_type)
+    if plan is None:
+        plan = _ComponentPlan(comp_type)
+        _component_plans[comp_type] = plan
+    return plan
+
+
 class Entity(object):
     """Use context.create_entity() to create a new entity and
     context.destroy_entity() to destroy it.
@@ -41,6 +105,12 @@ class Entity(object):
         #: Dictionary mapping component type and component instance.
         self._components: Dict[Type[Component], Component] = {}
 
+        #: Component bit index assigned by the context in archetype mode.
+        self._component_index: Optional[ComponentIndex] = None
+
+        #: Bitmask of attached component types (archetype mode only).
+        self._archetype = 0
+
         #: Each entity has its own unique creationIndex which will be
         #: set by the context when you create the entity.
         self._creation_index = 0
@@ -72,38 +142,45 @@ class Entity(object):
                 f"Cannot {operation} component '{comp_type.__name__}': {self} is not enabled."
             )
 
-    def _create_component(self, comp_type: Type[Component], *args: Any) -> Component:
+    def _create_component(
+        self, comp_type: Type[Component], args: Tuple[Any, ...], trusted: bool
+    ) -> Component:
         """Creates a component instance using Pydantic BaseModel.
 
         :param comp_type: Component type (Pydantic BaseModel subclass)
-        :param *args: Component field values
+        :param args: Component field values
+        :param trusted: Skip Pydantic validation for data that has already
+            been validated by internal systems
         :return: Component instance
         """
-        # Get field names from Pydantic BaseModel
-        field_names = list(comp_type.model_fields.keys())
+        plan = _get_component_plan(comp_type)
+        field_names = plan.field_names
 
-        # Handle components with no fields (like Marker)
-        if len(field_names) == 0:
-            if len(args) != 0:
+        if len(args) != len(field_names):
+            # Handle components with no fields (like Marker)
+            if len(field_names) == 0:
                 raise ValueError(
                     f"Component {comp_type.__name__} expects no arguments, got {len(args)}"
                 )
-            return comp_type()
-
-        # Handle components with fields
-        if len(args) != len(field_names):
             raise ValueError(
                 f"Component {comp_type.__name__} expects {len(field_names)} "
-                f"arguments ({field_names}), got {len(args)}"
+                f"arguments ({list(field_names)}), got {len(args)}"
             )
+
         kwargs = dict(zip(field_names, args))
+        if trusted:
+            return plan.construct(comp_type, kwargs)
         return comp_type(**kwargs)
 
-    def add(self, comp_type: Type[Component], *args: Any) -> None:
+    def add(
+        self, comp_type: Type[Component], *args: Any, trusted: bool = False
+    ) -> None:
         """Adds a component to the entity.
 
         :param comp_type: Component type (class)
         :param *args: Component field values (optional)
+        :param trusted: Skip validation for already-validated internal data.
+            Never use it for external or LLM-sourced data.
         :raises EntityNotEnabled: If the entity is not enabled
         :raises AlreadyAddedComponent: If the component already exists
         """
@@ -114,8 +191,10 @@ class Entity(object):
                 f"Cannot add another component '{comp_type.__name__}' to {self}."
             )
 
-        new_comp = self._create_component(comp_type, *args)
+        new_comp = self._create_component(comp_type, args, trusted)
         self._components[comp_type] = new_comp
+        if self._component_index is not None:
+            self._archetype |= self._component_index.bit(comp_type)
         self.on_component_added(self, new_comp)
 
     def remove(self, comp_type: Type[Component]) -> None:
@@ -134,27 +213,38 @@ class Entity(object):
 
         self._replace(comp_type, None)
 
-    def replace(self, comp_type: Type[Component], *args: Any) -> None:
+    def replace(
+        self, comp_type: Type[Component], *args: Any, trusted: bool = False
+    ) -> None:
         """Replaces an existing component or adds it if it doesn't exist.
 
         :param comp_type: Component type to replace/add
         :param *args: Component field values (optional)
+        :param trusted: Skip validation for already-validated internal data.
+            Never use it for external or LLM-sourced data.
         :raises EntityNotEnabled: If the entity is not enabled
         """
         self._ensure_enabled("replace", comp_type)
 
         if self.has(comp_type):
-            self._replace(comp_type, args)
+            self._replace(comp_type, args, trusted)
         else:
-            self.add(comp_type, *args)
-
-    def _replace(self, comp_type: Type[Component], args: Any) -> None:
+            self.add(comp_type, *args, trusted=trusted)
+
+    def _replace(
+        self,
+        comp_type: Type[Component],
+        args: Optional[Tuple[Any, ...]],
+        trusted: bool = False,
+    ) -> None:
         previous_comp = self._components[comp_type]
         if args is None:
             del self._components[comp_type]
+            if self._component_index is not None:
+                self._archetype &= ~self._component_index.bit(comp_type)
             self.on_component_removed(self, previous_comp)
         else:
-            new_comp = self._create_component(comp_type, *args)
+            new_comp = self._create_component(comp_type, args, trusted)
             self._components[comp_type] = new_comp
             self.on_component_replaced(self, previous_comp, new_comp)
 
@@ -233,6 +323,8 @@ class Entity(object):
             )
 
         self._components[comp_type] = comp_obj
+        if self._component_index is not None:
+            self._archetype |= self._component_index.bit(comp_type)
         self.on_component_added(self, comp_obj)
 
     @property
@@ -250,6 +342,16 @@ class Entity(object):
         """Gets whether the entity is enabled."""
         return self._is_enabled
 
+    @property
+    def component_index(self) -> Optional[ComponentIndex]:
+        """Gets the component bit index, or None outside archetype mode."""
+        return self._component_index
+
+    @property
+    def archetype(self) -> int:
+        """Gets the bitmask of attached component types (archetype mode only)."""
+        return self._archetype
+
     @property
     def component_count(self) -> int:
         """Gets the number of components attached to this entity."""
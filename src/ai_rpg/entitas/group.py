@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, Set
+from typing import Iterable, Optional, Set
 
 from .components import Component
 from .entity import Entity
@@ -99,6 +99,15 @@ class Group(object):
         else:
             self._remove_entity_silently(entity)
 
+    def add_entities_silently(self, entities: Iterable[Entity]) -> None:
+        """Adds entities already known to match without triggering events.
+
+        This is used by the context to populate a group per archetype.
+
+        :param entities: The matching entities to add
+        """
+        self._entities.update(entities)
+
     def handle_entity(self, entity: Entity, component: Component) -> None:
         """Handles an entity and triggers appropriate events.
 
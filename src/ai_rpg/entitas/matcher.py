@@ -1,5 +1,6 @@
-from typing import Any, Optional, Tuple, Type
+from typing import Any, Dict, Optional, Tuple, Type
 
+from .archetype import ComponentIndex
 from .components import Component
 from .entity import Entity
 
@@ -42,6 +43,9 @@ class Matcher(object):
             kwargs.get("none_of", None)
         )
 
+        #: Cached (index, all_mask, any_mask, none_mask) for archetype mode.
+        self._masks: Optional[Tuple[ComponentIndex, int, int, int]] = None
+
     def _ensure_tuple(self, value: Any) -> Optional[Tuple[Type[Component], ...]]:
         """Ensures the given value is a tuple of component types or None.
 
@@ -87,18 +91,63 @@ class Matcher(object):
         """
         return self._none
 
+    @property
+    def component_types(self) -> Tuple[Type[Component], ...]:
+        """Gets every component type referenced by this matcher.
+
+        The context uses this to index groups by component type, so a
+        component change only re-evaluates groups that can be affected by it.
+
+        :return: Tuple of unique component types from all_of, any_of and none_of
+        """
+        types: Dict[Type[Component], None] = {}
+        for expr in (self._all, self._any, self._none):
+            if expr is not None:
+                types.update(dict.fromkeys(expr))
+        return tuple(types)
+
     def matches(self, entity: Entity) -> bool:
         """Determines if the given entity matches the matcher's conditions.
 
         :param entity: The entity to be checked
         :return: True if the entity matches all conditions, False otherwise
         """
+        component_index = entity.component_index
+        if component_index is not None:
+            return self.matches_archetype(entity.archetype, component_index)
+
         all_cond = self._all is None or entity.has(*self._all)
         any_cond = self._any is None or entity.has_any(*self._any)
         none_cond = self._none is None or not entity.has_any(*self._none)
 
         return all_cond and any_cond and none_cond
 
+    def matches_archetype(
+        self, archetype: int, component_index: ComponentIndex
+    ) -> bool:
+        """Determines if an archetype bitmask matches the matcher's conditions.
+
+        :param archetype: Bitmask of component types attached to an entity
+        :param component_index: Component index the bitmask was built with
+        :return: True if the archetype matches all conditions, False otherwise
+        """
+        masks = self._masks
+        if masks is None or masks[0] is not component_index:
+            masks = (
+                component_index,
+                component_index.mask(self._all),
+                component_index.mask(self._any),
+                component_index.mask(self._none),
+            )
+            self._masks = masks
+
+        _, all_mask, any_mask, none_mask = masks
+        return (
+            archetype & all_mask == all_mask
+            and (self._any is None or archetype & any_mask != 0)
+            and archetype & none_mask == 0
+        )
+
     def __eq__(self, other: object) -> bool:
         """Checks equality with another matcher.
 
@@ -1,5 +1,20 @@
+import asyncio
+import time
 from abc import ABCMeta, abstractmethod
-from typing import Dict, List, Union, override
+from enum import Enum
+from typing import (
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    override,
+)
 
 from .collector import Collector
 from .context import Context
@@ -30,8 +45,19 @@ class ExecuteProcessor(metaclass=ABCMeta):
 
     Execute processors contain the main game logic and are called
     repeatedly during the game loop.
+
+    A processor may declare the state it touches through the ``reads`` and
+    ``writes`` class attributes: component types, or named shared resources
+    (plain strings). Processors that declare both and do not conflict can be
+    run concurrently by a ``Processors`` pipeline in ``CONCURRENT`` mode.
+    Leaving them as ``None`` (the default) means "touches anything", and the
+    processor always runs on its own. A reactive processor must list its
+    trigger components in ``reads``.
     """
 
+    reads: ClassVar[Optional[FrozenSet[Hashable]]] = None
+    writes: ClassVar[Optional[FrozenSet[Hashable]]] = None
+
     @abstractmethod
     async def execute(self) -> None:
         """Performs the main processing logic.
@@ -129,6 +155,14 @@ class ReactiveProcessor(ExecuteProcessor):
         """Clears all collected entities without processing them."""
         self._collector.clear_collected_entities()
 
+    @property
+    def collected_entity_count(self) -> int:
+        """Gets the number of entities collected since the last execution.
+
+        :return: Number of collected entities waiting to be filtered and processed
+        """
+        return len(self._collector.collected_entities)
+
     async def execute(self) -> None:
         """Executes the reactive processor logic.
 
@@ -162,6 +196,93 @@ class ReactiveProcessor(ExecuteProcessor):
         return collector
 
 
+class ExecutionMode(Enum):
+    """How a ``Processors`` pipeline runs its execute processors."""
+
+    SEQUENTIAL = "sequential"  # one after another, in the order they were added
+    CONCURRENT = "concurrent"  # adjacent non-conflicting processors run together
+
+
+class StageTrace(NamedTuple):
+    """Timing of one execution stage.
+
+    :param processors: Names of the processors that ran in the stage
+    :param wall_seconds: Elapsed time of the stage
+    :param busy_seconds: Sum of the elapsed time of each processor in the stage
+    """
+
+    processors: Tuple[str, ...]
+    wall_seconds: float
+    busy_seconds: float
+
+
+class ExecutionTrace(NamedTuple):
+    """Timing of one ``Processors.execute`` run, stage by stage."""
+
+    stages: List[StageTrace]
+
+    @property
+    def wall_seconds(self) -> float:
+        """Elapsed time of the whole run."""
+        return sum(stage.wall_seconds for stage in self.stages)
+
+    @property
+    def busy_seconds(self) -> float:
+        """Elapsed time the run would have taken with every processor in sequence."""
+        return sum(stage.busy_seconds for stage in self.stages)
+
+    @property
+    def saved_seconds(self) -> float:
+        """Wall-clock time saved by running stages concurrently."""
+        return max(0.0, self.busy_seconds - self.wall_seconds)
+
+
+def processors_conflict(first: ExecuteProcessor, second: ExecuteProcessor) -> bool:
+    """Checks whether two execute processors must not run concurrently.
+
+    Processors conflict when either one has not declared its ``reads`` and
+    ``writes``, or when one writes something the other reads or writes.
+
+    :param first: An execute processor
+    :param second: Another execute processor
+    :return: True if the processors must run one after the other
+    """
+    if (
+        first.reads is None
+        or first.writes is None
+        or second.reads is None
+        or second.writes is None
+    ):
+        return True
+    return not (
+        first.writes.isdisjoint(second.reads | second.writes)
+        and second.writes.isdisjoint(first.reads)
+    )
+
+
+def plan_execution_stages(
+    processors: Sequence[ExecuteProcessor],
+) -> List[List[ExecuteProcessor]]:
+    """Groups adjacent, mutually non-conflicting processors into stages.
+
+    The order of processors is preserved: a stage only ever contains a run of
+    adjacent processors, so a processor never runs before one added earlier
+    that it conflicts with.
+
+    :param processors: Execute processors in the order they were added
+    :return: Stages to run in order; processors within a stage may run concurrently
+    """
+    stages: List[List[ExecuteProcessor]] = []
+    for processor in processors:
+        if stages and not any(
+            processors_conflict(other, processor) for other in stages[-1]
+        ):
+            stages[-1].append(processor)
+        else:
+            stages.append([processor])
+    return stages
+
+
 class Processors(
     InitializeProcessor, ExecuteProcessor, CleanupProcessor, TearDownProcessor
 ):
@@ -172,12 +293,21 @@ class Processors(
     It also supports nested processors and reactive processor management.
     """
 
-    def __init__(self) -> None:
-        """Initializes an empty processor pipeline."""
+    def __init__(
+        self, execution_mode: ExecutionMode = ExecutionMode.SEQUENTIAL
+    ) -> None:
+        """Initializes an empty processor pipeline.
+
+        :param execution_mode: How execute processors are run; SEQUENTIAL keeps
+            the deterministic one-after-another order
+        """
         self._initialize_processors: List[InitializeProcessor] = []
         self._execute_processors: List[ExecuteProcessor] = []
         self._cleanup_processors: List[CleanupProcessor] = []
         self._tear_down_processors: List[TearDownProcessor] = []
+        self._execution_mode: ExecutionMode = execution_mode
+        self._execution_stages: Optional[List[List[ExecuteProcessor]]] = None
+        self._last_trace: Optional[ExecutionTrace] = None
 
     def add(
         self,
@@ -197,6 +327,7 @@ class Processors(
 
         if isinstance(processor, ExecuteProcessor):
             self._execute_processors.append(processor)
+            self._execution_stages = None
 
         if isinstance(processor, CleanupProcessor):
             self._cleanup_processors.append(processor)
@@ -210,11 +341,87 @@ class Processors(
         for processor in self._initialize_processors:
             await processor.initialize()
 
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        """How execute processors are run."""
+        return self._execution_mode
+
+    @execution_mode.setter
+    def execution_mode(self, execution_mode: ExecutionMode) -> None:
+        self._execution_mode = execution_mode
+        self._execution_stages = None
+
+    @property
+    def execution_stages(self) -> List[List[ExecuteProcessor]]:
+        """Stages that ``execute`` runs in order (one processor per stage in SEQUENTIAL mode)."""
+        if self._execution_stages is None:
+            if self._execution_mode == ExecutionMode.CONCURRENT:
+                self._execution_stages = plan_execution_stages(self._execute_processors)
+            else:
+                self._execution_stages = [[p] for p in self._execute_processors]
+        return self._execution_stages
+
+    @property
+    def last_trace(self) -> Optional[ExecutionTrace]:
+        """Stage timings of the most recent ``execute`` run, None before the first run."""
+        return self._last_trace
+
     @override
     async def execute(self) -> None:
-        """Executes all execute processors in the order they were added."""
-        for processor in self._execute_processors:
-            await processor.execute()
+        """Executes all execute processors stage by stage.
+
+        In SEQUENTIAL mode every processor is its own stage and runs in the
+        order it was added. In CONCURRENT mode the processors of a stage run
+        together; if any of them fails, the others are still awaited and the
+        first failure (in the order they were added) is raised.
+        """
+        trace = ExecutionTrace(stages=[])
+        self._last_trace = trace
+        for stage in self.execution_stages:
+            if len(stage) == 1:
+                start = time.perf_counter()
+                try:
+                    await self._execute_processor(stage[0])
+                finally:
+                    elapsed = time.perf_counter() - start
+                    trace.stages.append(
+                        StageTrace((type(stage[0]).__name__,), elapsed, elapsed)
+                    )
+                continue
+
+            durations = [0.0] * len(stage)
+
+            async def run(index: int, processor: ExecuteProcessor) -> None:
+                start = time.perf_counter()
+                try:
+                    await self._execute_processor(processor)
+                finally:
+                    durations[index] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(run(index, processor) for index, processor in enumerate(stage)),
+                return_exceptions=True,
+            )
+            trace.stages.append(
+                StageTrace(
+                    tuple(type(processor).__name__ for processor in stage),
+                    time.perf_counter() - start,
+                    sum(durations),
+                )
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+    async def _execute_processor(self, processor: ExecuteProcessor) -> None:
+        """Runs a single execute processor; subclasses may wrap it (e.g. for profiling).
+
+        In CONCURRENT mode this runs inside the processor's own task.
+
+        :param processor: The execute processor to run
+        """
+        await processor.execute()
 
     @override
     def cleanup(self) -> None:
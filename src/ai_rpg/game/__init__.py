@@ -5,6 +5,7 @@ from .dbg_game import DBGGame
 from .game_server import GameServer
 from .player_room import PlayerRoom
 from .world_store import (
+    WorldArchiver,
     archive_world,
     restore_world,
 )
@@ -14,6 +15,7 @@ __all__ = [
     "DBGGame",
     "GameServer",
     "PlayerRoom",
+    "WorldArchiver",
     "archive_world",
     "restore_world",
 ]
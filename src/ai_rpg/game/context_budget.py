@@ -0,0 +1,424 @@
+"""Agent 上下文 token 预算与自动压缩
+
+每次 LLM 请求都会携带实体的完整上下文（AgentContext.context），而上下文只会随游戏进行不断增长。
+这里为每个 agent 设定 token 预算（按 deepseek.token_counter 估算），超出预算时依次执行压缩策略，
+直到上下文回落到目标值（预算 × target_ratio）以下：
+
+- DropStaleBroadcastsPolicy：删除较早的事件通知消息（notify_entities 写入，带 broadcast_notification 标记），
+  只保留最近若干条；
+- SummarizeRangePolicy：把最早的一段连续、未固定的消息交给 LLM 以该角色视角总结，替换为一条摘要消息。
+
+固定（pinned）的消息永远不会被删除或总结：系统消息，以及带有 pinned_markers 中任一标记的消息
+（规划、战斗开始 / 结束等后续流程依赖的锚点消息）。最近 keep_recent_messages 条消息也不参与压缩。
+tool 调用消息（带 tool_calls 的 AIMessage 与其后的 ToolMessage）只会整组参与总结，不会被拆开。
+
+策略可插拔：实现 CompactionPolicy 协议并传给 ContextBudget.configure()。
+预算默认关闭，由 GameServer.startup() 调用 configure() 启用。
+"""
+
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    final,
+)
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..deepseek import DeepSeekClient, estimate_messages_tokens
+from ..models.messages import (
+    AIMessage,
+    BaseMessage,
+    ContextMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    get_buffer_string,
+)
+
+# 事件通知消息的标记（RPGGame.notify_entities 写入）
+BROADCAST_NOTIFICATION_MARKER: Final[str] = "broadcast_notification"
+
+# 摘要消息的标记，值为被总结的消息条数
+CONTEXT_SUMMARY_MARKER: Final[str] = "context_summary"
+
+# 总结函数：(agent 名, 人设系统消息, 待总结的消息) -> 摘要文本
+ContextSummarizer = Callable[
+    [str, Optional[SystemMessage], Sequence[ContextMessage]], Awaitable[str]
+]
+
+
+############################################################################################################
+class ContextBudgetConfig(BaseModel):
+    """上下文预算配置"""
+
+    max_tokens: int = 48_000  # 默认每个 agent 的上下文预算（估算 token）
+    agent_max_tokens: Dict[str, int] = {}  # 按 agent 名单独设置的预算
+    target_ratio: float = 0.75  # 超出预算时压缩到 预算 × target_ratio 以下
+    keep_recent_messages: int = 24  # 最近的若干条消息不参与压缩
+    broadcast_keep_recent: int = 32  # 删除事件通知时保留最近的条数
+    summary_min_messages: int = 8  # 少于该条数的连续消息段不值得总结
+    pinned_markers: List[str] = [
+        "home_actor_planning",
+        "combat_initialization",
+        "combat_outcome",
+        "status_effects_notification",
+    ]
+
+
+############################################################################################################
+class ContextBudgetStats(BaseModel):
+    """上下文预算计数"""
+
+    checks: int = 0  # 检查次数
+    compactions: int = 0  # 触发压缩的次数
+    messages_removed: int = 0  # 删除或被摘要替换的消息数
+    tokens_freed: int = 0  # 压缩释放的估算 token
+    summaries: int = 0  # 生成的摘要条数
+    failures: int = 0  # 策略执行失败次数
+    over_budget: int = 0  # 压缩后仍超出预算的次数
+
+
+############################################################################################################
+class ContextCompactionResult(BaseModel):
+    """单个 agent 一次压缩的结果"""
+
+    agent_name: str
+    budget: int
+    tokens_before: int
+    tokens_after: int
+    messages_before: int
+    messages_after: int
+    policies: List[str] = []  # 实际生效的策略
+
+
+############################################################################################################
+class CompactionPolicy(Protocol):
+    """压缩策略：原地修改 context，返回删除（或被替换）的消息条数"""
+
+    @property
+    def name(self) -> str: ...
+
+    async def compact(
+        self,
+        budget: "ContextBudget",
+        agent_name: str,
+        context: List[ContextMessage],
+        tokens_to_free: int,
+    ) -> int: ...
+
+
+############################################################################################################
+def _has_tool_calls(message: BaseMessage) -> bool:
+    return isinstance(message, AIMessage) and bool(
+        message.additional_kwargs.get("tool_calls")
+    )
+
+
+############################################################################################################
+@final
+class DropStaleBroadcastsPolicy:
+    """删除较早的事件通知消息，保留最近 broadcast_keep_recent 条"""
+
+    name: Final[str] = "drop_stale_broadcasts"
+
+    async def compact(
+        self,
+        budget: "ContextBudget",
+        agent_name: str,
+        context: List[ContextMessage],
+        tokens_to_free: int,
+    ) -> int:
+        protected_from = max(0, len(context) - budget.config.keep_recent_messages)
+        broadcasts = [
+            index
+            for index in range(protected_from)
+            if getattr(context[index], BROADCAST_NOTIFICATION_MARKER, None)
+            and not budget.is_pinned(context[index])
+        ]
+        droppable = broadcasts[
+            : max(0, len(broadcasts) - budget.config.broadcast_keep_recent)
+        ]
+
+        # 从最早的开始删，够数即停
+        drop: Set[int] = set()
+        freed = 0
+        for index in droppable:
+            if freed >= tokens_to_free:
+                break
+            drop.add(index)
+            freed += estimate_messages_tokens([context[index]])
+        if drop:
+            context[:] = [m for i, m in enumerate(context) if i not in drop]
+        return len(drop)
+
+
+############################################################################################################
+async def llm_summarize(
+    agent_name: str,
+    persona: Optional[SystemMessage],
+    messages: Sequence[ContextMessage],
+) -> str:
+    """默认总结函数：以该角色的人设与第一人称总结一段较早的经历"""
+    prompt = f"""# 整理较早的记忆。
+
+以下是你（{agent_name}）较早的一段经历记录：
+
+{get_buffer_string(messages, ai_prefix=f"AI({agent_name})")}
+
+以第一人称把这段经历总结为一段连续的回忆，保留：去过的场景、遇到的角色、做出的承诺与决定、获得或失去的物品、尚未完成的事项。
+要求：客观简洁，不用修辞，整段不分段不空行，纯文本输出。"""
+
+    client = DeepSeekClient(
+        name=agent_name,
+        full_prompt=prompt,
+        context=[persona] if persona is not None else [],
+    )
+    await client.chat()
+    return client.response_content.strip()
+
+
+############################################################################################################
+@final
+class SummarizeRangePolicy:
+    """把最早的一段连续、未固定的消息替换为一条 LLM 摘要"""
+
+    name: Final[str] = "summarize_range"
+
+    def __init__(
+        self, summarizer: Optional[ContextSummarizer] = None, max_ranges: int = 1
+    ) -> None:
+        self._summarizer: Final[ContextSummarizer] = (
+            summarizer if summarizer is not None else llm_summarize
+        )
+        self._max_ranges: Final[int] = max_ranges
+
+    ############################################################################################################
+    async def compact(
+        self,
+        budget: "ContextBudget",
+        agent_name: str,
+        context: List[ContextMessage],
+        tokens_to_free: int,
+    ) -> int:
+        replaced = 0
+        for _ in range(self._max_ranges):
+            if tokens_to_free <= 0:
+                break
+            span = self._pick_range(budget, context, tokens_to_free)
+            if span is None:
+                break
+            begin, end = span
+            messages = context[begin:end]
+            persona = context[0] if isinstance(context[0], SystemMessage) else None
+
+            summary = await self._summarizer(agent_name, persona, messages)
+            if summary == "":
+                logger.warning(f"{agent_name}: 上下文摘要为空，跳过")
+                break
+
+            # 等待 LLM 期间上下文可能变化：按对象身份重新定位，范围不再连续则放弃
+            begin = next((i for i, m in enumerate(context) if m is messages[0]), -1)
+            current = context[begin : begin + len(messages)] if begin >= 0 else []
+            if len(current) != len(messages) or any(
+                a is not b for a, b in zip(current, messages)
+            ):
+                logger.warning(f"{agent_name}: 总结期间上下文已变化，放弃本次摘要")
+                break
+
+            summary_message = HumanMessage(
+                content=f"# 较早的经历（摘要）\n\n{summary}",
+                **{CONTEXT_SUMMARY_MARKER: len(messages)},
+            )
+            context[begin : begin + len(messages)] = [summary_message]
+            tokens_to_free -= estimate_messages_tokens(
+                messages
+            ) - estimate_messages_tokens([summary_message])
+            replaced += len(messages)
+            budget.record_summary()
+        return replaced
+
+    ############################################################################################################
+    def _pick_range(
+        self,
+        budget: "ContextBudget",
+        context: Sequence[ContextMessage],
+        tokens_to_free: int,
+    ) -> Optional[Tuple[int, int]]:
+        """最早的一段足够长的可总结区间 [begin, end)，只取释放 tokens_to_free 所需的部分"""
+        protected_from = max(0, len(context) - budget.config.keep_recent_messages)
+        index = 0
+        while index < protected_from:
+            if budget.is_pinned(context[index]):
+                index += 1
+                continue
+            begin = index
+            while index < protected_from and not budget.is_pinned(context[index]):
+                index += 1
+            span = self._trim_span(context, begin, index, tokens_to_free)
+            if span[1] - span[0] >= budget.config.summary_min_messages:
+                return span
+        return None
+
+    ############################################################################################################
+    def _trim_span(
+        self,
+        context: Sequence[ContextMessage],
+        begin: int,
+        end: int,
+        tokens_to_free: int,
+    ) -> Tuple[int, int]:
+        # 不以 ToolMessage 开头（其 tool_calls 在区间之外）
+        while begin < end and isinstance(context[begin], ToolMessage):
+            begin += 1
+
+        # 释放足够的 token 即可，不必总结整段
+        tokens = 0
+        cut = begin
+        while cut < end and tokens < tokens_to_free:
+            tokens += estimate_messages_tokens([context[cut]])
+            cut += 1
+        end = cut
+
+        # 不拆开 tool 调用：不以带 tool_calls 的消息结尾，区间之后也不能紧跟 ToolMessage
+        while end > begin and (
+            _has_tool_calls(context[end - 1])
+            or (end < len(context) and isinstance(context[end], ToolMessage))
+        ):
+            end -= 1
+        return begin, end
+
+
+############################################################################################################
+class ContextBudget:
+    """按 agent 的上下文 token 预算，超出时依次执行压缩策略"""
+
+    def __init__(self) -> None:
+        self._config: ContextBudgetConfig = ContextBudgetConfig()
+        self._policies: List[CompactionPolicy] = []
+        self._enabled: bool = False
+        self._stats: ContextBudgetStats = ContextBudgetStats()
+
+    ############################################################################################################
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    ############################################################################################################
+    @property
+    def config(self) -> ContextBudgetConfig:
+        return self._config
+
+    ############################################################################################################
+    @property
+    def stats(self) -> ContextBudgetStats:
+        """预算计数（返回副本）"""
+        return self._stats.model_copy()
+
+    ############################################################################################################
+    def configure(
+        self,
+        config: Optional[ContextBudgetConfig] = None,
+        policies: Optional[Sequence[CompactionPolicy]] = None,
+    ) -> None:
+        """按配置启用预算；policies 为空时使用默认策略（先删事件通知，再总结）"""
+        if config is not None:
+            self._config = config
+        self._policies = (
+            list(policies)
+            if policies is not None
+            else [DropStaleBroadcastsPolicy(), SummarizeRangePolicy()]
+        )
+        self._enabled = True
+        self._stats = ContextBudgetStats()
+        logger.info(
+            f"ContextBudget configured: {self._config}, "
+            f"policies = {[p.name for p in self._policies]}"
+        )
+
+    ############################################################################################################
+    def disable(self) -> None:
+        self._enabled = False
+
+    ############################################################################################################
+    def budget_for(self, agent_name: str) -> int:
+        """agent 的上下文预算（估算 token）"""
+        return self._config.agent_max_tokens.get(agent_name, self._config.max_tokens)
+
+    ############################################################################################################
+    def is_pinned(self, message: BaseMessage) -> bool:
+        """固定消息不会被压缩：系统消息与带 pinned_markers 标记的消息"""
+        if isinstance(message, SystemMessage):
+            return True
+        return any(
+            getattr(message, marker, None) for marker in self._config.pinned_markers
+        )
+
+    ############################################################################################################
+    def record_summary(self) -> None:
+        self._stats.summaries += 1
+
+    ############################################################################################################
+    async def compact(
+        self, agent_name: str, context: List[ContextMessage]
+    ) -> Optional[ContextCompactionResult]:
+        """上下文超出预算时原地压缩，返回压缩结果；未启用或未超出预算返回 None"""
+        if not self._enabled:
+            return None
+
+        self._stats.checks += 1
+        budget = self.budget_for(agent_name)
+        tokens_before = estimate_messages_tokens(context)
+        if tokens_before <= budget:
+            return None
+
+        self._stats.compactions += 1
+        result = ContextCompactionResult(
+            agent_name=agent_name,
+            budget=budget,
+            tokens_before=tokens_before,
+            tokens_after=tokens_before,
+            messages_before=len(context),
+            messages_after=len(context),
+        )
+        target = int(budget * self._config.target_ratio)
+        for policy in self._policies:
+            tokens_to_free = result.tokens_after - target
+            if tokens_to_free <= 0:
+                break
+            try:
+                removed = await policy.compact(
+                    self, agent_name, context, tokens_to_free
+                )
+            except Exception as e:
+                self._stats.failures += 1
+                logger.error(f"{agent_name}: 上下文压缩策略 {policy.name} 失败: {e}")
+                continue
+            if removed > 0:
+                result.policies.append(policy.name)
+                self._stats.messages_removed += removed
+            result.tokens_after = estimate_messages_tokens(context)
+
+        result.messages_after = len(context)
+        self._stats.tokens_freed += result.tokens_before - result.tokens_after
+        if result.tokens_after > budget:
+            self._stats.over_budget += 1
+        logger.info(
+            f"{agent_name}: 上下文压缩 {result.tokens_before} -> {result.tokens_after} tokens "
+            f"({result.messages_before} -> {result.messages_after} 条消息, "
+            f"预算 {budget}, 策略 {result.policies})"
+        )
+        return result
+
+
+############################################################################################################
+# 进程级上下文预算（默认关闭）
+agent_context_budget: Final[ContextBudget] = ContextBudget()
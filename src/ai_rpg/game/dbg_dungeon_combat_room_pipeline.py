@@ -2,6 +2,7 @@
 
 from typing import cast
 from .game_session import GameSession
+from ..deepseek.scheduler import LLMPriority
 from .rpg_game_pipeline_manager import RPGGameProcessPipeline
 
 
@@ -41,6 +42,7 @@ def create_dungeon_combat_room_pipeline(
     from ..systems.pass_turn_action_system import PassTurnActionSystem
     from ..systems.retreat_action_system import RetreatActionSystem
     from ..systems.action_cleanup_system import ActionCleanupSystem
+    from ..systems.context_compaction_system import ContextCompactionSystem
     from ..systems.epilogue_system import EpilogueSystem
     from ..systems.prologue_system import PrologueSystem
 
@@ -78,7 +80,11 @@ def create_dungeon_combat_room_pipeline(
     from ..systems.party_pre_play_system import PartyPrePlaySystem
 
     dbg_game = cast(DBGGame, game)
-    processors = RPGGameProcessPipeline()
+    processors = RPGGameProcessPipeline(
+        name="dungeon_combat_room",
+        llm_user=dbg_game._player_session.name,
+        llm_priority=LLMPriority.INTERACTIVE,
+    )
 
     # 起始系统。
     processors.add(PrologueSystem(dbg_game))
@@ -153,6 +159,9 @@ def create_dungeon_combat_room_pipeline(
     # 是否需要销毁实体
     processors.add(DestroyEntitySystem(dbg_game))
 
+    # 上下文超出 token 预算时压缩（预算未启用时不做任何事）
+    processors.add(ContextCompactionSystem(dbg_game))
+
     # 收尾系统。
     processors.add(EpilogueSystem(dbg_game))
 
@@ -2,6 +2,7 @@
 
 from typing import cast
 from .game_session import GameSession
+from ..deepseek.scheduler import LLMPriority
 from .rpg_game_pipeline_manager import RPGGameProcessPipeline
 
 
@@ -26,7 +27,11 @@ def create_dungeon_entry_room_pipeline(
     from ..systems.destroy_entity_system import DestroyEntitySystem
 
     dbg_game = cast(DBGGame, game)
-    processors = RPGGameProcessPipeline()
+    processors = RPGGameProcessPipeline(
+        name="dungeon_entry_room",
+        llm_user=dbg_game._player_session.name,
+        llm_priority=LLMPriority.INTERACTIVE,
+    )
 
     # 起始系统
     processors.add(PrologueSystem(dbg_game))
@@ -2,6 +2,7 @@
 
 from typing import cast
 from .game_session import GameSession
+from ..deepseek.scheduler import LLMPriority
 from .rpg_game_pipeline_manager import RPGGameProcessPipeline
 
 
@@ -27,7 +28,11 @@ def create_dungeon_generate_pipeline(
     from ..systems.destroy_entity_system import DestroyEntitySystem
 
     dbg_game = cast(DBGGame, game)
-    processors = RPGGameProcessPipeline()
+    processors = RPGGameProcessPipeline(
+        name="dungeon_generate",
+        llm_user=dbg_game._player_session.name,
+        llm_priority=LLMPriority.GENERATION,
+    )
 
     # 起始系统
     processors.add(PrologueSystem(dbg_game))
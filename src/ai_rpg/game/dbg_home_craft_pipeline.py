@@ -2,6 +2,7 @@
 
 from typing import cast
 from .game_session import GameSession
+from ..deepseek.scheduler import LLMPriority
 from .rpg_game_pipeline_manager import RPGGameProcessPipeline
 
 
@@ -29,7 +30,11 @@ def create_home_craft_pipeline(game: GameSession) -> RPGGameProcessPipeline:
 
     ##
     dbg_game = cast(DBGGame, game)
-    processors = RPGGameProcessPipeline()
+    processors = RPGGameProcessPipeline(
+        name="home_craft",
+        llm_user=dbg_game._player_session.name,
+        llm_priority=LLMPriority.PLANNING,
+    )
 
     # 起始系统。
     processors.add(PrologueSystem(dbg_game))
@@ -2,6 +2,7 @@
 
 from typing import cast
 from .game_session import GameSession
+from ..deepseek.scheduler import LLMPriority
 from .rpg_game_pipeline_manager import RPGGameProcessPipeline
 
 
@@ -20,6 +21,7 @@ def create_home_pipeline(game: GameSession) -> RPGGameProcessPipeline:
         QueryActionSystem,
     )
     from ..systems.action_cleanup_system import ActionCleanupSystem
+    from ..systems.context_compaction_system import ContextCompactionSystem
     from ..systems.epilogue_system import EpilogueSystem
     from ..systems.prologue_system import PrologueSystem
     from ..systems.speak_action_system import SpeakActionSystem
@@ -38,7 +40,11 @@ def create_home_pipeline(game: GameSession) -> RPGGameProcessPipeline:
 
     ##
     dbg_game = cast(DBGGame, game)
-    processors = RPGGameProcessPipeline()
+    processors = RPGGameProcessPipeline(
+        name="home",
+        llm_user=dbg_game._player_session.name,
+        llm_priority=LLMPriority.PLANNING,
+    )
 
     # 起始系统。
     processors.add(PrologueSystem(dbg_game))
@@ -67,6 +73,9 @@ def create_home_pipeline(game: GameSession) -> RPGGameProcessPipeline:
     # 动作处理后，可能清理。
     processors.add(DestroyEntitySystem(dbg_game))
 
+    # 上下文超出 token 预算时压缩（预算未启用时不做任何事）
+    processors.add(ContextCompactionSystem(dbg_game))
+
     # 收尾系统。
     processors.add(EpilogueSystem(dbg_game))
 
@@ -3,21 +3,84 @@
 
 封装 flush_entities() → archive_world() 的标准存储流程，
 保证每次持久化前 ECS 运行时状态已同步到序列化模型。
+
+默认使用增量存档：同一局游戏固定写入一个存档目录，每次只写入变化的部分（见 WorldArchiver）。
+后台写入服务（world_persistence）启用时，这里只在调用方持有的房间锁内做快照，
+序列化与写盘在线程池中完成。
 """
 
 from pathlib import Path
 from typing import Optional
 from .dbg_game import DBGGame
-from .world_store import archive_world
+from .world_persistence import SaveJob, world_persistence
+from .world_store import (
+    WorldArchiver,
+    archive_world,
+    make_save_dir,
+    snapshot_player_session,
+    snapshot_world,
+)
 from .config import WORLDS_DIR
 
 
-def store_game(dbg_game: DBGGame, save_dir: Optional[Path] = None) -> bool:
-    """先刷新实体状态再持久化存档。"""
+def store_game(
+    dbg_game: DBGGame, save_dir: Optional[Path] = None, incremental: bool = True
+) -> bool:
+    """先刷新实体状态再持久化存档。
+
+    incremental 为 True 时复用该局游戏的 WorldArchiver：未指定 save_dir 时沿用首次存档生成的目录，
+    指定了不同的 save_dir 则新建存档器并全量写入。为 False 时每次全量写入（save_dir 为空则新建时间戳目录）。
+
+    后台写入服务启用时返回 True 表示存档已提交，写入结果见 world_persistence.stats；
+    否则同步写盘并返回是否成功。
+    """
     dbg_game.flush_entities()
-    return archive_world(
-        dbg_game._world,
-        dbg_game._player_session,
-        worlds_dir=WORLDS_DIR,
-        save_dir=save_dir,
-    )
+    live_session = dbg_game._player_session
+    player_session = live_session
+    durable_sequence = live_session.event_sequence
+
+    world = dbg_game._world
+    if world_persistence.enabled:
+        world = snapshot_world(world)
+        player_session = snapshot_player_session(player_session)
+
+    job: SaveJob
+    if not incremental:
+        if save_dir is None:
+            save_dir = make_save_dir(world, player_session, WORLDS_DIR)
+        full_save_dir = save_dir
+
+        def job() -> bool:
+            if not archive_world(
+                world, player_session, worlds_dir=WORLDS_DIR, save_dir=full_save_dir
+            ):
+                return False
+            # 写盘成功后，已写入的旧会话事件可以移出内存
+            live_session.mark_durable(
+                full_save_dir / "player_session.jsonl", durable_sequence
+            )
+            return True
+
+    else:
+        archiver = dbg_game._world_archiver
+        if archiver is None or (save_dir is not None and save_dir != archiver.save_dir):
+            if save_dir is None:
+                save_dir = make_save_dir(world, player_session, WORLDS_DIR)
+            archiver = WorldArchiver(save_dir)
+            dbg_game._world_archiver = archiver
+        incremental_archiver = archiver
+
+        def job() -> bool:
+            if not incremental_archiver.archive(world, player_session):
+                return False
+            live_session.mark_durable(
+                incremental_archiver.save_dir / "player_session.jsonl",
+                durable_sequence,
+            )
+            return True
+
+    if not world_persistence.enabled:
+        return job()
+
+    world_persistence.submit(live_session.name, job)
+    return True
@@ -1,10 +1,32 @@
 """游戏服务器模块"""
 
-from typing import Dict, Optional
-from .player_room import PlayerRoom
-from ..models import TaskRecord, TaskStatus
+import asyncio
 import uuid
-from datetime import datetime
+from typing import Any, Coroutine, Dict, Iterable, List, Optional
+from loguru import logger
+from .context_budget import ContextBudgetConfig, agent_context_budget
+from .player_room import PlayerRoom
+from .task_registry import TaskRegistry, TaskRegistryConfig, TaskRegistryStats
+from .room_hibernation import (
+    RoomHibernationConfig,
+    RoomHibernationStats,
+    RoomHibernator,
+)
+from .config import WORLDS_DIR
+from .world_persistence import world_persistence
+from .world_store import WorldArchiver, find_latest_save_dir
+from ..embedding_model import EmbeddingModelConfig, embedding_encoder
+from ..rag import RetrievalCacheConfig, rag_retrieval_cache
+from ..deepseek import (
+    HttpPoolConfig,
+    ResilienceConfig,
+    ResponseCacheConfig,
+    llm_resilience,
+    llm_response_cache,
+    llm_scheduler,
+    shared_http_pool,
+)
+from ..models import ChangeNotifier, TaskRecord, TaskStatus
 
 
 ###############################################################################################################################################
@@ -13,9 +35,107 @@ class GameServer:
 
     def __init__(
         self,
+        http_pool_config: Optional[HttpPoolConfig] = None,
+        max_llm_in_flight: int = 16,
+        resilience_config: Optional[ResilienceConfig] = None,
+        response_cache_config: Optional[ResponseCacheConfig] = None,
+        persistence_workers: int = 2,
+        embedding_config: Optional[EmbeddingModelConfig] = None,
+        retrieval_cache_config: Optional[RetrievalCacheConfig] = None,
+        context_budget_config: Optional[ContextBudgetConfig] = None,
+        room_hibernation_config: Optional[RoomHibernationConfig] = None,
+        task_registry_config: Optional[TaskRegistryConfig] = None,
+        worker_id: str = "",
     ) -> None:
         self._rooms: Dict[str, PlayerRoom] = {}
-        self._background_task_store: Dict[str, TaskRecord] = {}
+        # 分片部署时的 worker 标识（见 worker_shard）；每次进程启动生成新的 boot_id，前端路由据此发现 worker 重启
+        self._worker_id: str = worker_id
+        self._boot_id: str = uuid.uuid4().hex
+        # 任务状态变更通知（watch_task SSE 端点在此等待）
+        self._task_notifier: ChangeNotifier = ChangeNotifier()
+        # 后台任务登记表：终态任务定期过期，按玩家索引，可取消；分片部署时任务 ID 带 worker 前缀
+        if task_registry_config is None:
+            task_registry_config = TaskRegistryConfig()
+        if worker_id:
+            task_registry_config = task_registry_config.model_copy(
+                update={"worker_id": worker_id}
+            )
+        self._task_registry: TaskRegistry = TaskRegistry(
+            task_registry_config, on_change=self._task_notifier.notify
+        )
+        self._http_pool_config: HttpPoolConfig = (
+            http_pool_config if http_pool_config is not None else HttpPoolConfig()
+        )
+        self._max_llm_in_flight: int = max_llm_in_flight
+        self._resilience_config: ResilienceConfig = (
+            resilience_config if resilience_config is not None else ResilienceConfig()
+        )
+        self._response_cache_config: ResponseCacheConfig = (
+            response_cache_config
+            if response_cache_config is not None
+            else ResponseCacheConfig()
+        )
+        self._persistence_workers: int = persistence_workers
+        self._embedding_config: EmbeddingModelConfig = (
+            embedding_config if embedding_config is not None else EmbeddingModelConfig()
+        )
+        self._retrieval_cache_config: RetrievalCacheConfig = (
+            retrieval_cache_config
+            if retrieval_cache_config is not None
+            else RetrievalCacheConfig()
+        )
+        self._context_budget_config: ContextBudgetConfig = (
+            context_budget_config
+            if context_budget_config is not None
+            else ContextBudgetConfig()
+        )
+        # 空闲房间休眠（默认关闭）
+        self._room_hibernator: RoomHibernator = RoomHibernator(room_hibernation_config)
+        self._hibernation_task: Optional["asyncio.Task[None]"] = None
+
+    ###############################################################################################################################################
+    async def startup(self) -> None:
+        """服务器启动：初始化进程级共享资源（LLM HTTP 连接池、并发调度器、弹性层、响应缓存、后台存档、嵌入模型配置、RAG 检索缓存、agent 上下文预算、空闲房间休眠）"""
+        await shared_http_pool.start(self._http_pool_config)
+        llm_scheduler.configure(self._max_llm_in_flight)
+        llm_resilience.configure(self._resilience_config)
+        llm_response_cache.open(self._response_cache_config)
+        world_persistence.start(self._persistence_workers)
+        # 嵌入模型在第一次 RAG 检索时才加载（或连接共享编码服务）
+        embedding_encoder.configure(self._embedding_config)
+        rag_retrieval_cache.open(self._retrieval_cache_config)
+        agent_context_budget.configure(self._context_budget_config)
+        if self._room_hibernator.config.enabled:
+            self._hibernation_task = asyncio.create_task(self._hibernation_loop())
+        logger.info(
+            f"GameServer startup: http pool = {self._http_pool_config}, "
+            f"max_llm_in_flight = {self._max_llm_in_flight}, "
+            f"embedding = {self._embedding_config}, "
+            f"room hibernation = {self._room_hibernator.config}, "
+            f"worker = {self._worker_id or '-'}"
+        )
+
+    ###############################################################################################################################################
+    async def shutdown(self) -> None:
+        """服务器关闭：写完待写存档，释放进程级共享资源"""
+        if self._hibernation_task is not None:
+            self._hibernation_task.cancel()
+            await asyncio.gather(self._hibernation_task, return_exceptions=True)
+            self._hibernation_task = None
+        await world_persistence.aclose()
+        await shared_http_pool.aclose()
+        logger.info(
+            f"GameServer shutdown complete: llm scheduler = {llm_scheduler.stats}, "
+            f"llm resilience = {llm_resilience.stats}, "
+            f"llm response cache = {llm_response_cache.stats}, "
+            f"rag retrieval cache = {rag_retrieval_cache.stats}, "
+            f"agent context budget = {agent_context_budget.stats}, "
+            f"room hibernation = {self._room_hibernator.stats}, "
+            f"task registry = {self._task_registry.stats}"
+        )
+        llm_response_cache.close()
+        rag_retrieval_cache.close()
+        agent_context_budget.disable()
 
     ###############################################################################################################################################
     def has_room(self, user_name: str) -> bool:
@@ -27,6 +147,120 @@ class GameServer:
         """获取指定玩家的房间"""
         return self._rooms.get(user_name, None)
 
+    ###############################################################################################################################################
+    async def acquire_room(self, user_name: str) -> Optional[PlayerRoom]:
+        """获取指定玩家的房间并记录一次请求；房间已休眠时先从存档恢复游戏（恢复失败时房间没有游戏）"""
+        room = self._rooms.get(user_name, None)
+        if room is None:
+            return None
+        room.touch()
+        # 正在休眠的房间等休眠完成后立即恢复
+        if room.is_hibernated or room._hibernation_lock.locked():
+            await self._room_hibernator.restore(room)
+        return room
+
+    ###############################################################################################################################################
+    @property
+    def room_hibernation_stats(self) -> RoomHibernationStats:
+        """房间休眠计数与耗时"""
+        return self._room_hibernator.stats
+
+    ###############################################################################################################################################
+    async def hibernate_idle_rooms(self) -> int:
+        """按休眠配置休眠空闲房间，返回本次休眠的房间数"""
+        return await self._room_hibernator.sweep(list(self._rooms.values()))
+
+    ###############################################################################################################################################
+    async def _hibernation_loop(self) -> None:
+        """定期休眠空闲房间"""
+        interval = self._room_hibernator.config.sweep_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.hibernate_idle_rooms()
+            except Exception as e:
+                logger.error(f"休眠空闲房间失败: {e}")
+
+    ###############################################################################################################################################
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    ###############################################################################################################################################
+    @property
+    def boot_id(self) -> str:
+        return self._boot_id
+
+    ###############################################################################################################################################
+    @property
+    def room_count(self) -> int:
+        return len(self._rooms)
+
+    ###############################################################################################################################################
+    @property
+    def resident_room_count(self) -> int:
+        """游戏常驻内存（未休眠）的房间数"""
+        return sum(1 for room in self._rooms.values() if room._dbg_game is not None)
+
+    ###############################################################################################################################################
+    async def release_room(self, user_name: str) -> bool:
+        """把玩家的房间写入存档后移除（玩家迁移到其他 worker 前调用），返回是否已释放。
+
+        先从房间表移除，新请求不再拿到该房间；再等待进行中的请求与管道结束后休眠写盘。
+        写盘失败时放回房间并返回 False。
+        """
+        room = self._rooms.pop(user_name, None)
+        if room is None:
+            return True
+        if room._dbg_game is not None:
+            await self._room_hibernator.hibernate(room, wait_for_lock=True)
+            if room._dbg_game is not None:
+                self._rooms.setdefault(user_name, room)
+                return False
+        logger.info(f"房间已释放: user = {user_name}, worker = {self._worker_id}")
+        return True
+
+    ###############################################################################################################################################
+    async def adopt_room(self, user_name: str, replace: bool = False) -> bool:
+        """从玩家最近的存档领养房间（玩家从其他 worker 迁移过来时调用），返回是否领养了存档。
+
+        领养的房间处于休眠状态，下一个请求（acquire_room）时恢复游戏；没有存档时不做任何事。
+        房间已存在时：replace 为 False 则保留；为 True（玩家期间由其他 worker 服务过，最新进度在存档中）
+        则丢弃该房间（不写存档，内存中的游戏已过期）后领养。
+        """
+        room = self._rooms.get(user_name, None)
+        if room is not None:
+            if not replace:
+                return False
+            await self._discard_room(room)
+        save_dir = await asyncio.to_thread(find_latest_save_dir, WORLDS_DIR, user_name)
+        if save_dir is None or user_name in self._rooms:
+            return False
+        room = self.create_room(user_name)
+        room._hibernated_archiver = WorldArchiver(save_dir)
+        logger.info(
+            f"房间已领养: user = {user_name}, worker = {self._worker_id}, save_dir = {save_dir}"
+        )
+        return True
+
+    ###############################################################################################################################################
+    async def _discard_room(self, room: PlayerRoom) -> None:
+        """等进行中的请求与管道结束后丢弃房间及其游戏，不写存档"""
+        async with room._lock, room._hibernation_lock:
+            if self._rooms.get(room._username) is room:
+                self._rooms.pop(room._username)
+            dbg_game = room._dbg_game
+            room._dbg_game = None
+            room._player_session = None
+            room._hibernated_archiver = None
+            if dbg_game is not None:
+                dbg_game.exit()
+                # 唤醒该房间的 SSE 推送端点，使其发现房间已移除并结束
+                dbg_game._player_session.notifier.notify()
+        logger.warning(
+            f"房间已丢弃（内存中的游戏已过期）: user = {room._username}, worker = {self._worker_id}"
+        )
+
     ###############################################################################################################################################
     def create_room(self, user_name: str) -> PlayerRoom:
         """为指定玩家创建新房间"""
@@ -42,27 +276,71 @@ class GameServer:
         user_name = room._username
         assert user_name in self._rooms
         self._rooms.pop(user_name, None)
+        # 唤醒该房间的 SSE 推送端点，使其发现房间已移除并结束
+        if room._dbg_game is not None:
+            room._dbg_game._player_session.notifier.notify()
 
     ###############################################################################################################################################
-    def create_task(self) -> TaskRecord:
-        """创建并添加一个新的后台任务记录"""
+    def has_task_capacity(self, user_name: str) -> bool:
+        """指定玩家进行中的任务是否未达上限"""
+        return self._task_registry.has_capacity(user_name)
 
-        task_id = str(uuid.uuid4())
-        task_record = TaskRecord(
-            task_id=task_id,
-            status=TaskStatus.RUNNING,
-            start_time=datetime.now().isoformat(),
-        )
-
-        # 不可能出现重复ID！
-        assert task_id not in self._background_task_store
-        self._background_task_store[task_id] = task_record
+    ###############################################################################################################################################
+    def create_task(self, user_name: str = "") -> TaskRecord:
+        """创建并添加一个新的后台任务记录"""
+        return self._task_registry.create(user_name)
 
-        return task_record
+    ###############################################################################################################################################
+    def run_task(
+        self, task_record: TaskRecord, coroutine: Coroutine[Any, Any, None]
+    ) -> "asyncio.Task[None]":
+        """在后台执行任务协程，并登记到任务记录上以便取消"""
+        handle = asyncio.create_task(coroutine)
+        self._task_registry.attach(task_record.task_id, handle)
+        return handle
 
     ###############################################################################################################################################
     def get_task(self, task_id: str) -> Optional[TaskRecord]:
         """获取指定的后台任务记录"""
-        return self._background_task_store.get(task_id, None)
+        return self._task_registry.get(task_id)
+
+    ###############################################################################################################################################
+    def get_tasks(self, task_ids: Iterable[str]) -> List[TaskRecord]:
+        """批量获取后台任务记录（不存在或已过期的跳过）"""
+        return self._task_registry.get_many(task_ids)
+
+    ###############################################################################################################################################
+    def list_user_tasks(
+        self, user_name: str, running_only: bool = False
+    ) -> List[TaskRecord]:
+        """获取指定玩家的后台任务记录"""
+        return self._task_registry.list_user(user_name, running_only)
+
+    ###############################################################################################################################################
+    @property
+    def task_registry_stats(self) -> TaskRegistryStats:
+        """后台任务计数"""
+        return self._task_registry.stats
+
+    ###############################################################################################################################################
+    @property
+    def task_notifier(self) -> ChangeNotifier:
+        """任务状态变更通知"""
+        return self._task_notifier
+
+    ###############################################################################################################################################
+    def complete_task(self, task_id: str) -> None:
+        """将任务标记为完成并通知等待方"""
+        self._task_registry.finish(task_id, TaskStatus.COMPLETED)
+
+    ###############################################################################################################################################
+    def fail_task(self, task_id: str, error: str) -> None:
+        """将任务标记为失败并通知等待方"""
+        self._task_registry.finish(task_id, TaskStatus.FAILED, error)
+
+    ###############################################################################################################################################
+    def cancel_task(self, task_id: str) -> bool:
+        """取消进行中的任务并通知等待方，返回是否已取消"""
+        return self._task_registry.cancel(task_id)
 
     ###############################################################################################################################################
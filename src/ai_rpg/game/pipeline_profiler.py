@@ -0,0 +1,179 @@
+"""流程管道性能剖析
+
+开启后，每次 RPGGameProcessPipeline.process() 记录一个 PipelineProfile：逐个系统的墙钟耗时、
+LLM 等待时间与其余（CPU）时间、反应式系统收集到的实体数、组件变更引起的 group 更新次数。
+最近的剖析结果保存在内存中；设置 output_dir 后，每次 process() 另写一份 Chrome trace JSON。
+
+可在运行时随时开关（pipeline_profiler.enable() / disable()，或调试接口 /api/debug/pipeline-profile/v1/）。
+关闭时 process() 只多一次布尔判断，系统执行路径与未剖析时完全相同。
+"""
+
+import json
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, Final, List, Optional, Sequence
+
+from loguru import logger
+
+from ..deepseek import LLMWaitTimer, track_llm_wait
+from ..entitas import Context, ExecuteProcessor, ExecutionTrace, ReactiveProcessor
+from ..models import PipelineProfile, ProcessorSpan
+
+
+###############################################################################################################################################
+class PipelineProfileSession:
+    """一次 process() 调用的剖析记录器"""
+
+    def __init__(
+        self,
+        pipeline: str,
+        user: str,
+        stages: Sequence[Sequence[ExecuteProcessor]],
+        context: Optional[Context],
+    ) -> None:
+        self._profile: Final[PipelineProfile] = PipelineProfile(
+            pipeline=pipeline, user=user, started_at=datetime.now()
+        )
+        self._context: Final[Optional[Context]] = context
+        self._start: Final[float] = time.perf_counter()
+        self._placement: Dict[int, tuple[int, int]] = {
+            id(processor): (stage_index, slot)
+            for stage_index, stage in enumerate(stages)
+            for slot, processor in enumerate(stage)
+        }
+
+    ###############################################################################################################################################
+    async def run(self, processor: ExecuteProcessor) -> None:
+        """执行并记录单个系统"""
+        stage, slot = self._placement.get(id(processor), (-1, 0))
+        collected = (
+            processor.collected_entity_count
+            if isinstance(processor, ReactiveProcessor)
+            else None
+        )
+        group_updates = (
+            self._context.group_update_count if self._context is not None else 0
+        )
+        timer = LLMWaitTimer()
+        error: Optional[str] = None
+        start = time.perf_counter()
+        try:
+            with track_llm_wait(timer):
+                await processor.execute()
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._profile.spans.append(
+                ProcessorSpan(
+                    name=type(processor).__name__,
+                    stage=stage,
+                    slot=slot,
+                    start_seconds=start - self._start,
+                    wall_seconds=time.perf_counter() - start,
+                    llm_wait_seconds=timer.wait_seconds,
+                    llm_requests=timer.requests,
+                    collected_entities=collected,
+                    group_updates=(
+                        self._context.group_update_count - group_updates
+                        if self._context is not None
+                        else 0
+                    ),
+                    error=error,
+                )
+            )
+
+    ###############################################################################################################################################
+    def finish(
+        self, execute_seconds: float, trace: Optional[ExecutionTrace]
+    ) -> PipelineProfile:
+        """结束记录，返回剖析结果"""
+        self._profile.wall_seconds = time.perf_counter() - self._start
+        self._profile.execute_seconds = execute_seconds
+        self._profile.cleanup_seconds = max(
+            0.0, self._profile.wall_seconds - execute_seconds
+        )
+        self._profile.saved_seconds = trace.saved_seconds if trace is not None else 0.0
+        return self._profile
+
+
+###############################################################################################################################################
+class PipelineProfiler:
+    """进程级流程管道剖析开关与最近结果"""
+
+    def __init__(self) -> None:
+        self._enabled: bool = False
+        self._output_dir: Optional[Path] = None
+        self._recent: Deque[PipelineProfile] = deque(maxlen=32)
+
+    ###############################################################################################################################################
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    ###############################################################################################################################################
+    @property
+    def output_dir(self) -> Optional[Path]:
+        return self._output_dir
+
+    ###############################################################################################################################################
+    @property
+    def recent(self) -> List[PipelineProfile]:
+        """最近的剖析结果（从旧到新）"""
+        return list(self._recent)
+
+    ###############################################################################################################################################
+    def enable(self, output_dir: Optional[Path] = None, keep: int = 32) -> None:
+        """开启剖析；output_dir 不为空时每次 process() 另写一份 Chrome trace JSON"""
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        self._output_dir = output_dir
+        if keep != self._recent.maxlen:
+            self._recent = deque(self._recent, maxlen=keep)
+        self._enabled = True
+        logger.info(
+            f"PipelineProfiler enabled: output_dir = {output_dir}, keep = {keep}"
+        )
+
+    ###############################################################################################################################################
+    def disable(self) -> None:
+        self._enabled = False
+        logger.info("PipelineProfiler disabled")
+
+    ###############################################################################################################################################
+    def clear(self) -> None:
+        self._recent.clear()
+
+    ###############################################################################################################################################
+    def record(self, profile: PipelineProfile) -> None:
+        """保存剖析结果并输出最慢的系统"""
+        self._recent.append(profile)
+        slowest = ", ".join(
+            f"{span.name} {span.wall_seconds:.3f}s (llm {span.llm_wait_seconds:.3f}s)"
+            for span in profile.slowest(3)
+        )
+        logger.info(
+            f"pipeline profile {profile.pipeline} ({profile.user}): "
+            f"wall = {profile.wall_seconds:.3f}s, llm = {profile.llm_wait_seconds:.3f}s, "
+            f"saved = {profile.saved_seconds:.3f}s, slowest = [{slowest}]"
+        )
+
+    ###############################################################################################################################################
+    def export(self, profile: PipelineProfile) -> Optional[Path]:
+        """把剖析结果写为 Chrome trace JSON（未设置 output_dir 时不写），返回文件路径"""
+        output_dir = self._output_dir
+        if output_dir is None:
+            return None
+        path = output_dir / (
+            f"{profile.started_at.strftime('%Y%m%d_%H%M%S_%f')}"
+            f"_{profile.user or 'anonymous'}_{profile.pipeline or 'pipeline'}.trace.json"
+        )
+        path.write_text(json.dumps(profile.to_chrome_trace()), encoding="utf-8")
+        return path
+
+
+###############################################################################################################################################
+# 进程级流程管道剖析器（默认关闭）
+pipeline_profiler: Final[PipelineProfiler] = PipelineProfiler()
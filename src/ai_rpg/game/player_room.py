@@ -1,7 +1,9 @@
 import asyncio
+import time
 from typing import Final, Optional
 from .dbg_game import DBGGame
-from ..models import PlayerSession
+from .world_store import WorldArchiver
+from ..models import ChangeNotifier, PlayerSession
 
 
 class PlayerRoom:
@@ -14,3 +16,24 @@ class PlayerRoom:
         self._dbg_game: Optional[DBGGame] = None  # DBGGame 游戏实例
         self._player_session: Optional[PlayerSession] = None
         self._lock: asyncio.Lock = asyncio.Lock()  # 每玩家锁，防止并发状态竞争
+        # 休眠：游戏写入存档后释放，下次请求时从存档恢复（见 room_hibernation）
+        self._last_active: float = time.monotonic()
+        # 休眠存档所在的存档器（不为空表示游戏已休眠）
+        self._hibernated_archiver: Optional[WorldArchiver] = None
+        self._hibernation_lock: asyncio.Lock = asyncio.Lock()  # 休眠与恢复互斥
+        # 从休眠恢复时通知（SSE 推送端点在休眠期间等待它）
+        self._restore_notifier: ChangeNotifier = ChangeNotifier()
+
+    def touch(self) -> None:
+        """记录一次玩家请求"""
+        self._last_active = time.monotonic()
+
+    @property
+    def idle_seconds(self) -> float:
+        """距上次玩家请求的秒数"""
+        return time.monotonic() - self._last_active
+
+    @property
+    def is_hibernated(self) -> bool:
+        """游戏已写入存档并从内存释放"""
+        return self._hibernated_archiver is not None
@@ -0,0 +1,236 @@
+"""空闲房间休眠
+
+玩家长时间没有请求时，把房间中的 DBGGame（实体、group、agent 上下文、管道）写入存档后从内存释放，
+下次请求（GameServer.acquire_room）时用 restore_world + restore_from_snapshot 透明恢复：
+
+- 休眠：flush_entities() 后用该局游戏的增量存档器（WorldArchiver，与 store_game 同一存档目录）
+  在工作线程中写盘，写盘成功才释放游戏；存档器随房间保留，恢复后继续增量存档
+  （上下文游标改指向恢复出的消息对象）；恢复后唤醒房间的 restore 通知，SSE 推送立即继续；
+- 触发条件：空闲超过 idle_ttl_seconds，或常驻内存的游戏数超过 max_resident_rooms（高水位，按最久未活跃淘汰）；
+- 正在执行请求或管道（持有房间锁）的房间不会休眠；恢复只取房间的休眠锁，持有房间锁时也可以调用；
+- 统计休眠、恢复次数与耗时（RoomHibernationStats）。
+
+默认关闭（idle_ttl_seconds 与 max_resident_rooms 均为 0），由 GameServer 配置启用。
+"""
+
+import asyncio
+import time
+from typing import Iterable, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+from .config import WORLDS_DIR
+from .dbg_game import DBGGame
+from .player_room import PlayerRoom
+from .world_persistence import world_persistence
+from .world_store import WorldArchiver, make_save_dir, restore_world
+
+
+###############################################################################################################################################
+class RoomHibernationConfig(BaseModel):
+    """房间休眠配置"""
+
+    idle_ttl_seconds: float = 0.0  # 空闲多久后休眠（0 表示不按空闲时间休眠）
+    max_resident_rooms: int = 0  # 常驻内存的游戏数上限（0 表示不限）
+    sweep_interval_seconds: float = 30.0  # 检查间隔
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_ttl_seconds > 0 or self.max_resident_rooms > 0
+
+
+###############################################################################################################################################
+class RoomHibernationStats(BaseModel):
+    """房间休眠计数与耗时"""
+
+    hibernated: int = 0  # 休眠次数
+    restored: int = 0  # 恢复次数
+    hibernate_failed: int = 0  # 休眠失败（存档失败，游戏保留在内存中）
+    restore_failed: int = 0  # 恢复失败
+    hibernate_seconds_total: float = 0.0
+    hibernate_seconds_max: float = 0.0
+    restore_seconds_total: float = 0.0
+    restore_seconds_max: float = 0.0
+
+
+###############################################################################################################################################
+def select_rooms_to_hibernate(
+    rooms: Iterable[PlayerRoom], config: RoomHibernationConfig
+) -> List[PlayerRoom]:
+    """按配置选出应休眠的房间：空闲超时的房间，加上超出高水位时最久未活跃的房间"""
+    resident = sorted(
+        (room for room in rooms if room._dbg_game is not None),
+        key=lambda room: room._last_active,
+    )
+
+    selected: List[PlayerRoom] = []
+    if config.idle_ttl_seconds > 0:
+        selected = [
+            room for room in resident if room.idle_seconds >= config.idle_ttl_seconds
+        ]
+
+    if config.max_resident_rooms > 0:
+        excess = len(resident) - len(selected) - config.max_resident_rooms
+        for room in resident:
+            if excess <= 0:
+                break
+            if room not in selected:
+                selected.append(room)
+                excess -= 1
+
+    return selected
+
+
+###############################################################################################################################################
+class RoomHibernator:
+    """房间的休眠与恢复"""
+
+    def __init__(self, config: Optional[RoomHibernationConfig] = None) -> None:
+        self._config: RoomHibernationConfig = (
+            config if config is not None else RoomHibernationConfig()
+        )
+        self._stats: RoomHibernationStats = RoomHibernationStats()
+
+    ###############################################################################################################################################
+    @property
+    def config(self) -> RoomHibernationConfig:
+        return self._config
+
+    ###############################################################################################################################################
+    @property
+    def stats(self) -> RoomHibernationStats:
+        """休眠计数与耗时（返回副本）"""
+        return self._stats.model_copy()
+
+    ###############################################################################################################################################
+    async def sweep(self, rooms: Iterable[PlayerRoom]) -> int:
+        """按配置休眠房间，返回本次休眠的房间数"""
+        # 选出时记下各房间的活跃时间：逐个休眠期间有新请求的房间不再休眠
+        selected = [
+            (room, room._last_active)
+            for room in select_rooms_to_hibernate(rooms, self._config)
+        ]
+        count = 0
+        for room, last_active in selected:
+            if await self.hibernate(room, expected_last_active=last_active):
+                count += 1
+        return count
+
+    ###############################################################################################################################################
+    async def hibernate(
+        self,
+        room: PlayerRoom,
+        expected_last_active: Optional[float] = None,
+        wait_for_lock: bool = False,
+    ) -> bool:
+        """把房间的游戏写入存档并释放，返回是否已休眠。
+
+        房间锁被占用（请求或管道执行中）、没有游戏，或 expected_last_active 不为空且房间在此之后有过请求时跳过；
+        wait_for_lock 为 True 时改为等待房间锁（房间迁移到其他 worker 前使用）。
+        """
+        if room._lock.locked() and not wait_for_lock:
+            return False
+
+        async with room._lock, room._hibernation_lock:
+            dbg_game = room._dbg_game
+            if dbg_game is None or room.is_hibernated:
+                return False
+            if (
+                expected_last_active is not None
+                and room._last_active != expected_last_active
+            ):
+                return False
+
+            start = time.perf_counter()
+            player_session = dbg_game._player_session
+            archiver = dbg_game._world_archiver
+            if archiver is None:
+                archiver = WorldArchiver(
+                    make_save_dir(dbg_game._world, player_session, WORLDS_DIR)
+                )
+            try:
+                dbg_game.flush_entities()
+                # 等该玩家已提交的后台存档写完，避免与本次写入同一目录并发
+                await world_persistence.flush(player_session.name)
+                ok = await asyncio.to_thread(
+                    archiver.archive, dbg_game._world, player_session
+                )
+            except Exception as e:
+                logger.error(f"房间休眠失败: user = {room._username}, error = {e}")
+                ok = False
+
+            if not ok:
+                self._stats.hibernate_failed += 1
+                return False
+
+            dbg_game.exit()
+            room._dbg_game = None
+            room._player_session = None
+            room._hibernated_archiver = archiver
+
+            # 唤醒该房间的 SSE 推送端点，使其发现游戏已休眠
+            player_session.notifier.notify()
+
+            elapsed = time.perf_counter() - start
+            self._stats.hibernated += 1
+            self._stats.hibernate_seconds_total += elapsed
+            self._stats.hibernate_seconds_max = max(
+                self._stats.hibernate_seconds_max, elapsed
+            )
+            logger.info(
+                f"房间已休眠: user = {room._username}, save_dir = {archiver.save_dir}, "
+                f"elapsed = {elapsed:.3f}s"
+            )
+            return True
+
+    ###############################################################################################################################################
+    async def restore(self, room: PlayerRoom) -> bool:
+        """从休眠存档恢复房间的游戏，返回房间是否已有游戏"""
+        async with room._hibernation_lock:
+            archiver = room._hibernated_archiver
+            if archiver is None:
+                return room._dbg_game is not None
+
+            start = time.perf_counter()
+            try:
+                world, player_session = await asyncio.to_thread(
+                    restore_world, archiver.save_dir
+                )
+                archiver.rebind_contexts(world)
+                dbg_game = DBGGame(
+                    name=player_session.game,
+                    player_session=player_session,
+                    world=world,
+                )
+                dbg_game.restore_from_snapshot()
+                await dbg_game.initialize()
+            except Exception as e:
+                logger.error(f"房间恢复失败: user = {room._username}, error = {e}")
+                self._stats.restore_failed += 1
+                return False
+
+            # 存档中已包含全部会话事件；沿用休眠前的存档器继续增量存档
+            player_session.mark_durable(
+                archiver.save_dir / "player_session.jsonl",
+                player_session.event_sequence,
+            )
+            dbg_game._world_archiver = archiver
+            room._dbg_game = dbg_game
+            room._player_session = player_session
+            room._hibernated_archiver = None
+
+            # 唤醒等待该房间恢复的 SSE 推送端点
+            room._restore_notifier.notify()
+
+            elapsed = time.perf_counter() - start
+            self._stats.restored += 1
+            self._stats.restore_seconds_total += elapsed
+            self._stats.restore_seconds_max = max(
+                self._stats.restore_seconds_max, elapsed
+            )
+            logger.info(
+                f"房间已恢复: user = {room._username}, save_dir = {archiver.save_dir}, "
+                f"elapsed = {elapsed:.3f}s"
+            )
+            return True
@@ -1,4 +1,5 @@
-from typing import Callable, List, Sequence
+import asyncio
+from typing import Callable, Final, List, Optional, Sequence
 from ..models.messages import (
     AIMessage,
     BaseMessage,
@@ -8,12 +9,16 @@ from ..models.messages import (
     ToolMessage,
 )
 from loguru import logger
+from ..deepseek import estimate_messages_tokens
 from ..entitas import Entity
 from ..models import AgentContext, WorldState
-
+from .context_budget import ContextCompactionResult, agent_context_budget
 
 MessagePredicate = Callable[[BaseMessage, int, Sequence[ContextMessage]], bool]
 
+# 系统 reads / writes 声明中代表 agent LLM 上下文的共享资源（见 entitas.ExecuteProcessor）
+AGENT_CONTEXT_RESOURCE: Final[str] = "agent_context"
+
 
 #################################################################################################################################################
 class RPGAgentContext:
@@ -98,17 +103,11 @@ class RPGAgentContext:
         entity: Entity,
         messages: Sequence[BaseMessage],
     ) -> int:
-        """从实体上下文中删除指定的消息对象"""
+        """从实体上下文中删除指定的消息对象（按对象身份匹配，内容相同的其他消息不受影响）"""
         if len(messages) == 0:
             return 0
 
-        context = self.get_agent_context(entity).context
-        original_length = len(context)
-
-        # 删除指定的消息对象
-        context[:] = [msg for msg in context if msg not in messages]
-
-        deleted_count = original_length - len(context)
+        deleted_count = self.get_agent_context(entity).index.remove(messages)
         if deleted_count > 0:
             logger.debug(
                 f"Deleted {deleted_count} message(s) from {entity.name}'s chat history."
@@ -122,20 +121,15 @@ class RPGAgentContext:
         begin_message: SystemMessage | HumanMessage | AIMessage | ToolMessage,
         end_message: SystemMessage | HumanMessage | AIMessage | ToolMessage,
     ) -> List[SystemMessage | HumanMessage | AIMessage | ToolMessage]:
-        """从实体上下文中删除指定范围的消息（包含两端）"""
+        """从实体上下文中删除指定范围的消息（包含两端，按对象身份定位）"""
         assert (
-            begin_message != end_message
+            begin_message is not end_message
         ), "begin_message and end_message should not be the same"
 
-        agent_context = self.get_agent_context(entity)
-        begin_message_index = agent_context.context.index(begin_message)
-        end_message_index = agent_context.context.index(end_message) + 1
-
-        # 保存要删除的消息
-        deleted_messages = agent_context.context[begin_message_index:end_message_index]
-
         # 开始移除！！！！。
-        del agent_context.context[begin_message_index:end_message_index]
+        deleted_messages = self.get_agent_context(entity).index.remove_range(
+            begin_message, end_message
+        )
         logger.debug(f"remove_message_range= {entity.name}")
         logger.debug(f"begin_message: \n{begin_message.model_dump_json(indent=2)}")
         logger.debug(f"end_message: \n{end_message.model_dump_json(indent=2)}")
@@ -153,10 +147,33 @@ class RPGAgentContext:
         if len(messages) == 0:
             return
 
-        agent_context = self.get_agent_context(entity)
-        agent_context.context[index:index] = messages
+        self.get_agent_context(entity).index.insert(index, messages)
         logger.debug(
             f"insert_messages: inserted {len(messages)} message(s) at index {index} for {entity.name}"
         )
 
     #######################################################################################################################################
+    def message_position(self, entity: Entity, message: BaseMessage) -> Optional[int]:
+        """消息在实体上下文中的位置（按对象身份，O(1)），不在上下文中返回 None"""
+        return self.get_agent_context(entity).index.position(message)
+
+    #######################################################################################################################################
+    def context_token_count(self, entity: Entity) -> int:
+        """实体LLM上下文的估算 token 数"""
+        return estimate_messages_tokens(self.get_agent_context(entity).context)
+
+    #######################################################################################################################################
+    async def compact_agent_contexts(self) -> List[ContextCompactionResult]:
+        """对超出 token 预算的全部实体上下文执行压缩（预算未启用时不做任何事）"""
+        if not agent_context_budget.enabled:
+            return []
+
+        results = await asyncio.gather(
+            *(
+                agent_context_budget.compact(name, agent_context.context)
+                for name, agent_context in list(self._world.agents_context.items())
+            )
+        )
+        return [result for result in results if result is not None]
+
+    #######################################################################################################################################
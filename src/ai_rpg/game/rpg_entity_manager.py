@@ -1,5 +1,5 @@
 from typing import Dict, List, Optional, Set, override
-from ..entitas import Context, Entity, Matcher
+from ..entitas import ComponentIndex, Context, Entity, Matcher
 from ..models import (
     COMPONENT_TYPES,
     ActorComponent,
@@ -22,8 +22,9 @@ class RPGEntityManager(Context):
     ###############################################################################################################################################
     def __init__(
         self,
+        component_index: Optional[ComponentIndex] = None,
     ) -> None:
-        super().__init__()
+        super().__init__(component_index)  # 传入组件位索引即开启 archetype 模式
         self._entity_name_index: Dict[str, Entity] = {}  # （方便快速查找用）
 
     ###############################################################################################################################################
@@ -1,17 +1,21 @@
-from typing import Final, Set
+import uuid
+from typing import Callable, Final, Optional, Set
 from loguru import logger
 from overrides import override
+from ..deepseek import ChatStreamChunk
 from ..entitas import Entity
 from ..models.messages import HumanMessage
 from .game_session import GameSession
+from .context_budget import BROADCAST_NOTIFICATION_MARKER
 from .rpg_agent_context import RPGAgentContext
 from .rpg_entity_manager import RPGEntityManager
 from .rpg_game_pipeline_manager import RPGGamePipelineManager
+from .world_store import WorldArchiver
 from ..models import (
     AnyAgentEvent,
     WorldState,
 )
-from ..models import PlayerSession
+from ..models import PlayerSession, StreamDelta
 
 
 #################################################################################################################################################
@@ -36,6 +40,9 @@ class RPGGame(GameSession, RPGAgentContext, RPGEntityManager, RPGGamePipelineMan
         self._player_session: Final[PlayerSession] = player_session
         self._world: WorldState = world
 
+        # 增量存档器（首次增量存档时由 store_game 创建）
+        self._world_archiver: Optional[WorldArchiver] = None
+
         # 验证玩家信息
         assert self._player_session.name != "", "玩家名字不能为空"
         assert self._player_session.actor != "", "玩家角色不能为空"
@@ -115,9 +122,35 @@ class RPGGame(GameSession, RPGAgentContext, RPGEntityManager, RPGGamePipelineMan
         """向指定实体集合发送通知，并同步到玩家客户端"""
         # 正常的添加记忆。
         for entity in entities:
-            self.add_human_message(entity, HumanMessage(content=agent_event.message))
+            self.add_human_message(
+                entity,
+                HumanMessage(
+                    content=agent_event.message,
+                    **{BROADCAST_NOTIFICATION_MARKER: True},
+                ),
+            )
 
         # 最后都要发给客户端。
         self._player_session.add_agent_event(agent_event=agent_event)
 
     #######################################################################################################################################
+    def create_stream_sink(self, source: str) -> Callable[[ChatStreamChunk], None]:
+        """创建把 LLM 流式增量实时转发到玩家客户端的回调（传给 DeepSeekClient.on_stream_chunk）"""
+        stream_id = f"{source}-{uuid.uuid4().hex[:8]}"
+
+        def _sink(chunk: ChatStreamChunk) -> None:
+            if not (chunk.content or chunk.reasoning_content or chunk.finish_reason):
+                return
+            self._player_session.add_stream_delta(
+                StreamDelta(
+                    stream_id=stream_id,
+                    source=source,
+                    content=chunk.content,
+                    reasoning_content=chunk.reasoning_content,
+                    done=chunk.finish_reason != "",
+                )
+            )
+
+        return _sink
+
+    #######################################################################################################################################
@@ -1,24 +1,113 @@
-from typing import List
-from ..entitas import Processors
+import asyncio
+import time
+from typing import List, Optional
+from loguru import logger
+from ..deepseek.scheduler import LLMPriority, llm_request_context
+from ..entitas import Context, ExecuteProcessor, ExecutionMode, Processors
+from ..models import PipelineProfile
+from .pipeline_profiler import PipelineProfileSession, pipeline_profiler
 
 
 ###################################################################################################################################################################
 class RPGGameProcessPipeline(Processors):
     """RPG游戏流程管道，管理处理器的执行和生命周期"""
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        llm_user: str = "",
+        name: str = "",
+        llm_priority: LLMPriority = LLMPriority.PLANNING,
+        execution_mode: ExecutionMode = ExecutionMode.CONCURRENT,
+    ) -> None:
+        # 默认 CONCURRENT：声明了 reads / writes 且互不冲突的相邻系统并发执行，其余系统仍按添加顺序逐个执行
+        super().__init__(execution_mode)
+        # 管道内发起的 LLM 请求归属的玩家与优先级，交给全局 llm_scheduler 排队
+        self._llm_user: str = llm_user
+        self._llm_priority: LLMPriority = llm_priority
+        # 剖析用：管道名、所属游戏上下文（统计 group 更新次数）、当前与上一次 process() 的剖析记录
+        self._name: str = name
+        self._context: Optional[Context] = None
+        self._profile_session: Optional[PipelineProfileSession] = None
+        self._last_profile: Optional[PipelineProfile] = None
+        self._execute_seconds: float = 0.0
+
+    ###################################################################################################################################################################
+    @property
+    def name(self) -> str:
+        return self._name
+
+    ###################################################################################################################################################################
+    @property
+    def last_profile(self) -> Optional[PipelineProfile]:
+        """最近一次开启剖析时 process() 的剖析结果"""
+        return self._last_profile
+
+    ###################################################################################################################################################################
+    def bind_context(self, context: Context) -> None:
+        """绑定管道所操作的游戏上下文，剖析时据此统计每个系统引起的 group 更新次数"""
+        self._context = context
+
+    ###################################################################################################################################################################
+    @property
+    def llm_priority(self) -> LLMPriority:
+        return self._llm_priority
 
     ###################################################################################################################################################################
     async def process(self) -> None:
         """执行管道中的所有处理器"""
 
-        # 执行处理器
-        await self.execute()
+        if not pipeline_profiler.enabled:
+            await self._process()
+            return
+
+        # 剖析开启：逐个系统计时，结束后（包括失败）记录本次 process() 的剖析结果
+        session = PipelineProfileSession(
+            pipeline=self._name,
+            user=self._llm_user,
+            stages=self.execution_stages,
+            context=self._context,
+        )
+        self._profile_session = session
+        try:
+            await self._process()
+        finally:
+            self._profile_session = None
+            profile = session.finish(self._execute_seconds, self.last_trace)
+            self._last_profile = profile
+            pipeline_profiler.record(profile)
+            if pipeline_profiler.output_dir is not None:
+                await asyncio.to_thread(pipeline_profiler.export, profile)
+
+    ###################################################################################################################################################################
+    async def _process(self) -> None:
+
+        # 执行处理器（期间的 LLM 请求按本管道的玩家与优先级调度）
+        start = time.perf_counter()
+        try:
+            with llm_request_context(user=self._llm_user, priority=self._llm_priority):
+                await self.execute()
+        finally:
+            self._execute_seconds = time.perf_counter() - start
+
+        trace = self.last_trace
+        if trace is not None and trace.saved_seconds > 0:
+            logger.debug(
+                f"pipeline ({self._llm_user}): {len(trace.stages)} stages, "
+                f"wall = {trace.wall_seconds:.3f}s, busy = {trace.busy_seconds:.3f}s, "
+                f"saved = {trace.saved_seconds:.3f}s"
+            )
 
         # 清理处理器
         self.cleanup()
 
+    ###################################################################################################################################################################
+    async def _execute_processor(self, processor: ExecuteProcessor) -> None:
+        session = self._profile_session
+        if session is None:
+            await processor.execute()
+        else:
+            await session.run(processor)
+
     ###############################################################################################################################################
     def shutdown(self) -> None:
         """关闭管道并清理资源"""
@@ -40,6 +129,8 @@ class RPGGamePipelineManager:
     ###############################################################################################################################################
     def register_pipeline(self, pipeline: RPGGameProcessPipeline) -> None:
         """注册一个游戏流程管道"""
+        if isinstance(self, Context):
+            pipeline.bind_context(self)
         self._pipelines.append(pipeline)
 
     ###############################################################################################################################################
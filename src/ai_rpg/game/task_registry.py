@@ -0,0 +1,228 @@
+"""后台任务登记表
+
+每个战斗、家园动作都会创建一条 TaskRecord，客户端通过 /api/tasks/v1/ 查询或订阅其状态。登记表保证：
+
+- 有界：任务进入终态（完成、失败、取消）finished_ttl_seconds 秒后过期删除；
+  终态时间单调递增，过期队列按到期先后排列，每次访问时顺带清理，均摊 O(1)；
+- 按玩家索引：可列出某个玩家的全部（或进行中的）任务；
+- 每玩家并发上限：进行中的任务数达到 max_running_per_user 时拒绝新任务；
+- 可取消：登记了 asyncio.Task 的任务可以被取消，取消后状态为 CANCELLED。
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..models import TaskRecord, TaskStatus
+from .worker_shard import make_task_id
+
+
+###############################################################################################################################################
+class TaskRegistryConfig(BaseModel):
+    """后台任务登记表配置"""
+
+    finished_ttl_seconds: float = 600.0  # 终态任务保留时长
+    max_running_per_user: int = 8  # 每个玩家进行中的任务上限（0 表示不限）
+    worker_id: str = (
+        ""  # 任务 ID 前缀（分片部署时由 GameServer 设为其 worker_id，供前端路由使用）
+    )
+
+
+###############################################################################################################################################
+class TaskRegistryStats(BaseModel):
+    """后台任务计数"""
+
+    created: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    expired: int = 0  # 过期删除的终态任务
+    rejected: int = 0  # 因并发上限被拒绝的任务
+    size: int = 0  # 当前登记的任务数
+    running: int = 0  # 当前进行中的任务数
+
+
+###############################################################################################################################################
+class TaskRegistry:
+    """有界、按玩家索引、可取消的后台任务登记表"""
+
+    def __init__(
+        self,
+        config: Optional[TaskRegistryConfig] = None,
+        on_change: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._config: TaskRegistryConfig = (
+            config if config is not None else TaskRegistryConfig()
+        )
+        self._records: Dict[str, TaskRecord] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._running_by_user: Dict[str, Set[str]] = {}
+        self._handles: Dict[str, "asyncio.Task[None]"] = {}
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._stats: TaskRegistryStats = TaskRegistryStats()
+        # 任务进入终态时调用（GameServer 用它唤醒 watch_task SSE 端点）
+        self._on_change: Optional[Callable[[], None]] = on_change
+
+    ###############################################################################################################################################
+    @property
+    def config(self) -> TaskRegistryConfig:
+        return self._config
+
+    ###############################################################################################################################################
+    @property
+    def stats(self) -> TaskRegistryStats:
+        """后台任务计数（返回副本）"""
+        self._expire()
+        stats = self._stats.model_copy()
+        stats.size = len(self._records)
+        stats.running = sum(len(ids) for ids in self._running_by_user.values())
+        return stats
+
+    ###############################################################################################################################################
+    def running_count(self, user_name: str) -> int:
+        """指定玩家进行中的任务数"""
+        return len(self._running_by_user.get(user_name, ()))
+
+    ###############################################################################################################################################
+    def has_capacity(self, user_name: str) -> bool:
+        """指定玩家是否还能创建新任务；不能时计入 rejected"""
+        limit = self._config.max_running_per_user
+        if limit <= 0 or self.running_count(user_name) < limit:
+            return True
+        self._stats.rejected += 1
+        return False
+
+    ###############################################################################################################################################
+    def create(self, user_name: str = "") -> TaskRecord:
+        """创建一条进行中的任务记录"""
+        self._expire()
+
+        task_id = make_task_id(self._config.worker_id, str(uuid.uuid4()))
+        # 不可能出现重复ID！
+        assert task_id not in self._records
+        record = TaskRecord(
+            task_id=task_id,
+            user_name=user_name,
+            status=TaskStatus.RUNNING,
+            start_time=datetime.now().isoformat(),
+        )
+        self._records[task_id] = record
+        self._by_user.setdefault(user_name, set()).add(task_id)
+        self._running_by_user.setdefault(user_name, set()).add(task_id)
+        self._stats.created += 1
+        return record
+
+    ###############################################################################################################################################
+    def attach(self, task_id: str, handle: "asyncio.Task[None]") -> None:
+        """登记执行该任务的 asyncio.Task，使其可以被取消"""
+        record = self._records.get(task_id)
+        if record is None or record.status.is_terminal:
+            return
+        self._handles[task_id] = handle
+        handle.add_done_callback(lambda _: self._on_handle_done(task_id, handle))
+
+    ###############################################################################################################################################
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        self._expire()
+        return self._records.get(task_id, None)
+
+    ###############################################################################################################################################
+    def get_many(self, task_ids: Iterable[str]) -> List[TaskRecord]:
+        """按顺序返回存在的任务记录（不存在或已过期的跳过）"""
+        self._expire()
+        return [
+            self._records[task_id] for task_id in task_ids if task_id in self._records
+        ]
+
+    ###############################################################################################################################################
+    def list_user(self, user_name: str, running_only: bool = False) -> List[TaskRecord]:
+        """指定玩家的任务（按开始时间排序）"""
+        self._expire()
+        index = self._running_by_user if running_only else self._by_user
+        records = [self._records[task_id] for task_id in index.get(user_name, ())]
+        return sorted(records, key=lambda record: record.start_time)
+
+    ###############################################################################################################################################
+    def finish(
+        self, task_id: str, status: TaskStatus, error: Optional[str] = None
+    ) -> bool:
+        """把进行中的任务置为终态，返回是否发生了状态变化（已是终态或不存在时返回 False）"""
+        assert status.is_terminal, f"finish: {status} is not a terminal status"
+        record = self._records.get(task_id)
+        if record is None or record.status.is_terminal:
+            return False
+
+        record.status = status
+        record.error = error
+        record.end_time = datetime.now().isoformat()
+
+        running = self._running_by_user.get(record.user_name)
+        if running is not None:
+            running.discard(task_id)
+            if not running:
+                del self._running_by_user[record.user_name]
+        self._handles.pop(task_id, None)
+        self._expiry.append(
+            (time.monotonic() + self._config.finished_ttl_seconds, task_id)
+        )
+
+        match status:
+            case TaskStatus.COMPLETED:
+                self._stats.completed += 1
+            case TaskStatus.FAILED:
+                self._stats.failed += 1
+            case TaskStatus.CANCELLED:
+                self._stats.cancelled += 1
+        if self._on_change is not None:
+            self._on_change()
+        return True
+
+    ###############################################################################################################################################
+    def cancel(self, task_id: str) -> bool:
+        """取消进行中的任务，返回是否已取消。
+
+        已登记 asyncio.Task 的任务同时取消其执行（在下一个 await 处抛出 CancelledError）；
+        管道执行到一半被取消时，已完成的系统的修改会保留。
+        """
+        record = self._records.get(task_id)
+        if record is None or record.status.is_terminal:
+            return False
+        handle = self._handles.get(task_id)
+        if not self.finish(task_id, TaskStatus.CANCELLED, "任务已取消"):
+            return False
+        if handle is not None and not handle.done():
+            handle.cancel()
+        logger.info(f"任务已取消: task_id = {task_id}, user = {record.user_name}")
+        return True
+
+    ###############################################################################################################################################
+    def _on_handle_done(self, task_id: str, handle: "asyncio.Task[None]") -> None:
+        """任务协程结束但没有置终态（例如被外部取消）时补记终态"""
+        if handle.cancelled():
+            self.finish(task_id, TaskStatus.CANCELLED, "任务已取消")
+        elif handle.exception() is not None:
+            self.finish(task_id, TaskStatus.FAILED, str(handle.exception()))
+        else:
+            self.finish(task_id, TaskStatus.COMPLETED)
+
+    ###############################################################################################################################################
+    def _expire(self) -> None:
+        """删除已过期的终态任务"""
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, task_id = self._expiry.popleft()
+            record = self._records.pop(task_id, None)
+            if record is None:
+                continue
+            user_tasks = self._by_user.get(record.user_name)
+            if user_tasks is not None:
+                user_tasks.discard(task_id)
+                if not user_tasks:
+                    del self._by_user[record.user_name]
+            self._stats.expired += 1
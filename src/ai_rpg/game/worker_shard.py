@@ -0,0 +1,107 @@
+"""多 worker 分片
+
+分片部署时，每个玩家（user_name）的房间只由一个游戏服务器 worker 进程持有，前端路由
+（services/worker_router.py）按一致性哈希把该玩家的请求与 SSE 转发到所属 worker：
+
+- WorkerRing：每个 worker 在环上放置 replicas 个虚拟节点，玩家归属顺时针第一个存活的 worker；
+  增减 worker 时只有相邻区间的玩家改变归属；
+- 后台任务 ID 带上 worker 前缀（"{worker_id}.{uuid}"），只按任务 ID 查询的请求可直接路由；
+- 玩家归属变化（worker 下线、恢复或重启）时，旧 worker 把房间写入 .worlds 存档后释放，
+  新 worker 从最近的存档领养房间（见 GameServer.release_room / adopt_room）。
+"""
+
+import bisect
+import hashlib
+from typing import Container, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+# 后台任务 ID 中 worker 前缀与 uuid 的分隔符（uuid 中不含该字符）
+TASK_ID_SEPARATOR = "."
+
+
+###############################################################################################################################################
+class WorkerShardConfig(BaseModel):
+    """前端路由的分片配置"""
+
+    workers: Dict[str, str] = {}  # worker_id -> 基础 URL（例如 http://127.0.0.1:8001）
+    replicas: int = 64  # 每个 worker 的虚拟节点数
+    health_interval_seconds: float = 2.0  # 健康检查间隔
+    release_timeout_seconds: float = 120.0  # 等待旧 worker 释放房间的最长时间
+    max_placements: int = (
+        100_000  # 前端路由记住的玩家放置数上限（超出时淘汰最久未访问的玩家）
+    )
+
+    @classmethod
+    def parse_workers(cls, spec: str) -> Dict[str, str]:
+        """解析 "w0=http://127.0.0.1:8001,w1=http://127.0.0.1:8002" 形式的 worker 列表
+
+        worker_id 是后台任务 ID 的前缀，不能包含分隔符 "."（否则按任务 ID 路由时会取错 worker）。
+        """
+        workers: Dict[str, str] = {}
+        for item in spec.split(","):
+            if not item.strip():
+                continue
+            worker_id, sep, url = item.partition("=")
+            if not sep or not worker_id.strip() or not url.strip():
+                raise ValueError(f"无效的 worker 配置: {item!r}")
+            if TASK_ID_SEPARATOR in worker_id:
+                raise ValueError(
+                    f"worker_id 不能包含 {TASK_ID_SEPARATOR!r}: {worker_id.strip()!r}"
+                )
+            workers[worker_id.strip()] = url.strip().rstrip("/")
+        return workers
+
+
+###############################################################################################################################################
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest())
+
+
+###############################################################################################################################################
+def make_task_id(worker_id: str, task_uuid: str) -> str:
+    """带 worker 前缀的后台任务 ID（worker_id 为空时不加前缀）"""
+    if not worker_id:
+        return task_uuid
+    return f"{worker_id}{TASK_ID_SEPARATOR}{task_uuid}"
+
+
+###############################################################################################################################################
+def task_worker_id(task_id: str) -> Optional[str]:
+    """从后台任务 ID 中取出 worker 前缀（没有前缀时返回 None）"""
+    worker_id, sep, _ = task_id.partition(TASK_ID_SEPARATOR)
+    return worker_id if sep and worker_id else None
+
+
+###############################################################################################################################################
+class WorkerRing:
+    """一致性哈希环"""
+
+    def __init__(self, worker_ids: Sequence[str], replicas: int = 64) -> None:
+        assert replicas > 0, "replicas must be positive"
+        self._worker_ids: List[str] = list(dict.fromkeys(worker_ids))
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{worker_id}#{index}"), worker_id)
+            for worker_id in self._worker_ids
+            for index in range(replicas)
+        )
+        self._hashes: List[int] = [point for point, _ in points]
+        self._owners: List[str] = [worker_id for _, worker_id in points]
+
+    ###############################################################################################################################################
+    @property
+    def worker_ids(self) -> List[str]:
+        return list(self._worker_ids)
+
+    ###############################################################################################################################################
+    def owner(self, key: str, alive: Optional[Container[str]] = None) -> Optional[str]:
+        """key 所属的 worker：从 key 的哈希位置顺时针找第一个存活的 worker（alive 为 None 表示全部存活）"""
+        if not self._hashes:
+            return None
+        start = bisect.bisect(self._hashes, _hash(key))
+        count = len(self._hashes)
+        for offset in range(count):
+            worker_id = self._owners[(start + offset) % count]
+            if alive is None or worker_id in alive:
+                return worker_id
+        return None
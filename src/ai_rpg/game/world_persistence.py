@@ -0,0 +1,129 @@
+"""世界存档的后台写入（write-behind）服务
+
+store_game() 在房间锁内只做廉价快照，序列化与写盘交给有界线程池执行，
+避免一个玩家的存档阻塞事件循环上其他玩家的请求与 SSE 推送：
+
+- 同一玩家的存档按提交顺序串行执行（同一时刻最多一个写入在进行）；
+- 写入进行中又提交的存档只保留最新一份（合并），中间快照直接丢弃；
+- flush() 等待指定玩家（或全部）的存档写完，供关闭服务器与测试使用。
+
+服务默认关闭（脚本、测试中 store_game 同步写盘），由 GameServer.startup() 调用 start() 启用。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Final, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+# 一次存档写入：返回是否成功
+SaveJob = Callable[[], bool]
+
+
+###############################################################################################################################################
+class WorldPersistenceStats(BaseModel):
+    """后台存档计数"""
+
+    submitted: int = 0  # 提交的存档次数
+    coalesced: int = 0  # 被更新的快照覆盖而未写入的存档次数
+    written: int = 0  # 成功写入次数
+    failed: int = 0  # 写入失败次数（含抛出异常）
+    pending: int = 0  # 当前等待写入的玩家数
+    running: int = 0  # 当前正在写入的玩家数
+
+
+###############################################################################################################################################
+class WorldPersistence:
+    """按玩家合并、后台线程池执行的存档队列"""
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, SaveJob] = {}
+        self._running: Dict[str, "asyncio.Task[None]"] = {}
+        self._stats: WorldPersistenceStats = WorldPersistenceStats()
+
+    ###############################################################################################################################################
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    ###############################################################################################################################################
+    @property
+    def stats(self) -> WorldPersistenceStats:
+        """后台存档计数（返回副本）"""
+        stats = self._stats.model_copy()
+        stats.pending = len(self._pending)
+        stats.running = len(self._running)
+        return stats
+
+    ###############################################################################################################################################
+    def start(self, max_workers: int = 2) -> None:
+        """启用后台写入；已启用时保持原线程池"""
+        assert max_workers > 0, "max_workers must be positive"
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="world-persistence"
+        )
+        logger.info(f"WorldPersistence started: max_workers = {max_workers}")
+
+    ###############################################################################################################################################
+    def submit(self, key: str, job: SaveJob) -> None:
+        """提交一次存档（必须在事件循环中调用）。同一 key 已有等待中的存档时被新的覆盖。"""
+        assert self._executor is not None, "WorldPersistence is not started"
+        self._stats.submitted += 1
+        if key in self._pending:
+            self._stats.coalesced += 1
+        self._pending[key] = job
+
+        if key not in self._running:
+            self._running[key] = asyncio.create_task(self._drain(key))
+
+    ###############################################################################################################################################
+    async def flush(self, key: Optional[str] = None) -> None:
+        """等待指定 key（None 表示全部）已提交的存档写完"""
+        while True:
+            if key is None:
+                tasks = list(self._running.values())
+            else:
+                task = self._running.get(key)
+                tasks = [task] if task is not None else []
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    ###############################################################################################################################################
+    async def aclose(self) -> None:
+        """写完全部待写存档后关闭线程池"""
+        await self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info(f"WorldPersistence closed: {self._stats}")
+
+    ###############################################################################################################################################
+    async def _drain(self, key: str) -> None:
+        """串行写完 key 的存档，直到没有新的提交"""
+        loop = asyncio.get_running_loop()
+        try:
+            while key in self._pending:
+                job = self._pending.pop(key)
+                assert self._executor is not None
+                try:
+                    ok = await loop.run_in_executor(self._executor, job)
+                except Exception as e:
+                    logger.error(f"后台存档异常: key = {key}, error = {e}")
+                    ok = False
+
+                if ok:
+                    self._stats.written += 1
+                else:
+                    self._stats.failed += 1
+        finally:
+            self._running.pop(key, None)
+
+
+###############################################################################################################################################
+# 全局后台存档服务实例（默认关闭）
+world_persistence: Final[WorldPersistence] = WorldPersistence()
@@ -3,9 +3,11 @@
 """
 
 import datetime
+import hashlib
 import json
+import os
 import shutil
-from typing import Optional, Tuple, Dict
+from typing import Any, Dict, Final, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 from pydantic import TypeAdapter
 from ..models import get_buffer_string, AgentContext, PlayerSession, Dungeon, WorldState
@@ -124,6 +126,71 @@ def restore_world(snapshot_dir: Path) -> Tuple[WorldState, PlayerSession]:
     return world, player_session
 
 
+###############################################################################################################################################
+def snapshot_world(world: WorldState) -> WorldState:
+    """在锁内对 world 做廉价快照，供后台线程序列化与写盘。
+
+    entities（不可变的 EntitySerialization）、上下文消息与 blueprint 按引用共享，
+    只复制容器列表；运行中会被原地修改的 dungeon 做深拷贝。
+    """
+    return world.model_copy(
+        update={
+            "entities": list(world.entities),
+            "agents_context": {
+                name: AgentContext.model_construct(
+                    name=agent_context.name, context=list(agent_context.context)
+                )
+                for name, agent_context in world.agents_context.items()
+            },
+            "dungeon": world.dungeon.model_copy(deep=True),
+        }
+    )
+
+
+###############################################################################################################################################
+def snapshot_player_session(player_session: PlayerSession) -> PlayerSession:
+    """在锁内对 player_session 做廉价快照（会话消息只追加，按引用共享）"""
+    snapshot = PlayerSession.model_construct(
+        name=player_session.name,
+        actor=player_session.actor,
+        game=player_session.game,
+        session_messages=list(player_session.session_messages),
+        event_sequence=player_session.event_sequence,
+    )
+    # 已移出内存的旧消息仍需从原存档文件读取
+    snapshot.mark_durable_from(player_session)
+    return snapshot
+
+
+###############################################################################################################################################
+def make_save_dir(
+    world: WorldState, player_session: PlayerSession, worlds_dir: Path
+) -> Path:
+    """根据玩家名、游戏名和时间戳生成存档目录路径"""
+    username = player_session.name
+    game = str(world.blueprint.name)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return worlds_dir / username / game / timestamp
+
+
+###############################################################################################################################################
+def find_latest_save_dir(worlds_dir: Path, username: str) -> Optional[Path]:
+    """查找玩家最近写入的存档目录（{worlds_dir}/{username}/{game}/{timestamp}/），没有存档时返回 None。
+
+    world_state.json 每次存档（全量或增量）都会重写，按其修改时间判断先后。
+    """
+    latest: Optional[Path] = None
+    latest_mtime = -1.0
+    for world_path in (worlds_dir / username).glob("*/*/world_state.json"):
+        save_dir = world_path.parent
+        if not (save_dir / "player_session.jsonl").exists():
+            continue
+        mtime = world_path.stat().st_mtime
+        if mtime > latest_mtime:
+            latest, latest_mtime = save_dir, mtime
+    return latest
+
+
 ###############################################################################################################################################
 def archive_world(
     world: WorldState,
@@ -145,10 +212,7 @@ def archive_world(
 
     # 如果未指定 save_dir，则根据玩家名、游戏名和时间戳生成目录
     if save_dir is None:
-        username = player_session.name
-        game = str(world.blueprint.name)
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        save_dir = worlds_dir / username / game / timestamp
+        save_dir = make_save_dir(world, player_session, worlds_dir)
 
     # 创建存档目录
     save_dir.mkdir(parents=True, exist_ok=True)
@@ -161,20 +225,7 @@ def archive_world(
         )
 
         # player_session 序列化为 JSONL（首行元数据，后续每行一个事件）
-        session_lines = [
-            json.dumps(
-                {
-                    "name": player_session.name,
-                    "actor": player_session.actor,
-                    "game": player_session.game,
-                },
-                ensure_ascii=False,
-            )
-        ]
-
-        # 将每条会话消息序列化为 JSONL 格式
-        for msg in player_session.session_messages:
-            session_lines.append(msg.model_dump_json())
+        session_lines = _session_lines(player_session)
 
         # 将 player_session 的 JSONL 内容写入文件
         player_session_jsonl = "\n".join(session_lines) + "\n"
@@ -183,9 +234,7 @@ def archive_world(
         (save_dir / "world_state.json").write_text(world_state_json, encoding="utf-8")
 
         # player_session.jsonl
-        (save_dir / "player_session.jsonl").write_text(
-            player_session_jsonl, encoding="utf-8"
-        )
+        _replace_text(save_dir / "player_session.jsonl", player_session_jsonl)
 
         # entities/
         _dump_entities(save_dir, world)
@@ -207,6 +256,36 @@ def archive_world(
         return False
 
 
+###############################################################################################################################################
+def _session_meta_line(player_session: PlayerSession) -> str:
+    """player_session.jsonl 的首行元数据"""
+    return json.dumps(
+        {
+            "name": player_session.name,
+            "actor": player_session.actor,
+            "game": player_session.game,
+        },
+        ensure_ascii=False,
+    )
+
+
+###############################################################################################################################################
+def _session_lines(player_session: PlayerSession) -> List[str]:
+    """player_session.jsonl 的全部行：元数据 + 已移出内存的旧事件（从原存档读取）+ 内存中的事件"""
+    lines = [_session_meta_line(player_session)]
+    lines.extend(player_session.iter_spilled_lines())
+    lines.extend(msg.model_dump_json() for msg in player_session.session_messages)
+    return lines
+
+
+###############################################################################################################################################
+def _replace_text(path: Path, text: str) -> None:
+    """先写临时文件再原子替换 path，并发读取者只会看到替换前或替换后的完整文件"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
 ###############################################################################################################################################
 def _dump_agent_contexts(
     debug_dir: Path, world: WorldState, should_write_buffer_string: bool = True
@@ -217,9 +296,6 @@ def _dump_agent_contexts(
     context_dir = debug_dir / "contexts"
     context_dir.mkdir(parents=True, exist_ok=True)
 
-    # 实体记忆块之间的长分割线
-    sep: str = "-" * 100
-
     # 写每个 agent 的上下文 JSONL 和 buffer.txt
     for agent_name, agent_context in world.agents_context.items():
 
@@ -231,22 +307,28 @@ def _dump_agent_contexts(
 
         # 写 agent_name_buffer.txt
         if should_write_buffer_string:
-
-            # 构建 agent 的 buffer 字符串
-            buffer_str = get_buffer_string(
-                agent_context.context,
-                system_prefix="\n" + sep + "\nSystem",
-                human_prefix="\n" + sep + "\nHuman",
-                ai_prefix="\n" + sep + f"\nAI({agent_name})",
-                tool_prefix="\n" + sep + f"\nTool({agent_name})",
-            )
-
-            # 写入 agent_name_buffer.txt 文件
             (context_dir / f"{agent_name}_buffer.txt").write_text(
-                buffer_str, encoding="utf-8"
+                _agent_buffer_string(agent_name, agent_context.context),
+                encoding="utf-8",
             )
 
 
+###############################################################################################################################################
+def _agent_buffer_string(agent_name: str, messages: Sequence[ContextMessage]) -> str:
+    """构建 agent 的 buffer 字符串（每条消息前带长分割线，便于阅读）"""
+
+    # 实体记忆块之间的长分割线
+    sep: str = "-" * 100
+
+    return get_buffer_string(
+        messages,
+        system_prefix="\n" + sep + "\nSystem",
+        human_prefix="\n" + sep + "\nHuman",
+        ai_prefix="\n" + sep + f"\nAI({agent_name})",
+        tool_prefix="\n" + sep + f"\nTool({agent_name})",
+    )
+
+
 ###############################################################################################################################################
 def _dump_entities(debug_dir: Path, world: WorldState) -> None:
     """写入每个实体的 JSON 文件到 entities/ 目录"""
@@ -290,3 +372,279 @@ def _dump_blueprint(debug_dir: Path, blueprint: Blueprint) -> None:
 
 
 ###############################################################################################################################################
+
+
+###############################################################################################################################################
+class _ContextCursor:
+    """某个 agent 上下文在上次存档时的写入位置
+
+    只记录长度与首尾消息对象，以消息对象身份校验前缀未变（上下文可能是快照出的浅拷贝列表，
+    不能依赖列表本身的身份）。约定：已进入上下文的消息不会被原地修改。
+    """
+
+    __slots__ = ("length", "first", "last")
+
+    def __init__(self, messages: Sequence[ContextMessage]) -> None:
+        self.length: int = len(messages)
+        self.first: Optional[ContextMessage] = messages[0] if messages else None
+        self.last: Optional[ContextMessage] = messages[-1] if messages else None
+
+    def appended_since(self, messages: Sequence[ContextMessage]) -> Optional[int]:
+        """若 messages 只在上次写入之后追加了消息，返回追加起点；否则返回 None（需重写）"""
+        if len(messages) < self.length:
+            return None
+        if self.length == 0:
+            return 0
+        if messages[0] is not self.first or messages[self.length - 1] is not self.last:
+            return None
+        return self.length
+
+
+###############################################################################################################################################
+class WorldArchiver:
+    """增量世界存档器
+
+    与 archive_world 写出相同的目录结构（restore_world 可直接读取），但固定写入同一个存档目录，
+    并记录上次存档后的状态，之后每次存档只写变化的部分：
+
+    - entities/：按实体 JSON 的哈希判断脏实体，只重写变化的实体，删除已销毁实体的文件；
+    - contexts/：只向 {agent}.jsonl 与 {agent}_buffer.txt 追加新消息，
+      上下文被截断或替换时才整体重写该 agent；
+    - player_session.jsonl：只追加新的会话事件（按 sequence_id）；
+    - blueprint/、dungeon/：内容哈希未变时跳过；
+    - 每次存档写 manifest.json（本次检查点摘要），并向 checkpoints.jsonl 追加一行。
+
+    首次存档（或存档目录变化后）为全量写入。
+    """
+
+    def __init__(self, save_dir: Path) -> None:
+        self._save_dir: Final[Path] = save_dir
+        self._checkpoint: int = 0
+        self._entity_hashes: Dict[str, str] = {}
+        self._context_cursors: Dict[str, _ContextCursor] = {}
+        self._session_meta: str = ""
+        self._session_sequence: int = 0
+        self._blueprint_hash: str = ""
+        self._dungeon_hash: str = ""
+        self._last_manifest: Dict[str, Any] = {}
+
+    ###############################################################################################################################################
+    @property
+    def save_dir(self) -> Path:
+        return self._save_dir
+
+    ###############################################################################################################################################
+    @property
+    def checkpoint(self) -> int:
+        """已完成的检查点数量"""
+        return self._checkpoint
+
+    ###############################################################################################################################################
+    @property
+    def last_manifest(self) -> Dict[str, Any]:
+        """最近一次检查点的摘要"""
+        return self._last_manifest
+
+    ###############################################################################################################################################
+    def archive(self, world: WorldState, player_session: PlayerSession) -> bool:
+        """写入一个检查点，返回是否成功。失败后下次存档退化为全量写入。"""
+
+        full = self._checkpoint == 0
+        manifest: Dict[str, Any] = {
+            "checkpoint": self._checkpoint + 1,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "mode": "full" if full else "incremental",
+        }
+
+        try:
+            self._save_dir.mkdir(parents=True, exist_ok=True)
+            if full:
+                self._reset()
+
+            # world_state.json 体积很小，每次重写
+            (self._save_dir / "world_state.json").write_text(
+                world.model_dump_json(
+                    exclude={"agents_context", "entities", "dungeon", "blueprint"}
+                ),
+                encoding="utf-8",
+            )
+
+            manifest["session_events_appended"] = self._archive_session(player_session)
+            manifest.update(self._archive_entities(world))
+            manifest.update(self._archive_contexts(world))
+
+            self._blueprint_hash, manifest["blueprint_written"] = self._archive_named(
+                "blueprint", world.blueprint, self._blueprint_hash
+            )
+            self._dungeon_hash, manifest["dungeon_written"] = self._archive_named(
+                "dungeon", world.dungeon, self._dungeon_hash
+            )
+            manifest["event_sequence"] = self._session_sequence
+
+            # 检查点摘要
+            manifest_json = json.dumps(manifest, ensure_ascii=False)
+            (self._save_dir / "manifest.json").write_text(
+                manifest_json, encoding="utf-8"
+            )
+            with (self._save_dir / "checkpoints.jsonl").open(
+                "a", encoding="utf-8"
+            ) as f:
+                f.write(manifest_json + "\n")
+
+        except Exception as e:
+            logger.error(f"增量存档失败: {e}")
+            self._checkpoint = 0
+            return False
+
+        self._checkpoint += 1
+        self._last_manifest = manifest
+        logger.debug(f"增量存档成功: {self._save_dir}, checkpoint = {self._checkpoint}")
+        return True
+
+    ###############################################################################################################################################
+    def rebind_contexts(self, world: WorldState) -> None:
+        """让上下文游标指向刚从本存档目录读出的 world 中的消息对象
+
+        游戏从存档恢复后沿用原存档器时调用：存档中的上下文与读出的内容一致，
+        不再引用已释放游戏的消息对象，下次存档也只追加新消息而不是整体重写。
+        """
+        self._context_cursors = {
+            agent_name: _ContextCursor(agent_context.context)
+            for agent_name, agent_context in world.agents_context.items()
+        }
+
+    ###############################################################################################################################################
+    def _reset(self) -> None:
+        """全量写入前清空已跟踪状态与可能残留的旧文件"""
+        self._entity_hashes.clear()
+        self._context_cursors.clear()
+        self._session_meta = ""
+        self._session_sequence = 0
+        self._blueprint_hash = ""
+        self._dungeon_hash = ""
+        for sub_dir in ("entities", "contexts", "blueprint", "dungeon"):
+            if (self._save_dir / sub_dir).exists():
+                shutil.rmtree(self._save_dir / sub_dir)
+        (self._save_dir / "checkpoints.jsonl").unlink(missing_ok=True)
+
+    ###############################################################################################################################################
+    def _archive_session(self, player_session: PlayerSession) -> int:
+        """追加新的会话事件，返回追加条数"""
+        session_path = self._save_dir / "player_session.jsonl"
+        meta = _session_meta_line(player_session)
+
+        # 元数据变化（例如切换角色）时整体重写；工作线程可能正在读取旧事件（read_spilled_messages），原子替换
+        if meta != self._session_meta:
+            lines = _session_lines(player_session)
+            _replace_text(session_path, "\n".join(lines) + "\n")
+            self._session_meta = meta
+            self._session_sequence = player_session.event_sequence
+            return len(lines) - 1
+
+        # 会话消息只会追加且 sequence_id 递增：从尾部向前找到新消息
+        messages = player_session.session_messages
+        start = len(messages)
+        while start > 0 and messages[start - 1].sequence_id > self._session_sequence:
+            start -= 1
+        new_messages = messages[start:]
+        if new_messages:
+            with session_path.open("a", encoding="utf-8") as f:
+                for msg in new_messages:
+                    f.write(msg.model_dump_json() + "\n")
+        self._session_sequence = player_session.event_sequence
+        return len(new_messages)
+
+    ###############################################################################################################################################
+    def _archive_entities(self, world: WorldState) -> Dict[str, Any]:
+        """只重写内容变化的实体，删除已不存在的实体文件"""
+        entities_dir = self._save_dir / "entities"
+        entities_dir.mkdir(parents=True, exist_ok=True)
+
+        written: List[str] = []
+        current: Dict[str, str] = {}
+        for entity_serialization in world.entities:
+            entity_json = entity_serialization.model_dump_json()
+            digest = hashlib.sha1(entity_json.encode("utf-8")).hexdigest()
+            current[entity_serialization.name] = digest
+            if self._entity_hashes.get(entity_serialization.name) != digest:
+                (entities_dir / f"{entity_serialization.name}.json").write_text(
+                    entity_json, encoding="utf-8"
+                )
+                written.append(entity_serialization.name)
+
+        removed = [name for name in self._entity_hashes if name not in current]
+        for name in removed:
+            (entities_dir / f"{name}.json").unlink(missing_ok=True)
+
+        self._entity_hashes = current
+        return {"entities_written": written, "entities_removed": removed}
+
+    ###############################################################################################################################################
+    def _archive_contexts(self, world: WorldState) -> Dict[str, Any]:
+        """追加各 agent 的新消息；上下文被截断或替换时整体重写"""
+        context_dir = self._save_dir / "contexts"
+        context_dir.mkdir(parents=True, exist_ok=True)
+
+        appended: Dict[str, int] = {}
+        rewritten: List[str] = []
+        for agent_name, agent_context in world.agents_context.items():
+            messages = agent_context.context
+            jsonl_path = context_dir / f"{agent_name}.jsonl"
+            buffer_path = context_dir / f"{agent_name}_buffer.txt"
+
+            cursor = self._context_cursors.get(agent_name)
+            start = cursor.appended_since(messages) if cursor is not None else None
+            if start is None:
+                jsonl_path.write_text(
+                    "".join(msg.model_dump_json() + "\n" for msg in messages),
+                    encoding="utf-8",
+                )
+                buffer_path.write_text(
+                    _agent_buffer_string(agent_name, messages), encoding="utf-8"
+                )
+                rewritten.append(agent_name)
+
+            elif start < len(messages):
+                new_messages = messages[start:]
+                with jsonl_path.open("a", encoding="utf-8") as f:
+                    for msg in new_messages:
+                        f.write(msg.model_dump_json() + "\n")
+                with buffer_path.open("a", encoding="utf-8") as f:
+                    f.write(
+                        ("\n" if start > 0 else "")
+                        + _agent_buffer_string(agent_name, new_messages)
+                    )
+                appended[agent_name] = len(new_messages)
+
+            self._context_cursors[agent_name] = _ContextCursor(messages)
+
+        removed = [
+            name for name in self._context_cursors if name not in world.agents_context
+        ]
+        for name in removed:
+            self._context_cursors.pop(name)
+            (context_dir / f"{name}.jsonl").unlink(missing_ok=True)
+            (context_dir / f"{name}_buffer.txt").unlink(missing_ok=True)
+
+        return {
+            "contexts_appended": appended,
+            "contexts_rewritten": rewritten,
+            "contexts_removed": removed,
+        }
+
+    ###############################################################################################################################################
+    def _archive_named(
+        self, sub_dir: str, model: Union[Blueprint, Dungeon], previous_hash: str
+    ) -> Tuple[str, bool]:
+        """blueprint / dungeon：内容哈希未变时跳过，变化时清空目录后重写（目录内只保留一个文件）"""
+        model_json = model.model_dump_json()
+        digest = hashlib.sha1(model_json.encode("utf-8")).hexdigest()
+        if digest == previous_hash:
+            return digest, False
+
+        target_dir = self._save_dir / sub_dir
+        if target_dir.exists():
+            shutil.rmtree(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        (target_dir / f"{model.name}.json").write_text(model_json, encoding="utf-8")
+        return digest, True
@@ -19,7 +19,11 @@ from .serialization import *
 from .stats import *
 from .task import *
 from .blueprint import *
+from .context_index import ContextIndex as ContextIndex
 from .world_state import *
+from .change_notifier import ChangeNotifier as ChangeNotifier
+from .pipeline_profile import PipelineProfile as PipelineProfile
+from .pipeline_profile import ProcessorSpan as ProcessorSpan
 from .player_session import *
 from .rules import *
 from .entity_factory import *
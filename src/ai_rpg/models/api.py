@@ -1,12 +1,13 @@
 from enum import StrEnum, unique
 from typing import Dict, List, final
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from .session_message import SessionMessage
 from .dungeon import Dungeon, AnyDungeonRoom
 from .player_session import PlayerSession
 from .serialization import EntitySerialization
 from .task import TaskRecord
 from .blueprint import Blueprint
+from .pipeline_profile import PipelineProfile
 
 
 @final
@@ -492,6 +493,18 @@ class TasksStatusResponse(BaseModel):
     tasks: List[TaskRecord]
 
 
+@final
+class TaskCancelRequest(BaseModel):
+    user_name: str
+    task_id: str
+
+
+@final
+class TaskCancelResponse(BaseModel):
+    task: TaskRecord
+    message: str
+
+
 ################################################################################################################
 ################################################################################################################
 ################################################################################################################
@@ -510,3 +523,51 @@ class BlueprintListResponse(BaseModel):
 @final
 class DungeonListResponse(BaseModel):
     dungeons: List[Dungeon]
+
+
+################################################################################################################
+################################################################################################################
+################################################################################################################
+
+
+@final
+class PipelineProfileToggleRequest(BaseModel):
+    enabled: bool
+    keep: int = Field(default=32, ge=0)  # 保留最近多少次 process() 的剖析结果
+
+
+@final
+class PipelineProfileResponse(BaseModel):
+    enabled: bool
+    profiles: List[PipelineProfile]
+
+
+################################################################################################################
+################################################################################################################
+################################################################################################################
+
+
+@final
+class WorkerHealthResponse(BaseModel):
+    worker_id: str
+    boot_id: str  # 每次进程启动重新生成，前端路由据此发现 worker 重启
+    rooms: int
+    resident_rooms: int
+
+
+@final
+class RoomMigrationRequest(BaseModel):
+    user_name: str
+
+
+@final
+class RoomAdoptRequest(BaseModel):
+    user_name: str
+    replace: bool = False  # 丢弃 worker 上已有的（已过期的）房间后从存档领养
+
+
+@final
+class RoomMigrationResponse(BaseModel):
+    user_name: str
+    changed: bool  # release：是否释放了房间；adopt：是否从存档领养了房间
+    message: str
@@ -0,0 +1,88 @@
+"""变更通知（进程内广播）
+
+SSE 推送端点等待数据变化时使用：生产方每次变化调用 notify()，所有等待中的协程被唤醒；
+没有变化时等待方一直挂起，不再按固定间隔轮询。
+
+version 单调递增。等待方先记下 version，读取数据，再以该 version 调用 wait()：
+若期间已有变化，wait() 立即返回，不会错过通知。
+"""
+
+import asyncio
+import threading
+from typing import Final, Set
+
+__all__ = ["ChangeNotifier"]
+
+
+###############################################################################
+class ChangeNotifier:
+    """广播式变更通知：notify() 唤醒全部等待者（可在任意线程调用）"""
+
+    def __init__(self) -> None:
+        self._version: int = 0
+        self._waiters: Set["asyncio.Future[None]"] = set()
+        self._lock: Final[threading.Lock] = threading.Lock()
+
+    ###############################################################################
+    @property
+    def version(self) -> int:
+        """变更版本号（每次 notify 加一）"""
+        return self._version
+
+    ###############################################################################
+    @property
+    def waiter_count(self) -> int:
+        """当前挂起的等待者数量"""
+        return len(self._waiters)
+
+    ###############################################################################
+    def notify(self) -> None:
+        """记录一次变更并唤醒全部等待者"""
+        with self._lock:
+            self._version += 1
+            if not self._waiters:
+                return
+            waiters, self._waiters = self._waiters, set()
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for waiter in waiters:
+            loop = waiter.get_loop()
+            if loop is running_loop:
+                _wake(waiter)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, waiter)
+
+    ###############################################################################
+    async def wait(self, version: int, timeout: float) -> bool:
+        """
+        等待 version 之后的变更
+
+        Args:
+            version: 调用方上次读取数据前记下的版本号
+            timeout: 最长等待秒数（用于心跳与超时检查）
+
+        Returns:
+            bool: 有新变更返回 True，超时返回 False
+        """
+        with self._lock:
+            if self._version != version:
+                return True
+            waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self._version != version
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+###############################################################################
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,133 @@
+"""Agent 上下文的消息位置索引
+
+上下文中的消息都是 Pydantic 模型，`==` / `in` / `list.index` 会逐字段深比较，
+在长上下文上删除消息代价很高。这里以消息对象身份（id()）作为稳定 id，
+记录每条消息在上下文列表中的位置，提供 O(1) 查找与按身份删除。
+
+上下文列表仍可被直接修改（追加、上下文压缩、存档恢复等）：
+登记的位置在使用前都会校验（context[pos] is message），失效时增量补登尾部或整体重建，不会返回错误位置。
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from .messages import BaseMessage, ContextMessage
+
+__all__ = ["ContextIndex"]
+
+# 稀疏删除时逐条 del（C 层 memmove）；删除条数超过 1/8 时整体重建列表
+_SPARSE_REMOVE_RATIO = 8
+
+
+###############################################################################################################################################
+class ContextIndex:
+    """按对象身份索引的上下文消息位置表（原地修改所绑定的列表）"""
+
+    def __init__(self, context: List[ContextMessage]) -> None:
+        self._context: List[ContextMessage] = context
+        self._positions: Dict[int, int] = {}
+        self._indexed: int = 0  # context[:_indexed] 的位置已登记
+
+    ###############################################################################################################################################
+    @property
+    def context(self) -> List[ContextMessage]:
+        """索引所绑定的上下文列表"""
+        return self._context
+
+    ###############################################################################################################################################
+    def position(self, message: BaseMessage) -> Optional[int]:
+        """消息在上下文中的位置（按对象身份），不在上下文中返回 None"""
+        pos = self._lookup(message)
+        if pos is not None:
+            return pos
+
+        # 新追加的消息：补登尾部
+        if self._indexed > len(self._context):
+            self._reset()
+        self._index_tail()
+        pos = self._lookup(message)
+        if pos is not None:
+            return pos
+
+        # 上下文可能被外部原地修改过（如上下文压缩）：整体重建一次
+        self._reset()
+        self._index_tail()
+        return self._lookup(message)
+
+    ###############################################################################################################################################
+    def __contains__(self, message: BaseMessage) -> bool:
+        return self.position(message) is not None
+
+    ###############################################################################################################################################
+    def remove(self, messages: Sequence[BaseMessage]) -> int:
+        """按对象身份删除消息，返回实际删除的条数（不在上下文中的消息忽略）"""
+        found = (self.position(message) for message in messages)
+        positions = sorted({pos for pos in found if pos is not None}, reverse=True)
+        if len(positions) == 0:
+            return 0
+
+        if len(positions) * _SPARSE_REMOVE_RATIO <= len(self._context):
+            for pos in positions:
+                del self._context[pos]
+        else:
+            drop = set(positions)
+            self._context[:] = [
+                message
+                for index, message in enumerate(self._context)
+                if index not in drop
+            ]
+        self._invalidate_from(positions[-1])
+        return len(positions)
+
+    ###############################################################################################################################################
+    def remove_range(
+        self, begin_message: BaseMessage, end_message: BaseMessage
+    ) -> List[ContextMessage]:
+        """删除 begin_message 到 end_message 之间（包含两端）的消息，返回被删除的消息"""
+        begin = self.position(begin_message)
+        end = self.position(end_message)
+        if begin is None or end is None:
+            raise ValueError("begin_message / end_message is not in context")
+        if begin > end:
+            raise ValueError("begin_message must not come after end_message")
+
+        removed = self._context[begin : end + 1]
+        del self._context[begin : end + 1]
+        self._invalidate_from(begin)
+        return removed
+
+    ###############################################################################################################################################
+    def insert(self, index: int, messages: Sequence[ContextMessage]) -> None:
+        """在指定位置插入一段消息（index 语义同 list 切片）"""
+        start = max(0, index + len(self._context)) if index < 0 else index
+        start = min(start, len(self._context))
+        self._context[start:start] = messages
+        self._invalidate_from(start)
+
+    ###############################################################################################################################################
+    def _lookup(self, message: BaseMessage) -> Optional[int]:
+        pos = self._positions.get(id(message))
+        if (
+            pos is not None
+            and pos < len(self._context)
+            and self._context[pos] is message
+        ):
+            return pos
+        return None
+
+    ###############################################################################################################################################
+    def _index_tail(self) -> None:
+        for pos in range(self._indexed, len(self._context)):
+            self._positions[id(self._context[pos])] = pos
+        self._indexed = len(self._context)
+
+    ###############################################################################################################################################
+    def _invalidate_from(self, start: int) -> None:
+        # start 之前的位置不受影响；之后的在下次查找时补登
+        self._indexed = min(self._indexed, start)
+        if len(self._positions) > 2 * len(self._context) + 64:
+            self._reset()
+
+    ###############################################################################################################################################
+    def _reset(self) -> None:
+        self._positions.clear()
+        self._indexed = 0
@@ -0,0 +1,116 @@
+"""流程管道性能剖析数据
+
+一次 RPGGameProcessPipeline.process() 调用对应一个 PipelineProfile，其中每个执行的系统对应一个 ProcessorSpan。
+可导出为 Chrome trace JSON（chrome://tracing 或 https://ui.perfetto.dev 打开）。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, final
+
+from pydantic import BaseModel
+
+__all__ = ["ProcessorSpan", "PipelineProfile"]
+
+
+###############################################################################################################################################
+@final
+class ProcessorSpan(BaseModel):
+    """单个系统一次执行的耗时"""
+
+    name: str  # 系统类名
+    stage: int  # 所在执行阶段（同一阶段的系统并发执行）
+    slot: int  # 在阶段内的序号
+    start_seconds: float  # 相对 process() 开始的时间
+    wall_seconds: float  # 墙钟耗时
+    llm_wait_seconds: float  # 至少有一个 LLM 请求在途的时间
+    llm_requests: int  # 发起的 LLM 请求数
+    collected_entities: Optional[int] = None  # 反应式系统执行前收集到的实体数
+    group_updates: int = 0  # 组件变更引起的 group 更新次数（并发阶段内互相计入）
+    error: Optional[str] = None  # 执行失败时的异常
+
+    @property
+    def cpu_seconds(self) -> float:
+        """非 LLM 等待时间（CPU 与其他 IO 等待）"""
+        return max(0.0, self.wall_seconds - self.llm_wait_seconds)
+
+
+###############################################################################################################################################
+@final
+class PipelineProfile(BaseModel):
+    """一次 process() 调用的剖析结果"""
+
+    pipeline: str  # 管道名
+    user: str  # 管道所属玩家
+    started_at: datetime
+    wall_seconds: float = 0.0  # execute + cleanup 的墙钟耗时
+    execute_seconds: float = 0.0
+    cleanup_seconds: float = 0.0
+    saved_seconds: float = 0.0  # 并发阶段节省的墙钟时间
+    spans: List[ProcessorSpan] = []
+
+    ###############################################################################################################################################
+    @property
+    def llm_wait_seconds(self) -> float:
+        return sum(span.llm_wait_seconds for span in self.spans)
+
+    ###############################################################################################################################################
+    def slowest(self, count: int = 5) -> List[ProcessorSpan]:
+        """墙钟耗时最长的若干个系统"""
+        return sorted(self.spans, key=lambda span: span.wall_seconds, reverse=True)[
+            :count
+        ]
+
+    ###############################################################################################################################################
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """导出为 Chrome trace（Trace Event Format）：每个系统一个完整事件，并发阶段内的系统分到不同的线程行"""
+        pid = 1
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": f"{self.pipeline} ({self.user})"},
+            },
+            {
+                "name": self.pipeline,
+                "cat": "pipeline",
+                "ph": "X",
+                "pid": pid,
+                "tid": 0,
+                "ts": 0,
+                "dur": _micros(self.wall_seconds),
+                "args": {
+                    "started_at": self.started_at.isoformat(),
+                    "execute_seconds": self.execute_seconds,
+                    "cleanup_seconds": self.cleanup_seconds,
+                    "saved_seconds": self.saved_seconds,
+                },
+            },
+        ]
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "processor",
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": span.slot + 1,
+                    "ts": _micros(span.start_seconds),
+                    "dur": _micros(span.wall_seconds),
+                    "args": {
+                        "stage": span.stage,
+                        "llm_wait_seconds": span.llm_wait_seconds,
+                        "cpu_seconds": span.cpu_seconds,
+                        "llm_requests": span.llm_requests,
+                        "collected_entities": span.collected_entities,
+                        "group_updates": span.group_updates,
+                        "error": span.error,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+###############################################################################################################################################
+def _micros(seconds: float) -> int:
+    return int(seconds * 1_000_000)
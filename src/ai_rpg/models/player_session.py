@@ -1,7 +1,17 @@
-from typing import List
-from pydantic import BaseModel
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, PrivateAttr
 from .agent_event import AnyAgentEvent
-from .session_message import SessionMessage
+from .change_notifier import ChangeNotifier
+from .session_message import SessionMessage, StreamDelta
+
+# 流式增量缓冲区容量：只服务在线客户端的实时展示，旧增量直接丢弃
+STREAM_DELTA_BUFFER_SIZE: int = 1024
+
+# 会话消息内存窗口：超过窗口的 2 倍时，把已写入存档的旧消息移出内存（之后从存档文件读取）
+SESSION_MESSAGE_WINDOW_SIZE: int = 2048
 
 
 ###############################################################################
@@ -35,6 +45,24 @@ class PlayerSession(BaseModel):
     # 全局事件序号,用于标识事件的顺序
     event_sequence: int = 0
 
+    # LLM 流式增量缓冲区（私有属性，不参与序列化与存档）
+    _stream_deltas: Deque[StreamDelta] = PrivateAttr(
+        default_factory=lambda: deque(maxlen=STREAM_DELTA_BUFFER_SIZE)
+    )
+
+    # 流式增量序号，独立于 event_sequence，不影响会话消息的增量查询
+    _stream_sequence: int = PrivateAttr(default=0)
+
+    # 会话消息内存窗口大小（None 表示不移出旧消息）
+    _window_size: Optional[int] = PrivateAttr(default=SESSION_MESSAGE_WINDOW_SIZE)
+
+    # 新会话消息 / 流式增量的变更通知（SSE 推送端点在此等待，私有属性，不参与序列化）
+    _notifier: ChangeNotifier = PrivateAttr(default_factory=ChangeNotifier)
+
+    # 已持久化的会话事件：(player_session.jsonl 路径, 文件中已包含的最大 sequence_id)
+    # 由存档线程在写盘成功后整体替换（单次赋值），事件循环线程只读取
+    _durable: Optional[Tuple[Path, int]] = PrivateAttr(default=None)
+
     ###############################################################################
     def add_agent_event(self, agent_event: AnyAgentEvent) -> None:
         """
@@ -61,18 +89,171 @@ class PlayerSession(BaseModel):
         self.event_sequence += 1
         message.sequence_id = self.event_sequence
         self.session_messages.append(message)
+        if (
+            self._window_size is not None
+            and len(self.session_messages) >= 2 * self._window_size
+        ):
+            self._trim_window(self._window_size)
+        self._notifier.notify()
+
+    ###############################################################################
+    def _trim_window(self, window_size: int) -> None:
+        """把超出窗口、且已写入存档文件的旧消息移出内存（按 2 倍窗口触发，均摊 O(1)）"""
+        if self._durable is None:
+            return
+        durable_sequence = self._durable[1]
+        messages = self.session_messages
+        drop = min(
+            len(messages) - window_size,
+            bisect_right(messages, durable_sequence, key=lambda m: m.sequence_id),
+        )
+        if drop > 0:
+            del messages[:drop]
+
+    ###############################################################################
+    def mark_durable(self, session_path: Path, sequence_id: int) -> None:
+        """
+        存档写盘成功后调用：session_path 中已包含 sequence_id 及之前的全部会话事件
+
+        Args:
+            session_path: 存档中的 player_session.jsonl
+            sequence_id: 文件中已包含的最大序列号
+        """
+        self._durable = (session_path, sequence_id)
+
+    ###############################################################################
+    def mark_durable_from(self, other: "PlayerSession") -> None:
+        """沿用另一个会话（快照来源）的持久化位置"""
+        self._durable = other._durable
+
+    ###############################################################################
+    def configure_window(self, window_size: Optional[int]) -> None:
+        """设置内存窗口大小（None 表示全部会话消息常驻内存）"""
+        self._window_size = window_size
+
+    ###############################################################################
+    @property
+    def notifier(self) -> ChangeNotifier:
+        """会话变更通知（新会话消息与流式增量）"""
+        return self._notifier
+
+    ###############################################################################
+    @property
+    def durable(self) -> Optional[Tuple[Path, int]]:
+        return self._durable
+
+    ###############################################################################
+    @property
+    def first_sequence_in_memory(self) -> int:
+        """内存中最早一条消息的序列号（没有消息时为下一个序列号）"""
+        if self.session_messages:
+            return self.session_messages[0].sequence_id
+        return self.event_sequence + 1
+
+    ###############################################################################
+    def has_spilled_since(self, last_id: int) -> bool:
+        """last_id 之后是否有已移出内存、需要从存档文件读取的消息"""
+        return self._durable is not None and last_id + 1 < self.first_sequence_in_memory
+
+    ###############################################################################
+    def _iter_spilled(self) -> Iterator[Tuple[SessionMessage, str]]:
+        """按顺序读出已移出内存的会话事件及其在存档文件中的原始 JSON 行"""
+        if self._durable is None:
+            return
+        session_path, _ = self._durable
+        last_spilled = self.first_sequence_in_memory - 1
+        if last_spilled <= 0:
+            return
+        with session_path.open("r", encoding="utf-8") as f:
+            next(f, None)  # 首行为元数据
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                message = SessionMessage.model_validate_json(line)
+                if message.sequence_id > last_spilled:
+                    return
+                yield message, line
+                # 之后的行可能正被存档线程追加，读到最后一条已移出的消息即停止
+                if message.sequence_id == last_spilled:
+                    return
+
+    ###############################################################################
+    def iter_spilled_lines(self) -> Iterator[str]:
+        """已移出内存的会话事件（存档文件中的原始 JSON 行，不含首行元数据）"""
+        for _, line in self._iter_spilled():
+            yield line
+
+    ###############################################################################
+    def read_spilled_messages(self, last_id: int) -> List[SessionMessage]:
+        """
+        从存档文件读取 last_id 之后、已移出内存的消息（磁盘 IO，可在工作线程中调用）
+
+        Args:
+            last_id: 上次获取到的最后一条消息的序列号
+
+        Returns:
+            List[SessionMessage]: 序列号大于 last_id 且早于内存窗口的消息
+        """
+        if not self.has_spilled_since(last_id):
+            return []
+        return [
+            message
+            for message, _ in self._iter_spilled()
+            if message.sequence_id > last_id
+        ]
 
     ###############################################################################
     def get_messages_since(self, last_id: int) -> List[SessionMessage]:
         """
-        获取指定序列号之后的所有消息（增量获取）
+        获取指定序列号之后、仍在内存中的消息（增量获取，不读磁盘，可在事件循环中调用）
+
+        已移出内存的旧消息（has_spilled_since 为 True 时）需另行调用 read_spilled_messages，
+        并放到工作线程中执行。
 
         Args:
             last_id: 上次获取到的最后一条消息的序列号
 
         Returns:
-            List[SessionMessage]: 序列号大于 last_id 的所有消息列表
+            List[SessionMessage]: 内存中序列号大于 last_id 的消息列表
+        """
+        # sequence_id 单调递增：二分定位起点，代价与新消息数成正比
+        messages = self.session_messages
+        start = bisect_right(messages, last_id, key=lambda m: m.sequence_id)
+        return messages[start:]
+
+    ###############################################################################
+    @property
+    def stream_sequence(self) -> int:
+        """最近一条流式增量的序号"""
+        return self._stream_sequence
+
+    ###############################################################################
+    def add_stream_delta(self, delta: StreamDelta) -> None:
+        """
+        添加一条 LLM 流式增量并分配流式序号
+
+        Args:
+            delta: 流式增量对象
+        """
+        self._stream_sequence += 1
+        delta.sequence_id = self._stream_sequence
+        self._stream_deltas.append(delta)
+        self._notifier.notify()
+
+    ###############################################################################
+    def get_stream_deltas_since(self, last_id: int) -> List[StreamDelta]:
+        """
+        获取指定流式序号之后的增量（缓冲区已淘汰的部分不再返回）
+
+        Args:
+            last_id: 上次获取到的最后一条增量的序号
+
+        Returns:
+            List[StreamDelta]: 序号大于 last_id 的增量列表
         """
-        return [e for e in self.session_messages if e.sequence_id > last_id]
+        if last_id >= self._stream_sequence:
+            return []
+        return [d for d in self._stream_deltas if d.sequence_id > last_id]
 
     ###############################################################################
@@ -3,6 +3,7 @@
 提供全局组件类型注册表和装饰器，用于：
 - 组件序列化/反序列化时的类型查找
 - 动作组件的自动清理机制
+- archetype 模式下的组件位索引
 """
 
 from typing import (
@@ -11,6 +12,7 @@ from typing import (
     Type,
     TypeVar,
 )
+from ..entitas.archetype import ComponentIndex
 from ..entitas.components import Component, MutableComponent
 
 ############################################################################################################
@@ -63,4 +65,13 @@ def register_action_component_type(cls: Type[ComponentT]) -> Type[ComponentT]:
     return cls
 
 
+############################################################################################################
+def create_component_index() -> ComponentIndex:
+    """基于 COMPONENT_TYPES 创建组件位索引，用于开启 Context 的 archetype 模式。
+
+    须在所有组件模块导入（完成注册）之后调用；之后才出现的组件类型会被懒分配位。
+    """
+    return ComponentIndex(COMPONENT_TYPES.values())
+
+
 ############################################################################################################
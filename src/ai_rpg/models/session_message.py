@@ -7,3 +7,15 @@ from .agent_event import AnyAgentEvent
 class SessionMessage(BaseModel):
     agent_event: Optional[AnyAgentEvent] = None
     sequence_id: int = 0
+
+
+@final
+class StreamDelta(BaseModel):
+    """LLM 流式生成中的增量文本（仅用于实时展示，不计入会话历史）"""
+
+    stream_id: str  # 同一次 LLM 请求的所有增量共享同一个 stream_id
+    source: str  # 产生该文本的实体名称（如场景名）
+    content: str = ""
+    reasoning_content: str = ""
+    done: bool = False  # 最后一块为 True，客户端可据此结束占位展示
+    sequence_id: int = 0
@@ -13,6 +13,12 @@ class TaskStatus(StrEnum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def is_terminal(self) -> bool:
+        """是否为终态（完成、失败或取消）"""
+        return self is not TaskStatus.RUNNING
 
 
 @final
@@ -20,6 +26,7 @@ class TaskRecord(BaseModel):
     """任务记录模型"""
 
     task_id: str
+    user_name: str = ""  # 发起任务的玩家
     status: TaskStatus
     start_time: str
     end_time: Optional[str] = None
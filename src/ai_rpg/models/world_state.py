@@ -1,6 +1,7 @@
-from typing import Dict, List, final
+from typing import Dict, List, Optional, final
+from .context_index import ContextIndex
 from .messages import ContextMessage
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from .dungeon import Dungeon
 from .serialization import EntitySerialization
 from .blueprint import Blueprint
@@ -11,6 +12,14 @@ from .blueprint import Blueprint
 class AgentContext(BaseModel):
     name: str
     context: List[ContextMessage]
+    _index: Optional[ContextIndex] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> ContextIndex:
+        """context 的消息位置索引（按对象身份，不参与序列化；context 被整体替换时重新绑定）"""
+        if self._index is None or self._index.context is not self.context:
+            self._index = ContextIndex(self.context)
+        return self._index
 
 
 ###############################################################################################################################################
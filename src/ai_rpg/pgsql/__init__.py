@@ -7,10 +7,29 @@ from .base import *
 from .client import *
 from .user import *
 from .vector_document import VectorDocumentDB
-from .vector_document_operations import save_vector_document, search_similar_documents
+from .vector_document_operations import (
+    VectorSearchResult,
+    bulk_save_vector_documents,
+    compute_content_hash,
+    delete_vector_documents_except,
+    find_existing_content_hashes,
+    save_vector_document,
+    search_similar_documents,
+    search_vector_documents,
+    search_vector_documents_batch,
+)
+from .vector_index import (
+    VectorIndexConfig,
+    VectorIndexInfo,
+    VectorSearchParams,
+    collection_index_name,
+    create_collection_index,
+    drop_collection_index,
+    list_vector_indexes,
+    rebuild_collection_index,
+)
 from .config import PostgreSQLConfig, postgresql_config
 
-
 __all__: List[str] = [
     # PostgreSQL configuration
     "PostgreSQLConfig",
@@ -25,4 +44,20 @@ __all__: List[str] = [
     # Vector document operations (low-level)
     "save_vector_document",
     "search_similar_documents",
+    "compute_content_hash",
+    "find_existing_content_hashes",
+    "bulk_save_vector_documents",
+    "delete_vector_documents_except",
+    "VectorSearchResult",
+    "search_vector_documents",
+    "search_vector_documents_batch",
+    # Vector index management (per-collection ANN indexes)
+    "VectorIndexConfig",
+    "VectorIndexInfo",
+    "VectorSearchParams",
+    "collection_index_name",
+    "create_collection_index",
+    "drop_collection_index",
+    "list_vector_indexes",
+    "rebuild_collection_index",
 ]
@@ -161,6 +161,24 @@ def pgsql_ensure_database_tables() -> None:
 
         # 确保所有表都已创建
         Base.metadata.create_all(bind=engine)
+
+        # create_all 不会为已存在的表补列：旧库补上批量导入去重用的 content_hash 列
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "ALTER TABLE vector_documents "
+                    "ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_vector_documents_collection_hash "
+                    "ON vector_documents (collection, content_hash)"
+                )
+            )
+            # 旧版本在空表上建立的全表 IVFFlat(L2) 索引无法服务余弦检索，
+            # 改由 vector_index 按 collection 管理部分索引
+            conn.execute(text("DROP INDEX IF EXISTS ix_vector_documents_embedding"))
         logger.info("✅ 数据库表结构已确保存在")
 
     except Exception as e:
@@ -41,6 +41,9 @@ class VectorDocumentDB(UUIDBase):
     # 文档大小/字符数
     content_length: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
+    # 内容哈希（content + metadata 的 sha256），批量导入时用于跳过未变化的文档
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
     # 元数据字段（重命名以避免与SQLAlchemy的metadata冲突）
     doc_metadata: Mapped[Optional[str]] = mapped_column(
         Text, nullable=True
@@ -59,15 +62,10 @@ class VectorDocumentDB(UUIDBase):
         nullable=False,
     )
 
-    # 为向量字段创建索引以优化相似度搜索
+    # 向量字段的 ANN 索引按 collection 建立部分索引，由 vector_index 模块管理
     __table_args__ = (
-        Index(
-            "ix_vector_documents_embedding",
-            "embedding",
-            postgresql_using="ivfflat",
-            postgresql_with={"lists": 100},
-        ),
         Index("ix_vector_documents_doc_type", "doc_type"),
         Index("ix_vector_documents_source", "source"),
         Index("ix_vector_documents_collection", "collection"),
+        Index("ix_vector_documents_collection_hash", "collection", "content_hash"),
     )
@@ -3,19 +3,45 @@ PostgreSQL + pgvector 向量文档操作函数
 提供向量存储、检索、相似度搜索等功能
 """
 
+import hashlib
 import json
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, cast
+from uuid import UUID
 from loguru import logger
-from sqlalchemy import text
+from pgvector.sqlalchemy import Vector  # type: ignore
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    Integer,
+    cast as sql_cast,
+    column,
+    delete,
+    insert,
+    or_,
+    select,
+    true,
+    values,
+)
 from .client import SessionLocal
 from .vector_document import VectorDocumentDB, EMBEDDING_DIMENSION
-
+from .vector_index import VectorSearchParams, apply_search_params
 
 ##################################################################################################################
 # 向量文档操作
 ##################################################################################################################
 
 
+def compute_content_hash(content: str, metadata: Optional[Dict[str, Any]]) -> str:
+    """文档内容哈希：content 与 metadata 任一变化都视为新文档"""
+    payload = json.dumps(
+        {"content": content, "metadata": metadata or {}},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+###################################################################################################################
 def save_vector_document(
     content: str,
     embedding: List[float],
@@ -47,6 +73,7 @@ def save_vector_document(
             source=source,
             doc_type=doc_type,
             content_length=len(content),
+            content_hash=compute_content_hash(content, metadata),
             doc_metadata=json.dumps(metadata) if metadata else None,
         )
 
@@ -68,6 +95,139 @@ def save_vector_document(
         db.close()
 
 
+###################################################################################################################
+def find_existing_content_hashes(
+    collection: str, content_hashes: Sequence[str]
+) -> Set[str]:
+    """返回 collection 中已存在的内容哈希（content_hashes 的子集）"""
+    if not content_hashes:
+        return set()
+
+    db = SessionLocal()
+    try:
+        stmt = select(VectorDocumentDB.content_hash).where(
+            VectorDocumentDB.collection == collection,
+            VectorDocumentDB.content_hash.in_(list(content_hashes)),
+        )
+        return {h for h in db.execute(stmt).scalars() if h is not None}
+    finally:
+        db.close()
+
+
+###################################################################################################################
+def bulk_save_vector_documents(
+    collection: str,
+    contents: Sequence[str],
+    embeddings: Sequence[Sequence[float]],
+    metadatas: Sequence[Optional[Dict[str, Any]]],
+    content_hashes: Sequence[str],
+) -> int:
+    """
+    在一个事务中批量写入多条向量文档（多行 INSERT），返回写入条数
+    """
+    if not (len(contents) == len(embeddings) == len(metadatas) == len(content_hashes)):
+        raise ValueError(
+            "批量写入的 contents / embeddings / metadatas / hashes 长度不一致"
+        )
+    if not contents:
+        return 0
+
+    for embedding in embeddings:
+        if len(embedding) != EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"向量维度必须是{EMBEDDING_DIMENSION}，当前维度: {len(embedding)}"
+            )
+
+    rows = [
+        {
+            "content": content,
+            "embedding": list(embedding),
+            "collection": collection,
+            "content_length": len(content),
+            "content_hash": content_hash,
+            "doc_metadata": json.dumps(metadata) if metadata else None,
+        }
+        for content, embedding, metadata, content_hash in zip(
+            contents, embeddings, metadatas, content_hashes
+        )
+    ]
+
+    db = SessionLocal()
+    try:
+        # SQLAlchemy 2.x 对 executemany 形式的 insert 使用多行 VALUES（insertmanyvalues）
+        db.execute(insert(VectorDocumentDB), rows)
+        db.commit()
+        return len(rows)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ 批量保存向量文档失败: {e}")
+        raise e
+
+    finally:
+        db.close()
+
+
+###################################################################################################################
+def delete_vector_documents_except(collection: str, keep_hashes: Sequence[str]) -> int:
+    """删除 collection 中内容哈希不在 keep_hashes 内的文档（含无哈希的旧数据），返回删除条数"""
+    db = SessionLocal()
+    try:
+        stmt = delete(VectorDocumentDB).where(
+            VectorDocumentDB.collection == collection,
+            or_(
+                VectorDocumentDB.content_hash.is_(None),
+                VectorDocumentDB.content_hash.not_in(list(keep_hashes)),
+            ),
+        )
+        result = cast(CursorResult[Any], db.execute(stmt))
+        db.commit()
+        return int(result.rowcount)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ 清理过期向量文档失败: {e}")
+        raise e
+
+    finally:
+        db.close()
+
+
+###################################################################################################################
+class VectorSearchResult(NamedTuple):
+    """一条向量检索命中（直接取自排序查询的结果行，无需再按 ID 回表）"""
+
+    id: UUID
+    content: str
+    collection: str
+    title: Optional[str]
+    source: Optional[str]
+    doc_type: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+    similarity: float
+
+
+###################################################################################################################
+def _build_filters(
+    collection_filter: Optional[str], doc_type_filter: Optional[str]
+) -> List[ColumnElement[bool]]:
+    """构建检索的过滤条件"""
+    conditions: List[ColumnElement[bool]] = [VectorDocumentDB.embedding.is_not(None)]
+    if collection_filter:
+        conditions.append(VectorDocumentDB.collection == collection_filter)
+    if doc_type_filter:
+        conditions.append(VectorDocumentDB.doc_type == doc_type_filter)
+    return conditions
+
+
+###################################################################################################################
+def _validate_query_embedding(query_embedding: Sequence[float]) -> None:
+    if len(query_embedding) != EMBEDDING_DIMENSION:
+        raise ValueError(
+            f"查询向量维度必须是{EMBEDDING_DIMENSION}，当前维度: {len(query_embedding)}"
+        )
+
+
 ###################################################################################################################
 def search_similar_documents(
     query_embedding: List[float],
@@ -75,65 +235,35 @@ def search_similar_documents(
     collection_filter: Optional[str] = None,
     doc_type_filter: Optional[str] = None,
     similarity_threshold: float = 0.3,
+    search_params: Optional[VectorSearchParams] = None,
 ) -> List[Tuple[VectorDocumentDB, float]]:
     """
-    基于向量相似度搜索文档
-    """
-
-    db = SessionLocal()
-    try:
+    基于向量相似度搜索文档（返回 ORM 实体，单次查询）
 
-        # 验证查询向量维度
-        if len(query_embedding) != EMBEDDING_DIMENSION:
-            raise ValueError(
-                f"查询向量维度必须是{EMBEDDING_DIMENSION}，当前维度: {len(query_embedding)}"
-            )
+    相似度阈值在取回 top-k 后过滤：结果按距离升序排列，不满足阈值的总是末尾的若干行，
+    与在 WHERE 中过滤的结果一致，同时让 ORDER BY ... LIMIT 可以命中向量索引。
+    search_params 调节 ANN 索引的召回 / 延迟，只作用于本次查询的事务。
+    """
 
-        # 构建SQL条件
-        conditions = ["embedding IS NOT NULL"]
+    _validate_query_embedding(query_embedding)
 
-        # 将向量转换为PostgreSQL向量格式的字符串
-        vector_str = "[" + ",".join(map(str, query_embedding)) + "]"
+    distance = VectorDocumentDB.embedding.cosine_distance(query_embedding)
+    stmt = (
+        select(VectorDocumentDB, distance.label("distance"))
+        .where(*_build_filters(collection_filter, doc_type_filter))
+        .order_by(distance)
+        .limit(limit)
+    )
 
-        # 构建参数字典
-        params = {
-            "query_vector": vector_str,
-            "threshold": similarity_threshold,
-            "limit": limit,
-        }
-
-        # 如果提供了集合过滤器，则添加到条件中
-        if collection_filter:
-            conditions.append("collection = :collection_filter")
-            params["collection_filter"] = collection_filter
-
-        # 如果提供了文档类型过滤器，则添加到条件中
-        if doc_type_filter:
-            conditions.append("doc_type = :doc_type_filter")
-            params["doc_type_filter"] = doc_type_filter
-
-        # 构建WHERE子句
-        where_clause = " AND ".join(conditions)
-
-        # 直接使用原生SQL进行向量搜索
-        sql = f"""
-            SELECT *, (1 - (embedding <=> :query_vector)) as similarity
-            FROM vector_documents 
-            WHERE {where_clause}
-                AND (1 - (embedding <=> :query_vector)) >= :threshold
-            ORDER BY embedding <=> :query_vector
-            LIMIT :limit
-        """
-
-        # 执行SQL查询并获取结果
-        results = db.execute(text(sql), params).fetchall()
-
-        # 转换结果
+    db = SessionLocal()
+    try:
+        apply_search_params(db, search_params)
         documents_with_scores = []
-        for row in results:
-            doc = db.get(VectorDocumentDB, row.id)
-            if doc:
-                documents_with_scores.append((doc, float(row.similarity)))
+        for doc, doc_distance in db.execute(stmt).all():
+            similarity = 1.0 - float(doc_distance)
+            if similarity < similarity_threshold:
+                break
+            documents_with_scores.append((doc, similarity))
 
         # 记录日志
         logger.info(f"🔍 找到 {len(documents_with_scores)} 个相似文档")
@@ -144,3 +274,116 @@ def search_similar_documents(
         raise e
     finally:
         db.close()
+
+
+###################################################################################################################
+def search_vector_documents(
+    query_embedding: List[float],
+    limit: int = 10,
+    collection_filter: Optional[str] = None,
+    doc_type_filter: Optional[str] = None,
+    similarity_threshold: float = 0.0,
+    search_params: Optional[VectorSearchParams] = None,
+) -> List[VectorSearchResult]:
+    """
+    基于向量相似度搜索文档，一次查询直接返回内容 / 元数据 / 相似度
+    """
+    return search_vector_documents_batch(
+        [query_embedding],
+        limit=limit,
+        collection_filter=collection_filter,
+        doc_type_filter=doc_type_filter,
+        similarity_threshold=similarity_threshold,
+        search_params=search_params,
+    )[0]
+
+
+###################################################################################################################
+def search_vector_documents_batch(
+    query_embeddings: Sequence[Sequence[float]],
+    limit: int = 10,
+    collection_filter: Optional[str] = None,
+    doc_type_filter: Optional[str] = None,
+    similarity_threshold: float = 0.0,
+    search_params: Optional[VectorSearchParams] = None,
+) -> List[List[VectorSearchResult]]:
+    """
+    多个查询向量在同一条 SQL 中完成检索（一次数据库往返）
+
+    查询向量以 pgvector 类型绑定参数，组成 VALUES 列表后通过 LATERAL 子查询
+    对每个向量分别执行 ORDER BY 距离 LIMIT k。search_params 调节 ANN 索引的召回 / 延迟
+    （hnsw.ef_search / ivfflat.probes），只作用于本次查询的事务。
+
+    Returns:
+        与 query_embeddings 一一对应的命中列表（按相似度降序）
+    """
+    if not query_embeddings:
+        return []
+    for query_embedding in query_embeddings:
+        _validate_query_embedding(query_embedding)
+
+    # 查询向量表：(idx, vec)
+    queries = values(
+        column("idx", Integer),
+        column("vec", Vector(EMBEDDING_DIMENSION)),
+        name="queries",
+    ).data([(i, list(vec)) for i, vec in enumerate(query_embeddings)])
+
+    # VALUES 中的参数在 PostgreSQL 侧是未定类型的文本，需显式转换为 vector
+    distance = VectorDocumentDB.embedding.cosine_distance(
+        sql_cast(queries.c.vec, Vector(EMBEDDING_DIMENSION))
+    )
+    hits = (
+        select(
+            VectorDocumentDB.id,
+            VectorDocumentDB.content,
+            VectorDocumentDB.collection,
+            VectorDocumentDB.title,
+            VectorDocumentDB.source,
+            VectorDocumentDB.doc_type,
+            VectorDocumentDB.doc_metadata,
+            distance.label("distance"),
+        )
+        .where(*_build_filters(collection_filter, doc_type_filter))
+        .order_by(distance)
+        .limit(limit)
+        .lateral("hits")
+    )
+    stmt = (
+        select(queries.c.idx, hits)
+        .select_from(queries.join(hits, true()))
+        .order_by(queries.c.idx, hits.c.distance)
+    )
+
+    db = SessionLocal()
+    try:
+        apply_search_params(db, search_params)
+        results: List[List[VectorSearchResult]] = [[] for _ in query_embeddings]
+        for row in db.execute(stmt):
+            similarity = 1.0 - float(row.distance)
+            if similarity < similarity_threshold:
+                continue
+            results[row.idx].append(
+                VectorSearchResult(
+                    id=row.id,
+                    content=row.content,
+                    collection=row.collection,
+                    title=row.title,
+                    source=row.source,
+                    doc_type=row.doc_type,
+                    metadata=json.loads(row.doc_metadata) if row.doc_metadata else None,
+                    similarity=similarity,
+                )
+            )
+
+        logger.info(
+            f"🔍 批量向量检索完成: {len(query_embeddings)} 个查询，"
+            f"共 {sum(len(r) for r in results)} 个命中"
+        )
+        return results
+
+    except Exception as e:
+        logger.error(f"❌ 批量向量搜索失败: {e}")
+        raise e
+    finally:
+        db.close()
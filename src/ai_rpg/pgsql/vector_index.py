@@ -0,0 +1,210 @@
+"""
+pgvector ANN 索引管理
+
+vector_documents 按 collection（游戏名）隔离知识库，检索总是带 collection 过滤并按余弦距离
+（<=>）排序。这里为每个 collection 维护一个部分索引（WHERE collection = '...'），
+使 ORDER BY embedding <=> :q LIMIT k 在单个知识库内走 HNSW / IVFFlat 索引而不是顺序扫描：
+
+- HNSW：支持增量写入，召回率高，默认选择；查询时用 hnsw.ef_search 调节召回 / 延迟；
+- IVFFlat：构建更快、占用更小，但聚类中心在建索引时确定，数据大幅变化后需要重建；
+  查询时用 ivfflat.probes 调节召回 / 延迟。
+
+查询参数通过 VectorSearchParams 传给检索函数，以 SET LOCAL 的方式只作用于当前事务。
+"""
+
+import hashlib
+import math
+from typing import Final, List, Literal, Optional, final
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .client import SessionLocal, engine
+
+# 每个 collection 的部分索引名前缀
+_INDEX_PREFIX: Final[str] = "ix_vecdoc_"
+
+
+###################################################################################################################
+@final
+class VectorIndexConfig(BaseModel):
+    """ANN 索引构建参数"""
+
+    method: Literal["hnsw", "ivfflat"] = "hnsw"
+    m: int = 16  # HNSW：每个节点的最大连接数
+    ef_construction: int = 64  # HNSW：构建时的候选列表大小
+    lists: Optional[int] = None  # IVFFlat：聚类数，None 时按行数自动选择
+
+
+###################################################################################################################
+@final
+class VectorSearchParams(BaseModel):
+    """ANN 查询参数（只作用于当前事务）"""
+
+    ef_search: Optional[int] = None  # HNSW：查询时的候选列表大小（pgvector 默认 40）
+    probes: Optional[int] = None  # IVFFlat：查询时扫描的聚类数（pgvector 默认 1）
+
+
+###################################################################################################################
+@final
+class VectorIndexInfo(BaseModel):
+    """已存在的向量索引"""
+
+    name: str
+    collection: Optional[str]
+    method: str
+    definition: str
+
+
+###################################################################################################################
+def collection_index_name(collection: str) -> str:
+    """collection 对应的部分索引名（collection 可含任意字符，以哈希保证名字合法且不超长）"""
+    digest = hashlib.sha1(collection.encode("utf-8")).hexdigest()[:16]
+    return f"{_INDEX_PREFIX}{digest}"
+
+
+###################################################################################################################
+def _quote_literal(value: str) -> str:
+    """DDL 中的部分索引谓词不能使用绑定参数，按 SQL 标准转义为字符串字面量"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+###################################################################################################################
+def _auto_lists(row_count: int) -> int:
+    """pgvector 建议：100 万行以内 lists = rows / 1000，以上 lists = sqrt(rows)"""
+    if row_count <= 1_000_000:
+        return max(row_count // 1000, 10)
+    return int(math.sqrt(row_count))
+
+
+###################################################################################################################
+def apply_search_params(db: Session, params: Optional[VectorSearchParams]) -> None:
+    """在当前事务内设置 ANN 查询参数"""
+    if params is None:
+        return
+    if params.ef_search is not None:
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {int(params.ef_search)}"))
+    if params.probes is not None:
+        db.execute(text(f"SET LOCAL ivfflat.probes = {int(params.probes)}"))
+
+
+###################################################################################################################
+def create_collection_index(
+    collection: str,
+    config: Optional[VectorIndexConfig] = None,
+    concurrently: bool = False,
+) -> str:
+    """
+    为 collection 创建余弦距离的部分 ANN 索引（已存在时跳过），返回索引名
+
+    Args:
+        collection: 集合名称
+        config: 索引构建参数，默认 HNSW(m=16, ef_construction=64)
+        concurrently: 是否使用 CREATE INDEX CONCURRENTLY（不阻塞写入，构建更慢）
+    """
+    config = config if config is not None else VectorIndexConfig()
+    name = collection_index_name(collection)
+    predicate = f"collection = {_quote_literal(collection)} AND embedding IS NOT NULL"
+
+    if config.method == "hnsw":
+        options = (
+            f"m = {int(config.m)}, ef_construction = {int(config.ef_construction)}"
+        )
+    else:
+        lists = config.lists
+        if lists is None:
+            lists = _auto_lists(count_collection_rows(collection))
+        options = f"lists = {int(lists)}"
+
+    sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+        f"ON vector_documents USING {config.method} (embedding vector_cosine_ops) "
+        f"WITH ({options}) WHERE {predicate}"
+    )
+
+    # CONCURRENTLY 不能在事务块中执行
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(sql))
+
+    logger.info(
+        f"✅ 向量索引已就绪: {name} ({config.method}, {options}) -> {collection}"
+    )
+    return name
+
+
+###################################################################################################################
+def drop_collection_index(collection: str, concurrently: bool = False) -> None:
+    """删除 collection 的部分 ANN 索引（不存在时忽略）"""
+    name = collection_index_name(collection)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(
+            text(
+                f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}"
+            )
+        )
+    logger.info(f"🗑️ 向量索引已删除: {name} -> {collection}")
+
+
+###################################################################################################################
+def rebuild_collection_index(
+    collection: str,
+    config: Optional[VectorIndexConfig] = None,
+) -> str:
+    """
+    按新参数重建 collection 的 ANN 索引（切换 HNSW / IVFFlat、调整参数，
+    或 IVFFlat 数据大幅变化后重新聚类）
+    """
+    drop_collection_index(collection)
+    return create_collection_index(collection, config)
+
+
+###################################################################################################################
+def count_collection_rows(collection: str) -> int:
+    """collection 中带向量的文档数"""
+    db = SessionLocal()
+    try:
+        count = db.execute(
+            text(
+                "SELECT COUNT(*) FROM vector_documents "
+                "WHERE collection = :collection AND embedding IS NOT NULL"
+            ),
+            {"collection": collection},
+        ).scalar_one()
+        return int(count)
+    finally:
+        db.close()
+
+
+###################################################################################################################
+def list_vector_indexes() -> List[VectorIndexInfo]:
+    """列出 vector_documents 上的全部 HNSW / IVFFlat 索引"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = 'vector_documents' "
+                "AND (indexdef ILIKE '%USING hnsw%' OR indexdef ILIKE '%USING ivfflat%')"
+            )
+        ).all()
+    finally:
+        db.close()
+
+    indexes: List[VectorIndexInfo] = []
+    for name, definition in rows:
+        collection: Optional[str] = None
+        marker = "collection)::text = '"
+        if marker in definition:
+            tail = definition.split(marker, 1)[1]
+            collection = tail.split("'::text", 1)[0].replace("''", "'")
+        indexes.append(
+            VectorIndexInfo(
+                name=name,
+                collection=collection,
+                method="hnsw" if "USING hnsw" in definition else "ivfflat",
+                definition=definition,
+            )
+        )
+    return indexes
@@ -1,14 +1,34 @@
 """
 RAG（检索增强生成）模块
 
-桥接 SentenceTransformer 嵌入模型与 pgvector 存储层，
+桥接嵌入模型（本地 SentenceTransformer 或共享编码服务）与 pgvector 存储层，
 提供文档加载与语义检索的高层 API。
 """
 
-from .knowledge_retrieval import add_documents, search_documents, delete_collection
+from .knowledge_retrieval import (
+    IngestReport,
+    add_documents,
+    ingest_documents,
+    search_documents,
+    search_documents_batch,
+    delete_collection,
+)
+from .retrieval_cache import (
+    RetrievalCache,
+    RetrievalCacheConfig,
+    RetrievalCacheStats,
+    rag_retrieval_cache,
+)
 
 __all__ = [
+    "IngestReport",
     "add_documents",
+    "ingest_documents",
     "search_documents",
+    "search_documents_batch",
     "delete_collection",
+    "RetrievalCache",
+    "RetrievalCacheConfig",
+    "RetrievalCacheStats",
+    "rag_retrieval_cache",
 ]
@@ -1,49 +1,229 @@
 """
-RAG 知识检索模块（桥接 SentenceTransformer 与 pgvector）
+RAG 知识检索模块（桥接嵌入模型与 pgvector）
 
 此模块提供 RAG（检索增强生成）系统的文档管理和语义搜索功能：
 1. 文档加载 - 将文档向量化并存储到 vector_documents 表
 2. 语义搜索 - 基于向量相似度检索最相关的文档
 
 核心功能：
-- add_documents: 加载文档到向量数据库（纯工具函数，不含业务逻辑）
+- add_documents: 加载文档到向量数据库（纯工具函数，不含业务逻辑，每个文档都写入）
+- ingest_documents: 流式批量导入（分块向量化 + 多行 INSERT + 内容哈希去重），返回吞吐统计
 - search_documents: 执行语义搜索，返回最相关的文档和相似度分数
+- search_documents_batch: 批量语义搜索（一次 encode，多个查询合并为一条 SQL，不阻塞事件循环）
 - delete_collection: 清空指定 collection 下的全部文档（开发/测试环境清理用）
+
+启用 rag_retrieval_cache 后，检索先查查询向量 / 检索结果缓存；导入与删除会使对应 collection 的结果失效。
 """
 
+import asyncio
+import time
 import traceback
-from typing import Any, Dict, List, Tuple, cast
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple, cast
 from loguru import logger
+from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.engine import CursorResult
-from sentence_transformers import SentenceTransformer
+from ..embedding_model import TextEncoder
+from .retrieval_cache import rag_retrieval_cache
 from ..pgsql.client import SessionLocal
-from ..pgsql import save_vector_document, search_similar_documents
+from ..pgsql import (
+    bulk_save_vector_documents,
+    compute_content_hash,
+    delete_vector_documents_except,
+    find_existing_content_hashes,
+    search_vector_documents_batch,
+    VectorSearchParams,
+)
+
+# 批量检索默认并发数：与 SQLAlchemy 默认连接池大小（pool_size=5）一致，避免检索排队等待连接
+_SEARCH_CONCURRENCY: Final[int] = 5
+
+# 批量检索时单条 SQL 中的查询向量数上限
+_SEARCH_BATCH_SIZE: Final[int] = 16
+
+# 批量导入时每块（一次 encode + 一个事务）的文档数
+_INGEST_BATCH_SIZE: Final[int] = 64
+
+
+############################################################################################################
+class IngestReport(BaseModel):
+    """批量导入结果"""
+
+    collection: str
+    total: int = 0  # 输入文档数
+    duplicates: int = 0  # 输入中重复（内容与元数据均相同）的文档数
+    unchanged: int = 0  # 库中已存在、跳过向量化的文档数
+    inserted: int = 0  # 新向量化并写入的文档数
+    pruned: int = 0  # 删除的过期文档数（prune=True 时）
+    chunks: int = 0  # 写入的批次数（每批一个事务）
+    encode_seconds: float = 0.0
+    write_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        """新文档的端到端吞吐（条/秒）"""
+        return self.inserted / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+############################################################################################################
+def ingest_documents(
+    collection: str,
+    embedding_model: TextEncoder,
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    batch_size: int = _INGEST_BATCH_SIZE,
+    prune: bool = False,
+    on_progress: Optional[Callable[[IngestReport], None]] = None,
+) -> IngestReport:
+    """
+    流式批量导入文档到向量数据库
+
+    1. 按 content + metadata 计算内容哈希，跳过输入中的重复项与库中已存在的文档
+    2. 余下文档按 batch_size 分块：每块一次 encode，一条多行 INSERT，一个事务
+    3. prune=True 时删除 collection 中不在本次输入内的旧文档（内容已修改或已移除）
+
+    Args:
+        collection: 集合名称（用于隔离不同知识库，如游戏名）
+        embedding_model: 文本编码器（本地模型或共享编码服务）
+        documents: 文档列表
+        metadatas: 元数据列表，与 documents 一一对应
+        batch_size: 每块的文档数
+        prune: 是否删除本次输入中不存在的旧文档
+        on_progress: 每写完一块后回调（参数为当前累计结果）
+
+    Returns:
+        IngestReport: 导入结果与吞吐统计
+
+    Raises:
+        ValueError: documents 与 metadatas 长度不一致
+    """
+    if len(documents) != len(metadatas):
+        raise ValueError(
+            f"数据长度不一致: documents={len(documents)}, metadatas={len(metadatas)}"
+        )
+    assert batch_size > 0, "batch_size must be positive"
+
+    start = time.perf_counter()
+    report = IngestReport(collection=collection, total=len(documents))
+
+    # 输入内去重
+    pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for document, metadata in zip(documents, metadatas):
+        content_hash = compute_content_hash(document, metadata)
+        if content_hash in pending:
+            report.duplicates += 1
+            continue
+        pending[content_hash] = (document, metadata)
+
+    # 与库中已有文档去重
+    existing = find_existing_content_hashes(collection, list(pending.keys()))
+    report.unchanged = len(existing)
+    new_hashes = [h for h in pending if h not in existing]
+    logger.info(
+        f"🚀 [LOAD] {collection}: {report.total} 个文档，"
+        f"重复 {report.duplicates}，未变化 {report.unchanged}，待导入 {len(new_hashes)}"
+    )
+
+    try:
+        _ingest_chunks(
+            collection,
+            embedding_model,
+            pending,
+            new_hashes,
+            batch_size,
+            report,
+            start,
+            on_progress,
+        )
+        if prune:
+            report.pruned = delete_vector_documents_except(
+                collection, list(pending.keys())
+            )
+    finally:
+        # 已写入的部分即使后续失败也已改变知识库
+        if report.inserted or report.pruned:
+            rag_retrieval_cache.invalidate(collection)
+
+    report.elapsed_seconds = time.perf_counter() - start
+    logger.success(
+        f"✅ [LOAD] {collection}: 新增 {report.inserted}，跳过 {report.unchanged}，"
+        f"清理 {report.pruned}，耗时 {report.elapsed_seconds:.2f}s "
+        f"(encode {report.encode_seconds:.2f}s, write {report.write_seconds:.2f}s)"
+    )
+    return report
+
+
+############################################################################################################
+def _ingest_chunks(
+    collection: str,
+    embedding_model: TextEncoder,
+    pending: Dict[str, Tuple[str, Dict[str, Any]]],
+    new_hashes: List[str],
+    batch_size: int,
+    report: IngestReport,
+    start: float,
+    on_progress: Optional[Callable[[IngestReport], None]] = None,
+) -> None:
+    """按块向量化并写入新文档，累计到 report"""
+    for offset in range(0, len(new_hashes), batch_size):
+        chunk_hashes = new_hashes[offset : offset + batch_size]
+        chunk_documents = [pending[h][0] for h in chunk_hashes]
+        chunk_metadatas = [pending[h][1] for h in chunk_hashes]
+
+        encode_start = time.perf_counter()
+        embeddings = embedding_model.encode(chunk_documents).tolist()
+        report.encode_seconds += time.perf_counter() - encode_start
+
+        write_start = time.perf_counter()
+        report.inserted += bulk_save_vector_documents(
+            collection=collection,
+            contents=chunk_documents,
+            embeddings=embeddings,
+            metadatas=chunk_metadatas,
+            content_hashes=chunk_hashes,
+        )
+        report.write_seconds += time.perf_counter() - write_start
+        report.chunks += 1
+        report.elapsed_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"💾 [LOAD] {collection}: {report.inserted}/{len(new_hashes)} "
+            f"({report.docs_per_second:.1f} docs/s)"
+        )
+        if on_progress is not None:
+            on_progress(report)
 
 
 ############################################################################################################
 def add_documents(
     collection: str,
-    embedding_model: SentenceTransformer,
+    embedding_model: TextEncoder,
     documents: List[str],
     metadatas: List[Dict[str, Any]],
+    batch_size: int = _INGEST_BATCH_SIZE,
 ) -> bool:
     """
     加载文档到向量数据库（纯工具函数）
 
     功能：
-    1. 将文档向量化并存储到 vector_documents 表
+    1. 将文档分块向量化并批量存储到 vector_documents 表，每个文档都会写入（不去重）
     2. 不包含业务逻辑，由调用方准备所有数据
 
+    需要跳过已存在文档、清理过期文档或吞吐统计时使用 ingest_documents。
+
     Args:
         collection: 集合名称（用于隔离不同知识库，如游戏名）
-        embedding_model: SentenceTransformer 嵌入模型实例
+        embedding_model: 文本编码器（本地模型或共享编码服务）
         documents: 文档列表
         metadatas: 元数据列表，与 documents 一一对应
+        batch_size: 每批向量化与写入的文档数
 
     Returns:
         bool: 加载是否成功
     """
+    assert batch_size > 0, "batch_size must be positive"
+    inserted = 0
     try:
         if not documents:
             logger.warning("⚠️  [LOAD] 文档数据为空，跳过加载")
@@ -56,16 +236,20 @@ def add_documents(
             return False
 
         logger.info(f"🚀 [LOAD] 开始加载 {len(documents)} 个文档...")
-        logger.info("🔄 [LOAD] 计算文档向量嵌入...")
-        embeddings = embedding_model.encode(documents).tolist()
-
-        logger.info("💾 [LOAD] 存储向量到数据库...")
-        for document, metadata, embedding in zip(documents, metadatas, embeddings):
-            save_vector_document(
-                content=document,
-                embedding=embedding,
+        for offset in range(0, len(documents), batch_size):
+            chunk_documents = documents[offset : offset + batch_size]
+            chunk_metadatas = metadatas[offset : offset + batch_size]
+            embeddings = embedding_model.encode(chunk_documents).tolist()
+            # 同时记下内容哈希，之后的 ingest_documents 可识别这些文档
+            inserted += bulk_save_vector_documents(
                 collection=collection,
-                metadata=metadata,
+                contents=chunk_documents,
+                embeddings=embeddings,
+                metadatas=chunk_metadatas,
+                content_hashes=[
+                    compute_content_hash(document, metadata)
+                    for document, metadata in zip(chunk_documents, chunk_metadatas)
+                ],
             )
 
         logger.success(f"✅ [LOAD] 成功加载 {len(documents)} 个文档")
@@ -75,13 +259,18 @@ def add_documents(
         logger.error(f"❌ [LOAD] 文档加载失败: {e}\n{traceback.format_exc()}")
         return False
 
+    finally:
+        if inserted:
+            rag_retrieval_cache.invalidate(collection)
+
 
 ############################################################################################################
 def search_documents(
     query: str,
     collection: str,
-    embedding_model: SentenceTransformer,
+    embedding_model: TextEncoder,
     top_k: int = 5,
+    search_params: Optional[VectorSearchParams] = None,
 ) -> Tuple[List[str], List[float]]:
     """
     执行语义搜索，查询公共知识库
@@ -89,8 +278,9 @@ def search_documents(
     Args:
         query: 用户查询文本
         collection: 集合名称（用于隔离不同知识库，如游戏名）
-        embedding_model: SentenceTransformer 嵌入模型实例
+        embedding_model: 文本编码器（本地模型或共享编码服务）
         top_k: 返回最相似的文档数量
+        search_params: ANN 索引查询参数（ef_search / probes），None 使用数据库默认值
 
     Returns:
         tuple: (检索到的文档列表, 相似度分数列表)
@@ -98,18 +288,26 @@ def search_documents(
     try:
         logger.info(f"🔍 [SEARCH] 执行语义搜索: '{query}'")
 
-        query_vector = embedding_model.encode([query])[0].tolist()
-
-        # threshold=0.0：始终返回 top_k 条结果，不做相关性过滤
-        results = search_similar_documents(
-            query_embedding=query_vector,
-            limit=top_k,
-            collection_filter=collection,
-            similarity_threshold=0.0,
+        cached = rag_retrieval_cache.get_results(
+            collection, query, top_k, search_params
         )
+        if cached is not None:
+            logger.info(f"✅ [SEARCH] 命中检索缓存，{len(cached[0])} 个相关文档")
+            return cached
 
-        documents = [doc.content for doc, _ in results]
-        similarity_scores = [score for _, score in results]
+        generation = rag_retrieval_cache.generation(collection)
+        query_vector = _encode_queries(embedding_model, [query])[0]
+        documents, similarity_scores = _search_by_vectors(
+            [query_vector], collection, top_k, search_params
+        )[0]
+        rag_retrieval_cache.put_results(
+            collection,
+            query,
+            top_k,
+            (documents, similarity_scores),
+            generation,
+            search_params,
+        )
 
         logger.info(f"✅ [SEARCH] 搜索完成，找到 {len(documents)} 个相关文档")
         return documents, similarity_scores
@@ -119,6 +317,149 @@ def search_documents(
         return [], []
 
 
+############################################################################################################
+def _encode_queries(
+    embedding_model: TextEncoder, queries: List[str]
+) -> List[List[float]]:
+    """向量化查询文本：先查查询向量缓存，只对未命中的文本调用一次 encode"""
+    vectors: Dict[str, List[float]] = {}
+    misses: List[str] = []
+    for query in queries:
+        cached = rag_retrieval_cache.get_embedding(query)
+        if cached is not None:
+            vectors[query] = cached
+        else:
+            misses.append(query)
+
+    if misses:
+        encoded: List[List[float]] = embedding_model.encode(misses).tolist()
+        for query, vector in zip(misses, encoded):
+            vectors[query] = vector
+            rag_retrieval_cache.put_embedding(query, vector)
+
+    return [vectors[query] for query in queries]
+
+
+############################################################################################################
+def _search_by_vectors(
+    query_vectors: List[List[float]],
+    collection: str,
+    top_k: int,
+    search_params: Optional[VectorSearchParams] = None,
+) -> List[Tuple[List[str], List[float]]]:
+    """以一组查询向量检索指定 collection（一条 SQL），返回每个向量的 (文档列表, 相似度分数列表)"""
+
+    # threshold=0.0：始终返回 top_k 条结果，不做相关性过滤
+    hits_per_query = search_vector_documents_batch(
+        query_vectors,
+        limit=top_k,
+        collection_filter=collection,
+        similarity_threshold=0.0,
+        search_params=search_params,
+    )
+    return [
+        ([hit.content for hit in hits], [hit.similarity for hit in hits])
+        for hits in hits_per_query
+    ]
+
+
+############################################################################################################
+async def search_documents_batch(
+    queries: List[str],
+    collection: str,
+    embedding_model: TextEncoder,
+    top_k: int = 5,
+    batch_size: int = _SEARCH_BATCH_SIZE,
+    max_concurrency: Optional[int] = None,
+    search_params: Optional[VectorSearchParams] = None,
+) -> List[Tuple[List[str], List[float]]]:
+    """
+    批量执行语义搜索（同一帧内多个查询一次完成），不阻塞事件循环
+
+    0. 启用检索缓存时，命中结果缓存的查询直接返回，命中向量缓存的查询跳过向量化
+    1. 去重后的全部查询在工作线程中用一次 encode 调用完成向量化
+    2. 查询向量按 batch_size 分组，每组用一条 SQL 完成检索；各组在线程池中并发执行
+       （每组使用独立的数据库会话）
+
+    Args:
+        queries: 查询文本列表
+        collection: 集合名称（用于隔离不同知识库，如游戏名）
+        embedding_model: 文本编码器（本地模型或共享编码服务）
+        top_k: 每个查询返回最相似的文档数量
+        batch_size: 单条 SQL 中的查询向量数上限
+        max_concurrency: 同时进行的数据库检索数上限，默认 _SEARCH_CONCURRENCY
+        search_params: ANN 索引查询参数（ef_search / probes），None 使用数据库默认值
+
+    Returns:
+        与 queries 一一对应的 (检索到的文档列表, 相似度分数列表)；检索失败的查询对应项为空结果
+    """
+    if not queries:
+        return []
+
+    # 相同问题只编码、检索一次
+    unique_queries = list(dict.fromkeys(queries))
+    logger.info(
+        f"🔍 [SEARCH] 批量语义搜索: {len(queries)} 个查询（去重后 {len(unique_queries)} 个）"
+    )
+
+    by_query: Dict[str, Tuple[List[str], List[float]]] = {}
+    for query in unique_queries:
+        cached = rag_retrieval_cache.get_results(
+            collection, query, top_k, search_params
+        )
+        if cached is not None:
+            by_query[query] = cached
+    pending_queries = [query for query in unique_queries if query not in by_query]
+    if not pending_queries:
+        logger.info(
+            f"✅ [SEARCH] 批量搜索全部命中检索缓存: {len(unique_queries)} 个查询"
+        )
+        return [by_query[query] for query in queries]
+
+    generation = rag_retrieval_cache.generation(collection)
+    try:
+        query_vectors = await asyncio.to_thread(
+            _encode_queries, embedding_model, pending_queries
+        )
+    except Exception as e:
+        logger.error(f"❌ [SEARCH] 批量向量化失败: {e}\n{traceback.format_exc()}")
+        return [by_query.get(query, ([], [])) for query in queries]
+
+    semaphore = asyncio.Semaphore(
+        max_concurrency if max_concurrency is not None else _SEARCH_CONCURRENCY
+    )
+
+    async def _search(offset: int) -> None:
+        chunk_queries = pending_queries[offset : offset + batch_size]
+        async with semaphore:
+            try:
+                chunk_results = await asyncio.to_thread(
+                    _search_by_vectors,
+                    query_vectors[offset : offset + batch_size],
+                    collection,
+                    top_k,
+                    search_params,
+                )
+            except Exception as e:
+                logger.error(f"❌ [SEARCH] 语义搜索失败: {e}\n{traceback.format_exc()}")
+                return
+        for query, result in zip(chunk_queries, chunk_results):
+            by_query[query] = result
+            rag_retrieval_cache.put_results(
+                collection, query, top_k, result, generation, search_params
+            )
+
+    await asyncio.gather(
+        *(_search(offset) for offset in range(0, len(pending_queries), batch_size))
+    )
+
+    logger.info(
+        f"✅ [SEARCH] 批量搜索完成: {len(unique_queries)} 个查询"
+        f"（缓存命中 {len(unique_queries) - len(pending_queries)} 个）"
+    )
+    return [by_query.get(query, ([], [])) for query in queries]
+
+
 ############################################################################################################
 def delete_collection(collection: str) -> int:
     """
@@ -140,6 +481,7 @@ def delete_collection(collection: str) -> int:
             ),
         )
         db.commit()
+        rag_retrieval_cache.invalidate(collection)
         return int(result.rowcount)
     finally:
         db.close()
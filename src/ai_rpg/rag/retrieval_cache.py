@@ -0,0 +1,250 @@
+"""
+RAG 检索缓存
+
+NPC 的检索问题在多个回合、同一蓝图的多个玩家之间高度重复，而每次检索都要重新向量化问题
+并访问 PostgreSQL。这里提供两层进程内缓存：
+
+- 查询向量：规范化后的问题文本 → 向量（与 collection 无关，可跨知识库复用）
+- 检索结果：(collection, 问题文本, top_k, 查询参数) → (文档列表, 相似度分数列表)
+
+两层均为 LRU + TTL 淘汰。add_documents / ingest_documents / delete_collection 修改某个 collection 时，
+该 collection 的检索结果全部失效；失效前已开始、失效后才完成的检索不会写回缓存（按 collection 代数校验）。
+缓存只在进程内有效，其他进程（如 setup_demo）修改知识库时依靠 TTL 限定结果的陈旧时间。
+
+缓存默认关闭，由 GameServer.startup() 调用 open() 启用。
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Final, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..pgsql import VectorSearchParams
+
+# 检索结果缓存 key：(collection, 规范化问题, top_k, 查询参数)
+_ResultKey = Tuple[str, str, int, str]
+
+
+############################################################################################################
+class RetrievalCacheConfig(BaseModel):
+    """检索缓存配置"""
+
+    embedding_max_entries: int = 4096  # 查询向量缓存容量（条）
+    result_max_entries: int = 2048  # 检索结果缓存容量（条）
+    ttl_seconds: float = 600.0  # 条目有效期（秒）
+
+
+############################################################################################################
+class RetrievalCacheStats(BaseModel):
+    """检索缓存计数"""
+
+    embedding_hits: int = 0
+    embedding_misses: int = 0
+    result_hits: int = 0
+    result_misses: int = 0
+    evictions: int = 0  # 容量淘汰 + 过期淘汰
+    invalidations: int = 0  # 因 collection 修改而失效的结果条目数
+
+    @property
+    def embedding_hit_ratio(self) -> float:
+        total = self.embedding_hits + self.embedding_misses
+        return self.embedding_hits / total if total else 0.0
+
+    @property
+    def result_hit_ratio(self) -> float:
+        total = self.result_hits + self.result_misses
+        return self.result_hits / total if total else 0.0
+
+
+############################################################################################################
+def normalize_query(query: str) -> str:
+    """缓存 key 使用的问题文本：NFKC 规范化（全角 / 半角统一），折叠空白"""
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+############################################################################################################
+class RetrievalCache:
+    """查询向量与检索结果的进程内 LRU + TTL 缓存（线程安全：检索在工作线程中执行）"""
+
+    _EMPTY_PARAMS: Final[str] = ""
+
+    def __init__(self) -> None:
+        self._config: RetrievalCacheConfig = RetrievalCacheConfig()
+        self._enabled: bool = False
+        self._embeddings: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._results: (
+            "OrderedDict[_ResultKey, Tuple[float, List[str], List[float]]]"
+        ) = OrderedDict()
+        self._keys_by_collection: Dict[str, Set[_ResultKey]] = {}
+        self._generations: Dict[str, int] = {}
+        self._stats: RetrievalCacheStats = RetrievalCacheStats()
+        self._lock: threading.Lock = threading.Lock()
+
+    ############################################################################################################
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    ############################################################################################################
+    @property
+    def stats(self) -> RetrievalCacheStats:
+        """缓存计数（返回副本）"""
+        with self._lock:
+            return self._stats.model_copy()
+
+    ############################################################################################################
+    def open(self, config: Optional[RetrievalCacheConfig] = None) -> None:
+        """按配置启用缓存；已启用时先清空"""
+        self.close()
+        if config is not None:
+            self._config = config
+        self._enabled = True
+        logger.info(f"RetrievalCache opened: {self._config}")
+
+    ############################################################################################################
+    def close(self) -> None:
+        """关闭并清空缓存"""
+        with self._lock:
+            self._enabled = False
+            self._embeddings.clear()
+            self._results.clear()
+            self._keys_by_collection.clear()
+
+    ############################################################################################################
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        """查询向量缓存，命中返回向量"""
+        if not self._enabled:
+            return None
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._embeddings.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._embeddings[key]
+                    self._stats.evictions += 1
+                self._stats.embedding_misses += 1
+                return None
+            self._embeddings.move_to_end(key)
+            self._stats.embedding_hits += 1
+            return entry[1]
+
+    ############################################################################################################
+    def put_embedding(self, query: str, vector: List[float]) -> None:
+        """写入查询向量"""
+        if not self._enabled:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            self._embeddings[key] = (
+                time.monotonic() + self._config.ttl_seconds,
+                vector,
+            )
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self._config.embedding_max_entries:
+                self._embeddings.popitem(last=False)
+                self._stats.evictions += 1
+
+    ############################################################################################################
+    def generation(self, collection: str) -> int:
+        """collection 的当前代数（每次失效加一），检索开始前读取，写回结果时校验"""
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    ############################################################################################################
+    def get_results(
+        self,
+        collection: str,
+        query: str,
+        top_k: int,
+        search_params: Optional[VectorSearchParams] = None,
+    ) -> Optional[Tuple[List[str], List[float]]]:
+        """查询检索结果缓存，命中返回 (文档列表, 相似度分数列表) 的副本"""
+        if not self._enabled:
+            return None
+        key = self._result_key(collection, query, top_k, search_params)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop_result(key)
+                    self._stats.evictions += 1
+                self._stats.result_misses += 1
+                return None
+            self._results.move_to_end(key)
+            self._stats.result_hits += 1
+            return list(entry[1]), list(entry[2])
+
+    ############################################################################################################
+    def put_results(
+        self,
+        collection: str,
+        query: str,
+        top_k: int,
+        result: Tuple[List[str], List[float]],
+        generation: int,
+        search_params: Optional[VectorSearchParams] = None,
+    ) -> None:
+        """写入检索结果；collection 在检索期间被修改过（代数不一致）时丢弃"""
+        if not self._enabled:
+            return
+        key = self._result_key(collection, query, top_k, search_params)
+        with self._lock:
+            if self._generations.get(collection, 0) != generation:
+                return
+            documents, scores = result
+            self._results[key] = (
+                time.monotonic() + self._config.ttl_seconds,
+                list(documents),
+                list(scores),
+            )
+            self._results.move_to_end(key)
+            self._keys_by_collection.setdefault(collection, set()).add(key)
+            while len(self._results) > self._config.result_max_entries:
+                oldest = next(iter(self._results))
+                self._drop_result(oldest)
+                self._stats.evictions += 1
+
+    ############################################################################################################
+    def invalidate(self, collection: str) -> None:
+        """collection 的文档被修改：使其全部检索结果失效"""
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            keys = self._keys_by_collection.pop(collection, set())
+            for key in keys:
+                self._results.pop(key, None)
+            self._stats.invalidations += len(keys)
+        if keys:
+            logger.debug(f"RetrievalCache: {collection} 失效 {len(keys)} 条检索结果")
+
+    ############################################################################################################
+    def _result_key(
+        self,
+        collection: str,
+        query: str,
+        top_k: int,
+        search_params: Optional[VectorSearchParams],
+    ) -> _ResultKey:
+        params = (
+            search_params.model_dump_json()
+            if search_params is not None
+            else self._EMPTY_PARAMS
+        )
+        return (collection, normalize_query(query), top_k, params)
+
+    ############################################################################################################
+    def _drop_result(self, key: _ResultKey) -> None:
+        self._results.pop(key, None)
+        keys = self._keys_by_collection.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_collection[key[0]]
+
+
+############################################################################################################
+# 进程级检索缓存实例（默认关闭）
+rag_retrieval_cache: Final[RetrievalCache] = RetrievalCache()
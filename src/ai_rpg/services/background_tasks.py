@@ -2,16 +2,16 @@
 
 import asyncio
 import json
-from datetime import datetime
+import time
 from typing import AsyncGenerator, List
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from loguru import logger
 from ..models import (
+    TaskCancelRequest,
+    TaskCancelResponse,
     TaskTriggerResponse,
-    TaskRecord,
     TasksStatusResponse,
-    TaskStatus,
 )
 from ..services.game_server_dependencies import CurrentGameServer
 from ..game.game_server import GameServer
@@ -20,6 +20,17 @@ from ..game.game_server import GameServer
 background_tasks_api_router = APIRouter()
 
 
+################################################################################################################
+def ensure_task_capacity(game_server: GameServer, user_name: str) -> None:
+    """玩家进行中的任务达到上限时拒绝创建新任务"""
+    if not game_server.has_task_capacity(user_name):
+        logger.warning(f"⚠️ 玩家进行中的任务已达上限: user={user_name}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="进行中的任务过多，请等待当前任务完成",
+        )
+
+
 ###############################################################################################################################################
 ################################################################################################################
 ################################################################################################################
@@ -33,19 +44,12 @@ async def simulate_long_task(
         logger.info(f"🚀 后台任务开始: task_id={task_id}, duration={duration}s")
         await asyncio.sleep(duration)
 
-        task = game_server.get_task(task_id)
-        if task:
-            task.status = TaskStatus.COMPLETED
-            task.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 后台任务完成: task_id={task_id}")
     except Exception as e:
         logger.error(f"❌ 后台任务失败: task_id={task_id}, error={e}")
-        task = game_server.get_task(task_id)
-        if task:
-            task.status = TaskStatus.FAILED
-            task.end_time = datetime.now().isoformat()
-            task.error = str(e)
+        game_server.fail_task(task_id, str(e))
 
 
 ################################################################################################################
@@ -102,21 +106,13 @@ async def get_tasks_status(
             detail="请提供至少一个任务ID",
         )
 
-    # 批量查询任务
-    tasks_details: List[TaskRecord] = []
-
-    for task_id in task_ids:
-        task_detail = game_server.get_task(task_id)
-        if task_detail is None:
-            logger.warning(f"⚠️ 查询的任务不存在: task_id={task_id}")
-            continue  # 跳过不存在的任务
-
-        logger.info(
-            f"🔍 查询到任务状态: task_id={task_id}, status={task_detail.status}"
+    # 批量查询任务（不存在或已过期的任务跳过）
+    tasks_details = game_server.get_tasks(task_ids)
+    if len(tasks_details) < len(task_ids):
+        logger.warning(
+            f"⚠️ 部分查询的任务不存在: {len(task_ids) - len(tasks_details)} / {len(task_ids)}"
         )
 
-        tasks_details.append(task_detail)
-
     return TasksStatusResponse(tasks=tasks_details)
 
 
@@ -130,30 +126,95 @@ async def watch_task(
     task_id: str,
     game_server: CurrentGameServer,
     timeout_seconds: int = Query(default=120, ge=1, le=600),
-    interval: float = Query(default=0.3, ge=0.1, le=5.0),
+    heartbeat_seconds: float = Query(default=15.0, ge=1.0, le=60.0),
 ) -> StreamingResponse:
-    """SSE 端点：推送单个任务状态直至终态或超时。"""
-
-    async def event_generator(poll_interval: float) -> AsyncGenerator[str, None]:
-        elapsed = 0.0
-        while elapsed < timeout_seconds:
+    """SSE 端点：推送单个任务状态直至终态或超时。
+
+    任务状态变化时由 GameServer.task_notifier 唤醒并立即推送；无变化期间不轮询，
+    每 heartbeat_seconds 发送一行 SSE 注释保活。
+    """
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        notifier = game_server.task_notifier
+        deadline = time.monotonic() + timeout_seconds
+        last_payload = ""
+        while True:
+            # 先记下版本号再读取状态，读取之后的变更不会被错过
+            version = notifier.version
             task = game_server.get_task(task_id)
             if task is None:
                 payload = json.dumps({"error": "task_not_found", "task_id": task_id})
                 yield f"data: {payload}\n\n"
                 logger.warning(f"watch_task: 任务不存在 task_id={task_id}")
                 return
-            yield f"data: {task.model_dump_json()}\n\n"
-            if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            task_payload = task.model_dump_json()
+            if task_payload != last_payload:
+                last_payload = task_payload
+                yield f"data: {task_payload}\n\n"
+            if task.status.is_terminal:
                 logger.info(
                     f"watch_task: 任务终态 task_id={task_id} status={task.status}"
                 )
                 return
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not await notifier.wait(version, min(heartbeat_seconds, remaining)):
+                yield ": keep-alive\n\n"
 
         payload = json.dumps({"error": "timeout", "task_id": task_id})
         yield f"data: {payload}\n\n"
         logger.warning(f"watch_task: 超时 task_id={task_id}")
 
-    return StreamingResponse(event_generator(interval), media_type="text/event-stream")
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+################################################################################################################
+################################################################################################################
+################################################################################################################
+
+
+@background_tasks_api_router.get(
+    path="/api/tasks/v1/user/{user_name}", response_model=TasksStatusResponse
+)
+async def get_user_tasks(
+    user_name: str,
+    game_server: CurrentGameServer,
+    running_only: bool = Query(default=False),
+) -> TasksStatusResponse:
+    """查询玩家的任务（默认包括已结束但未过期的任务，running_only 为 True 时只返回进行中的任务）"""
+    return TasksStatusResponse(
+        tasks=game_server.list_user_tasks(user_name, running_only=running_only)
+    )
+
+
+################################################################################################################
+################################################################################################################
+################################################################################################################
+
+
+@background_tasks_api_router.post(
+    path="/api/tasks/v1/cancel", response_model=TaskCancelResponse
+)
+async def cancel_task(
+    payload: TaskCancelRequest,
+    game_server: CurrentGameServer,
+) -> TaskCancelResponse:
+    """取消玩家进行中的任务"""
+
+    logger.info(f"/api/tasks/v1/cancel: {payload.model_dump_json()}")
+
+    task = game_server.get_task(payload.task_id)
+    if task is None or task.user_name != payload.user_name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="任务不存在",
+        )
+
+    if not game_server.cancel_task(payload.task_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"任务已结束: {task.status.value}",
+        )
+
+    return TaskCancelResponse(task=task, message="任务已取消")
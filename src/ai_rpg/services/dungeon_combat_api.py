@@ -2,9 +2,9 @@
 副本战斗玩法服务模块（战斗房间内的专属接口）
 """
 
-import asyncio
 from fastapi import APIRouter, HTTPException, status
 from loguru import logger
+from .background_tasks import ensure_task_capacity
 from .game_server_dependencies import CurrentGameServer
 from ..models import (
     DungeonCombatRetreatRequest,
@@ -61,7 +61,7 @@ async def dungeon_combat_retreat(
 
     logger.info(f"/api/dungeon/combat/retreat/v1/: user={payload.user_name}")
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,6 +70,9 @@ async def dungeon_combat_retreat(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -105,13 +108,14 @@ async def dungeon_combat_retreat(
         logger.info(f"玩家 {payload.user_name} 撤退动作激活成功: {message}")
 
     # 在锁外创建后台 task，让任务在后台独立持锁执行
-    retreat_task = game_server.create_task()
-    asyncio.create_task(
+    retreat_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        retreat_task,
         execute_retreat_task(
             retreat_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建撤退任务: task_id={retreat_task.task_id}, user={payload.user_name}"
@@ -142,7 +146,7 @@ async def dungeon_combat_init(
     logger.info(f"/api/dungeon/combat/init/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,6 +155,9 @@ async def dungeon_combat_init(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -176,13 +183,14 @@ async def dungeon_combat_init(
             )
 
     # 创建战斗初始化后台任务（在锁外创建，让任务在后台独立持锁执行）
-    init_combat_task = game_server.create_task()
-    asyncio.create_task(
+    init_combat_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        init_combat_task,
         execute_init_combat_task(
             init_combat_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建战斗初始化任务: task_id={init_combat_task.task_id}, user={payload.user_name}"
@@ -214,7 +222,7 @@ async def dungeon_combat_collect_loot(
     logger.info(f"/api/dungeon/combat/collect_loot/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -271,7 +279,7 @@ async def dungeon_combat_draw_cards(
     logger.info(f"/api/dungeon/combat/draw_cards/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -280,6 +288,9 @@ async def dungeon_combat_draw_cards(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -314,13 +325,14 @@ async def dungeon_combat_draw_cards(
             )
 
     # 创建后台任务（在锁外创建，让任务在后台独立持锁执行）
-    draw_task = game_server.create_task()
-    asyncio.create_task(
+    draw_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        draw_task,
         execute_draw_cards_task(
             draw_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建全员抽卡任务: task_id={draw_task.task_id}, user={payload.user_name}"
@@ -352,7 +364,7 @@ async def dungeon_combat_play_cards(
     logger.info(f"/api/dungeon/combat/play_cards/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -361,6 +373,9 @@ async def dungeon_combat_play_cards(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -393,8 +408,9 @@ async def dungeon_combat_play_cards(
             )
 
     # 在锁外创建后台 task，让任务在后台独立持锁执行
-    play_cards_task = game_server.create_task()
-    asyncio.create_task(
+    play_cards_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        play_cards_task,
         execute_play_cards_task(
             play_cards_task.task_id,
             payload.user_name,
@@ -402,7 +418,7 @@ async def dungeon_combat_play_cards(
             payload.card_name,
             payload.targets,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -433,7 +449,7 @@ async def dungeon_combat_pass_turn(
     logger.info(f"/api/dungeon/combat/pass_turn/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -442,6 +458,9 @@ async def dungeon_combat_pass_turn(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -474,14 +493,15 @@ async def dungeon_combat_pass_turn(
             )
 
     # 在锁外创建后台 task，让任务在后台独立持锁执行
-    pass_turn_task = game_server.create_task()
-    asyncio.create_task(
+    pass_turn_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        pass_turn_task,
         execute_pass_turn_task(
             pass_turn_task.task_id,
             payload.user_name,
             payload.actor_name,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -515,7 +535,7 @@ async def dungeon_combat_use_consumable(
     )
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -524,6 +544,9 @@ async def dungeon_combat_use_consumable(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -560,15 +583,16 @@ async def dungeon_combat_use_consumable(
             )
 
     # 在锁外创建后台 task，让任务在后台独立持锁执行
-    use_consumable_task = game_server.create_task()
-    asyncio.create_task(
+    use_consumable_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        use_consumable_task,
         execute_use_consumable_task(
             use_consumable_task.task_id,
             payload.user_name,
             payload.item_name,
             payload.targets,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -602,7 +626,7 @@ async def dungeon_combat_use_gear(
     )
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -611,6 +635,9 @@ async def dungeon_combat_use_gear(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -645,15 +672,16 @@ async def dungeon_combat_use_gear(
             )
 
     # 在锁外创建后台 task，让任务在后台独立持锁执行
-    use_gear_task = game_server.create_task()
-    asyncio.create_task(
+    use_gear_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        use_gear_task,
         execute_use_gear_task(
             use_gear_task.task_id,
             payload.user_name,
             payload.item_name,
             payload.targets,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -2,13 +2,12 @@
 副本战斗后台任务模块
 """
 
-from datetime import datetime
 from typing import List
 from loguru import logger
 from ..game.dbg_game import DBGGame
 from ..game.dbg_store import store_game
 from ..game.game_server import GameServer
-from ..models import MonsterComponent, TaskStatus
+from ..models import MonsterComponent
 from .dungeon_combat_actions import (
     activate_monster_play_trigger,
     activate_play_cards_specified,
@@ -32,7 +31,7 @@ async def execute_init_combat_task(
         logger.info(f"🚀 战斗初始化任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -57,10 +56,7 @@ async def execute_init_combat_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 战斗初始化任务完成: task_id={task_id}, user={user_name}")
 
@@ -70,11 +66,7 @@ async def execute_init_combat_task(
         )
 
         # 保存失败结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -91,7 +83,7 @@ async def execute_retreat_task(
         logger.info(f"🚀 撤退任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -118,10 +110,7 @@ async def execute_retreat_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(
             f"✅ 撤退任务完成: task_id={task_id}, user={user_name}, "
@@ -132,11 +121,7 @@ async def execute_retreat_task(
         logger.error(f"❌ 撤退任务失败: task_id={task_id}, user={user_name}, error={e}")
 
         # 保存失败结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -153,7 +138,7 @@ async def execute_draw_cards_task(
         logger.info(f"🚀 抽卡任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -180,10 +165,7 @@ async def execute_draw_cards_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 抽卡任务完成: task_id={task_id}, user={user_name}")
 
@@ -191,11 +173,7 @@ async def execute_draw_cards_task(
         logger.error(f"❌ 抽卡任务失败: task_id={task_id}, user={user_name}, error={e}")
 
         # 保存失败结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -214,7 +192,7 @@ async def execute_play_cards_task(
         logger.info(f"🚀 出牌任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -254,10 +232,7 @@ async def execute_play_cards_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 出牌任务完成: task_id={task_id}, user={user_name}")
 
@@ -265,11 +240,7 @@ async def execute_play_cards_task(
 
         # 保存失败结果
         logger.error(f"❌ 出牌任务失败: task_id={task_id}, user={user_name}, error={e}")
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -286,7 +257,7 @@ async def execute_pass_turn_task(
         logger.info(f"🚀 过牌任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -316,10 +287,7 @@ async def execute_pass_turn_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 过牌任务完成: task_id={task_id}, user={user_name}")
 
@@ -327,11 +295,7 @@ async def execute_pass_turn_task(
 
         # 保存失败结果
         logger.error(f"❌ 过牌任务失败: task_id={task_id}, user={user_name}, error={e}")
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -350,7 +314,7 @@ async def execute_use_consumable_task(
         logger.info(f"🚀 使用消耗品任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -380,10 +344,7 @@ async def execute_use_consumable_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 使用消耗品任务完成: task_id={task_id}, user={user_name}")
 
@@ -393,11 +354,7 @@ async def execute_use_consumable_task(
         logger.error(
             f"❌ 使用消耗品任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -415,7 +372,7 @@ async def execute_use_gear_task(
         logger.info(f"🚀 使用装备任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -445,10 +402,7 @@ async def execute_use_gear_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 使用装备任务完成: task_id={task_id}, user={user_name}")
 
@@ -458,11 +412,7 @@ async def execute_use_gear_task(
         logger.error(
             f"❌ 使用装备任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
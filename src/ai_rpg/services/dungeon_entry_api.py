@@ -5,9 +5,9 @@
 与 combat room API 平级设计，入口房间只需一次 process() 调用完成初始化。
 """
 
-import asyncio
 from fastapi import APIRouter, HTTPException, status
 from loguru import logger
+from .background_tasks import ensure_task_capacity
 from .game_server_dependencies import CurrentGameServer
 from ..models import (
     DungeonEntryInitRequest,
@@ -43,7 +43,7 @@ async def dungeon_entry_init(
     logger.info(f"/api/dungeon/entry/init/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,6 +52,9 @@ async def dungeon_entry_init(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         rpg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -69,13 +72,14 @@ async def dungeon_entry_init(
             )
 
     # 创建入口房间初始化后台任务（在锁外创建，让任务在后台独立持锁执行）
-    entry_init_task = game_server.create_task()
-    asyncio.create_task(
+    entry_init_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        entry_init_task,
         execute_entry_room_init_task(
             entry_init_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建入口房间初始化任务: task_id={entry_init_task.task_id}, user={payload.user_name}"
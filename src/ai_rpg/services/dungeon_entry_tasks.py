@@ -2,12 +2,10 @@
 副本入口房间后台任务模块
 """
 
-from datetime import datetime
 from loguru import logger
 from ..game.dbg_game import DBGGame
 from ..game.dbg_store import store_game
 from ..game.game_server import GameServer
-from ..models import TaskStatus
 
 
 ###################################################################################################################################################################
@@ -24,7 +22,7 @@ async def execute_entry_room_init_task(
         logger.info(f"🚀 入口房间初始化任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -45,10 +43,7 @@ async def execute_entry_room_init_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 入口房间初始化任务完成: task_id={task_id}, user={user_name}")
 
@@ -58,11 +53,7 @@ async def execute_entry_room_init_task(
         )
 
         # 保存失败结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -2,11 +2,10 @@
 副本生命周期 API 路由模块（进入、关卡推进、退出等与具体房间类型无关的流程接口）
 """
 
-import asyncio
-
 from fastapi import APIRouter, HTTPException, status
 from loguru import logger
 from ..game.dbg_game import DBGGame
+from .background_tasks import ensure_task_capacity
 from .game_server_dependencies import CurrentGameServer
 from ..models import (
     DungeonAdvanceStageRequest,
@@ -102,7 +101,7 @@ async def dungeon_advance_stage(
     logger.info(f"/api/dungeon/progress/advance_stage/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -182,7 +181,7 @@ async def dungeon_exit(
     logger.info(f"/api/dungeon/exit/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -191,6 +190,9 @@ async def dungeon_exit(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证副本操作的前置条件
         dbg_game = _validate_dungeon_prerequisites(
             user_name=payload.user_name,
@@ -207,13 +209,14 @@ async def dungeon_exit(
                 )
 
     # 创建退出副本后台任务（在锁外创建，让任务在后台独立持锁执行）
-    exit_task = game_server.create_task()
-    asyncio.create_task(
+    exit_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        exit_task,
         execute_exit_dungeon_task(
             exit_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建退出副本任务: task_id={exit_task.task_id}, user={payload.user_name}"
@@ -244,7 +247,7 @@ async def dungeon_enter(
     logger.info(f"/api/home/enter_dungeon/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
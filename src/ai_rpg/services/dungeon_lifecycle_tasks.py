@@ -1,11 +1,9 @@
 """副本生命周期后台任务模块"""
 
-from datetime import datetime
 from loguru import logger
 from ..game.dbg_game import DBGGame
 from ..game.dbg_store import store_game
 from ..game.game_server import GameServer
-from ..models import TaskStatus
 from .dungeon_archive_action import (
     archive_dungeon,
 )
@@ -31,7 +29,7 @@ async def execute_exit_dungeon_task(
         logger.info(f"🚀 退出副本任务开始: task_id={task_id}, user={user_name}")
 
         # 获取房间并用每玩家锁避免并发状态竞争
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None or current_room._dbg_game is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -57,10 +55,7 @@ async def execute_exit_dungeon_task(
             store_game(rpg_game)
 
         # 保存结果
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ 退出副本任务完成: task_id={task_id}, user={user_name}")
 
@@ -70,11 +65,7 @@ async def execute_exit_dungeon_task(
         logger.error(
             f"❌ 退出副本任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -41,7 +41,7 @@ async def get_dungeon_state(
         )
 
     # 获取房间实例并检查 DBG 游戏是否存在
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "get_dungeon_state: room instance is None"
     if current_room._dbg_game is None:
         logger.error(f"view_dungeon: {user_name} has no game")
@@ -81,7 +81,7 @@ async def get_dungeon_room(
         )
 
     # 获取房间实例并检查 DBG 游戏是否存在
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "get_dungeon_room: room instance is None"
     if current_room._dbg_game is None:
         logger.error(f"get_dungeon_room: {user_name} has no game")
@@ -51,7 +51,7 @@ async def get_entities_details(
         )
 
     # 获取房间实例
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "Current room should not be None"
 
     # 根据游戏类型获取游戏实例
@@ -169,7 +169,7 @@ async def get_entities_group(
         )
 
     # 获取房间实例
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "Current room should not be None"
 
     # 根据游戏类型获取游戏实例
@@ -3,10 +3,12 @@
 提供 FastAPI 依赖注入的游戏服务器单例实例。
 """
 
+import os
 from typing import Annotated, Optional
 from fastapi import Depends
+from ..embedding_model import EmbeddingModelConfig
 from ..game.game_server import GameServer
-
+from ..game.room_hibernation import RoomHibernationConfig
 
 _game_server_instance: Optional[GameServer] = None
 
@@ -16,7 +18,19 @@ def get_game_server() -> GameServer:
     """获取游戏服务器单例实例"""
     global _game_server_instance
     if _game_server_instance is None:
-        _game_server_instance = GameServer()
+        # 设置 AI_RPG_ENCODER_SOCKET 后，各 worker 共享 scripts/run_encoder_service.py 启动的编码服务
+        _game_server_instance = GameServer(
+            embedding_config=EmbeddingModelConfig(
+                encoder_socket=os.getenv("AI_RPG_ENCODER_SOCKET")
+            ),
+            # 空闲房间休眠：空闲秒数与常驻内存的游戏数上限（均为 0 时关闭）
+            room_hibernation_config=RoomHibernationConfig(
+                idle_ttl_seconds=float(os.getenv("AI_RPG_ROOM_IDLE_TTL_SECONDS", "0")),
+                max_resident_rooms=int(os.getenv("AI_RPG_MAX_RESIDENT_ROOMS", "0")),
+            ),
+            # 分片部署时由 scripts/run_game_router.py 的 worker 配置指定（任务 ID 前缀）
+            worker_id=os.getenv("AI_RPG_WORKER_ID", ""),
+        )
     return _game_server_instance
 
 
@@ -5,10 +5,10 @@
 包括对话、场景切换、游戏推进和副本传送等功能。
 """
 
-import asyncio
 from typing import List
 from fastapi import APIRouter, HTTPException, status
 from loguru import logger
+from .background_tasks import ensure_task_capacity
 from .game_server_dependencies import CurrentGameServer
 from .home_tasks import (
     _validate_player_at_home,
@@ -77,7 +77,7 @@ async def home_player_action(
     logger.info(f"/api/home/player_action/v1/: {payload.model_dump_json()}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,6 +86,9 @@ async def home_player_action(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证前置条件并获取游戏实例
         rpg_game = await _validate_player_at_home(
             payload.user_name,
@@ -124,14 +127,15 @@ async def home_player_action(
             )
 
     # 创建 home pipeline 后台任务（在锁外创建，让任务在后台独立持锁执行）
-    home_action_task = game_server.create_task()
+    home_action_task = game_server.create_task(payload.user_name)
 
-    asyncio.create_task(
+    game_server.run_task(
+        home_action_task,
         execute_home_pipeline_task(
             home_action_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -160,7 +164,7 @@ async def home_advance(
     logger.info(f"/api/home/advance/v1/: {payload.model_dump_json()}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -169,6 +173,9 @@ async def home_advance(
 
     async with current_room._lock:
 
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
+
         # 验证前置条件并获取游戏实例
         rpg_game = await _validate_player_at_home(
             payload.user_name,
@@ -185,14 +192,15 @@ async def home_advance(
             )
 
     # 创建 home pipeline 后台任务（在锁外创建，让任务在后台独立持锁执行）
-    home_advance_task = game_server.create_task()
+    home_advance_task = game_server.create_task(payload.user_name)
 
-    asyncio.create_task(
+    game_server.run_task(
+        home_advance_task,
         execute_home_pipeline_task(
             home_advance_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
 
     return HomeAdvanceResponse(
@@ -219,7 +227,7 @@ async def home_generate_dungeon(
     logger.info(f"/api/home/generate_dungeon/v1/: user={payload.user_name}")
 
     # 获取房间并用每玩家锁避免并发状态竞争
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -227,6 +235,9 @@ async def home_generate_dungeon(
         )
 
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         # 验证前置条件并获取游戏实例
         rpg_game = await _validate_player_at_home(
             payload.user_name,
@@ -242,14 +253,15 @@ async def home_generate_dungeon(
             )
 
     # 创建 dungeon generate pipeline 后台任务（在锁外创建，让任务在后台独立持锁执行）
-    generate_dungeon_task = game_server.create_task()
+    generate_dungeon_task = game_server.create_task(payload.user_name)
 
-    asyncio.create_task(
+    game_server.run_task(
+        generate_dungeon_task,
         execute_dungeon_generate_pipeline_task(
             generate_dungeon_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
 
     logger.info(
@@ -273,7 +285,7 @@ async def home_add_party_member(
     payload: HomeRosterAddRequest,
     game_server: CurrentGameServer,
 ) -> HomeRosterAddResponse:
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -300,7 +312,7 @@ async def home_remove_party_member(
     payload: HomeRosterRemoveRequest,
     game_server: CurrentGameServer,
 ) -> HomeRosterRemoveResponse:
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -329,7 +341,7 @@ async def home_item_move_to_inventory(
     game_server: CurrentGameServer,
 ) -> HomeItemMoveToInventoryResponse:
     """将道具从储物箱移入随身背包。"""
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -363,7 +375,7 @@ async def home_item_move_to_storage(
     game_server: CurrentGameServer,
 ) -> HomeItemMoveToStorageResponse:
     """将道具从随身背包移入储物箱。"""
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -399,13 +411,16 @@ async def home_wear_costume(
         f"/api/home/costume/wear/v1/: user={payload.user_name} item={payload.item_name!r} target={payload.target_name!r}"
     )
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"找不到游戏房间: user={payload.user_name}",
         )
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         dbg_game = await _validate_player_at_home(payload.user_name, game_server)
         success, error_detail = activate_wear_costume(
             dbg_game, payload.item_name, payload.target_name
@@ -416,13 +431,14 @@ async def home_wear_costume(
                 detail=error_detail,
             )
 
-    wear_costume_task = game_server.create_task()
-    asyncio.create_task(
+    wear_costume_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        wear_costume_task,
         execute_home_pipeline_task(
             wear_costume_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建穿装任务: task_id={wear_costume_task.task_id}, user={payload.user_name}"
@@ -448,13 +464,16 @@ async def home_remove_costume(
         f"/api/home/costume/remove/v1/: user={payload.user_name} target={payload.target_name!r}"
     )
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"找不到游戏房间: user={payload.user_name}",
         )
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         dbg_game = await _validate_player_at_home(payload.user_name, game_server)
         success, error_detail = activate_remove_costume(dbg_game, payload.target_name)
         if not success:
@@ -463,13 +482,14 @@ async def home_remove_costume(
                 detail=error_detail,
             )
 
-    remove_costume_task = game_server.create_task()
-    asyncio.create_task(
+    remove_costume_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        remove_costume_task,
         execute_home_pipeline_task(
             remove_costume_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建脱装任务: task_id={remove_costume_task.task_id}, user={payload.user_name}"
@@ -499,7 +519,7 @@ async def home_craft_item(
         f"/api/home/craft/item/v1/: user={payload.user_name} materials={payload.materials}"
     )
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -507,6 +527,9 @@ async def home_craft_item(
         )
 
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         dbg_game = await _validate_player_at_home(payload.user_name, game_server)
         success, error_detail = activate_craft_consumable(
             dbg_game, list(payload.materials)
@@ -517,13 +540,14 @@ async def home_craft_item(
                 detail=error_detail,
             )
 
-    craft_task = game_server.create_task()
-    asyncio.create_task(
+    craft_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        craft_task,
         execute_home_craft_pipeline_task(
             craft_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建制造工坊任务: task_id={craft_task.task_id}, user={payload.user_name}"
@@ -549,7 +573,7 @@ async def home_craft_gear_item(
         f"/api/home/craft/gear/v1/: user={payload.user_name} materials={payload.materials}"
     )
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -557,6 +581,9 @@ async def home_craft_gear_item(
         )
 
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         dbg_game = await _validate_player_at_home(payload.user_name, game_server)
         success, error_detail = activate_craft_gear_item(
             dbg_game, list(payload.materials)
@@ -567,13 +594,14 @@ async def home_craft_gear_item(
                 detail=error_detail,
             )
 
-    craft_task = game_server.create_task()
-    asyncio.create_task(
+    craft_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        craft_task,
         execute_home_craft_pipeline_task(
             craft_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建工坊锻造任务: task_id={craft_task.task_id}, user={payload.user_name}"
@@ -599,7 +627,7 @@ async def home_craft_costume_item(
         f"/api/home/craft/costume/v1/: user={payload.user_name} materials={payload.materials}"
     )
 
-    current_room = game_server.get_room(payload.user_name)
+    current_room = await game_server.acquire_room(payload.user_name)
     if current_room is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -607,6 +635,9 @@ async def home_craft_costume_item(
         )
 
     async with current_room._lock:
+
+        # 进行中的任务达到上限时拒绝新任务
+        ensure_task_capacity(game_server, payload.user_name)
         dbg_game = await _validate_player_at_home(payload.user_name, game_server)
         success, error_detail = activate_craft_costume_item(
             dbg_game, list(payload.materials)
@@ -617,13 +648,14 @@ async def home_craft_costume_item(
                 detail=error_detail,
             )
 
-    craft_task = game_server.create_task()
-    asyncio.create_task(
+    craft_task = game_server.create_task(payload.user_name)
+    game_server.run_task(
+        craft_task,
         execute_home_craft_pipeline_task(
             craft_task.task_id,
             payload.user_name,
             game_server,
-        )
+        ),
     )
     logger.info(
         f"📝 创建工坊制衣任务: task_id={craft_task.task_id}, user={payload.user_name}"
@@ -2,13 +2,11 @@
 家园后台任务模块
 """
 
-from datetime import datetime
 from fastapi import HTTPException, status
 from loguru import logger
 from ..game.dbg_game import DBGGame
 from ..game.dbg_store import store_game
 from ..game.game_server import GameServer
-from ..models import TaskStatus
 
 
 ###################################################################################################################################################################
@@ -30,7 +28,7 @@ async def _validate_player_at_home(
         )
 
     # 获取房间实例并检查游戏是否存在
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "_validate_player_at_home: room instance is None"
     if current_room._dbg_game is None:
         raise HTTPException(
@@ -63,7 +61,7 @@ async def execute_dungeon_generate_pipeline_task(
             f"🚀 dungeon generate pipeline 任务开始: task_id={task_id}, user={user_name}"
         )
 
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -77,10 +75,7 @@ async def execute_dungeon_generate_pipeline_task(
             # 存档当前世界状态，便于调试和回放
             store_game(rpg_game)
 
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(
             f"✅ dungeon generate pipeline 任务完成: task_id={task_id}, user={user_name}"
@@ -90,11 +85,7 @@ async def execute_dungeon_generate_pipeline_task(
         logger.error(
             f"❌ dungeon generate pipeline 任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -109,7 +100,7 @@ async def execute_home_pipeline_task(
     try:
         logger.info(f"🚀 home pipeline 任务开始: task_id={task_id}, user={user_name}")
 
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -123,10 +114,7 @@ async def execute_home_pipeline_task(
             # 存档当前世界状态，便于调试和回放
             store_game(rpg_game)
 
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(f"✅ home pipeline 任务完成: task_id={task_id}, user={user_name}")
 
@@ -134,11 +122,7 @@ async def execute_home_pipeline_task(
         logger.error(
             f"❌ home pipeline 任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -155,7 +139,7 @@ async def execute_home_craft_pipeline_task(
             f"🚀 home craft pipeline 任务开始: task_id={task_id}, user={user_name}"
         )
 
-        current_room = game_server.get_room(user_name)
+        current_room = await game_server.acquire_room(user_name)
         if current_room is None:
             raise ValueError(f"游戏实例不存在: user={user_name}")
 
@@ -169,10 +153,7 @@ async def execute_home_craft_pipeline_task(
             # 存档当前世界状态，便于调试和回放
             store_game(rpg_game)
 
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.COMPLETED
-            task_record.end_time = datetime.now().isoformat()
+        game_server.complete_task(task_id)
 
         logger.info(
             f"✅ home craft pipeline 任务完成: task_id={task_id}, user={user_name}"
@@ -182,11 +163,7 @@ async def execute_home_craft_pipeline_task(
         logger.error(
             f"❌ home craft pipeline 任务失败: task_id={task_id}, user={user_name}, error={e}"
         )
-        task_record = game_server.get_task(task_id)
-        if task_record is not None:
-            task_record.status = TaskStatus.FAILED
-            task_record.error = str(e)
-            task_record.end_time = datetime.now().isoformat()
+        game_server.fail_task(task_id, str(e))
 
 
 ###################################################################################################################################################################
@@ -57,6 +57,7 @@ async def new_game(
     # 获取房间实例
     room = game_server.get_room(payload.user_name)
     assert room is not None, "new_game: room instance is None"
+    room.touch()
 
     # 从 BLUEPRINTS_DIR 加载蓝图 JSON 文件
     blueprint_path = BLUEPRINTS_DIR / f"{payload.game_name}.json"
@@ -69,6 +70,9 @@ async def new_game(
         blueprint_path.read_text(encoding="utf-8")
     )
 
+    # 新游戏覆盖休眠中的旧游戏（旧存档保留在磁盘上）
+    room._hibernated_archiver = None
+
     # 创建玩家客户端
     room._player_session = PlayerSession(
         name=payload.user_name,
@@ -0,0 +1,76 @@
+"""流程管道剖析调试服务模块"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from loguru import logger
+
+from ..game.pipeline_profiler import pipeline_profiler
+from ..models import (
+    PipelineProfileResponse,
+    PipelineProfileToggleRequest,
+)
+
+###################################################################################################################################################################
+pipeline_profile_api_router = APIRouter()
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@pipeline_profile_api_router.post(
+    path="/api/debug/pipeline-profile/v1/toggle",
+    response_model=PipelineProfileResponse,
+)
+async def toggle_pipeline_profile(
+    payload: PipelineProfileToggleRequest,
+) -> PipelineProfileResponse:
+    """运行时开关流程管道剖析"""
+
+    logger.info(f"toggle_pipeline_profile: {payload}")
+
+    if payload.enabled:
+        pipeline_profiler.enable(pipeline_profiler.output_dir, keep=payload.keep)
+    else:
+        pipeline_profiler.disable()
+
+    return PipelineProfileResponse(enabled=pipeline_profiler.enabled, profiles=[])
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@pipeline_profile_api_router.get(
+    path="/api/debug/pipeline-profile/v1/recent",
+    response_model=PipelineProfileResponse,
+)
+async def get_recent_pipeline_profiles(
+    user_name: Optional[str] = Query(default=None),
+) -> PipelineProfileResponse:
+    """查询最近的剖析结果（可按玩家过滤）"""
+
+    profiles = [
+        profile
+        for profile in pipeline_profiler.recent
+        if user_name is None or profile.user == user_name
+    ]
+    return PipelineProfileResponse(enabled=pipeline_profiler.enabled, profiles=profiles)
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@pipeline_profile_api_router.get(path="/api/debug/pipeline-profile/v1/trace")
+async def get_pipeline_chrome_trace(
+    user_name: Optional[str] = Query(default=None),
+) -> Dict[str, Any]:
+    """以 Chrome trace JSON 返回最近一次剖析结果（chrome://tracing 或 ui.perfetto.dev 打开）"""
+
+    for profile in reversed(pipeline_profiler.recent):
+        if user_name is None or profile.user == user_name:
+            return profile.to_chrome_trace()
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="没有剖析结果",
+    )
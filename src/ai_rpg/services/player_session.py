@@ -1,12 +1,13 @@
 """玩家会话消息服务模块"""
 
 import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from loguru import logger
 from ..models import (
+    PlayerSession,
     SessionMessageResponse,
 )
 from .game_server_dependencies import CurrentGameServer
@@ -44,7 +45,7 @@ async def get_session_messages(
         )
 
     # 获取房间实例并检查游戏是否存在
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "get_session_messages: room instance is None"
 
     # 获取 DBG 游戏实例
@@ -65,8 +66,16 @@ async def get_session_messages(
             detail="游戏名称不匹配",
         )
 
-    # 根据游戏类型获取增量消息
-    messages = rpg_game._player_session.get_messages_since(last_sequence_id)
+    # 根据游戏类型获取增量消息（已移出内存的旧消息在工作线程中从存档文件读取）
+    player_session = rpg_game._player_session
+    messages = []
+    if player_session.has_spilled_since(last_sequence_id):
+        messages = await asyncio.to_thread(
+            player_session.read_spilled_messages, last_sequence_id
+        )
+        if messages:
+            last_sequence_id = messages[-1].sequence_id
+    messages.extend(player_session.get_messages_since(last_sequence_id))
     return SessionMessageResponse(session_messages=messages)
 
 
@@ -81,12 +90,21 @@ async def stream_session_messages(
     user_name: str,
     game_name: str,
     last_sequence_id: int = Query(..., alias="last_sequence_id"),
-    interval: float = Query(default=0.3, ge=0.1, le=5.0),
+    heartbeat_seconds: float = Query(default=15.0, ge=1.0, le=60.0),
 ) -> StreamingResponse:
-    """SSE 端点：持续推送玩家会话新消息。"""
+    """SSE 端点：持续推送玩家会话新消息。
+
+    会话消息以默认事件（data:）推送；LLM 生成中的增量文本以 `event: stream_delta`
+    推送，只包含连接建立之后产生的增量，不支持断线补发。
+
+    新消息与增量到达时由 PlayerSession.notifier 唤醒并立即推送；无变化期间不轮询，
+    每 heartbeat_seconds 发送一行 SSE 注释保活，同时检查房间与游戏是否仍然存在。
+    """
 
     async def event_generator() -> AsyncGenerator[str, None]:
         current_last_id = last_sequence_id
+        current_stream_id = -1
+        current_session: Optional[PlayerSession] = None
         while True:
             if not game_server.has_room(user_name):
                 logger.warning(
@@ -96,14 +114,48 @@ async def stream_session_messages(
             current_room = game_server.get_room(user_name)
             if current_room is None:
                 return
+            # 先记下版本号再检查休眠状态，检查之后的恢复会立即唤醒
+            restore_version = current_room._restore_notifier.version
+            if current_room.is_hibernated:
+                # 游戏休眠中：保持连接，下一个请求恢复游戏后立即继续推送（不因推送连接而恢复游戏）
+                if not await current_room._restore_notifier.wait(
+                    restore_version, heartbeat_seconds
+                ):
+                    yield ": keep-alive\n\n"
+                continue
             rpg_game = current_room._dbg_game
             if rpg_game is None or rpg_game.name != game_name:
                 return
-            messages = rpg_game._player_session.get_messages_since(current_last_id)
+            player_session = rpg_game._player_session
+            if player_session is not current_session:
+                # 首次连接或游戏从休眠恢复（新的会话对象，流式增量序号重新计数）
+                current_session = player_session
+                current_stream_id = player_session.stream_sequence
+
+            # 先记下版本号再读取，读取之后到达的消息会在下一轮立即唤醒
+            notifier = player_session.notifier
+            version = notifier.version
+
+            # 先推送流式增量，再推送完整消息，保证完整消息总在其增量之后到达
+            for delta in player_session.get_stream_deltas_since(current_stream_id):
+                current_stream_id = delta.sequence_id
+                yield f"event: stream_delta\ndata: {delta.model_dump_json()}\n\n"
+
+            # 落后于内存窗口的客户端先补读存档文件中的旧消息
+            if player_session.has_spilled_since(current_last_id):
+                for msg in await asyncio.to_thread(
+                    player_session.read_spilled_messages, current_last_id
+                ):
+                    current_last_id = msg.sequence_id
+                    yield f"data: {msg.model_dump_json()}\n\n"
+
+            messages = player_session.get_messages_since(current_last_id)
             for msg in messages:
                 if msg.sequence_id > current_last_id:
                     current_last_id = msg.sequence_id
                 yield f"data: {msg.model_dump_json()}\n\n"
-            await asyncio.sleep(interval)
+
+            if not await notifier.wait(version, heartbeat_seconds):
+                yield ": keep-alive\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -36,7 +36,7 @@ async def get_stages_state(
         )
 
     # 获取房间实例
-    current_room = game_server.get_room(user_name)
+    current_room = await game_server.acquire_room(user_name)
     assert current_room is not None, "get_stages_state: room instance is None"
 
     # 根据游戏类型获取游戏实例
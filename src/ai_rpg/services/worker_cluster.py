@@ -0,0 +1,84 @@
+"""分片部署的 worker 端服务模块
+
+供前端路由（worker_router）调用：健康检查，以及玩家迁移时的房间释放与领养。
+前端路由不会把客户端对 /api/cluster/ 的请求转发到 worker。
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from loguru import logger
+
+from ..models import (
+    RoomAdoptRequest,
+    RoomMigrationRequest,
+    RoomMigrationResponse,
+    WorkerHealthResponse,
+)
+from .game_server_dependencies import CurrentGameServer
+
+###################################################################################################################################################################
+worker_cluster_api_router = APIRouter()
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@worker_cluster_api_router.get(
+    path="/api/cluster/v1/health", response_model=WorkerHealthResponse
+)
+async def worker_health(game_server: CurrentGameServer) -> WorkerHealthResponse:
+    """worker 健康检查"""
+    return WorkerHealthResponse(
+        worker_id=game_server.worker_id,
+        boot_id=game_server.boot_id,
+        rooms=game_server.room_count,
+        resident_rooms=game_server.resident_room_count,
+    )
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@worker_cluster_api_router.post(
+    path="/api/cluster/v1/release", response_model=RoomMigrationResponse
+)
+async def release_room(
+    payload: RoomMigrationRequest,
+    game_server: CurrentGameServer,
+) -> RoomMigrationResponse:
+    """把玩家的房间写入存档后释放（等待进行中的请求与管道结束）"""
+
+    logger.info(f"/api/cluster/v1/release: {payload.model_dump_json()}")
+
+    had_room = game_server.has_room(payload.user_name)
+    if not await game_server.release_room(payload.user_name):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"release: {payload.user_name} 房间存档失败，未释放",
+        )
+    return RoomMigrationResponse(
+        user_name=payload.user_name,
+        changed=had_room,
+        message=f"release: {payload.user_name} {'已释放' if had_room else '没有房间'}",
+    )
+
+
+###################################################################################################################################################################
+###################################################################################################################################################################
+###################################################################################################################################################################
+@worker_cluster_api_router.post(
+    path="/api/cluster/v1/adopt", response_model=RoomMigrationResponse
+)
+async def adopt_room(
+    payload: RoomAdoptRequest,
+    game_server: CurrentGameServer,
+) -> RoomMigrationResponse:
+    """从玩家最近的存档领养房间（没有存档时不做任何事；房间已存在时仅在 replace 为 True 时丢弃后领养）"""
+
+    logger.info(f"/api/cluster/v1/adopt: {payload.model_dump_json()}")
+
+    adopted = await game_server.adopt_room(payload.user_name, payload.replace)
+    return RoomMigrationResponse(
+        user_name=payload.user_name,
+        changed=adopted,
+        message=f"adopt: {payload.user_name} {'已从存档领养' if adopted else '无需领养'}",
+    )
@@ -0,0 +1,550 @@
+"""分片部署的前端路由
+
+前端路由监听对外端口，把每个请求转发给所属的游戏服务器 worker（scripts/run_game_router.py 启动）：
+
+- 按玩家路由：从路径（/api/session_messages/v1/{user_name}/... 等）、查询参数或 JSON 请求体中取出
+  user_name，按一致性哈希（WorkerRing）转发到所属 worker；响应（包括 SSE）以流式原样回传；
+- 按任务路由：只带任务 ID 的请求按任务 ID 的 worker 前缀转发，批量状态查询按 worker 分组后合并；
+- 其余请求（蓝图列表、静态图片等）按路径哈希转发到任一存活的 worker；流程管道剖析开关广播到全部 worker；
+- 迁移：定期检查 worker 健康与 boot_id。玩家的所属 worker 变化（worker 下线、恢复或重启）后的第一个请求，
+  先让其他存活 worker 把该玩家的房间写入存档并释放，再让新 worker 从 .worlds 存档领养，之后才转发；
+  新 worker 上残留的房间（例如错过健康检查但未重启，期间玩家由其他 worker 服务）已过期，领养时不写存档直接丢弃；
+  释放失败时返回 503，客户端稍后重试。worker 崩溃时，迁移从其最近一次写入的存档恢复。
+- 连接：转发（含 SSE 长连接）与健康检查、迁移使用各自的连接池，长连接再多也不会让健康检查排队超时；
+  转发时只有连接失败才把 worker 视为下线，读取或排队超时只让本次请求失败（504）。
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import unquote
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from ..game.worker_shard import WorkerRing, WorkerShardConfig, task_worker_id
+from ..models import RoomMigrationResponse, WorkerHealthResponse
+
+# 路径中紧跟 user_name 的前缀
+_USER_PATH_PREFIXES: Tuple[str, ...] = (
+    "/api/session_messages/v1/",
+    "/api/dungeons/v1/",
+    "/api/entities/v1/",
+    "/api/stages/v1/",
+    "/api/tasks/v1/user/",
+)
+_TASK_WATCH_PREFIX = "/api/tasks/v1/watch/"
+_TASK_STATUS_PATH = "/api/tasks/v1/status"
+_CLUSTER_PREFIX = "/api/cluster/"
+# 作用于进程全局状态、需要广播到全部 worker 的请求
+_BROADCAST_PATHS: Tuple[str, ...] = ("/api/debug/pipeline-profile/v1/toggle",)
+
+# 不转发的逐跳头部
+_HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+        "host",
+    }
+)
+
+
+###############################################################################################################################################
+class RouteKey(NamedTuple):
+    """请求的路由依据"""
+
+    user_name: Optional[str] = None
+    task_id: Optional[str] = None
+
+
+###############################################################################################################################################
+def route_key(
+    path: str, query: Mapping[str, str], body: bytes, content_type: str = ""
+) -> RouteKey:
+    """从请求路径、查询参数与 JSON 请求体中取出路由依据"""
+    for prefix in _USER_PATH_PREFIXES:
+        if path.startswith(prefix):
+            user_name = path[len(prefix) :].split("/", 1)[0]
+            if user_name:
+                return RouteKey(user_name=unquote(user_name))
+
+    if path.startswith(_TASK_WATCH_PREFIX):
+        task_id = path[len(_TASK_WATCH_PREFIX) :].split("/", 1)[0]
+        if task_id:
+            return RouteKey(task_id=unquote(task_id))
+
+    query_user_name = query.get("user_name")
+    if query_user_name:
+        return RouteKey(user_name=query_user_name)
+
+    if body and content_type.startswith("application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return RouteKey()
+        if isinstance(payload, dict) and isinstance(payload.get("user_name"), str):
+            return RouteKey(user_name=payload["user_name"] or None)
+
+    return RouteKey()
+
+
+###############################################################################################################################################
+class WorkerRouterStats(BaseModel):
+    """前端路由计数"""
+
+    forwarded: int = 0  # 转发的请求数
+    migrations: int = 0  # 玩家迁移（含首次放置）次数
+    migration_failed: int = 0  # 因旧 worker 未能释放房间而返回 503 的次数
+    unavailable: int = 0  # 没有可用 worker 或 worker 连接失败的次数
+    worker_restarts: int = 0  # 检测到的 worker 重启次数
+    placements_evicted: int = 0  # 超出 max_placements 被淘汰的玩家放置数
+
+
+###############################################################################################################################################
+class _MigrationLock:
+    """玩家的迁移锁，记录正在使用（持有或等待）的请求数，无人使用时从路由中移除"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.users: int = 0
+
+
+###############################################################################################################################################
+class WorkerRouter:
+    """按玩家把请求转发到所属 worker，并在归属变化时迁移房间"""
+
+    def __init__(
+        self,
+        config: WorkerShardConfig,
+        client: Optional[httpx.AsyncClient] = None,
+        control_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        assert len(config.workers) > 0, "WorkerRouter: no workers configured"
+        self._config: WorkerShardConfig = config
+        self._ring: WorkerRing = WorkerRing(list(config.workers), config.replicas)
+        # 转发客户端请求：SSE 长连接各占一个连接，不限制连接数，读取不超时
+        self._client: httpx.AsyncClient = (
+            client
+            if client is not None
+            else httpx.AsyncClient(
+                timeout=httpx.Timeout(connect=10.0, read=None, write=30.0, pool=None),
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=64),
+            )
+        )
+        # 健康检查与房间迁移使用独立的连接池，不会因客户端连接过多而排队超时，把健康的 worker 误判为下线
+        self._control_client: httpx.AsyncClient = (
+            control_client
+            if control_client is not None
+            else (
+                client
+                if client is not None
+                else httpx.AsyncClient(
+                    timeout=httpx.Timeout(10.0),
+                    limits=httpx.Limits(
+                        max_connections=4 * len(config.workers) + 16,
+                        max_keepalive_connections=2 * len(config.workers),
+                    ),
+                )
+            )
+        )
+        # 存活 worker 的 boot_id（健康检查更新）
+        self._alive: Dict[str, str] = {}
+        # 玩家最近一次放置的 (worker_id, boot_id)；与当前归属不一致时需要迁移。
+        # 按最近访问排序，超出 max_placements 时淘汰最久未访问的玩家（之后的请求重新迁移一次，
+        # 其他 worker 释放房间时会报告变化，新 worker 仍会丢弃过期房间）
+        self._placements: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        # 每玩家迁移锁，同一玩家的并发请求只迁移一次；迁移结束且无人等待时移除
+        self._migration_locks: Dict[str, _MigrationLock] = {}
+        self._stats: WorkerRouterStats = WorkerRouterStats()
+        self._health_task: Optional["asyncio.Task[None]"] = None
+
+    ###############################################################################################################################################
+    @property
+    def stats(self) -> WorkerRouterStats:
+        """前端路由计数（返回副本）"""
+        return self._stats.model_copy()
+
+    ###############################################################################################################################################
+    @property
+    def alive_workers(self) -> Dict[str, str]:
+        """存活 worker 及其 boot_id"""
+        return dict(self._alive)
+
+    ###############################################################################################################################################
+    def owner(self, user_name: str) -> Optional[str]:
+        """玩家当前所属的存活 worker"""
+        return self._ring.owner(user_name, alive=self._alive)
+
+    ###############################################################################################################################################
+    async def start(self) -> None:
+        """检查一次 worker 健康后开始定期检查"""
+        await self.check_health()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    ###############################################################################################################################################
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        await self._client.aclose()
+        if self._control_client is not self._client:
+            await self._control_client.aclose()
+        logger.info(f"WorkerRouter closed: stats = {self._stats}")
+
+    ###############################################################################################################################################
+    async def check_health(self) -> None:
+        """并发检查全部 worker 的健康与 boot_id"""
+        worker_ids = list(self._config.workers)
+        results = await asyncio.gather(
+            *(self._fetch_health(worker_id) for worker_id in worker_ids)
+        )
+        for worker_id, health in zip(worker_ids, results):
+            previous = self._alive.get(worker_id)
+            if health is None:
+                if previous is not None:
+                    logger.warning(f"worker 下线: {worker_id}")
+                    del self._alive[worker_id]
+                continue
+            if previous is None:
+                logger.info(f"worker 上线: {worker_id}, boot_id = {health.boot_id}")
+            elif previous != health.boot_id:
+                logger.warning(f"worker 已重启: {worker_id}")
+                self._stats.worker_restarts += 1
+            self._alive[worker_id] = health.boot_id
+
+    ###############################################################################################################################################
+    async def _fetch_health(self, worker_id: str) -> Optional[WorkerHealthResponse]:
+        url = f"{self._config.workers[worker_id]}/api/cluster/v1/health"
+        try:
+            response = await self._control_client.get(
+                url, timeout=self._config.health_interval_seconds
+            )
+            response.raise_for_status()
+            return WorkerHealthResponse.model_validate_json(response.content)
+        except Exception as e:
+            logger.debug(f"worker 健康检查失败: {worker_id}, error = {e}")
+            return None
+
+    ###############################################################################################################################################
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.health_interval_seconds)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"worker 健康检查失败: {e}")
+
+    ###############################################################################################################################################
+    async def place(self, user_name: str) -> str:
+        """返回玩家所属的 worker；归属变化后先迁移房间。没有可用 worker 或迁移失败时抛出 503"""
+        worker_id = self._require_owner(user_name)
+        if self._placements.get(user_name) == (worker_id, self._alive[worker_id]):
+            self._placements.move_to_end(user_name)
+            return worker_id
+
+        migration_lock = self._migration_locks.get(user_name)
+        if migration_lock is None:
+            migration_lock = self._migration_locks[user_name] = _MigrationLock()
+        migration_lock.users += 1
+        try:
+            async with migration_lock.lock:
+                return await self._migrate_user(user_name)
+        finally:
+            migration_lock.users -= 1
+            if migration_lock.users == 0:
+                del self._migration_locks[user_name]
+
+    ###############################################################################################################################################
+    async def _migrate_user(self, user_name: str) -> str:
+        """持有玩家迁移锁时调用：需要时把房间迁移到所属 worker 并记录放置"""
+        # 等锁期间可能已由其他请求完成迁移，或归属再次变化
+        worker_id = self._require_owner(user_name)
+        placement = (worker_id, self._alive[worker_id])
+        if self._placements.get(user_name) == placement:
+            return worker_id
+
+        self._stats.migrations += 1
+        previous = self._placements.get(user_name)
+        others = [other for other in self._alive if other != worker_id]
+        released = await asyncio.gather(
+            *(
+                self._migrate(other, "release", {"user_name": user_name})
+                for other in others
+            )
+        )
+        # 玩家期间由其他 worker 服务过（例如该 worker 错过健康检查后以同一 boot_id 恢复），
+        # 或其他 worker 刚释放了房间：最新进度在存档中，新 worker 上残留的房间已过期，须丢弃
+        replace = (previous is not None and previous[0] != worker_id) or any(
+            response is not None and response.changed for response in released
+        )
+        if any(response is None for response in released) or (
+            await self._migrate(
+                worker_id, "adopt", {"user_name": user_name, "replace": replace}
+            )
+            is None
+        ):
+            self._stats.migration_failed += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"{user_name} 的房间正在迁移，请稍后重试",
+            )
+
+        self._placements[user_name] = placement
+        self._placements.move_to_end(user_name)
+        while len(self._placements) > self._config.max_placements:
+            self._placements.popitem(last=False)
+            self._stats.placements_evicted += 1
+        logger.info(
+            f"玩家已放置: user = {user_name}, worker = {worker_id}, previous = {previous}"
+        )
+        return worker_id
+
+    ###############################################################################################################################################
+    def _require_owner(self, user_name: str) -> str:
+        worker_id = self.owner(user_name)
+        if worker_id is None:
+            self._stats.unavailable += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="没有可用的游戏服务器 worker",
+            )
+        return worker_id
+
+    ###############################################################################################################################################
+    async def _migrate(
+        self, worker_id: str, action: str, payload: Dict[str, object]
+    ) -> Optional[RoomMigrationResponse]:
+        """调用 worker 的 release / adopt 端点，失败时返回 None"""
+        url = f"{self._config.workers[worker_id]}/api/cluster/v1/{action}"
+        try:
+            response = await self._control_client.post(
+                url, json=payload, timeout=self._config.release_timeout_seconds
+            )
+        except Exception as e:
+            logger.error(f"{action} 失败: worker = {worker_id}, {payload}, {e}")
+            return None
+        if response.status_code != status.HTTP_200_OK:
+            logger.error(
+                f"{action} 失败: worker = {worker_id}, {payload}, "
+                f"status = {response.status_code}, body = {response.text}"
+            )
+            return None
+        return RoomMigrationResponse.model_validate_json(response.content)
+
+    ###############################################################################################################################################
+    async def forward(self, request: Request) -> Response:
+        """把客户端请求转发到所属 worker"""
+        path = request.url.path
+        if path.startswith(_CLUSTER_PREFIX):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if path == _TASK_STATUS_PATH:
+            return await self._forward_task_status(request)
+
+        body = await request.body()
+        if path in _BROADCAST_PATHS:
+            return await self._broadcast(request, body)
+
+        key = route_key(
+            path,
+            request.query_params,
+            body,
+            request.headers.get("content-type", ""),
+        )
+        task_worker = task_worker_id(key.task_id) if key.task_id is not None else None
+        if key.user_name is not None:
+            worker_id = await self.place(key.user_name)
+        elif task_worker is not None:
+            worker_id = task_worker
+            if worker_id not in self._alive:
+                self._stats.unavailable += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"任务所在的 worker 不可用: {worker_id}",
+                )
+        else:
+            worker_id = self._require_owner(path)
+
+        return await self._send(worker_id, request, body)
+
+    ###############################################################################################################################################
+    async def _send(self, worker_id: str, request: Request, body: bytes) -> Response:
+        """转发请求并以流式回传响应（SSE 连接在客户端或 worker 任一端关闭时结束）"""
+        url = httpx.URL(
+            f"{self._config.workers[worker_id]}{request.url.path}",
+            query=request.url.query.encode("utf-8"),
+        )
+        upstream_request = self._client.build_request(
+            request.method,
+            url,
+            content=body,
+            headers=_forward_headers(request.headers.items()),
+        )
+        try:
+            upstream = await self._client.send(upstream_request, stream=True)
+        except httpx.ConnectError as e:
+            logger.error(f"转发失败: worker = {worker_id}, error = {e}")
+            # 连接被拒绝：在下一次健康检查之前不再向该 worker 转发
+            self._alive.pop(worker_id, None)
+            self._stats.unavailable += 1
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"游戏服务器 worker 不可用: {worker_id}",
+            )
+        except httpx.TransportError as e:
+            # 超时等其他错误只让本次请求失败，worker 是否存活由健康检查判断
+            logger.error(f"转发失败: worker = {worker_id}, error = {e!r}")
+            self._stats.unavailable += 1
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"游戏服务器 worker 响应超时: {worker_id}",
+            )
+
+        self._stats.forwarded += 1
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers=dict(_forward_headers(upstream.headers.multi_items())),
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    ###############################################################################################################################################
+    async def _broadcast(self, request: Request, body: bytes) -> Response:
+        """把请求发送到全部存活 worker，返回第一个 worker 的响应"""
+        if not self._alive:
+            self._require_owner(request.url.path)  # 没有存活 worker：抛出 503
+        responses = await asyncio.gather(
+            *(
+                self._client.request(
+                    request.method,
+                    f"{self._config.workers[worker_id]}{request.url.path}",
+                    content=body,
+                    headers=_forward_headers(request.headers.items()),
+                )
+                for worker_id in sorted(self._alive)
+            ),
+            return_exceptions=True,
+        )
+        for response in responses:
+            if isinstance(response, httpx.Response):
+                self._stats.forwarded += 1
+                return Response(
+                    content=response.content,
+                    status_code=response.status_code,
+                    media_type=response.headers.get("content-type"),
+                )
+        self._stats.unavailable += 1
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="游戏服务器 worker 不可用",
+        )
+
+    ###############################################################################################################################################
+    async def _forward_task_status(self, request: Request) -> Response:
+        """批量任务状态查询：按任务 ID 的 worker 前缀分组查询后按请求顺序合并（没有前缀的任务 ID 查询全部 worker）"""
+        task_ids = request.query_params.getlist("task_ids")
+        if len(task_ids) == 0 or task_ids[0] == "":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="请提供至少一个任务ID",
+            )
+
+        groups: Dict[str, List[str]] = {}
+        for task_id in task_ids:
+            owner = task_worker_id(task_id)
+            targets = [owner] if owner is not None else list(self._alive)
+            for worker_id in targets:
+                if worker_id in self._alive:
+                    groups.setdefault(worker_id, []).append(task_id)
+
+        results = await asyncio.gather(
+            *(
+                self._client.get(
+                    f"{self._config.workers[worker_id]}{_TASK_STATUS_PATH}",
+                    params=[("task_ids", task_id) for task_id in ids],
+                )
+                for worker_id, ids in groups.items()
+            ),
+            return_exceptions=True,
+        )
+        found: Dict[str, object] = {}
+        for result in results:
+            if isinstance(result, httpx.Response) and result.status_code == 200:
+                for task in result.json().get("tasks", []):
+                    found[task["task_id"]] = task
+        self._stats.forwarded += 1
+        return JSONResponse(
+            {"tasks": [found[task_id] for task_id in task_ids if task_id in found]}
+        )
+
+
+###############################################################################################################################################
+def _forward_headers(headers: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """去掉逐跳头部"""
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in _HOP_BY_HOP_HEADERS
+    ]
+
+
+###############################################################################################################################################
+def create_worker_router_app(
+    config: WorkerShardConfig,
+    client: Optional[httpx.AsyncClient] = None,
+    control_client: Optional[httpx.AsyncClient] = None,
+) -> FastAPI:
+    """创建前端路由应用：/api/cluster/v1/router 查看 worker 状态，其余请求全部转发"""
+    worker_router = WorkerRouter(config, client, control_client)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        await worker_router.start()
+        try:
+            yield
+        finally:
+            await worker_router.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.worker_router = worker_router
+
+    @app.get(path="/api/cluster/v1/router")
+    async def router_status() -> Dict[str, object]:
+        """前端路由状态：配置的 worker、存活 worker 与转发计数"""
+        return {
+            "workers": config.workers,
+            "alive": worker_router.alive_workers,
+            "stats": worker_router.stats.model_dump(),
+        }
+
+    @app.api_route(
+        path="/{path:path}",
+        methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"],
+    )
+    async def forward(request: Request) -> Response:
+        return await worker_router.forward(request)
+
+    return app
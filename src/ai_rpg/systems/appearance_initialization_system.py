@@ -6,6 +6,7 @@ from overrides import override
 from ..deepseek import DeepSeekClient, batch_chat
 from ..entitas import Entity, ExecuteProcessor, Matcher
 from ..game.dbg_game import DBGGame
+from ..game.rpg_agent_context import AGENT_CONTEXT_RESOURCE
 from ..models import (
     ActorComponent,
     AppearanceComponent,
@@ -24,6 +25,17 @@ from .appearance_prompt_builders import (
 class AppearanceInitializationSystem(ExecuteProcessor):
     """角色外观初始化系统"""
 
+    # 并发调度声明（见 entitas.ExecuteProcessor.reads / writes）
+    reads = frozenset(
+        {
+            ActorComponent,
+            AppearanceComponent,
+            WornCostumeComponent,
+            AGENT_CONTEXT_RESOURCE,
+        }
+    )
+    writes = frozenset({AppearanceComponent, AGENT_CONTEXT_RESOURCE})
+
     def __init__(self, game: DBGGame) -> None:
         self._game: Final[DBGGame] = game
 
@@ -75,6 +87,7 @@ class AppearanceInitializationSystem(ExecuteProcessor):
             name=entity.name,
             full_prompt=prompt,
             context=self._game.get_agent_context(entity).context,
+            cacheable=True,
         )
 
     #######################################################################################################################################
@@ -148,9 +148,13 @@ class CombatInitActorSystem(ExecuteProcessor):
             ), f"角色 {actor_entity.name} 已有 ExhaustPileComponent，理论上不应该出现这种情况！如果确实出现了，请检查之前的系统是否正确清理了旧牌堆。"
 
             # 强制初始化空的牌堆组件
-            actor_entity.replace(DrawPileComponent, actor_entity.name, [])
-            actor_entity.replace(DiscardPileComponent, actor_entity.name, [])
-            actor_entity.replace(ExhaustPileComponent, actor_entity.name, [])
+            actor_entity.replace(DrawPileComponent, actor_entity.name, [], trusted=True)
+            actor_entity.replace(
+                DiscardPileComponent, actor_entity.name, [], trusted=True
+            )
+            actor_entity.replace(
+                ExhaustPileComponent, actor_entity.name, [], trusted=True
+            )
             logger.debug(
                 f"[{actor_entity.name}] 战斗临时牌堆初始化完成（DrawPile / DiscardPile / ExhaustPile）"
             )
@@ -164,6 +168,7 @@ class CombatInitActorSystem(ExecuteProcessor):
                 StatusEffectsComponent,
                 actor_entity.name,
                 [],
+                trusted=True,
             )
             logger.debug(f"[{actor_entity.name}] 状态效果组件初始化完成（空）")
 
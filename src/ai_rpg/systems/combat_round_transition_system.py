@@ -128,7 +128,9 @@ class CombatRoundTransitionSystem(ExecuteProcessor):
             ), f"{actor.name} 已存在 RoundStatsComponent"
             assert not actor.has(DeathComponent), f"{actor.name} 已死亡，不应参与新回合"
             computed = compute_character_stats(actor)
-            actor.replace(RoundStatsComponent, actor.name, computed.energy)
+            actor.replace(
+                RoundStatsComponent, actor.name, computed.energy, trusted=True
+            )
 
         return new_round
 
@@ -0,0 +1,36 @@
+"""上下文压缩系统，在 pipeline 末端把超出 token 预算的 agent 上下文压缩回预算以内。"""
+
+from typing import Final, final, override
+
+from loguru import logger
+
+from ..entitas import ExecuteProcessor
+from ..game.context_budget import agent_context_budget
+from ..game.rpg_game import RPGGame
+
+
+@final
+class ContextCompactionSystem(ExecuteProcessor):
+    """上下文压缩系统。
+
+    每轮流程结束前检查全部 agent 的上下文 token 数，超出预算的按配置的压缩策略原地压缩。
+    预算未启用（agent_context_budget.enabled 为 False）时不做任何事。
+    """
+
+    ############################################################################################################
+    def __init__(self, game: RPGGame) -> None:
+        self._game: Final[RPGGame] = game
+
+    ############################################################################################################
+    @override
+    async def execute(self) -> None:
+        """压缩超出预算的 agent 上下文。"""
+        if not agent_context_budget.enabled:
+            return
+
+        results = await self._game.compact_agent_contexts()
+        if len(results) > 0:
+            logger.debug(
+                f"ContextCompactionSystem: 压缩了 {len(results)} 个 agent 的上下文, "
+                f"stats = {agent_context_budget.stats}"
+            )
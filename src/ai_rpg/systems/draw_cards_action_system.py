@@ -92,7 +92,7 @@ class DrawCardsActionSystem(ReactiveProcessor):
             logger.debug(
                 f"[{entity.name}] 抽取 {len(drawn)} 张：{[c.name for c in drawn]}"
             )
-            entity.replace(HandComponent, entity.name, drawn)
+            entity.replace(HandComponent, entity.name, drawn, trusted=True)
 
         # 标记本回合 DRAW 阶段已完成（后续 PostDrawCardsSystem 可能仍会异步调整手牌数值）
         last_round = self._game.current_dungeon_combat_room.combat.latest_round
@@ -247,6 +247,7 @@ class GenerateDeckActionSystem(ReactiveProcessor):
             full_prompt=prompt,
             condensed_prompt=condensed_prompt,
             context=self._game.get_agent_context(entity).context,
+            cacheable=True,
         )
 
     #######################################################################################################################################
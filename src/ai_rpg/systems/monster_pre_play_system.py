@@ -407,12 +407,13 @@ class MonsterPrePlaySystem(ReactiveProcessor):
             entity.replace(PassTurnAction, entity.name)
             return
 
-        # 替换 PlayCardsAction，填入真实卡牌和目标
+        # 替换 PlayCardsAction，填入真实卡牌和目标（均已校验，跳过重复验证）
         entity.replace(
             PlayCardsAction,
             entity.name,
             selected_card,
             valid_targets,
+            trusted=True,
         )
         logger.debug(
             f"MonsterPrePlaySystem: [{entity.name}] 决策出牌 '{selected_card.name}'，目标：{valid_targets}"
@@ -151,12 +151,14 @@ class PlayCardsArbitrationSystem(ReactiveProcessor):
         )
 
         # 初始化 DeepSeekClient，用于与 LLM 进行交互，传入生成的仲裁提示消息和精简提示消息（如果启用）
+        # 仲裁叙事较长，以流式模式请求，生成中的文本实时推送给玩家
         chat_client = DeepSeekClient(
             name=stage_entity.name,
             full_prompt=message,
             condensed_prompt=condensed_message,
             context=self._game.get_agent_context(stage_entity).context,
             timeout=60 * 2,
+            on_stream_chunk=self._game.create_stream_sink(stage_entity.name),
         )
 
         # 发起 LLM 请求，捕获异常以防止整个流程崩溃
@@ -8,9 +8,9 @@ from ..models import (
 )
 from loguru import logger
 from ..embedding_model import (
-    embedding_model,
+    embedding_encoder,
 )
-from ..rag import search_documents
+from ..rag import search_documents_batch
 from ..game.dbg_game import DBGGame
 
 
@@ -46,6 +46,21 @@ def _build_query_result_message(
 向量数据库中**目前**没有相关信息。"""
 
 
+#############################################################################################################################
+def _format_related_info(docs: List[str], scores: List[float]) -> str:
+    """将检索结果格式化为带相似度的编号列表，无结果时返回空字符串"""
+    if not docs:
+        logger.warning("⚠️ 未检索到任何相关文档，返回空结果")
+        return ""
+
+    result_parts = []
+    for i, (doc, score) in enumerate(zip(docs, scores), 1):
+        result_parts.append(f"{i}. [相似度: {score:.3f}] {doc}")
+
+    logger.success(f"🔍 RAG查询完成，共找到 {len(docs)} 条相关知识")
+    return "\n".join(result_parts)
+
+
 #####################################################################################################################################
 @final
 class QueryActionSystem(ReactiveProcessor):
@@ -68,62 +83,41 @@ class QueryActionSystem(ReactiveProcessor):
     #############################################################################################################################
     @override
     async def react(self, entities: List[Entity]) -> None:
+        questions: List[str] = []
         for entity in entities:
-            self._process_action(entity)
+            query_action = entity.get(QueryAction)
+            assert query_action is not None
+            questions.append(query_action.question)
+
+        # 同一帧的全部查询一次批量检索（向量化与数据库检索均不在事件循环线程执行）
+        logger.info(
+            f"📚 查询公共知识库（游戏: {self._game.name}），查询数: {len(questions)}"
+        )
+        results = await search_documents_batch(
+            queries=questions,
+            collection=self._game.name,
+            embedding_model=embedding_encoder,
+            top_k=self._top_k,
+        )
+
+        for entity, question, (docs, scores) in zip(entities, questions, results):
+            self._process_action(entity, question, _format_related_info(docs, scores))
 
     #############################################################################################################################
-    def _process_action(self, entity: Entity) -> None:
+    def _process_action(self, entity: Entity, question: str, related_info: str) -> None:
         """处理单个实体的查询行动。"""
-        query_action = entity.get(QueryAction)
-        assert query_action is not None
-
-        related_info = self._get_related_info(entity, query_action.question)
-        logger.success(f"🔎 角色发起查询行动，问题: {query_action.question}")
+        logger.success(f"🔎 角色发起查询行动，问题: {question}")
         logger.success(f"💭 角色记忆查询结果: {related_info}")
 
         # 构建并发送查询结果消息
         message = _build_query_result_message(
             actor=entity.name,
-            question=query_action.question,
+            question=question,
             related_info=related_info if related_info else None,
         )
 
         # 将查询结果作为系统消息发送给角色，供后续决策参考
         self._game.add_human_message(entity, HumanMessage(content=message))
 
-    ####################################################################################################################################
-    def _get_related_info(self, entity: Entity, original_message: str) -> str:
-        """对公共知识库执行语义检索，返回格式化的相似度结果字符串。"""
-        try:
-            logger.success(f"🔍 RAG检索: {original_message}")
-
-            # 查询公共知识库
-            logger.info(f"📚 查询公共知识库（游戏: {self._game.name}）...")
-            docs, scores = search_documents(
-                query=original_message,
-                collection=self._game.name,
-                embedding_model=embedding_model,
-                top_k=self._top_k,
-            )
-
-            # 检查查询结果
-            if not docs:
-                logger.warning("⚠️ 未检索到任何相关文档，返回空结果")
-                return ""
-
-            # 格式化结果
-            result_parts = []
-            for i, (doc, score) in enumerate(zip(docs, scores), 1):
-                result_parts.append(f"{i}. [相似度: {score:.3f}] {doc}")
-
-            query_result = "\n".join(result_parts)
-            logger.success(f"🔍 RAG查询完成，共找到 {len(docs)} 条相关知识")
-
-            return query_result
-
-        except Exception as e:
-            logger.error(f"❌ RAG查询失败: {e}")
-            return ""
-
 
 #####################################################################################################################################
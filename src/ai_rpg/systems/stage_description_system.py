@@ -8,7 +8,10 @@ from ..deepseek import DeepSeekClient, batch_chat
 from ..entitas import Entity, ExecuteProcessor, Matcher
 from ..game.dbg_game import DBGGame
 from ..game.rpg_actor_appearances import get_actor_appearances_in_stage
+from ..game.rpg_agent_context import AGENT_CONTEXT_RESOURCE
 from ..models import (
+    ActorComponent,
+    AppearanceComponent,
     StageComponent,
     StageDescriptionComponent,
 )
@@ -92,6 +95,19 @@ def _build_stage_description_prompt(
 class StageDescriptionSystem(ExecuteProcessor):
     """为场景实体生成环境描述，写入 StageDescriptionComponent.narrative。"""
 
+    # 并发调度声明（见 entitas.ExecuteProcessor.reads / writes）：
+    # 提示词包含场景内角色外观，因此与写 AppearanceComponent 的系统冲突
+    reads = frozenset(
+        {
+            StageComponent,
+            StageDescriptionComponent,
+            ActorComponent,
+            AppearanceComponent,
+            AGENT_CONTEXT_RESOURCE,
+        }
+    )
+    writes = frozenset({StageDescriptionComponent, AGENT_CONTEXT_RESOURCE})
+
     def __init__(
         self,
         game: DBGGame,
@@ -109,9 +125,18 @@ class StageDescriptionSystem(ExecuteProcessor):
             Matcher(all_of=[StageComponent], none_of=[StageDescriptionComponent])
         ).entities.copy()
 
+        # 玩家所在场景的描述以流式模式请求，生成中的文本实时推送给玩家
+        player_entity = self._game.get_player_entity()
+        player_stage_entity = (
+            self._game.resolve_stage_entity(player_entity)
+            if player_entity is not None
+            else None
+        )
+
         # 若没有需要生成环境描述的场景实体，则直接返回
         chat_clients: List[DeepSeekClient] = [
-            self._build_client(stage_entity) for stage_entity in stage_entities
+            self._build_client(stage_entity, stream=stage_entity is player_stage_entity)
+            for stage_entity in stage_entities
         ]
 
         # 批量发送请求给 AI，等待所有响应完成
@@ -124,8 +149,8 @@ class StageDescriptionSystem(ExecuteProcessor):
             )
 
     #######################################################################################################################################
-    def _build_client(self, stage_entity: Entity) -> DeepSeekClient:
-        """为场景实体构建 DeepSeekClient。"""
+    def _build_client(self, stage_entity: Entity, stream: bool) -> DeepSeekClient:
+        """为场景实体构建 DeepSeekClient。stream 为 True 时把生成中的文本实时推送给玩家。"""
 
         actor_appearances: Dict[str, str] = get_actor_appearances_in_stage(
             self._game, stage_entity
@@ -140,6 +165,10 @@ class StageDescriptionSystem(ExecuteProcessor):
                 else None
             ),
             context=self._game.get_agent_context(stage_entity).context,
+            cacheable=True,
+            on_stream_chunk=(
+                self._game.create_stream_sink(stage_entity.name) if stream else None
+            ),
         )
 
     #######################################################################################################################################
@@ -156,7 +156,7 @@ async def stream_session_messages(
 ) -> AsyncGenerator[SessionMessage, None]:
     """通过 SSE 持续接收玩家会话新消息。
 
-    长连接方式替代轮询，服务端以 0.3s 为间隔推送新 SessionMessage。
+    长连接方式替代轮询，服务端在有新 SessionMessage 时立即推送（空闲时只发送保活注释行）。
     调用方通过 `async for` 消费，取消协程即可停止接收。
 
     Args:
@@ -252,7 +252,7 @@ async def watch_task_until_done(task_id: str, timeout_seconds: int = 120) -> Tas
         TaskRecord: 状态为 COMPLETED 的任务记录
 
     Raises:
-        TaskFailedError: 任务失败（status=FAILED 或服务端返回 error 字段）
+        TaskFailedError: 任务失败或被取消（status=FAILED/CANCELLED 或服务端返回 error 字段）
         TimeoutError: 等待超时
     """
     url = server_config.base_url + f"/api/tasks/v1/watch/{task_id}"
@@ -274,7 +274,7 @@ async def watch_task_until_done(task_id: str, timeout_seconds: int = 120) -> Tas
                     continue
                 data = json.loads(payload)
                 record = TaskRecord.model_validate(data)
-                if record.status == TaskStatus.FAILED:
+                if record.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
                     raise TaskFailedError(record.error or "未知错误")
                 if record.status == TaskStatus.COMPLETED:
                     return record
@@ -0,0 +1,171 @@
+"""
+pgvector 检索性能基准（需要本地 PostgreSQL + pgvector）
+
+对比三种检索路径：
+1. 旧实现：排序查询 SELECT * + 逐行 db.get 回表（N+1 次查询）
+2. search_vector_documents：单条排序查询直接返回内容 / 元数据 / 相似度
+3. search_vector_documents_batch：多个查询向量合并为一条 SQL
+"""
+
+import hashlib
+import time
+from typing import Any, Generator, List, Tuple, cast
+
+import numpy as np
+import pytest
+from loguru import logger
+from sqlalchemy import text
+
+from src.ai_rpg.pgsql.client import SessionLocal
+from src.ai_rpg.pgsql.vector_document import EMBEDDING_DIMENSION, VectorDocumentDB
+from src.ai_rpg.pgsql.vector_document_operations import (
+    save_vector_document,
+    search_similar_documents,
+    search_vector_documents,
+    search_vector_documents_batch,
+)
+
+BENCHMARK_COLLECTION = "benchmark_vector_search"
+DOCUMENT_COUNT = 500
+QUERY_COUNT = 16
+TOP_K = 5
+
+
+def _embedding(seed_text: str) -> List[float]:
+    """由文本哈希生成确定性的归一化向量"""
+    seed = int(hashlib.md5(seed_text.encode()).hexdigest(), 16) % (2**32)
+    rng = np.random.default_rng(seed)
+    vector = rng.standard_normal(EMBEDDING_DIMENSION)
+    return cast(List[float], (vector / np.linalg.norm(vector)).tolist())
+
+
+def _delete_collection() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("DELETE FROM vector_documents WHERE collection = :collection"),
+            {"collection": BENCHMARK_COLLECTION},
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _legacy_search(
+    query_embedding: List[float],
+) -> List[Tuple[VectorDocumentDB, float]]:
+    """旧实现：相似度计算两次 + 字符串拼接向量 + 逐行回表"""
+    db = SessionLocal()
+    try:
+        vector_str = "[" + ",".join(map(str, query_embedding)) + "]"
+        rows = db.execute(
+            text("""
+                SELECT *, (1 - (embedding <=> :query_vector)) as similarity
+                FROM vector_documents
+                WHERE embedding IS NOT NULL AND collection = :collection
+                    AND (1 - (embedding <=> :query_vector)) >= 0
+                ORDER BY embedding <=> :query_vector
+                LIMIT :limit
+                """),
+            {
+                "query_vector": vector_str,
+                "collection": BENCHMARK_COLLECTION,
+                "limit": TOP_K,
+            },
+        ).fetchall()
+        results = []
+        for row in rows:
+            doc = db.get(VectorDocumentDB, row.id)
+            if doc:
+                results.append((doc, float(row.similarity)))
+        return results
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def benchmark_collection() -> Generator[None, Any, None]:
+    from src.ai_rpg.pgsql.client import pgsql_ensure_database_tables
+
+    pgsql_ensure_database_tables()
+    _delete_collection()
+    for i in range(DOCUMENT_COUNT):
+        save_vector_document(
+            content=f"benchmark document {i}",
+            embedding=_embedding(f"doc-{i}"),
+            collection=BENCHMARK_COLLECTION,
+            metadata={"index": i},
+        )
+    yield
+    _delete_collection()
+
+
+@pytest.mark.integration
+@pytest.mark.database
+@pytest.mark.slow
+def test_search_paths_return_same_ranking(benchmark_collection: None) -> None:
+    """三种检索路径的排序结果一致"""
+    query = _embedding("query-0")
+
+    legacy = _legacy_search(query)
+    orm = search_similar_documents(
+        query,
+        limit=TOP_K,
+        collection_filter=BENCHMARK_COLLECTION,
+        similarity_threshold=-1.0,
+    )
+    single = search_vector_documents(
+        query,
+        limit=TOP_K,
+        collection_filter=BENCHMARK_COLLECTION,
+        similarity_threshold=-1.0,
+    )
+    batch = search_vector_documents_batch(
+        [query, _embedding("query-1")],
+        limit=TOP_K,
+        collection_filter=BENCHMARK_COLLECTION,
+        similarity_threshold=-1.0,
+    )
+
+    expected = [doc.content for doc, _ in legacy]
+    assert [doc.content for doc, _ in orm] == expected
+    assert [hit.content for hit in single] == expected
+    assert [hit.content for hit in batch[0]] == expected
+    assert len(batch[1]) == TOP_K
+    assert single[0].metadata is not None and "index" in single[0].metadata
+    for (_, legacy_score), hit in zip(legacy, single):
+        assert hit.similarity == pytest.approx(legacy_score, abs=1e-6)
+
+
+@pytest.mark.integration
+@pytest.mark.database
+@pytest.mark.slow
+def test_benchmark_search_latency(benchmark_collection: None) -> None:
+    """N 个查询的检索延迟：旧实现 vs 单查询 vs 单条 SQL 批量"""
+    queries = [_embedding(f"query-{i}") for i in range(QUERY_COUNT)]
+
+    start = time.perf_counter()
+    for query in queries:
+        _legacy_search(query)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        search_vector_documents(
+            query, limit=TOP_K, collection_filter=BENCHMARK_COLLECTION
+        )
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_vector_documents_batch(
+        queries, limit=TOP_K, collection_filter=BENCHMARK_COLLECTION
+    )
+    batch = time.perf_counter() - start
+
+    logger.info(
+        f"📊 {QUERY_COUNT} 个查询 x top{TOP_K}（{DOCUMENT_COUNT} 个文档）: "
+        f"legacy={legacy * 1e3:.1f}ms single={single * 1e3:.1f}ms "
+        f"batch={batch * 1e3:.1f}ms"
+    )
+    assert single < legacy
+    assert batch < single
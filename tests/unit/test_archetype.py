@@ -0,0 +1,213 @@
+"""
+Tests for archetype (component bitmask) mode in entitas framework.
+"""
+
+import random
+import time
+from typing import List, Type
+
+from src.ai_rpg.entitas import Component, ComponentIndex, Context, Matcher
+from src.ai_rpg.models import COMPONENT_TYPES, create_component_index
+from tests.unit.test_components import (
+    Age,
+    Damage,
+    Health,
+    Name,
+    Position,
+    Score,
+    Velocity,
+)
+
+ALL_TYPES: List[Type[Component]] = [Position, Velocity, Health, Name, Age, Score]
+
+
+def _add_random_components(
+    context: Context, rng: random.Random, entity_count: int
+) -> None:
+    for i in range(entity_count):
+        entity = context.create_entity()
+        if rng.random() < 0.5:
+            entity.add(Position, i, i)
+        if rng.random() < 0.5:
+            entity.add(Velocity, 1, 1)
+        if rng.random() < 0.5:
+            entity.add(Health, 10, 10)
+        if rng.random() < 0.3:
+            entity.add(Name, f"e{i}")
+        if rng.random() < 0.3:
+            entity.add(Age, i)
+
+
+def _matchers() -> List[Matcher]:
+    return [
+        Matcher(Position),
+        Matcher(Position, Velocity),
+        Matcher(any_of=(Health, Name)),
+        Matcher(Position, none_of=(Age,)),
+        Matcher(all_of=(Velocity,), any_of=(Name, Age), none_of=(Health,)),
+        Matcher(Score),
+    ]
+
+
+class TestComponentIndex:
+    """Test cases for ComponentIndex."""
+
+    def test_register_assigns_distinct_bits(self) -> None:
+        """Test that each registered type gets its own bit."""
+        index = ComponentIndex([Position, Velocity])
+
+        assert index.bit(Position) == 1
+        assert index.bit(Velocity) == 2
+        assert index.register(Position) == 1
+        assert len(index) == 2
+
+    def test_unknown_type_is_assigned_lazily(self) -> None:
+        """Test that looking up an unknown type registers it."""
+        index = ComponentIndex()
+
+        assert Health not in index
+        assert index.bit(Health) == 1
+        assert Health in index
+
+    def test_mask_combines_bits(self) -> None:
+        """Test combining several types into one mask."""
+        index = ComponentIndex([Position, Velocity, Health])
+
+        assert index.mask((Position, Health)) == 0b101
+        assert index.mask(None) == 0
+
+    def test_create_component_index_from_registry(self) -> None:
+        """Test building the index from COMPONENT_TYPES."""
+        index = create_component_index()
+
+        assert len(index) == len(COMPONENT_TYPES)
+        for comp_type in COMPONENT_TYPES.values():
+            assert comp_type in index
+
+
+class TestArchetypeMode:
+    """Test cases for Context/Entity/Matcher in archetype mode."""
+
+    def test_entity_archetype_tracks_components(self) -> None:
+        """Test that the entity bitmask follows add/replace/remove/set."""
+        index = ComponentIndex([Position, Velocity])
+        context = Context(index)
+        entity = context.create_entity()
+
+        entity.add(Position, 1, 2)
+        assert entity.archetype == 0b01
+
+        entity.set(Velocity, Velocity(dx=1, dy=1))
+        assert entity.archetype == 0b11
+
+        entity.replace(Position, 3, 4)
+        assert entity.archetype == 0b11
+
+        entity.remove(Position)
+        assert entity.archetype == 0b10
+
+    def test_context_buckets_entities_by_archetype(self) -> None:
+        """Test that the context keeps entities in archetype buckets."""
+        context = Context(ComponentIndex())
+        e1 = context.create_entity()
+        e2 = context.create_entity()
+        e1.add(Position, 1, 1)
+        e2.add(Position, 2, 2)
+        e2.add(Velocity, 1, 1)
+
+        assert context.archetype_count == 2
+
+        e2.remove(Velocity)
+        assert context.archetype_count == 1
+
+        context.destroy_entity(e1)
+        context.destroy_entity(e2)
+        assert context.archetype_count == 0
+
+    def test_reused_entity_starts_with_empty_archetype(self) -> None:
+        """Test that a recycled entity has a cleared bitmask."""
+        context = Context(ComponentIndex())
+        entity = context.create_entity()
+        entity.add(Position, 1, 1)
+        context.destroy_entity(entity)
+
+        reused = context.create_entity()
+        assert reused is entity
+        assert reused.archetype == 0
+        assert not context.get_group(Matcher(Position)).entities
+
+    def test_groups_match_dictionary_mode(self) -> None:
+        """Test that archetype mode produces the same groups as the default mode."""
+        rng_seed = 1234
+        default_context = Context()
+        archetype_context = Context(ComponentIndex())
+        _add_random_components(default_context, random.Random(rng_seed), 300)
+        _add_random_components(archetype_context, random.Random(rng_seed), 300)
+
+        for matcher in _matchers():
+            expected = {
+                e.creation_index for e in default_context.get_group(matcher).entities
+            }
+            actual = {
+                e.creation_index for e in archetype_context.get_group(matcher).entities
+            }
+            assert actual == expected, matcher
+
+        # Groups keep matching while components change afterwards.
+        for context in (default_context, archetype_context):
+            for entity in list(context.entities):
+                if entity.has(Position):
+                    entity.remove(Position)
+                else:
+                    entity.add(Damage, 1)
+
+        for matcher in _matchers():
+            expected = {
+                e.creation_index for e in default_context.get_group(matcher).entities
+            }
+            actual = {
+                e.creation_index for e in archetype_context.get_group(matcher).entities
+            }
+            assert actual == expected, matcher
+
+    def test_benchmark_group_population_and_matcher_throughput(self) -> None:
+        """Benchmark get_group population and matcher throughput with many entities."""
+        entity_count = 5000
+        default_context = Context()
+        archetype_context = Context(ComponentIndex(ALL_TYPES))
+        _add_random_components(default_context, random.Random(7), entity_count)
+        _add_random_components(archetype_context, random.Random(7), entity_count)
+
+        def populate(context: Context) -> float:
+            start = time.perf_counter()
+            for matcher in _matchers():
+                # Fresh matcher instances force the context to build new groups.
+                context._groups.clear()
+                context._groups_for_type.clear()
+                context.get_group(matcher)
+            return time.perf_counter() - start
+
+        def match_all(context: Context) -> float:
+            entities = list(context.entities)
+            matchers = _matchers()
+            start = time.perf_counter()
+            for matcher in matchers:
+                for entity in entities:
+                    matcher.matches(entity)
+            return time.perf_counter() - start
+
+        default_populate = min(populate(default_context) for _ in range(3))
+        archetype_populate = min(populate(archetype_context) for _ in range(3))
+        default_match = min(match_all(default_context) for _ in range(3))
+        archetype_match = min(match_all(archetype_context) for _ in range(3))
+
+        print(
+            f"\nget_group population ({entity_count} entities): "
+            f"dict={default_populate * 1e3:.2f}ms archetype={archetype_populate * 1e3:.2f}ms"
+            f"\nmatcher throughput: "
+            f"dict={default_match * 1e3:.2f}ms archetype={archetype_match * 1e3:.2f}ms"
+        )
+
+        # Populating per archetype touches a handful of buckets, not every entity.
+        assert archetype_context.archetype_count <= 2 ** len(ALL_TYPES)
+        assert archetype_populate < default_populate
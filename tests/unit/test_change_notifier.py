@@ -0,0 +1,140 @@
+"""
+Tests for push-based SSE notification (ChangeNotifier and the SSE endpoints).
+
+The endpoint handlers are called directly and their StreamingResponse body
+iterators are consumed in-process.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import AsyncIterator, List, cast
+
+import pytest
+from starlette.responses import StreamingResponse
+
+from src.ai_rpg.game.game_server import GameServer
+from src.ai_rpg.models import ChangeNotifier, PlayerSession
+from src.ai_rpg.models.agent_event import AgentEvent
+from src.ai_rpg.services.background_tasks import watch_task
+from src.ai_rpg.services.player_session import stream_session_messages
+
+
+def _body(response: StreamingResponse) -> AsyncIterator[str]:
+    return cast(AsyncIterator[str], response.body_iterator)
+
+
+def _server_with_session() -> tuple[GameServer, PlayerSession]:
+    server = GameServer()
+    session = PlayerSession(name="player", actor="hero", game="game")
+    room = server.create_room("player")
+    room._dbg_game = SimpleNamespace(  # type: ignore[assignment]
+        name="game", _player_session=session
+    )
+    return server, session
+
+
+class TestChangeNotifier:
+    """Test cases for ChangeNotifier."""
+
+    async def test_notify_wakes_all_waiters(self) -> None:
+        """Test that one notify releases every pending waiter."""
+        notifier = ChangeNotifier()
+        version = notifier.version
+        waiters = [asyncio.create_task(notifier.wait(version, 5.0)) for _ in range(50)]
+        await asyncio.sleep(0)
+        assert notifier.waiter_count == 50
+
+        notifier.notify()
+        assert all(await asyncio.gather(*waiters))
+        assert notifier.waiter_count == 0
+
+    async def test_change_before_wait_is_not_missed(self) -> None:
+        """Test that a notify between reading the version and waiting returns at once."""
+        notifier = ChangeNotifier()
+        version = notifier.version
+        notifier.notify()
+        assert await asyncio.wait_for(notifier.wait(version, 5.0), 0.5)
+
+    async def test_timeout_and_cross_thread_notify(self) -> None:
+        """Test the timeout result and a notify issued from a worker thread."""
+        notifier = ChangeNotifier()
+        assert not await notifier.wait(notifier.version, 0.01)
+        assert notifier.waiter_count == 0
+
+        version = notifier.version
+        timer = threading.Timer(0.05, notifier.notify)
+        timer.start()
+        assert await notifier.wait(version, 5.0)
+        timer.join()
+
+
+class TestPushedStreams:
+    """Test cases for the push-based SSE endpoints."""
+
+    async def test_session_stream_pushes_new_messages(self) -> None:
+        """Test that a new agent event is delivered without polling."""
+        server, session = _server_with_session()
+        session.add_agent_event(AgentEvent(message="old"))
+        response = await stream_session_messages(server, "player", "game", 0, 30.0)
+        body = _body(response)
+
+        first = await asyncio.wait_for(body.__anext__(), 1.0)
+        assert '"old"' in first
+
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        assert session.notifier.waiter_count == 1
+
+        session.add_agent_event(AgentEvent(message="new"))
+        second = await asyncio.wait_for(pending, 1.0)
+        assert '"new"' in second and '"sequence_id":2' in second
+        await body.aclose()  # type: ignore[attr-defined]
+
+    async def test_session_stream_heartbeat_and_room_removal(self) -> None:
+        """Test keep-alive comments while idle and shutdown when the room goes away."""
+        server, session = _server_with_session()
+        response = await stream_session_messages(server, "player", "game", 0, 0.05)
+        body = _body(response)
+
+        assert await asyncio.wait_for(body.__anext__(), 1.0) == ": keep-alive\n\n"
+
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0)
+        room = server.get_room("player")
+        assert room is not None
+        server.remove_room(room)
+        chunks: List[str] = []
+        with pytest.raises(StopAsyncIteration):
+            while True:
+                chunks.append(await asyncio.wait_for(pending, 1.0))
+                pending = asyncio.ensure_future(body.__anext__())
+        assert all(chunk == ": keep-alive\n\n" for chunk in chunks)
+
+    async def test_watch_task_wakes_on_completion(self) -> None:
+        """Test that watch_task emits the terminal state as soon as it is set."""
+        server = GameServer()
+        task = server.create_task()
+        response = await watch_task(task.task_id, server, 60, 30.0)
+        body = _body(response)
+
+        assert '"running"' in await asyncio.wait_for(body.__anext__(), 1.0)
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+
+        server.complete_task(task.task_id)
+        assert '"completed"' in await asyncio.wait_for(pending, 1.0)
+        with pytest.raises(StopAsyncIteration):
+            await body.__anext__()
+
+    async def test_watch_task_times_out(self) -> None:
+        """Test that the timeout error is still reported without polling."""
+        server = GameServer()
+        task = server.create_task()
+        response = await watch_task(task.task_id, server, 1, 30.0)
+        chunks = [chunk async for chunk in _body(response)]
+
+        assert '"running"' in chunks[0]
+        assert '"timeout"' in chunks[-1]
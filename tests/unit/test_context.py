@@ -2,10 +2,13 @@
 Tests for the Context class in entitas framework.
 """
 
+import time
 import pytest
+from typing import List, Type
 from unittest.mock import patch
+from pydantic import create_model
 
-from src.ai_rpg.entitas import Context, Entity, Matcher, Group
+from src.ai_rpg.entitas import Component, Context, Entity, Matcher, Group
 from src.ai_rpg.entitas.exceptions import MissingEntity
 from tests.unit.test_components import Position, Velocity, Health, Name, Age
 
@@ -390,3 +393,85 @@ class TestContext:
         assert new_entity is entity  # Same object
         assert new_entity._creation_index == creation_index + 1  # New index
         assert new_entity._is_enabled
+
+    def test_groups_indexed_by_component_type(self) -> None:
+        """Test that groups are indexed by every component type of their matcher."""
+        context = Context()
+
+        group = context.get_group(
+            Matcher(all_of=(Position,), any_of=(Velocity, Health), none_of=(Age,))
+        )
+
+        for comp_type in (Position, Velocity, Health, Age):
+            assert context._groups_for_type[comp_type] == [group]
+        assert Name not in context._groups_for_type
+
+    def test_unrelated_groups_not_touched_on_component_change(self) -> None:
+        """Test that add/replace/remove only touch groups referencing the type."""
+        context = Context()
+        entity = context.create_entity()
+        entity.add(Name, "hero")
+
+        pos_group = context.get_group(Matcher(Position))
+        name_group = context.get_group(Matcher(Name))
+
+        with (
+            patch.object(name_group, "handle_entity") as mock_handle,
+            patch.object(name_group, "update_entity") as mock_update,
+        ):
+            entity.add(Position, 1, 2)
+            entity.replace(Position, 3, 4)
+            entity.remove(Position)
+
+            mock_handle.assert_not_called()
+            mock_update.assert_not_called()
+
+        assert entity not in pos_group.entities
+        assert entity in name_group.entities
+
+    def test_replace_does_not_retrigger_unrelated_group(self) -> None:
+        """Test that replacing a component only fires events of related groups."""
+        context = Context()
+        entity = context.create_entity()
+        entity.add(Position, 1, 2)
+        entity.add(Velocity, 1, 1)
+
+        added: List[Entity] = []
+        pos_group = context.get_group(Matcher(Position))
+        pos_group.on_entity_added += lambda e, c: added.append(e)
+
+        entity.replace(Velocity, 2, 2)
+        assert added == []
+
+        entity.replace(Position, 5, 6)
+        assert added == [entity]
+
+    def test_component_write_cost_flat_as_group_count_grows(self) -> None:
+        """Micro-benchmark: per-write cost must not scale with unrelated groups."""
+
+        def measure_write_cost(unrelated_group_count: int) -> float:
+            context = Context()
+            for i in range(unrelated_group_count):
+                dummy: Type[Component] = create_model(f"Dummy{i}", __base__=Component)
+                context.get_group(Matcher(dummy))
+            context.get_group(Matcher(Position))
+
+            entity = context.create_entity()
+            iterations = 2000
+            start = time.perf_counter()
+            for i in range(iterations):
+                entity.add(Position, i, i)
+                entity.replace(Position, i + 1, i + 1)
+                entity.remove(Position)
+            return (time.perf_counter() - start) / iterations
+
+        baseline = min(measure_write_cost(0) for _ in range(3))
+        with_many_groups = min(measure_write_cost(500) for _ in range(3))
+
+        print(
+            f"\nper-write cost: 1 group={baseline * 1e6:.2f}us, "
+            f"501 groups={with_many_groups * 1e6:.2f}us"
+        )
+
+        # Scanning all 500 groups per write would be orders of magnitude slower.
+        assert with_many_groups < baseline * 3
@@ -0,0 +1,266 @@
+"""
+Tests for token-budgeted agent contexts: token estimation, the compaction
+policies of ContextBudget, and DeepSeekClient usage accounting.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import pytest
+
+from src.ai_rpg.deepseek import (
+    DeepSeekClient,
+    estimate_messages_tokens,
+    estimate_text_tokens,
+)
+from src.ai_rpg.game.context_budget import (
+    BROADCAST_NOTIFICATION_MARKER,
+    CONTEXT_SUMMARY_MARKER,
+    ContextBudget,
+    ContextBudgetConfig,
+    DropStaleBroadcastsPolicy,
+    SummarizeRangePolicy,
+)
+from src.ai_rpg.models.messages import (
+    AIMessage,
+    ContextMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+_FILLER = "x" * 300  # ~91 estimated tokens per message
+
+
+def _budget(**kwargs: Any) -> ContextBudget:
+    budget = ContextBudget()
+    budget.configure(
+        ContextBudgetConfig(
+            max_tokens=kwargs.pop("max_tokens", 1000),
+            keep_recent_messages=kwargs.pop("keep_recent_messages", 4),
+            broadcast_keep_recent=kwargs.pop("broadcast_keep_recent", 2),
+            summary_min_messages=kwargs.pop("summary_min_messages", 2),
+        ),
+        kwargs.pop("policies", None),
+    )
+    return budget
+
+
+class _FakeSummarizer:
+    def __init__(self, summary: str = "summary") -> None:
+        self.calls: List[List[ContextMessage]] = []
+        self._summary = summary
+
+    async def __call__(
+        self,
+        agent_name: str,
+        persona: Optional[SystemMessage],
+        messages: Sequence[ContextMessage],
+    ) -> str:
+        assert persona is not None and persona.content == "persona"
+        self.calls.append(list(messages))
+        return self._summary
+
+
+class TestTokenEstimate:
+    """Test cases for the token estimate helpers."""
+
+    def test_ascii_and_cjk_ratios(self) -> None:
+        """Test that CJK text costs about twice as much per character as ASCII."""
+        assert estimate_text_tokens("") == 0
+        assert estimate_text_tokens("a" * 1000) == 301
+        assert estimate_text_tokens("中" * 1000) == 601
+        assert estimate_text_tokens("a" * 500 + "中" * 500) == 451
+
+    def test_messages_include_overhead_and_tool_calls(self) -> None:
+        """Test per-message overhead and that tool_calls are counted."""
+        plain = AIMessage(content="hi")
+        with_tools = AIMessage(
+            content="hi",
+            additional_kwargs={"tool_calls": [{"id": "call_1", "name": "lookup"}]},
+        )
+        assert estimate_messages_tokens([plain]) == 4 + 1
+        assert estimate_messages_tokens([with_tools]) > estimate_messages_tokens(
+            [plain]
+        )
+
+
+class TestContextBudget:
+    """Test cases for ContextBudget and its default policies."""
+
+    async def test_disabled_or_under_budget_is_noop(self) -> None:
+        """Test that nothing happens when disabled or when the context fits."""
+        context: List[ContextMessage] = [
+            SystemMessage(content="persona"),
+            HumanMessage(content=_FILLER),
+        ]
+        assert await ContextBudget().compact("hero", context) is None
+        assert await _budget().compact("hero", context) is None
+        assert len(context) == 2
+
+    async def test_drop_stale_broadcasts_keeps_recent_and_pinned(self) -> None:
+        """Test that only old, unpinned broadcast notifications are dropped."""
+        budget = _budget(policies=[DropStaleBroadcastsPolicy()])
+        pinned = HumanMessage(
+            content=_FILLER,
+            broadcast_notification=True,
+            combat_initialization=True,
+        )
+        context: List[ContextMessage] = [SystemMessage(content="persona"), pinned]
+        context += [
+            HumanMessage(content=_FILLER, **{BROADCAST_NOTIFICATION_MARKER: True})
+            for _ in range(12)
+        ]
+        context += [AIMessage(content=_FILLER) for _ in range(4)]
+        kept_broadcasts = context[12:14]
+
+        result = await budget.compact("hero", context)
+
+        assert result is not None and result.policies == ["drop_stale_broadcasts"]
+        assert result.tokens_after <= 750
+        assert context[0].content == "persona" and context[1] is pinned
+        assert all(m in context for m in kept_broadcasts)
+        assert len([m for m in context if isinstance(m, AIMessage)]) == 4
+        assert budget.stats.messages_removed == result.messages_before - len(context)
+
+    async def test_summarize_replaces_oldest_range(self) -> None:
+        """Test that the oldest unpinned run is replaced by one summary message."""
+        summarizer = _FakeSummarizer()
+        budget = _budget(policies=[SummarizeRangePolicy(summarizer)])
+        context: List[ContextMessage] = [SystemMessage(content="persona")]
+        context += [HumanMessage(content=_FILLER) for _ in range(14)]
+        recent = context[-4:]
+
+        result = await budget.compact("hero", context)
+
+        assert result is not None and result.policies == ["summarize_range"]
+        assert len(summarizer.calls) == 1
+        summary = context[1]
+        assert isinstance(summary, HumanMessage)
+        assert getattr(summary, CONTEXT_SUMMARY_MARKER) == len(summarizer.calls[0])
+        assert context[-4:] == recent
+        assert result.tokens_after <= 750
+        assert budget.stats.summaries == 1
+
+    async def test_summarize_keeps_pinned_and_tool_call_groups(self) -> None:
+        """Test that pinned anchors survive and tool calls are never split."""
+        summarizer = _FakeSummarizer()
+        budget = _budget(policies=[SummarizeRangePolicy(summarizer)])
+        anchor = HumanMessage(content=_FILLER, combat_outcome=True)
+        tool_call = AIMessage(
+            content=_FILLER,
+            additional_kwargs={"tool_calls": [{"id": "call_1", "name": "lookup"}]},
+        )
+        tool_result = ToolMessage(content=_FILLER, tool_call_id="call_1")
+        context: List[ContextMessage] = [
+            SystemMessage(content="persona"),
+            HumanMessage(content=_FILLER),
+            HumanMessage(content=_FILLER),
+            tool_call,
+            tool_result,
+            anchor,
+        ]
+        context += [HumanMessage(content=_FILLER) for _ in range(8)]
+
+        await budget.compact("hero", context)
+
+        assert anchor in context
+        for summarized in summarizer.calls:
+            assert (tool_call in summarized) == (tool_result in summarized)
+            assert anchor not in summarized
+
+    async def test_summary_dropped_when_context_changes(self) -> None:
+        """Test that a summary is discarded if the range moved during the LLM call."""
+        context: List[ContextMessage] = [SystemMessage(content="persona")]
+        context += [HumanMessage(content=_FILLER) for _ in range(14)]
+
+        async def mutating(
+            agent_name: str,
+            persona: Optional[SystemMessage],
+            messages: Sequence[ContextMessage],
+        ) -> str:
+            del context[2]
+            return "summary"
+
+        budget = _budget(policies=[SummarizeRangePolicy(mutating)])
+        result = await budget.compact("hero", context)
+
+        assert result is not None and result.policies == []
+        assert len(context) == 14
+        assert budget.stats.over_budget == 1
+
+    async def test_failing_policy_is_counted_and_skipped(self) -> None:
+        """Test that a policy error does not stop the next policy."""
+
+        async def failing(
+            agent_name: str,
+            persona: Optional[SystemMessage],
+            messages: Sequence[ContextMessage],
+        ) -> str:
+            raise RuntimeError("llm down")
+
+        budget = _budget(
+            policies=[SummarizeRangePolicy(failing), DropStaleBroadcastsPolicy()]
+        )
+        context: List[ContextMessage] = [SystemMessage(content="persona")]
+        context += [
+            HumanMessage(content=_FILLER, **{BROADCAST_NOTIFICATION_MARKER: True})
+            for _ in range(14)
+        ]
+
+        result = await budget.compact("hero", context)
+
+        assert result is not None and result.policies == ["drop_stale_broadcasts"]
+        assert budget.stats.failures == 1
+
+
+@pytest.fixture
+def _api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+
+
+@pytest.mark.usefixtures("_api_key")
+class TestClientUsage:
+    """Test cases for DeepSeekClient token usage accounting."""
+
+    async def test_stream_requests_and_records_usage(self) -> None:
+        """Test that streaming asks for usage and records the final usage chunk."""
+        events: List[Dict[str, Any]] = [
+            {"choices": [{"index": 0, "delta": {"content": "Hi"}}]},
+            {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+            {
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": 120,
+                    "completion_tokens": 3,
+                    "total_tokens": 123,
+                    "prompt_cache_hit_tokens": 64,
+                },
+            },
+        ]
+        body = (
+            "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        )
+        captured: List[Dict[str, Any]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            captured.append(json.loads(request.content))
+            return httpx.Response(200, content=body.encode())
+
+        client = DeepSeekClient(
+            name="stage",
+            full_prompt="describe",
+            context=[SystemMessage(content="system")],
+        )
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            async for _ in client.stream(http_client):
+                pass
+
+        assert captured[0]["stream_options"] == {"include_usage": True}
+        assert client.response_content == "Hi"
+        assert client.usage.estimated_prompt_tokens > 0
+        assert client.usage.prompt_tokens == 120
+        assert client.usage.completion_tokens == 3
+        assert client.usage.prompt_cache_hit_tokens == 64
@@ -0,0 +1,97 @@
+"""
+Tests for ContextIndex, the identity-based position index behind
+AgentContext.index and the RPGAgentContext removal helpers.
+"""
+
+from typing import List
+
+import pytest
+
+from src.ai_rpg.models import AgentContext, ContextIndex
+from src.ai_rpg.models.messages import AIMessage, ContextMessage, HumanMessage
+
+
+def _context(n: int) -> List[ContextMessage]:
+    return [HumanMessage(content=f"msg{i}") for i in range(n)]
+
+
+class TestContextIndex:
+    """Test cases for ContextIndex."""
+
+    def test_position_is_identity_based(self) -> None:
+        """Test that an equal but distinct message is not found."""
+        context = _context(5)
+        index = ContextIndex(context)
+
+        assert index.position(context[3]) == 3
+        assert HumanMessage(content="msg3") == context[3]
+        assert index.position(HumanMessage(content="msg3")) is None
+        assert context[3] in index
+
+    def test_tracks_direct_list_mutation(self) -> None:
+        """Test that appends and external in-place edits never yield stale positions."""
+        context = _context(5)
+        index = ContextIndex(context)
+        assert index.position(context[4]) == 4
+
+        appended = AIMessage(content="late")
+        context.append(appended)
+        assert index.position(appended) == 5
+
+        moved = context[4]
+        context[:] = context[3:]
+        assert index.position(moved) == 1
+        assert index.position(appended) == 2
+
+    def test_remove_only_matching_objects(self) -> None:
+        """Test that duplicates with equal content survive identity removal."""
+        context = _context(3) + [HumanMessage(content="msg0")]
+        original = list(context)
+        index = ContextIndex(context)
+
+        assert index.remove([original[0], HumanMessage(content="foreign")]) == 1
+        assert context == original[1:]
+        assert context[-1] is original[3]
+        assert index.position(original[3]) == 2
+
+    @pytest.mark.parametrize("count", [2, 20])
+    def test_remove_sparse_and_dense(self, count: int) -> None:
+        """Test both removal paths keep order and later lookups correct."""
+        context = _context(50)
+        original = list(context)
+        index = ContextIndex(context)
+
+        removed = original[1 : count * 2 : 2][:count]
+        assert index.remove(removed) == len(removed)
+        assert context == [m for m in original if all(m is not r for r in removed)]
+        assert index.position(original[-1]) == len(context) - 1
+
+    def test_remove_range_and_insert(self) -> None:
+        """Test range deletion by identity and re-insertion at the same spot."""
+        context = _context(6)
+        original = list(context)
+        index = ContextIndex(context)
+
+        removed = index.remove_range(original[1], original[3])
+        assert [m is o for m, o in zip(removed, original[1:4])] == [True] * 3
+        assert index.position(original[4]) == 1
+
+        with pytest.raises(ValueError):
+            index.remove_range(original[5], original[4])
+        with pytest.raises(ValueError):
+            index.remove_range(original[1], original[5])
+
+        index.insert(1, removed)
+        assert all(m is o for m, o in zip(context, original))
+        assert index.position(original[5]) == 5
+
+    def test_agent_context_rebinds_on_replacement(self) -> None:
+        """Test that AgentContext.index follows reassignment and is not serialized."""
+        agent_context = AgentContext(name="hero", context=_context(3))
+        first = agent_context.index
+        assert agent_context.index is first
+
+        agent_context.context = _context(2)
+        assert agent_context.index is not first
+        assert agent_context.index.position(agent_context.context[1]) == 1
+        assert "_index" not in agent_context.model_dump_json()
@@ -0,0 +1,163 @@
+"""
+Tests for the streaming (SSE) mode of DeepSeekClient and the player session
+stream delta buffer.
+"""
+
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from src.ai_rpg.deepseek import ChatStreamChunk, DeepSeekClient
+from src.ai_rpg.models import PlayerSession, StreamDelta
+from src.ai_rpg.models.messages import SystemMessage
+
+
+def _sse_body(events: List[Dict[str, Any]]) -> bytes:
+    lines = [": keep-alive", ""]
+    for event in events:
+        lines.append(f"data: {json.dumps(event)}")
+        lines.append("")
+    lines.append("data: [DONE]")
+    lines.append("")
+    return "\n".join(lines).encode()
+
+
+def _delta(delta: Dict[str, Any], finish_reason: Any = None) -> Dict[str, Any]:
+    return {"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+def _mock_client(
+    body: bytes, captured: List[Dict[str, Any]], status_code: int = 200
+) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(json.loads(request.content))
+        return httpx.Response(
+            status_code,
+            content=body,
+            headers={"Content-Type": "text/event-stream"},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _make_client(**kwargs: Any) -> DeepSeekClient:
+    return DeepSeekClient(
+        name="stage",
+        full_prompt="describe",
+        context=[SystemMessage(content="system")],
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+
+
+class TestDeepSeekStream:
+    """Test cases for DeepSeekClient.stream()."""
+
+    async def test_stream_yields_deltas_and_assembles_response(self) -> None:
+        """Test that content and reasoning deltas are yielded and accumulated."""
+        body = _sse_body(
+            [
+                _delta({"role": "assistant", "reasoning_content": "think"}),
+                _delta({"content": "Hello"}),
+                _delta({"content": ", world"}),
+                _delta({}, finish_reason="stop"),
+            ]
+        )
+        captured: List[Dict[str, Any]] = []
+        client = _make_client()
+
+        async with _mock_client(body, captured) as http_client:
+            chunks = [chunk async for chunk in client.stream(http_client)]
+
+        assert captured[0]["stream"] is True
+        assert [c.content for c in chunks] == ["", "Hello", ", world", ""]
+        assert chunks[-1].finish_reason == "stop"
+        assert client.response_content == "Hello, world"
+        assert client.response_reasoning_content == "think"
+        assert client.finish_reason == "stop"
+
+    async def test_stream_merges_tool_call_fragments(self) -> None:
+        """Test that tool_call fragments are joined by index."""
+        body = _sse_body(
+            [
+                _delta(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": 0,
+                                "id": "call_1",
+                                "type": "function",
+                                "function": {"name": "lookup", "arguments": '{"q"'},
+                            }
+                        ]
+                    }
+                ),
+                _delta(
+                    {"tool_calls": [{"index": 0, "function": {"arguments": ': "x"}'}}]}
+                ),
+                _delta({}, finish_reason="tool_calls"),
+            ]
+        )
+        client = _make_client()
+
+        async with _mock_client(body, []) as http_client:
+            async for _ in client.stream(http_client):
+                pass
+
+        assert client.finish_reason == "tool_calls"
+        assert len(client.tool_calls) == 1
+        assert client.tool_calls[0].id == "call_1"
+        assert client.tool_calls[0].function.name == "lookup"
+        assert json.loads(client.tool_calls[0].function.arguments) == {"q": "x"}
+
+    async def test_chat_forwards_chunks_when_sink_is_set(self) -> None:
+        """Test that chat() switches to streaming when on_stream_chunk is given."""
+        body = _sse_body(
+            [_delta({"content": "a"}), _delta({"content": "b"}, finish_reason="stop")]
+        )
+        received: List[ChatStreamChunk] = []
+        captured: List[Dict[str, Any]] = []
+        client = _make_client(on_stream_chunk=received.append)
+
+        async with _mock_client(body, captured) as http_client:
+            await client.chat(http_client)
+
+        assert captured[0]["stream"] is True
+        assert "".join(c.content for c in received) == "ab"
+        assert client.response_content == "ab"
+
+    async def test_stream_raises_on_error_status(self) -> None:
+        """Test that non-200 responses raise HTTPStatusError."""
+        client = _make_client()
+
+        async with _mock_client(b"bad", [], status_code=400) as http_client:
+            with pytest.raises(httpx.HTTPStatusError):
+                async for _ in client.stream(http_client):
+                    pass
+
+
+class TestPlayerSessionStreamDeltas:
+    """Test cases for PlayerSession stream delta buffer."""
+
+    def test_stream_deltas_do_not_touch_session_history(self) -> None:
+        """Test that deltas are kept apart from session messages and archives."""
+        session = PlayerSession(name="player", actor="hero", game="game")
+        session.add_stream_delta(
+            StreamDelta(stream_id="s", source="stage", content="a")
+        )
+        session.add_stream_delta(
+            StreamDelta(stream_id="s", source="stage", content="b", done=True)
+        )
+
+        assert session.stream_sequence == 2
+        assert [d.content for d in session.get_stream_deltas_since(0)] == ["a", "b"]
+        assert [d.content for d in session.get_stream_deltas_since(1)] == ["b"]
+        assert session.get_stream_deltas_since(2) == []
+        assert session.event_sequence == 0
+        assert "stream" not in session.model_dump_json()
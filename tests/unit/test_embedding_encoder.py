@@ -0,0 +1,154 @@
+"""
+Tests for lazy embedding model loading and the shared encoder service.
+
+The SentenceTransformer loader is replaced with a fake so these tests run
+without the downloaded model.
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from src.ai_rpg.embedding_model import (
+    EmbeddingModelConfig,
+    LazyEmbeddingModel,
+    sentence_transformer,
+)
+from src.ai_rpg.embedding_model.encoder_service import EncoderServer, RemoteEncoder
+
+
+class _FakeModel:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: List[List[str]] = []
+
+    def encode(self, sentences: List[str]) -> Any:
+        self.calls.append(list(sentences))
+        time.sleep(self.delay)
+        return np.array([[float(len(s)), 1.0, 2.0] for s in sentences])
+
+
+class TestLazyEmbeddingModel:
+    """Test cases for LazyEmbeddingModel."""
+
+    def test_importing_systems_does_not_load_torch(self) -> None:
+        """Test that importing the RAG system module stays cheap."""
+        code = (
+            "import sys; import src.ai_rpg.systems.query_action_system; "
+            "print('torch' in sys.modules, 'sentence_transformers' in sys.modules)"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parents[2],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert completed.stdout.strip().splitlines()[-1] == "False False"
+
+    def test_concurrent_first_use_loads_once(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that racing first encode calls share a single load."""
+        loads: List[EmbeddingModelConfig] = []
+
+        def fake_load(config: EmbeddingModelConfig) -> _FakeModel:
+            loads.append(config)
+            time.sleep(0.05)
+            return _FakeModel()
+
+        monkeypatch.setattr(
+            sentence_transformer, "load_sentence_transformer", fake_load
+        )
+        encoder = LazyEmbeddingModel()
+        encoder.configure(EmbeddingModelConfig(backend="onnx", quantized=True))
+        assert not encoder.loaded
+
+        threads = [
+            threading.Thread(target=encoder.encode, args=([f"s{i}"],)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert encoder.loaded
+        assert loads == [EmbeddingModelConfig(backend="onnx", quantized=True)]
+
+
+class TestEncoderService:
+    """Test cases for EncoderServer and RemoteEncoder."""
+
+    async def test_round_trip_and_errors(self, tmp_path: Path) -> None:
+        """Test vectors round-trip intact and server errors surface to the client."""
+        model = _FakeModel()
+        server = EncoderServer(model, str(tmp_path / "enc.sock"))
+        await server.start()
+        client = RemoteEncoder(server.socket_path)
+        try:
+            vectors = await asyncio.to_thread(client.encode, ["a", "中文"])
+            assert vectors.dtype == np.float32
+            assert vectors.tolist() == [[1.0, 1.0, 2.0], [2.0, 1.0, 2.0]]
+
+            model.encode = lambda sentences: (_ for _ in ()).throw(  # type: ignore[method-assign]
+                ValueError("bad input")
+            )
+            with pytest.raises(RuntimeError, match="bad input"):
+                await asyncio.to_thread(client.encode, ["x"])
+        finally:
+            client.close()
+            await server.aclose()
+        assert not (tmp_path / "enc.sock").exists()
+
+    async def test_concurrent_requests_share_encode_calls(self, tmp_path: Path) -> None:
+        """Test that requests from several workers are batched into fewer encodes."""
+        model = _FakeModel(delay=0.05)
+        server = EncoderServer(model, str(tmp_path / "enc.sock"))
+        await server.start()
+        clients = [RemoteEncoder(server.socket_path) for _ in range(6)]
+        try:
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(client.encode, ["x" * (i + 1)])
+                    for i, client in enumerate(clients)
+                )
+            )
+        finally:
+            for client in clients:
+                client.close()
+            await server.aclose()
+
+        assert [int(r[0][0]) for r in results] == [1, 2, 3, 4, 5, 6]
+        assert server.requests == 6
+        assert server.batches < 6
+
+    async def test_lazy_model_routes_to_socket(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a configured socket is used instead of loading locally."""
+
+        def fail_load(config: EmbeddingModelConfig) -> Any:
+            raise AssertionError("local model must not load")
+
+        monkeypatch.setattr(
+            sentence_transformer, "load_sentence_transformer", fail_load
+        )
+        server = EncoderServer(_FakeModel(), str(tmp_path / "enc.sock"))
+        await server.start()
+        encoder = LazyEmbeddingModel()
+        encoder.configure(EmbeddingModelConfig(encoder_socket=server.socket_path))
+        try:
+            vectors = await asyncio.to_thread(encoder.encode, ["abc"])
+        finally:
+            encoder.configure(EmbeddingModelConfig())
+            await server.aclose()
+
+        assert vectors.shape == (1, 3)
+        assert not encoder.loaded
@@ -2,15 +2,21 @@
 Tests for the Entity class in entitas framework.
 """
 
+import time
 import pytest
+from typing import Any, Dict, List, Type
 from unittest.mock import Mock
 
-from src.ai_rpg.entitas import Entity
+from pydantic import BaseModel
+
+from src.ai_rpg.entitas import Component, Entity
+from src.ai_rpg.entitas.entity import _component_plans, _get_component_plan
 from src.ai_rpg.entitas.exceptions import (
     EntityNotEnabled,
     AlreadyAddedComponent,
     MissingComponent,
 )
+from src.ai_rpg.models.registry import COMPONENT_TYPES
 from tests.unit.test_components import (
     Position,
     Velocity,
@@ -390,3 +396,126 @@ class TestEntity:
         entity.destroy()
         assert not entity._is_enabled
         assert len(entity._components) == 0
+
+    def test_component_plan_cached_per_type(self) -> None:
+        """Test that field names are resolved once per component type."""
+        entity = Entity()
+        entity.activate(1)
+
+        entity.add(Position, 1, 2)
+        plan = _component_plans[Position]
+        entity.replace(Position, 3, 4)
+
+        assert _component_plans[Position] is plan
+        assert plan.field_names == ("x", "y")
+
+    def test_trusted_add_and_replace(self) -> None:
+        """Test that trusted construction yields equivalent, frozen components."""
+        entity = Entity()
+        entity.activate(1)
+
+        entity.add(Name, "hero", trusted=True)
+        assert entity.get(Name) == Name(value="hero")
+        assert entity.get(Name).model_fields_set == {"value"}
+        assert entity.get(Name).model_dump() == {"value": "hero"}
+
+        entity.replace(Position, 1.0, 2.0, trusted=True)
+        assert entity.get(Position) == Position(x=1.0, y=2.0)
+
+        with pytest.raises(Exception):
+            entity.get(Position).x = 5
+
+    def test_trusted_construction_skips_validation(self) -> None:
+        """Test that trusted data bypasses validation while the default path keeps it."""
+        entity = Entity()
+        entity.activate(1)
+
+        entity.add(Name, "  hero  ", trusted=True)
+        assert entity.get(Name).value == "  hero  "
+
+        entity.replace(Name, "  hero  ")
+        assert entity.get(Name).value == "hero"
+
+        with pytest.raises(Exception):
+            entity.replace(Position, "not-a-number", 0)
+
+    def test_trusted_construction_runs_post_init(self) -> None:
+        """Test that types with model_post_init fall back to model_construct."""
+        entity = Entity()
+        entity.activate(1)
+
+        assert not _get_component_plan(Health).direct_construct
+        with pytest.raises(ValueError):
+            entity.add(Health, 10, 5, trusted=True)
+
+    def test_direct_construction_matches_model_construct(self) -> None:
+        """Test that writing pydantic's slots directly matches model_construct.
+
+        The direct path relies on pydantic internals (see the pin in
+        pyproject.toml); this guards every component type against upgrades.
+        """
+        missing = object()
+        comp_types: List[Type[Component]] = [Position, Velocity, Name, Marker]
+        comp_types += [Transform, *COMPONENT_TYPES.values()]
+        checked = 0
+        for comp_type in comp_types:
+            plan = _get_component_plan(comp_type)
+            if not plan.direct_construct:
+                continue
+            values: Dict[str, Any] = {name: object() for name in plan.field_names}
+            direct = plan.construct(comp_type, dict(values))
+            reference = comp_type.model_construct(**values)
+
+            assert type(direct) is comp_type
+            for slot in BaseModel.__slots__:
+                assert getattr(direct, slot, missing) == getattr(
+                    reference, slot, missing
+                ), (comp_type.__name__, slot)
+            checked += 1
+        assert checked > len(comp_types) // 2
+
+    def test_trusted_construction_argument_count_checked(self) -> None:
+        """Test that the trusted path still checks the number of arguments."""
+        entity = Entity()
+        entity.activate(1)
+
+        with pytest.raises(ValueError):
+            entity.add(Position, 1, trusted=True)
+
+    def test_benchmark_add_replace_throughput(self) -> None:
+        """Benchmark add/replace throughput before and after constructor plans."""
+        entity = Entity()
+        entity.activate(1)
+        iterations = 5000
+
+        def run_uncached() -> float:
+            # Previous behaviour: rebuild field names and validate on every call.
+            start = time.perf_counter()
+            for i in range(iterations):
+                for values in ((i, i, 0.0, 1.0), (i, i, 1.0, 2.0)):
+                    field_names = list(Transform.model_fields.keys())
+                    entity._components[Transform] = Transform(
+                        **dict(zip(field_names, values))
+                    )
+            return (time.perf_counter() - start) / iterations
+
+        def run(trusted: bool) -> float:
+            start = time.perf_counter()
+            for i in range(iterations):
+                entity.add(Transform, i, i, 0.0, 1.0, trusted=trusted)
+                entity.replace(Transform, i, i, 1.0, 2.0, trusted=trusted)
+                entity.remove(Transform)
+            return (time.perf_counter() - start) / iterations
+
+        before = min(run_uncached() for _ in range(3))
+        entity._components.clear()
+        validated = min(run(False) for _ in range(3))
+        trusted = min(run(True) for _ in range(3))
+
+        print(
+            f"\nadd+replace per iteration: uncached construction={before * 1e6:.2f}us "
+            f"entity validated={validated * 1e6:.2f}us "
+            f"entity trusted={trusted * 1e6:.2f}us"
+        )
+
+        assert trusted < validated
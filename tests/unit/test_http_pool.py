@@ -0,0 +1,188 @@
+"""
+Tests for the process-wide shared HTTP pool used by DeepSeekClient.
+
+A minimal keep-alive HTTP/1.1 server on localhost stands in for the
+DeepSeek API so connection reuse can be observed without network access.
+"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, List
+
+import httpx
+import pytest
+
+from src.ai_rpg.deepseek import (
+    DeepSeekClient,
+    HttpPoolConfig,
+    SharedHttpPool,
+    batch_chat,
+    shared_http_pool,
+)
+from src.ai_rpg.deepseek import client as client_module
+from src.ai_rpg.models.messages import SystemMessage
+
+_RESPONSE_BODY = json.dumps(
+    {
+        "choices": [
+            {
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "ok"},
+            }
+        ]
+    }
+).encode()
+
+
+async def _handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Serves keep-alive requests on one connection until the client closes it."""
+    try:
+        while True:
+            header = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in header.decode().split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(_RESPONSE_BODY)}\r\n\r\n".encode()
+                + _RESPONSE_BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+@pytest.fixture
+async def local_server_url() -> AsyncIterator[str]:
+    server = await asyncio.start_server(_handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/chat/completions"
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+class TestSharedHttpPool:
+    """Test cases for SharedHttpPool."""
+
+    async def test_connections_are_reused(self, local_server_url: str) -> None:
+        """Test that sequential requests share one keep-alive connection."""
+        pool = SharedHttpPool()
+        await pool.start(HttpPoolConfig(http2=False))
+
+        for _ in range(10):
+            response = await pool.get_client().post(local_server_url, json={})
+            assert response.status_code == 200
+
+        stats = pool.stats
+        await pool.aclose()
+
+        assert stats.requests == 10
+        assert stats.connections_opened == 1
+        assert stats.reuse_ratio == pytest.approx(0.9)
+        assert not pool.is_open
+
+    async def test_same_client_within_loop(self) -> None:
+        """Test that the pool hands out one client per event loop."""
+        pool = SharedHttpPool()
+        try:
+            assert pool.get_client() is pool.get_client()
+            assert pool.stats.clients_created == 1
+        finally:
+            await pool.aclose()
+
+    def test_client_recreated_for_new_event_loop(self) -> None:
+        """Test that a client bound to a finished loop is not reused."""
+        pool = SharedHttpPool()
+        clients: List[object] = []
+
+        async def grab() -> None:
+            clients.append(pool.get_client())
+
+        asyncio.run(grab())
+        asyncio.run(grab())
+        asyncio.run(pool.aclose())
+
+        assert clients[0] is not clients[1]
+        assert pool.stats.clients_created == 2
+        assert pool.stats.clients_discarded == 1
+
+    def test_old_client_closed_on_its_running_loop(self) -> None:
+        """Test that switching loops closes the old client on the loop that owns it."""
+        pool = SharedHttpPool()
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+
+            async def grab() -> httpx.AsyncClient:
+                return pool.get_client()
+
+            old_client = asyncio.run_coroutine_threadsafe(grab(), other_loop).result()
+            new_client = asyncio.run(grab())
+
+            # the close is scheduled on the other loop
+            for _ in range(100):
+                if old_client.is_closed:
+                    break
+                asyncio.run_coroutine_threadsafe(
+                    asyncio.sleep(0.01), other_loop
+                ).result()
+            assert old_client.is_closed
+            assert new_client is not old_client and not new_client.is_closed
+            assert pool.stats.clients_discarded == 0
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+    def test_http2_falls_back_without_h2(self) -> None:
+        """Test that HTTP/2 is only enabled when the h2 package is available."""
+        import importlib.util
+
+        pool = SharedHttpPool()
+
+        async def grab() -> None:
+            pool.get_client()
+            await pool.aclose()
+
+        asyncio.run(grab())
+        assert pool.stats.http2 == (importlib.util.find_spec("h2") is not None)
+
+    async def test_deepseek_chat_uses_shared_pool(
+        self, local_server_url: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that DeepSeekClient.chat and batch_chat reuse the shared pool."""
+        monkeypatch.setattr(client_module, "_DEEPSEEK_API_URL", local_server_url)
+        monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+        await shared_http_pool.start(HttpPoolConfig(http2=False))
+        before = shared_http_pool.stats
+
+        def make_client(i: int) -> DeepSeekClient:
+            return DeepSeekClient(
+                name=f"npc{i}",
+                full_prompt="hello",
+                context=[SystemMessage(content="system")],
+            )
+
+        single = make_client(0)
+        await single.chat()
+        await make_client(1).chat()
+        await batch_chat([make_client(i) for i in range(2, 6)])
+
+        after = shared_http_pool.stats
+        await shared_http_pool.aclose()
+
+        assert single.response_content == "ok"
+        assert after.requests - before.requests == 6
+        # Sequential calls share a connection; the concurrent batch may open more.
+        assert after.connections_opened - before.connections_opened <= 4
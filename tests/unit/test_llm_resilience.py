@@ -0,0 +1,267 @@
+"""
+Tests for the LLM resilience layer (retry, hedging, circuit breaker).
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, List
+
+import httpx
+import pytest
+
+from src.ai_rpg.deepseek import (
+    CircuitBreakerConfig,
+    HedgePolicy,
+    LLMCircuitOpenError,
+    LLMPriority,
+    ResilienceConfig,
+    ResilienceLayer,
+    RetryPolicy,
+    llm_request_context,
+)
+from src.ai_rpg.deepseek.resilience import _parse_retry_after
+
+_REQUEST = httpx.Request("POST", "http://llm.test/chat/completions")
+
+
+def _response(status_code: int, **headers: str) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers, request=_REQUEST)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """A streaming body that records whether it was closed."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b""
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _fast_config(**kwargs: object) -> ResilienceConfig:
+    return ResilienceConfig(
+        retry=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002),
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+class TestRetry:
+    """Test cases for retry with backoff."""
+
+    async def test_transport_error_is_retried(self) -> None:
+        """Test that a transient connect error is retried and then succeeds."""
+        layer = ResilienceLayer(_fast_config())
+        calls: List[int] = []
+
+        async def send() -> httpx.Response:
+            calls.append(1)
+            if len(calls) == 1:
+                raise httpx.ConnectError("boom", request=_REQUEST)
+            return _response(200)
+
+        response = await layer.execute(send, hedge=False)
+
+        stats = layer.stats
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert stats.retries == 1
+        assert stats.failures == 1
+        assert stats.attempts == 2
+
+    async def test_gives_up_after_max_attempts(self) -> None:
+        """Test that the last error is raised once attempts are exhausted."""
+        layer = ResilienceLayer(_fast_config())
+
+        async def send() -> httpx.Response:
+            raise httpx.ReadTimeout("slow", request=_REQUEST)
+
+        with pytest.raises(httpx.ReadTimeout):
+            await layer.execute(send, hedge=False)
+        assert layer.stats.attempts == 3
+
+    async def test_non_retryable_status_is_returned(self) -> None:
+        """Test that client errors are handed back without retrying."""
+        layer = ResilienceLayer(_fast_config())
+        calls: List[int] = []
+
+        async def send() -> httpx.Response:
+            calls.append(1)
+            return _response(400)
+
+        response = await layer.execute(send, hedge=False)
+        assert response.status_code == 400
+        assert len(calls) == 1
+
+    async def test_retry_after_is_honored(self) -> None:
+        """Test that Retry-After on 429 sets a lower bound for the backoff."""
+        layer = ResilienceLayer(_fast_config())
+        responses = [_response(429, **{"Retry-After": "0.05"}), _response(200)]
+
+        async def send() -> httpx.Response:
+            return responses.pop(0)
+
+        start = time.monotonic()
+        response = await layer.execute(send, hedge=False)
+
+        assert response.status_code == 200
+        assert time.monotonic() - start >= 0.05
+        assert layer.stats.retry_after_honored == 1
+
+    def test_parse_retry_after(self) -> None:
+        """Test parsing Retry-After as seconds and as an HTTP date."""
+        assert _parse_retry_after("3") == 3.0
+        assert _parse_retry_after(None) is None
+        assert _parse_retry_after("garbage") is None
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestCircuitBreaker:
+    """Test cases for the circuit breaker."""
+
+    async def test_opens_rejects_and_recovers(self) -> None:
+        """Test closed -> open -> half-open -> closed transitions."""
+        layer = ResilienceLayer(
+            _fast_config(
+                breaker=CircuitBreakerConfig(failure_threshold=3, recovery_timeout=0.05)
+            )
+        )
+        healthy = False
+
+        async def send() -> httpx.Response:
+            return _response(200 if healthy else 503)
+
+        response = await layer.execute(send, hedge=False)
+        assert response.status_code == 503
+        assert layer.stats.circuit_state == "open"
+
+        with pytest.raises(LLMCircuitOpenError):
+            await layer.execute(send, hedge=False)
+        assert layer.stats.circuit_rejections == 1
+
+        await asyncio.sleep(0.06)
+        healthy = True
+        response = await layer.execute(send, hedge=False)
+        assert response.status_code == 200
+        assert layer.stats.circuit_state == "closed"
+        assert layer.stats.circuit_opens == 1
+
+    async def test_half_open_admits_a_single_probe(self) -> None:
+        """Test that only one probe passes while half-open and the rest are rejected."""
+        layer = ResilienceLayer(
+            _fast_config(
+                breaker=CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0.0)
+            )
+        )
+        layer._record_failure()
+        release = asyncio.Event()
+        calls: List[int] = []
+
+        async def send() -> httpx.Response:
+            calls.append(1)
+            await release.wait()
+            return _response(200)
+
+        probe = asyncio.ensure_future(layer.execute(send, hedge=False))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMCircuitOpenError):
+            await asyncio.wait_for(layer.execute(send, hedge=False), timeout=1.0)
+        assert layer.stats.circuit_state == "half_open"
+
+        release.set()
+        assert (await probe).status_code == 200
+        assert len(calls) == 1
+        assert layer.stats.circuit_state == "closed"
+
+    async def test_cancelled_probe_frees_the_slot(self) -> None:
+        """Test that a cancelled probe lets the next caller probe again."""
+        layer = ResilienceLayer(
+            _fast_config(
+                breaker=CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0.0)
+            )
+        )
+        layer._record_failure()
+
+        async def stall() -> httpx.Response:
+            await asyncio.sleep(10)
+            return _response(200)
+
+        async def send() -> httpx.Response:
+            return _response(200)
+
+        probe = asyncio.ensure_future(layer.execute(stall, hedge=False))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert (await layer.execute(send, hedge=False)).status_code == 200
+        assert layer.stats.circuit_state == "closed"
+
+
+class TestHedging:
+    """Test cases for hedged requests."""
+
+    def _hedging_layer(self) -> ResilienceLayer:
+        layer = ResilienceLayer(
+            _fast_config(hedge=HedgePolicy(enabled=True, min_samples=5, min_delay=0.0))
+        )
+        for _ in range(50):
+            layer._record_success(0.01)
+        return layer
+
+    async def test_slow_request_is_hedged(self) -> None:
+        """Test that a duplicate request wins when the first one stalls."""
+        layer = self._hedging_layer()
+        calls: List[int] = []
+
+        async def send() -> httpx.Response:
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1.0)
+            return _response(200)
+
+        start = time.monotonic()
+        response = await layer.execute(send, hedge=True)
+
+        assert response.status_code == 200
+        assert time.monotonic() - start < 0.5
+        assert layer.stats.hedges_launched == 1
+        assert layer.stats.hedges_won == 1
+
+    async def test_hedging_follows_interactive_priority(self) -> None:
+        """Test that only interactive requests are hedged by default."""
+        layer = self._hedging_layer()
+
+        async def send() -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return _response(200)
+
+        with llm_request_context(priority=LLMPriority.GENERATION):
+            await layer.execute(send)
+        assert layer.stats.hedges_launched == 0
+
+        with llm_request_context(priority=LLMPriority.INTERACTIVE):
+            await layer.execute(send)
+        assert layer.stats.hedges_launched == 1
+
+    async def test_unused_responses_are_closed(self) -> None:
+        """Test that a retryable response replaced by the winner is closed."""
+        layer = self._hedging_layer()
+        streams: List[_TrackedStream] = []
+
+        async def send() -> httpx.Response:
+            first = not streams
+            stream = _TrackedStream()
+            streams.append(stream)
+            await asyncio.sleep(0.05 if first else 0.1)
+            return httpx.Response(
+                503 if first else 200, stream=stream, request=_REQUEST
+            )
+
+        response = await layer._send_hedged(send)
+
+        assert response.status_code == 200
+        assert streams[0].closed and not streams[1].closed
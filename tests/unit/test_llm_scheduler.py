@@ -0,0 +1,175 @@
+"""
+Tests for the global LLM concurrency scheduler.
+"""
+
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from src.ai_rpg.deepseek import LLMPriority, LLMScheduler, llm_request_context
+from src.ai_rpg.entitas import ExecuteProcessor
+from src.ai_rpg.game.rpg_game_pipeline_manager import RPGGameProcessPipeline
+
+
+async def _hold(scheduler: LLMScheduler, release: asyncio.Event) -> None:
+    async with scheduler.slot(user="holder", priority=LLMPriority.INTERACTIVE):
+        await release.wait()
+
+
+async def _record(
+    scheduler: LLMScheduler,
+    order: List[Tuple[str, LLMPriority]],
+    user: str,
+    priority: LLMPriority,
+) -> None:
+    async with scheduler.slot(user=user, priority=priority):
+        order.append((user, priority))
+        await asyncio.sleep(0)
+
+
+async def _queue_behind_holder(
+    scheduler: LLMScheduler,
+    requests: List[Tuple[str, LLMPriority]],
+) -> List[Tuple[str, LLMPriority]]:
+    """Queues requests while a single slot is held, then releases it."""
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(scheduler, release))
+    await asyncio.sleep(0)
+
+    order: List[Tuple[str, LLMPriority]] = []
+    tasks = []
+    for user, priority in requests:
+        tasks.append(asyncio.create_task(_record(scheduler, order, user, priority)))
+        await asyncio.sleep(0)
+
+    assert scheduler.queue_depth == len(requests)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+class TestLLMScheduler:
+    """Test cases for LLMScheduler."""
+
+    async def test_in_flight_never_exceeds_cap(self) -> None:
+        """Test that concurrent requests are limited to max_in_flight."""
+        scheduler = LLMScheduler(max_in_flight=3)
+        peak = 0
+
+        async def request(i: int) -> None:
+            nonlocal peak
+            async with scheduler.slot(user=f"player{i % 4}"):
+                peak = max(peak, scheduler.in_flight)
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(request(i) for i in range(20)))
+
+        assert peak == 3
+        assert scheduler.in_flight == 0
+        assert scheduler.stats.granted == 20
+
+    async def test_higher_priority_goes_first(self) -> None:
+        """Test that queued interactive requests overtake generation requests."""
+        scheduler = LLMScheduler(max_in_flight=1)
+        order = await _queue_behind_holder(
+            scheduler,
+            [
+                ("a", LLMPriority.GENERATION),
+                ("b", LLMPriority.PLANNING),
+                ("c", LLMPriority.INTERACTIVE),
+            ],
+        )
+
+        assert [priority for _, priority in order] == [
+            LLMPriority.INTERACTIVE,
+            LLMPriority.PLANNING,
+            LLMPriority.GENERATION,
+        ]
+
+    async def test_round_robin_between_players(self) -> None:
+        """Test that one player's burst does not starve another player."""
+        scheduler = LLMScheduler(max_in_flight=1)
+        burst = [("greedy", LLMPriority.PLANNING)] * 4
+        order = await _queue_behind_holder(
+            scheduler, burst + [("polite", LLMPriority.PLANNING)]
+        )
+
+        users = [user for user, _ in order]
+        assert users.index("polite") == 1
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        """Test that cancelling a queued request does not leak a slot."""
+        scheduler = LLMScheduler(max_in_flight=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, release))
+        await asyncio.sleep(0)
+
+        waiter = asyncio.create_task(scheduler.acquire(user="x"))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+
+        release.set()
+        await holder
+        assert scheduler.in_flight == 0
+
+    async def test_context_supplies_user_and_priority(self) -> None:
+        """Test that slot() falls back to llm_request_context values."""
+        scheduler = LLMScheduler(max_in_flight=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, release))
+        await asyncio.sleep(0)
+
+        with llm_request_context(user="hero", priority=LLMPriority.GENERATION):
+            waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+        stats = scheduler.stats
+        assert stats.queue_depth_by_priority[LLMPriority.GENERATION.name] == 1
+        assert stats.queued_users == 1
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        scheduler.release()
+        assert scheduler.in_flight == 0
+
+    async def test_configure_releases_waiters(self) -> None:
+        """Test that raising the cap immediately admits queued requests."""
+        scheduler = LLMScheduler(max_in_flight=1)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+
+        scheduler.configure(2)
+        await waiter
+        assert scheduler.in_flight == 2
+
+    async def test_pipeline_sets_request_context(self) -> None:
+        """Test that RPGGameProcessPipeline.process() tags LLM requests."""
+        from src.ai_rpg.deepseek import scheduler as scheduler_module
+
+        seen: List[Tuple[str, LLMPriority]] = []
+
+        class _Probe(ExecuteProcessor):
+            async def execute(self) -> None:
+                seen.append(
+                    (
+                        scheduler_module._current_user.get(),
+                        scheduler_module._current_priority.get(),
+                    )
+                )
+
+        pipeline = RPGGameProcessPipeline(
+            llm_user="hero", llm_priority=LLMPriority.INTERACTIVE
+        )
+        pipeline.add(_Probe())
+        await pipeline.process()
+
+        assert seen == [("hero", LLMPriority.INTERACTIVE)]
+        assert scheduler_module._current_user.get() == ""
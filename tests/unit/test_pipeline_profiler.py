@@ -0,0 +1,218 @@
+"""
+Tests for per-system pipeline profiling: LLM wait attribution, reactive
+collection counts, group updates, Chrome trace export and the runtime toggle.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Generator, List
+
+import pytest
+from pydantic import ValidationError
+
+from src.ai_rpg.deepseek import LLMWaitTimer, llm_wait, track_llm_wait
+from src.ai_rpg.entitas import (
+    Context,
+    Entity,
+    ExecuteProcessor,
+    ExecutionMode,
+    GroupEvent,
+    Matcher,
+    ReactiveProcessor,
+)
+from src.ai_rpg.game.pipeline_profiler import pipeline_profiler
+from src.ai_rpg.game.rpg_game_pipeline_manager import (
+    RPGGamePipelineManager,
+    RPGGameProcessPipeline,
+)
+from src.ai_rpg.models import PipelineProfileToggleRequest
+from tests.unit.test_components import Position, Velocity
+
+
+@pytest.fixture
+def profiler_enabled() -> Generator[None, None, None]:
+    pipeline_profiler.clear()
+    pipeline_profiler.enable()
+    yield
+    pipeline_profiler.disable()
+    pipeline_profiler.clear()
+
+
+class _FakeLLMSystem(ExecuteProcessor):
+    """Execute processor that waits on `count` simulated LLM requests at once."""
+
+    def __init__(self, latency: float, count: int = 1) -> None:
+        self._latency = latency
+        self._count = count
+
+    async def _request(self) -> None:
+        with llm_wait():
+            await asyncio.sleep(self._latency)
+
+    async def execute(self) -> None:
+        await asyncio.gather(*(self._request() for _ in range(self._count)))
+
+
+class _MoveSystem(ReactiveProcessor):
+    """Reactive processor that replaces Position on every collected entity."""
+
+    def __init__(self, context: Context) -> None:
+        super().__init__(context)
+
+    def get_trigger(self) -> dict[Matcher, GroupEvent]:
+        return {Matcher(Velocity): GroupEvent.ADDED}
+
+    def filter(self, entity: Entity) -> bool:
+        return entity.has(Position)
+
+    async def react(self, entities: list[Entity]) -> None:
+        for entity in entities:
+            position = entity.get(Position)
+            entity.replace(Position, position.x + 1, position.y)
+
+
+class _FailingSystem(ExecuteProcessor):
+    async def execute(self) -> None:
+        raise RuntimeError("boom")
+
+
+class _GameContext(Context, RPGGamePipelineManager):
+    """Context that also manages pipelines, like RPGGame."""
+
+    def __init__(self) -> None:
+        Context.__init__(self)
+        RPGGamePipelineManager.__init__(self)
+
+
+class TestLLMWaitTimer:
+    """Test cases for LLM wait accounting."""
+
+    async def test_overlapping_requests_count_once(self) -> None:
+        """Test that concurrent requests are measured as the union of their intervals."""
+        timer = LLMWaitTimer()
+        with track_llm_wait(timer):
+            await _FakeLLMSystem(0.05, count=3).execute()
+
+        assert timer.requests == 3
+        assert 0.04 < timer.wait_seconds < 0.12
+
+    async def test_untracked_requests_are_ignored(self) -> None:
+        """Test that llm_wait() without a bound timer records nothing."""
+        timer = LLMWaitTimer()
+        await _FakeLLMSystem(0.01).execute()
+        assert timer.requests == 0
+
+
+class TestPipelineProfiling:
+    """Test cases for RPGGameProcessPipeline profiling."""
+
+    async def test_disabled_records_nothing(self) -> None:
+        """Test that a pipeline run without the profiler leaves no profile."""
+        pipeline_profiler.clear()
+        pipeline = RPGGameProcessPipeline(name="test")
+        pipeline.add(_FakeLLMSystem(0.01))
+
+        await pipeline.process()
+
+        assert pipeline.last_profile is None
+        assert pipeline_profiler.recent == []
+
+    async def test_spans_split_llm_wait_and_cpu(self, profiler_enabled: None) -> None:
+        """Test per-system spans and LLM attribution in concurrent stages."""
+        pipeline = RPGGameProcessPipeline(
+            name="test", llm_user="alice", execution_mode=ExecutionMode.CONCURRENT
+        )
+        llm = _FakeLLMSystem(0.05)
+        llm.reads, llm.writes = frozenset(), frozenset({"a"})  # type: ignore[misc]
+        other = _FakeLLMSystem(0.05, count=2)
+        other.reads, other.writes = frozenset(), frozenset({"b"})  # type: ignore[misc]
+        pipeline.add(llm)
+        pipeline.add(other)
+        pipeline.add(_FakeLLMSystem(0.0, count=0))
+
+        await pipeline.process()
+
+        profile = pipeline.last_profile
+        assert profile is not None
+        assert pipeline_profiler.recent == [profile]
+        assert (profile.pipeline, profile.user) == ("test", "alice")
+        assert [(s.stage, s.slot) for s in profile.spans] == [(0, 0), (0, 1), (1, 0)]
+        first, second, last = profile.spans
+        assert first.llm_requests == 1 and second.llm_requests == 2
+        assert first.llm_wait_seconds > 0.04 and second.llm_wait_seconds > 0.04
+        assert last.llm_requests == 0 and last.llm_wait_seconds == 0.0
+        assert first.cpu_seconds < first.wall_seconds
+        # both LLM systems overlapped, so the pipeline took roughly one latency
+        assert profile.execute_seconds < 0.09
+        assert profile.saved_seconds > 0.03
+
+    async def test_reactive_collection_and_group_updates(
+        self, profiler_enabled: None
+    ) -> None:
+        """Test collected entity counts and group updates caused by a system."""
+        manager_context = _GameContext()
+        pipeline = RPGGameProcessPipeline(name="test")
+        pipeline.add(_MoveSystem(manager_context))
+        manager_context.register_pipeline(pipeline)
+        manager_context.get_group(Matcher(Position))
+        await manager_context.initialize_pipelines()
+
+        for index in range(3):
+            entity = manager_context.create_entity()
+            entity.add(Position, index, 0)
+            entity.add(Velocity, 1, 0)
+
+        await pipeline.process()
+
+        profile = pipeline.last_profile
+        assert profile is not None
+        (span,) = profile.spans
+        assert span.name == "_MoveSystem"
+        assert span.collected_entities == 3
+        # one Position group update per replaced entity
+        assert span.group_updates == 3
+
+    async def test_failure_is_recorded(self, profiler_enabled: None) -> None:
+        """Test that a failing system still produces a profile with the error."""
+        pipeline = RPGGameProcessPipeline(name="test")
+        pipeline.add(_FailingSystem())
+
+        with pytest.raises(RuntimeError):
+            await pipeline.process()
+
+        profile = pipeline.last_profile
+        assert profile is not None
+        assert profile.spans[0].error == "RuntimeError: boom"
+
+    async def test_chrome_trace_export(self, tmp_path: Path) -> None:
+        """Test the Trace Event Format output and the per-run trace file."""
+        pipeline_profiler.clear()
+        pipeline_profiler.enable(tmp_path)
+        try:
+            pipeline = RPGGameProcessPipeline(name="test", llm_user="bob")
+            pipeline.add(_FakeLLMSystem(0.01))
+            await pipeline.process()
+        finally:
+            # reset output_dir so later tests don't write trace files
+            pipeline_profiler.enable(None)
+            pipeline_profiler.disable()
+
+        files = list(tmp_path.glob("*_bob_test.trace.json"))
+        assert len(files) == 1
+        trace = json.loads(files[0].read_text(encoding="utf-8"))
+        events: List[dict[str, object]] = trace["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        assert [event["name"] for event in complete] == ["test", "_FakeLLMSystem"]
+        processor_event = complete[1]
+        assert processor_event["tid"] == 1
+        assert isinstance(processor_event["dur"], int) and processor_event["dur"] > 0
+        args = processor_event["args"]
+        assert isinstance(args, dict) and args["llm_requests"] == 1
+        pipeline_profiler.clear()
+
+    def test_toggle_rejects_negative_keep(self) -> None:
+        """Test that a negative keep is a validation error rather than a deque error."""
+        with pytest.raises(ValidationError):
+            PipelineProfileToggleRequest(enabled=True, keep=-1)
+        assert PipelineProfileToggleRequest(enabled=True, keep=0).keep == 0
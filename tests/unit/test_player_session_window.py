@@ -0,0 +1,138 @@
+"""
+Tests for PlayerSession incremental reads and the bounded in-memory window.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Union
+
+import pytest
+
+from src.ai_rpg.game.world_store import (
+    WorldArchiver,
+    archive_world,
+    restore_world,
+    snapshot_player_session,
+)
+from src.ai_rpg.models import PlayerSession, WorldState
+from src.ai_rpg.models.agent_event import AgentEvent
+
+
+def _session(window_size: int, events: int = 0) -> PlayerSession:
+    session = PlayerSession(name="player", actor="hero", game="game")
+    session.configure_window(window_size)
+    _add_events(session, events)
+    return session
+
+
+def _add_events(session: PlayerSession, count: int) -> None:
+    for _ in range(count):
+        session.add_agent_event(
+            AgentEvent(message=f"event {session.event_sequence + 1}")
+        )
+
+
+def _sequence_ids(session: PlayerSession, last_id: int) -> list[int]:
+    return [m.sequence_id for m in session.get_messages_since(last_id)]
+
+
+def _world() -> WorldState:
+    world = WorldState(entity_counter=0)
+    world.blueprint.name = "game"
+    return world
+
+
+def _archive(
+    archiver: WorldArchiver, world: WorldState, session: PlayerSession
+) -> None:
+    sequence = session.event_sequence
+    assert archiver.archive(world, snapshot_player_session(session))
+    session.mark_durable(archiver.save_dir / "player_session.jsonl", sequence)
+
+
+class TestPlayerSessionWindow:
+    """Test cases for PlayerSession.get_messages_since and window trimming."""
+
+    def test_messages_since_uses_sequence_ids(self) -> None:
+        """Test incremental reads at the start, middle and end of the session."""
+        session = _session(window_size=100, events=10)
+
+        assert _sequence_ids(session, 0) == list(range(1, 11))
+        assert _sequence_ids(session, 7) == [8, 9, 10]
+        assert _sequence_ids(session, 10) == []
+        assert _sequence_ids(session, 99) == []
+
+    def test_messages_stay_in_memory_until_archived(self) -> None:
+        """Test that nothing is dropped before it has been written to disk."""
+        session = _session(window_size=4, events=20)
+
+        assert len(session.session_messages) == 20
+        assert _sequence_ids(session, 0) == list(range(1, 21))
+
+    def test_archived_messages_spill_and_are_read_back(self, tmp_path: Path) -> None:
+        """Test that old events leave memory and lagging readers get them from disk."""
+        world = _world()
+        session = _session(window_size=4, events=10)
+        archiver = WorldArchiver(tmp_path / "save")
+        _archive(archiver, world, session)
+
+        _add_events(session, 2)  # past 2x window: trims back to the window size
+        assert session.first_sequence_in_memory == 8
+        assert len(session.session_messages) == 5
+        assert session.has_spilled_since(3)
+        assert not session.has_spilled_since(7)
+
+        assert [m.sequence_id for m in session.read_spilled_messages(3)] == [4, 5, 6, 7]
+        assert _sequence_ids(session, 0) == list(range(8, 13))  # memory only
+        assert _sequence_ids(session, 5) == list(range(8, 13))
+        assert _sequence_ids(session, 8) == [9, 10, 11, 12]
+
+    def test_unarchived_messages_are_never_trimmed(self, tmp_path: Path) -> None:
+        """Test that trimming stops at the last durable sequence id."""
+        world = _world()
+        session = _session(window_size=4, events=3)
+        archiver = WorldArchiver(tmp_path / "save")
+        _archive(archiver, world, session)
+
+        _add_events(session, 5)
+        assert session.first_sequence_in_memory == 4
+        assert _sequence_ids(session, 0) == list(range(4, 9))
+
+    def test_rewrites_keep_spilled_events(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that full archives and role switches re-emit events from disk."""
+        world = _world()
+        session = _session(window_size=4, events=10)
+        archiver = WorldArchiver(tmp_path / "save")
+        _archive(archiver, world, session)
+        _add_events(session, 2)
+        assert session.first_sequence_in_memory > 1
+
+        # the old file stays readable until the rewritten one replaces it
+        spilled_during_rewrite: List[int] = []
+        real_replace = os.replace
+
+        def replace(src: Union[str, Path], dst: Union[str, Path]) -> None:
+            spilled_during_rewrite.extend(
+                m.sequence_id for m in session.read_spilled_messages(0)
+            )
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", replace)
+
+        # switching the actor changes the metadata line and forces a rewrite
+        session.actor = "mage"
+        _archive(archiver, world, session)
+        assert spilled_during_rewrite == list(range(1, 8))
+        assert not list(archiver.save_dir.glob("*.tmp"))
+        _, restored = restore_world(archiver.save_dir)
+        assert restored.actor == "mage"
+        assert [m.sequence_id for m in restored.session_messages] == list(range(1, 13))
+
+        full_dir = tmp_path / "full"
+        assert archive_world(
+            world, snapshot_player_session(session), tmp_path, full_dir
+        )
+        _, restored = restore_world(full_dir)
+        assert [m.sequence_id for m in restored.session_messages] == list(range(1, 13))
@@ -0,0 +1,188 @@
+"""
+Tests for dependency-aware concurrent execution in Processors: conflict
+detection from declared reads/writes, stage planning, execution and traces.
+"""
+
+import asyncio
+from typing import ClassVar, FrozenSet, Hashable, List, Optional
+
+import pytest
+
+from src.ai_rpg.entitas import (
+    ExecuteProcessor,
+    ExecutionMode,
+    Processors,
+    plan_execution_stages,
+    processors_conflict,
+)
+from src.ai_rpg.systems.appearance_initialization_system import (
+    AppearanceInitializationSystem,
+)
+from src.ai_rpg.systems.stage_description_system import StageDescriptionSystem
+from tests.unit.test_components import Position, Velocity
+
+
+class _Sleeper(ExecuteProcessor):
+    """Execute processor that records start/end order around an await."""
+
+    def __init__(
+        self,
+        name: str,
+        log: List[str],
+        reads: Optional[FrozenSet[Hashable]] = None,
+        writes: Optional[FrozenSet[Hashable]] = None,
+        delay: float = 0.05,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.name = name
+        self._log = log
+        self._delay = delay
+        self._error = error
+        # instance attributes shadow the class-level declarations
+        self.reads = reads  # type: ignore[misc]
+        self.writes = writes  # type: ignore[misc]
+
+    async def execute(self) -> None:
+        self._log.append(f"start {self.name}")
+        await asyncio.sleep(self._delay)
+        self._log.append(f"end {self.name}")
+        if self._error is not None:
+            raise self._error
+
+
+def _declared(
+    name: str, log: List[str], reads: FrozenSet[Hashable], writes: FrozenSet[Hashable]
+) -> _Sleeper:
+    return _Sleeper(name, log, reads=reads, writes=writes)
+
+
+class TestConflicts:
+    """Test cases for conflict detection and stage planning."""
+
+    def test_undeclared_always_conflicts(self) -> None:
+        """Test that a processor without declarations is a barrier."""
+        log: List[str] = []
+        declared = _declared("a", log, frozenset(), frozenset({Position}))
+        assert processors_conflict(declared, _Sleeper("b", log))
+
+    def test_read_write_overlap(self) -> None:
+        """Test write/read, write/write and read/read combinations."""
+        log: List[str] = []
+        writer = _declared("w", log, frozenset(), frozenset({Position}))
+        reader = _declared("r", log, frozenset({Position}), frozenset())
+        other_reader = _declared("r2", log, frozenset({Position}), frozenset())
+        other_writer = _declared("w2", log, frozenset(), frozenset({Velocity}))
+
+        assert processors_conflict(writer, reader)
+        assert processors_conflict(reader, writer)
+        assert processors_conflict(writer, writer)
+        assert not processors_conflict(reader, other_reader)
+        assert not processors_conflict(writer, other_writer)
+
+    def test_plan_groups_only_adjacent_processors(self) -> None:
+        """Test that stages keep the added order and never reorder across a barrier."""
+        log: List[str] = []
+        a = _declared("a", log, frozenset(), frozenset({Position}))
+        b = _declared("b", log, frozenset(), frozenset({Velocity}))
+        barrier = _Sleeper("barrier", log)
+        c = _declared("c", log, frozenset(), frozenset({"resource"}))
+        d = _declared("d", log, frozenset({Position}), frozenset())
+
+        stages = plan_execution_stages([a, b, barrier, c, d])
+        assert stages == [[a, b], [barrier], [c, d]]
+
+    def test_declared_game_systems_conflict(self) -> None:
+        """Test that stage description waits for appearance initialization."""
+        assert StageDescriptionSystem.reads is not None
+        assert AppearanceInitializationSystem.writes is not None
+        assert not StageDescriptionSystem.reads.isdisjoint(
+            AppearanceInitializationSystem.writes
+        )
+
+
+class TestConcurrentExecution:
+    """Test cases for Processors.execute in both execution modes."""
+
+    def _pipeline(self, mode: ExecutionMode, log: List[str]) -> Processors:
+        processors = Processors(mode)
+        processors.add(_declared("a", log, frozenset(), frozenset({Position})))
+        processors.add(_declared("b", log, frozenset(), frozenset({Velocity})))
+        processors.add(_declared("c", log, frozenset({Position}), frozenset()))
+        return processors
+
+    async def test_sequential_mode_is_deterministic(self) -> None:
+        """Test that SEQUENTIAL keeps strict one-after-another order."""
+        log: List[str] = []
+        processors = self._pipeline(ExecutionMode.SEQUENTIAL, log)
+
+        await processors.execute()
+
+        assert log == ["start a", "end a", "start b", "end b", "start c", "end c"]
+        trace = processors.last_trace
+        assert trace is not None and len(trace.stages) == 3
+        assert trace.saved_seconds == 0.0
+
+    async def test_concurrent_mode_overlaps_and_reports_savings(self) -> None:
+        """Test that independent processors overlap and the trace shows the saving."""
+        log: List[str] = []
+        processors = self._pipeline(ExecutionMode.CONCURRENT, log)
+
+        await processors.execute()
+
+        assert log[:2] == ["start a", "start b"]
+        assert log.index("start c") > log.index("end a")
+        trace = processors.last_trace
+        assert trace is not None
+        assert [stage.processors for stage in trace.stages] == [
+            ("_Sleeper", "_Sleeper"),
+            ("_Sleeper",),
+        ]
+        assert trace.saved_seconds > 0.03
+
+    async def test_failure_waits_for_stage_and_raises_first(self) -> None:
+        """Test that a failing processor lets its stage finish and stops later stages."""
+        log: List[str] = []
+        processors = Processors(ExecutionMode.CONCURRENT)
+        processors.add(
+            _Sleeper(
+                "a",
+                log,
+                reads=frozenset(),
+                writes=frozenset({Position}),
+                delay=0.01,
+                error=ValueError("a failed"),
+            )
+        )
+        processors.add(_declared("b", log, frozenset(), frozenset({Velocity})))
+        processors.add(_Sleeper("after", log))
+
+        with pytest.raises(ValueError, match="a failed"):
+            await processors.execute()
+
+        assert "end b" in log
+        assert "start after" not in log
+
+    def test_switching_mode_replans(self) -> None:
+        """Test that changing the mode or adding a processor rebuilds the stages."""
+        log: List[str] = []
+        processors = self._pipeline(ExecutionMode.SEQUENTIAL, log)
+        assert len(processors.execution_stages) == 3
+
+        processors.execution_mode = ExecutionMode.CONCURRENT
+        assert len(processors.execution_stages) == 2
+
+        processors.add(_declared("d", log, frozenset(), frozenset({"other"})))
+        assert [len(stage) for stage in processors.execution_stages] == [2, 2]
+
+
+class _DeclaredAtClassLevel(ExecuteProcessor):
+    reads: ClassVar[Optional[FrozenSet[Hashable]]] = frozenset({Position})
+    writes: ClassVar[Optional[FrozenSet[Hashable]]] = frozenset()
+
+    async def execute(self) -> None:
+        pass
+
+
+def test_class_level_declarations() -> None:
+    """Test that declarations made on the class are picked up."""
+    assert not processors_conflict(_DeclaredAtClassLevel(), _DeclaredAtClassLevel())
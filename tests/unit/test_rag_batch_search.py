@@ -0,0 +1,153 @@
+"""
+Tests and N-query latency benchmark for batched RAG retrieval.
+
+The embedding model and the pgvector search are replaced with fakes that
+sleep for a fixed time, so the test measures how retrieval is scheduled
+rather than model or database speed.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pytest
+
+from src.ai_rpg.rag import knowledge_retrieval, search_documents, search_documents_batch
+
+_ENCODE_FIXED_COST = 0.02  # per encode() call (model dispatch overhead)
+_SEARCH_LATENCY = 0.02  # per database round trip
+
+
+class _FakeEmbeddingModel:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def encode(self, sentences: List[str]) -> Any:
+        self.calls.append(list(sentences))
+        time.sleep(_ENCODE_FIXED_COST)
+        return np.array([[float(len(s))] * 384 for s in sentences])
+
+
+def _fake_search_batch(
+    query_embeddings: Sequence[Sequence[float]],
+    limit: int = 10,
+    collection_filter: Optional[str] = None,
+    doc_type_filter: Optional[str] = None,
+    similarity_threshold: float = 0.0,
+    search_params: Any = None,
+) -> List[List[Any]]:
+    time.sleep(_SEARCH_LATENCY)  # one round trip per statement
+    return [
+        [SimpleNamespace(content=f"{collection_filter}:{int(v[0])}", similarity=0.9)]
+        for v in query_embeddings
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _patch_search(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        knowledge_retrieval, "search_vector_documents_batch", _fake_search_batch
+    )
+
+
+class TestSearchDocumentsBatch:
+    """Test cases for search_documents_batch."""
+
+    async def test_results_are_returned_per_query(self) -> None:
+        """Test that results line up with the input and duplicates are encoded once."""
+        model = _FakeEmbeddingModel()
+        queries = ["a", "bbb", "a", "cc"]
+
+        results = await search_documents_batch(queries, "game", model, top_k=3)
+
+        assert [docs for docs, _ in results] == [
+            ["game:1"],
+            ["game:3"],
+            ["game:1"],
+            ["game:2"],
+        ]
+        assert model.calls == [["a", "bbb", "cc"]]
+
+    async def test_failed_search_yields_empty_result(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that one failing statement does not fail the whole batch."""
+
+        def flaky(query_embeddings: Sequence[Sequence[float]], **kwargs: Any) -> Any:
+            if int(query_embeddings[0][0]) == 2:
+                raise RuntimeError("db down")
+            return _fake_search_batch(query_embeddings, **kwargs)
+
+        monkeypatch.setattr(knowledge_retrieval, "search_vector_documents_batch", flaky)
+        results = await search_documents_batch(
+            ["a", "bb"], "game", _FakeEmbeddingModel(), batch_size=1
+        )
+        assert results == [(["game:1"], [0.9]), ([], [])]
+
+    async def test_queries_are_chunked_into_statements(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that each statement carries at most batch_size query vectors."""
+        statements: List[int] = []
+
+        def counting(query_embeddings: Sequence[Sequence[float]], **kwargs: Any) -> Any:
+            statements.append(len(query_embeddings))
+            return _fake_search_batch(query_embeddings, **kwargs)
+
+        monkeypatch.setattr(
+            knowledge_retrieval, "search_vector_documents_batch", counting
+        )
+        results = await search_documents_batch(
+            [f"q{i}" * (i + 1) for i in range(10)],
+            "game",
+            _FakeEmbeddingModel(),
+            batch_size=4,
+        )
+        assert sorted(statements) == [2, 4, 4]
+        assert len(results) == 10
+
+    async def test_event_loop_stays_responsive(self) -> None:
+        """Test that encoding and searching do not block the event loop."""
+        ticks: List[float] = []
+        stop = asyncio.Event()
+
+        async def ticker() -> None:
+            while not stop.is_set():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await search_documents_batch(
+            [f"q{i}" * (i + 1) for i in range(8)],
+            "game",
+            _FakeEmbeddingModel(),
+        )
+        stop.set()
+        await task
+
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        assert len(ticks) > 3
+        assert max(gaps) < _ENCODE_FIXED_COST * 2
+
+    @pytest.mark.parametrize("n", [1, 4, 8, 16])
+    async def test_benchmark_n_query_latency(self, n: int) -> None:
+        """Benchmark N queries: sequential search_documents vs one batch."""
+        queries = [f"q{i}" * (i + 1) for i in range(n)]
+
+        start = time.perf_counter()
+        for query in queries:
+            search_documents(query, "game", _FakeEmbeddingModel())
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await search_documents_batch(queries, "game", _FakeEmbeddingModel())
+        batched = time.perf_counter() - start
+
+        print(
+            f"\n{n:>2} queries: sequential={sequential * 1e3:.1f}ms "
+            f"batched={batched * 1e3:.1f}ms"
+        )
+        if n >= 4:
+            assert batched < sequential
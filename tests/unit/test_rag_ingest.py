@@ -0,0 +1,155 @@
+"""
+Tests for the streaming bulk-ingest path in ai_rpg.rag.
+
+The pgvector storage functions are replaced with an in-memory table so the
+chunking, deduplication and pruning logic can be checked without Postgres.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import pytest
+
+from src.ai_rpg.pgsql import compute_content_hash
+from src.ai_rpg.rag import (
+    IngestReport,
+    add_documents,
+    ingest_documents,
+    knowledge_retrieval,
+)
+
+
+class _FakeEmbeddingModel:
+    def __init__(self) -> None:
+        self.calls: List[int] = []
+
+    def encode(self, sentences: List[str]) -> Any:
+        self.calls.append(len(sentences))
+        return np.zeros((len(sentences), 384))
+
+
+class _FakeTable:
+    def __init__(self) -> None:
+        self.rows: Dict[str, str] = {}  # content_hash -> content
+        self.transactions: List[int] = []
+
+    def find_existing(self, collection: str, hashes: Sequence[str]) -> Set[str]:
+        return {h for h in hashes if h in self.rows}
+
+    def bulk_save(
+        self,
+        collection: str,
+        contents: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+        content_hashes: Sequence[str],
+    ) -> int:
+        self.transactions.append(len(contents))
+        for content, content_hash in zip(contents, content_hashes):
+            self.rows[content_hash] = content
+        return len(contents)
+
+    def delete_except(self, collection: str, keep: Sequence[str]) -> int:
+        stale = [h for h in self.rows if h not in set(keep)]
+        for h in stale:
+            del self.rows[h]
+        return len(stale)
+
+
+@pytest.fixture
+def table(monkeypatch: pytest.MonkeyPatch) -> _FakeTable:
+    fake = _FakeTable()
+    monkeypatch.setattr(
+        knowledge_retrieval, "find_existing_content_hashes", fake.find_existing
+    )
+    monkeypatch.setattr(
+        knowledge_retrieval, "bulk_save_vector_documents", fake.bulk_save
+    )
+    monkeypatch.setattr(
+        knowledge_retrieval, "delete_vector_documents_except", fake.delete_except
+    )
+    return fake
+
+
+def _docs(n: int) -> List[str]:
+    return [f"doc {i}" for i in range(n)]
+
+
+def _metas(n: int) -> List[Dict[str, Any]]:
+    return [{"category": "lore"} for _ in range(n)]
+
+
+class TestIngestDocuments:
+    """Test cases for ingest_documents."""
+
+    def test_chunks_share_one_encode_and_transaction(self, table: _FakeTable) -> None:
+        """Test that documents are encoded and written chunk by chunk."""
+        model = _FakeEmbeddingModel()
+        progress: List[int] = []
+
+        report = ingest_documents(
+            "game",
+            model,
+            _docs(10),
+            _metas(10),
+            batch_size=4,
+            on_progress=lambda r: progress.append(r.inserted),
+        )
+
+        assert model.calls == [4, 4, 2]
+        assert table.transactions == [4, 4, 2]
+        assert progress == [4, 8, 10]
+        assert report.inserted == 10 and report.chunks == 3
+
+    def test_rerun_only_embeds_changed_documents(self, table: _FakeTable) -> None:
+        """Test content-hash deduplication across runs and within one input."""
+        ingest_documents("game", _FakeEmbeddingModel(), _docs(5), _metas(5))
+
+        documents = _docs(5) + ["doc 0"]
+        metadatas = _metas(6)
+        documents[2] = "doc 2 (revised)"
+        model = _FakeEmbeddingModel()
+        report = ingest_documents("game", model, documents, metadatas, prune=True)
+
+        assert model.calls == [1]
+        assert report == IngestReport(
+            collection="game",
+            total=6,
+            duplicates=1,
+            unchanged=4,
+            inserted=1,
+            pruned=1,
+            chunks=1,
+            encode_seconds=report.encode_seconds,
+            write_seconds=report.write_seconds,
+            elapsed_seconds=report.elapsed_seconds,
+        )
+        assert sorted(table.rows.values()) == sorted(set(documents))
+
+    def test_metadata_change_counts_as_new_document(self) -> None:
+        """Test that the content hash covers metadata as well as content."""
+        assert compute_content_hash("a", {"k": 1}) != compute_content_hash(
+            "a", {"k": 2}
+        )
+        assert compute_content_hash("a", None) == compute_content_hash("a", {})
+
+    def test_add_documents_reports_failure(self, table: _FakeTable) -> None:
+        """Test that add_documents keeps its bool contract."""
+        assert add_documents("game", _FakeEmbeddingModel(), _docs(2), _metas(2))
+        assert not add_documents("game", _FakeEmbeddingModel(), _docs(2), _metas(1))
+
+    def test_add_documents_inserts_every_document(
+        self, table: _FakeTable, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that add_documents stays a plain insert without deduplication."""
+
+        def fail(collection: str, hashes: Sequence[str]) -> Set[str]:
+            raise AssertionError("add_documents must not look up existing hashes")
+
+        monkeypatch.setattr(knowledge_retrieval, "find_existing_content_hashes", fail)
+        model = _FakeEmbeddingModel()
+        documents = _docs(3) + ["doc 0"]
+        assert add_documents("game", model, documents, _metas(4), batch_size=3)
+
+        assert model.calls == [3, 1]
+        assert table.transactions == [3, 1]
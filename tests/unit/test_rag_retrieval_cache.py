@@ -0,0 +1,187 @@
+"""
+Tests for the RAG query-embedding and top-k result cache.
+
+The embedding model and the pgvector storage functions are replaced with
+fakes that count calls, so cache hits can be observed directly.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+import pytest
+
+from src.ai_rpg.pgsql import VectorSearchParams
+from src.ai_rpg.rag import (
+    RetrievalCache,
+    RetrievalCacheConfig,
+    ingest_documents,
+    knowledge_retrieval,
+    rag_retrieval_cache,
+    retrieval_cache,
+    search_documents,
+    search_documents_batch,
+)
+
+
+class _FakeEmbeddingModel:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def encode(self, sentences: List[str]) -> Any:
+        self.calls.append(list(sentences))
+        return np.array([[float(len(s))] * 384 for s in sentences])
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.searches: List[int] = []
+        self.version = 0
+
+    def search_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        limit: int = 10,
+        collection_filter: Optional[str] = None,
+        doc_type_filter: Optional[str] = None,
+        similarity_threshold: float = 0.0,
+        search_params: Any = None,
+    ) -> List[List[Any]]:
+        self.searches.append(len(query_embeddings))
+        return [
+            [
+                type(
+                    "Hit",
+                    (),
+                    {"content": f"v{self.version}:{int(v[0])}", "similarity": 0.5},
+                )()
+            ]
+            for v in query_embeddings
+        ]
+
+    def find_existing(self, collection: str, hashes: Sequence[str]) -> Set[str]:
+        return set()
+
+    def bulk_save(self, collection: str, contents: Sequence[str], **kwargs: Any) -> int:
+        self.version += 1
+        return len(contents)
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> Iterator[_FakeStore]:
+    fake = _FakeStore()
+    monkeypatch.setattr(
+        knowledge_retrieval, "search_vector_documents_batch", fake.search_batch
+    )
+    monkeypatch.setattr(
+        knowledge_retrieval, "find_existing_content_hashes", fake.find_existing
+    )
+    monkeypatch.setattr(
+        knowledge_retrieval, "bulk_save_vector_documents", fake.bulk_save
+    )
+    rag_retrieval_cache.open(RetrievalCacheConfig())
+    yield fake
+    rag_retrieval_cache.close()
+
+
+class TestRetrievalCacheIntegration:
+    """Test cases for cached search_documents / search_documents_batch."""
+
+    async def test_repeated_questions_skip_encode_and_search(
+        self, store: _FakeStore
+    ) -> None:
+        """Test that a second round of the same questions is served from cache."""
+        model = _FakeEmbeddingModel()
+        first = await search_documents_batch(["where?", "who?"], "game", model)
+        second = await search_documents_batch(["who?", " where? "], "game", model)
+
+        assert model.calls == [["where?", "who?"]]
+        assert store.searches == [2]
+        assert second == [first[1], first[0]]
+        assert rag_retrieval_cache.stats.result_hits == 2
+
+    async def test_embeddings_are_shared_across_collections(
+        self, store: _FakeStore
+    ) -> None:
+        """Test that another collection re-searches but reuses the query vector."""
+        model = _FakeEmbeddingModel()
+        await search_documents_batch(["where?"], "game_a", model)
+        results = await search_documents_batch(["where?"], "game_b", model)
+
+        assert model.calls == [["where?"]]
+        assert store.searches == [1, 1]
+        assert results == [(["v0:6"], [0.5])]
+
+    def test_search_params_and_top_k_are_part_of_the_key(
+        self, store: _FakeStore
+    ) -> None:
+        """Test that different top_k or ANN settings do not share results."""
+        model = _FakeEmbeddingModel()
+        search_documents("q", "game", model, top_k=5)
+        search_documents("q", "game", model, top_k=3)
+        search_documents("q", "game", model, top_k=3)
+        search_documents(
+            "q", "game", model, search_params=VectorSearchParams(ef_search=80)
+        )
+
+        assert store.searches == [1, 1, 1]
+        assert model.calls == [["q"]]
+
+    async def test_ingest_invalidates_collection(self, store: _FakeStore) -> None:
+        """Test that new documents in a collection drop its cached results."""
+        model = _FakeEmbeddingModel()
+        await search_documents_batch(["q"], "game", model)
+        await search_documents_batch(["q"], "other", model)
+
+        ingest_documents("game", model, ["new lore"], [{}])
+        game = await search_documents_batch(["q"], "game", model)
+        other = await search_documents_batch(["q"], "other", model)
+
+        assert game == [(["v1:1"], [0.5])]
+        assert other == [(["v0:1"], [0.5])]
+        assert store.searches == [1, 1, 1]
+
+
+class TestRetrievalCache:
+    """Test cases for RetrievalCache eviction and invalidation."""
+
+    def test_ttl_and_lru_eviction(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that entries expire after the TTL and the LRU bound holds."""
+        now = [100.0]
+        monkeypatch.setattr(
+            retrieval_cache, "time", SimpleNamespace(monotonic=lambda: now[0])
+        )
+        cache = RetrievalCache()
+        cache.open(RetrievalCacheConfig(embedding_max_entries=2, ttl_seconds=10.0))
+
+        cache.put_embedding("a", [1.0])
+        cache.put_embedding("b", [2.0])
+        assert cache.get_embedding("a") == [1.0]
+        cache.put_embedding("c", [3.0])  # evicts "b", the least recently used
+        assert cache.get_embedding("b") is None
+        assert cache.get_embedding("a") == [1.0]
+
+        now[0] += 11.0
+        assert cache.get_embedding("a") is None
+        assert cache.stats.evictions == 2
+
+    def test_results_from_before_invalidation_are_not_stored(self) -> None:
+        """Test that a search racing with an ingest cannot repopulate stale data."""
+        cache = RetrievalCache()
+        cache.open()
+        generation = cache.generation("game")
+        cache.invalidate("game")
+        cache.put_results("game", "q", 5, (["stale"], [0.9]), generation)
+        assert cache.get_results("game", "q", 5) is None
+
+        cache.put_results("game", "q", 5, (["fresh"], [0.9]), cache.generation("game"))
+        documents, _ = cache.get_results("game", "q", 5) or ([], [])
+        documents.append("mutated")
+        assert cache.get_results("game", "q", 5) == (["fresh"], [0.9])
+
+    def test_disabled_cache_is_a_no_op(self) -> None:
+        """Test that the cache stores nothing until opened."""
+        cache = RetrievalCache()
+        cache.put_embedding("a", [1.0])
+        assert cache.get_embedding("a") is None
+        assert cache.stats.embedding_misses == 0
@@ -0,0 +1,221 @@
+"""
+Tests for the two-tier LLM response cache and incremental context hashing.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import httpx
+import pytest
+
+from src.ai_rpg.deepseek import (
+    ContextHasher,
+    DeepSeekClient,
+    ResponseCache,
+    ResponseCacheConfig,
+    llm_response_cache,
+)
+from src.ai_rpg.models.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
+from src.ai_rpg.utils.debug_cache import compute_cache_key
+
+
+def _data(content: str) -> Dict[str, Any]:
+    return {
+        "choices": [
+            {
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }
+        ]
+    }
+
+
+def _context(size: int) -> List[BaseMessage]:
+    context: List[BaseMessage] = [SystemMessage(content="system prompt")]
+    for i in range(size):
+        context.append(HumanMessage(content=f"question {i} " * 20))
+        context.append(AIMessage(content=f"answer {i} " * 40))
+    return context
+
+
+class TestContextHasher:
+    """Test cases for ContextHasher."""
+
+    def test_appending_only_hashes_new_messages(self) -> None:
+        """Test that a growing context only hashes the appended messages."""
+        hasher = ContextHasher()
+        context = _context(10)
+
+        first = hasher.digest(context)
+        assert hasher.hashed_messages == len(context)
+
+        context.append(HumanMessage(content="new"))
+        second = hasher.digest(context)
+
+        assert second != first
+        assert hasher.hashed_messages == len(context)
+
+    def test_equal_contexts_share_digest(self) -> None:
+        """Test that separate lists with equal messages produce the same digest."""
+        hasher = ContextHasher()
+        assert hasher.digest(_context(3)) == hasher.digest(_context(3))
+        assert hasher.digest(_context(3)) != hasher.digest(_context(4))
+
+    def test_removal_invalidates_suffix(self) -> None:
+        """Test that removing a message in the middle changes the digest."""
+        hasher = ContextHasher()
+        context = _context(5)
+        full = hasher.digest(context)
+
+        removed = context.pop(3)
+        shorter = hasher.digest(context)
+        assert shorter != full
+
+        context.insert(3, removed)
+        assert hasher.digest(context) == full
+
+    def test_benchmark_against_full_rehash(self) -> None:
+        """Benchmark rolling keys against re-dumping the whole context per call."""
+        context = _context(200)
+        hasher = ContextHasher()
+        hasher.digest(context)
+        rounds = 50
+
+        start = time.perf_counter()
+        for i in range(rounds):
+            context.append(HumanMessage(content=f"turn {i}"))
+            hasher.digest(context)
+        rolling = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            compute_cache_key(context)  # type: ignore[arg-type]
+        full = time.perf_counter() - start
+
+        print(
+            f"\ncache keys for {len(context)} messages x {rounds}: "
+            f"rolling={rolling * 1e3:.2f}ms full={full * 1e3:.2f}ms"
+        )
+        assert rolling < full
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_disabled_cache_is_a_no_op(self) -> None:
+        """Test that a cache that was never opened stores nothing."""
+        cache = ResponseCache()
+        cache.put("k", _data("x"))
+        assert cache.get("k") is None
+        assert cache.stats.stores == 0
+
+    def test_memory_and_disk_tiers(self, tmp_path: Path) -> None:
+        """Test memory hits, disk hits after reopen, and misses."""
+        config = ResponseCacheConfig(disk_path=tmp_path / "cache.sqlite3")
+        cache = ResponseCache()
+        cache.open(config)
+
+        cache.put("a", _data("alpha"))
+        assert cache.get("a") == _data("alpha")
+        assert cache.get("missing") is None
+
+        cache.open(config)
+        assert cache.get("a") == _data("alpha")
+        assert cache.get("a") == _data("alpha")
+
+        stats = cache.stats
+        cache.close()
+        assert stats.memory_hits == 2
+        assert stats.disk_hits == 1
+        assert stats.misses == 1
+        assert stats.disk_entries == 1
+        assert stats.hit_ratio == pytest.approx(0.75)
+
+    def test_memory_tier_is_lru_bounded(self) -> None:
+        """Test that the in-memory tier evicts least recently used entries."""
+        cache = ResponseCache()
+        cache.open(ResponseCacheConfig(memory_max_entries=2, disk_path=None))
+
+        cache.put("a", _data("a"))
+        cache.put("b", _data("b"))
+        cache.get("a")
+        cache.put("c", _data("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_disk_tier_evicts_by_size(self, tmp_path: Path) -> None:
+        """Test that the disk tier stays under its byte budget."""
+        entry_size = len(json.dumps(_data("x" * 1000)))
+        cache = ResponseCache()
+        cache.open(
+            ResponseCacheConfig(
+                memory_max_entries=1,
+                disk_path=tmp_path / "cache.sqlite3",
+                disk_max_bytes=entry_size * 5,
+            )
+        )
+
+        for i in range(20):
+            cache.put(f"k{i}", _data("x" * 1000))
+
+        stats = cache.stats
+        cache.close()
+        assert stats.disk_bytes <= entry_size * 5
+        assert stats.evictions > 0
+        assert stats.disk_entries == 20 - stats.evictions
+
+
+@pytest.fixture
+def open_global_cache(tmp_path: Path) -> Iterator[None]:
+    llm_response_cache.open(ResponseCacheConfig(disk_path=tmp_path / "c.sqlite3"))
+    try:
+        yield
+    finally:
+        llm_response_cache.close()
+
+
+class TestDeepSeekClientCache:
+    """Test cases for cacheable DeepSeekClient requests."""
+
+    async def test_cacheable_request_is_served_from_cache(
+        self, open_global_cache: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a repeated cacheable request does not hit the network."""
+        monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+        calls: List[int] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(200, json=_data("cached answer"))
+
+        context: List[BaseMessage] = [SystemMessage(content="system")]
+
+        def make_client() -> DeepSeekClient:
+            return DeepSeekClient(
+                name="stage",
+                full_prompt="describe",
+                context=context,
+                cacheable=True,
+            )
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as http_client:
+            first = make_client()
+            await first.chat(http_client)
+            second = make_client()
+            await second.chat(http_client)
+
+        assert len(calls) == 1
+        assert second.response_content == "cached answer"
+        assert second.finish_reason == "stop"
+        assert llm_response_cache.stats.memory_hits == 1
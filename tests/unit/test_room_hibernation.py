@@ -0,0 +1,252 @@
+"""
+Tests for idle room hibernation: room selection, hibernate/restore round trip
+through the world archive, lock handling and GameServer.acquire_room.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, cast
+
+import pytest
+
+from src.ai_rpg.game.dbg_game import DBGGame
+from src.ai_rpg.game.game_server import GameServer
+from src.ai_rpg.game.player_room import PlayerRoom
+from src.ai_rpg.game.room_hibernation import (
+    RoomHibernationConfig,
+    RoomHibernator,
+    select_rooms_to_hibernate,
+)
+from src.ai_rpg.game.world_store import WorldArchiver
+from src.ai_rpg.models import (
+    ActorType,
+    AgentEvent,
+    Blueprint,
+    Dungeon,
+    HumanMessage,
+    PlayerSession,
+    StageType,
+    WorldState,
+)
+from src.ai_rpg.services.player_session import stream_session_messages
+from tests.unit.test_tcg_game import _make_actor_model, _make_stage_model
+
+
+def _room(user_name: str, save_dir: Path) -> PlayerRoom:
+    """Create a room holding a freshly built game that archives into save_dir."""
+    hero = _make_actor_model("hero", ActorType.NPC)
+    home = _make_stage_model("home_stage", StageType.HOME, actors=[hero])
+    blueprint = Blueprint(
+        name="hibernate_test",
+        player_actor="hero",
+        campaign_setting="",
+        knowledge_base={},
+        stages=[home],
+        world_entities=[],
+        storage_entity="世界储物箱",
+    )
+    world = WorldState(
+        entity_counter=0,
+        entities=[],
+        agents_context={},
+        dungeon=Dungeon(name="", rooms=[], profile=""),
+        blueprint=blueprint,
+    )
+    session = PlayerSession(name=user_name, actor="hero", game="hibernate_test")
+    game = DBGGame(name="hibernate_test", player_session=session, world=world)
+    game.build_from_blueprint()
+    game._world_archiver = WorldArchiver(save_dir)
+
+    room = PlayerRoom(user_name)
+    room._dbg_game = game
+    room._player_session = session
+    return room
+
+
+class TestSelection:
+    """Test cases for select_rooms_to_hibernate."""
+
+    def test_idle_ttl_and_high_water_mark(self, tmp_path: Path) -> None:
+        """Test TTL selection plus least-recently-active eviction above the cap."""
+        rooms = [_room(f"p{index}", tmp_path / f"p{index}") for index in range(4)]
+        now = time.monotonic()
+        for index, room in enumerate(rooms):
+            room._last_active = now - 100 * (4 - index)  # p0 is the oldest
+
+        assert select_rooms_to_hibernate(rooms, RoomHibernationConfig()) == []
+
+        by_ttl = RoomHibernationConfig(idle_ttl_seconds=250)
+        assert select_rooms_to_hibernate(rooms, by_ttl) == rooms[:2]
+
+        by_cap = RoomHibernationConfig(max_resident_rooms=1)
+        assert select_rooms_to_hibernate(rooms, by_cap) == rooms[:3]
+
+        both = RoomHibernationConfig(idle_ttl_seconds=350, max_resident_rooms=2)
+        assert select_rooms_to_hibernate(rooms, both) == rooms[:2]
+
+        rooms[0]._dbg_game = None
+        assert select_rooms_to_hibernate(rooms, by_cap) == rooms[1:3]
+
+
+class TestHibernateRestore:
+    """Test cases for RoomHibernator."""
+
+    async def test_round_trip_keeps_game_state(self, tmp_path: Path) -> None:
+        """Test that a hibernated game comes back with entities, contexts and session."""
+        room = _room("alice", tmp_path / "save")
+        game = room._dbg_game
+        assert game is not None
+        hero = game.get_actor_entity("hero")
+        assert hero is not None
+        game.add_human_message(hero, HumanMessage(content="remember me"))
+        game._player_session.add_agent_event(AgentEvent(message="before sleep"))
+        sequence = game._player_session.event_sequence
+        hibernator = RoomHibernator()
+
+        assert await hibernator.hibernate(room)
+        assert room.is_hibernated
+        assert room._dbg_game is None and room._player_session is None
+
+        assert await hibernator.restore(room)
+        assert not room.is_hibernated
+        restored = room._dbg_game
+        assert restored is not None and restored is not game
+        restored_hero = restored.get_actor_entity("hero")
+        assert restored_hero is not None
+        assert restored.get_agent_context(restored_hero).context[-1].content == (
+            "remember me"
+        )
+        restored_session = restored._player_session
+        assert restored_session.event_sequence == sequence
+        last_event = restored_session.session_messages[-1].agent_event
+        assert last_event is not None and last_event.message == "before sleep"
+        assert restored._world_archiver is not None
+        assert restored._world_archiver.save_dir == tmp_path / "save"
+
+        stats = hibernator.stats
+        assert (stats.hibernated, stats.restored) == (1, 1)
+        assert stats.hibernate_seconds_max > 0 and stats.restore_seconds_max > 0
+
+    async def test_restored_archiver_appends_contexts(self, tmp_path: Path) -> None:
+        """Test that the reattached archiver tracks the restored messages, not the freed ones."""
+        room = _room("erin", tmp_path / "save")
+        game = room._dbg_game
+        assert game is not None
+        hero = game.get_actor_entity("hero")
+        assert hero is not None
+        game.add_human_message(hero, HumanMessage(content="before sleep"))
+        old_messages = list(game.get_agent_context(hero).context)
+        hibernator = RoomHibernator()
+
+        assert await hibernator.hibernate(room)
+        assert await hibernator.restore(room)
+        restored = room._dbg_game
+        assert restored is not None and restored._world_archiver is not None
+        cursor = restored._world_archiver._context_cursors["hero"]
+        assert all(cursor.last is not message for message in old_messages)
+
+        restored_hero = restored.get_actor_entity("hero")
+        assert restored_hero is not None
+        restored.add_human_message(restored_hero, HumanMessage(content="after"))
+        restored.flush_entities()
+        assert restored._world_archiver.archive(
+            restored._world, restored._player_session
+        )
+        manifest = restored._world_archiver.last_manifest
+        assert manifest["contexts_rewritten"] == []
+        assert manifest["contexts_appended"] == {"hero": 1}
+
+    async def test_busy_or_touched_rooms_are_skipped(self, tmp_path: Path) -> None:
+        """Test that rooms holding their lock or touched after selection stay resident."""
+        room = _room("bob", tmp_path / "save")
+        hibernator = RoomHibernator()
+
+        async with room._lock:
+            assert not await hibernator.hibernate(room)
+
+        selected_at = room._last_active
+        room._last_active += 1.0  # a request arrived after the sweep selected it
+        assert not await hibernator.hibernate(room, expected_last_active=selected_at)
+        assert not room.is_hibernated
+
+    async def test_sweep_skips_rooms_touched_during_the_sweep(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a room touched while an earlier room hibernates stays resident."""
+        first = _room("frank", tmp_path / "frank")
+        second = _room("grace", tmp_path / "grace")
+        first._last_active -= 200
+        second._last_active -= 100
+        first_game = first._dbg_game
+        assert first_game is not None
+        flush_entities = first_game.flush_entities
+
+        def flush_and_touch_second() -> object:
+            # a request for the second room arrives while the first is being archived
+            second.touch()
+            return flush_entities()
+
+        monkeypatch.setattr(first_game, "flush_entities", flush_and_touch_second)
+        hibernator = RoomHibernator(RoomHibernationConfig(idle_ttl_seconds=50))
+
+        assert await hibernator.sweep([first, second]) == 1
+        assert first.is_hibernated
+        assert not second.is_hibernated and second._dbg_game is not None
+
+    async def test_failed_archive_keeps_game(self, tmp_path: Path) -> None:
+        """Test that the game stays in memory when the archive cannot be written."""
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        room = _room("carol", blocker / "save")
+        hibernator = RoomHibernator()
+
+        assert not await hibernator.hibernate(room)
+        assert room._dbg_game is not None
+        assert hibernator.stats.hibernate_failed == 1
+
+
+class TestGameServer:
+    """Test cases for GameServer room hibernation."""
+
+    async def test_acquire_room_restores_transparently(self, tmp_path: Path) -> None:
+        """Test that idle rooms hibernate and the next acquire brings them back."""
+        server = GameServer(
+            room_hibernation_config=RoomHibernationConfig(idle_ttl_seconds=60)
+        )
+        room = _room("dave", tmp_path / "save")
+        server._rooms["dave"] = room
+        room._last_active -= 120
+
+        assert await server.hibernate_idle_rooms() == 1
+        assert server.get_room("dave") is room and room.is_hibernated
+
+        acquired = await server.acquire_room("dave")
+        assert acquired is room
+        assert room._dbg_game is not None
+        assert room.idle_seconds < 1
+        assert await server.hibernate_idle_rooms() == 0
+        assert server.room_hibernation_stats.restored == 1
+        assert await server.acquire_room("nobody") is None
+
+    async def test_session_stream_resumes_on_restore(self, tmp_path: Path) -> None:
+        """Test that a stream parked on a hibernated room wakes as soon as it is restored."""
+        server = GameServer()
+        room = _room("fred", tmp_path / "save")
+        server._rooms["fred"] = room
+        assert await server._room_hibernator.hibernate(room)
+
+        response = await stream_session_messages(
+            server, "fred", "hibernate_test", 0, 30.0
+        )
+        body = cast(AsyncIterator[str], response.body_iterator)
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+
+        assert await server.acquire_room("fred") is room
+        game = room._dbg_game
+        assert game is not None
+        game._player_session.add_agent_event(AgentEvent(message="awake"))
+        assert '"awake"' in await asyncio.wait_for(pending, 1.0)
+        await body.aclose()  # type: ignore[attr-defined]
@@ -0,0 +1,179 @@
+"""
+Tests for the background task registry: expiry after terminal states,
+per-user indexes, the running-task cap and cancellation.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from src.ai_rpg.game.game_server import GameServer
+from src.ai_rpg.game.task_registry import TaskRegistry, TaskRegistryConfig
+from src.ai_rpg.models import TaskCancelRequest, TaskStatus
+from src.ai_rpg.services.background_tasks import (
+    background_tasks_api_router,
+    cancel_task,
+    ensure_task_capacity,
+)
+from src.ai_rpg.services.game_server_dependencies import get_game_server
+
+
+class TestTaskRegistry:
+    """Test cases for TaskRegistry bookkeeping."""
+
+    def test_finished_tasks_expire(self) -> None:
+        """Test that terminal tasks are dropped after the TTL and running ones stay."""
+        registry = TaskRegistry(TaskRegistryConfig(finished_ttl_seconds=0.0))
+        done = registry.create("alice")
+        running = registry.create("alice")
+
+        assert registry.finish(done.task_id, TaskStatus.COMPLETED)
+        assert not registry.finish(done.task_id, TaskStatus.FAILED)
+
+        assert registry.get(done.task_id) is None
+        assert registry.get(running.task_id) is running
+        assert registry.list_user("alice") == [running]
+        stats = registry.stats
+        assert (stats.size, stats.running, stats.expired) == (1, 1, 1)
+
+    def test_user_indexes_and_batch_lookup(self) -> None:
+        """Test per-user listings and batch lookups that skip unknown ids."""
+        registry = TaskRegistry()
+        first = registry.create("alice")
+        second = registry.create("alice")
+        other = registry.create("bob")
+        registry.finish(first.task_id, TaskStatus.FAILED, "boom")
+
+        assert registry.list_user("alice") == [first, second]
+        assert registry.list_user("alice", running_only=True) == [second]
+        assert registry.list_user("carol") == []
+        assert registry.get_many([other.task_id, "missing", first.task_id]) == [
+            other,
+            first,
+        ]
+        assert first.error == "boom" and first.end_time is not None
+
+    def test_running_cap(self) -> None:
+        """Test that the per-user cap frees up when a task finishes."""
+        registry = TaskRegistry(TaskRegistryConfig(max_running_per_user=2))
+        first = registry.create("alice")
+        registry.create("alice")
+
+        assert not registry.has_capacity("alice")
+        assert registry.has_capacity("bob")
+        registry.finish(first.task_id, TaskStatus.COMPLETED)
+        assert registry.has_capacity("alice")
+        assert registry.stats.rejected == 1
+
+
+class TestCancellation:
+    """Test cases for cancelling running tasks through GameServer."""
+
+    async def test_cancel_stops_the_coroutine(self) -> None:
+        """Test that cancel marks the record and cancels the attached task."""
+        server = GameServer()
+        record = server.create_task("alice")
+        started = asyncio.Event()
+        finished = False
+
+        async def pipeline() -> None:
+            nonlocal finished
+            started.set()
+            await asyncio.sleep(10)
+            finished = True
+
+        handle = server.run_task(record, pipeline())
+        await started.wait()
+        version = server.task_notifier.version
+
+        assert server.cancel_task(record.task_id)
+        assert record.status is TaskStatus.CANCELLED
+        assert server.task_notifier.version > version
+        with pytest.raises(asyncio.CancelledError):
+            await handle
+        assert not finished
+        assert not server.cancel_task(record.task_id)
+        assert server.list_user_tasks("alice", running_only=True) == []
+
+    async def test_unreported_outcome_is_recorded(self) -> None:
+        """Test that a task that ends without reporting still reaches a terminal state."""
+        server = GameServer()
+        failing = server.create_task("alice")
+        silent = server.create_task("alice")
+
+        async def fail() -> None:
+            raise ValueError("lost")
+
+        async def noop() -> None:
+            pass
+
+        for handle in (
+            server.run_task(failing, fail()),
+            server.run_task(silent, noop()),
+        ):
+            await asyncio.gather(handle, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert failing.status is TaskStatus.FAILED and failing.error == "lost"
+        assert silent.status is TaskStatus.COMPLETED
+
+    async def test_cancel_endpoint_checks_owner(self) -> None:
+        """Test that the cancel endpoint only cancels the caller's running tasks."""
+        server = GameServer()
+        record = server.create_task("alice")
+
+        with pytest.raises(HTTPException) as not_found:
+            await cancel_task(
+                TaskCancelRequest(user_name="bob", task_id=record.task_id), server
+            )
+        assert not_found.value.status_code == 404
+
+        response = await cancel_task(
+            TaskCancelRequest(user_name="alice", task_id=record.task_id), server
+        )
+        assert response.task.status is TaskStatus.CANCELLED
+
+        with pytest.raises(HTTPException) as conflict:
+            await cancel_task(
+                TaskCancelRequest(user_name="alice", task_id=record.task_id), server
+            )
+        assert conflict.value.status_code == 409
+
+    def test_capacity_check_raises_429(self) -> None:
+        """Test that a user at the cap is refused before an action is activated."""
+        server = GameServer(
+            task_registry_config=TaskRegistryConfig(max_running_per_user=1)
+        )
+        server.create_task("alice")
+
+        with pytest.raises(HTTPException) as refused:
+            ensure_task_capacity(server, "alice")
+        assert refused.value.status_code == 429
+        ensure_task_capacity(server, "bob")
+
+    async def test_user_tasks_endpoint_includes_finished_by_default(self) -> None:
+        """Test that the listing endpoint and GameServer share the same default."""
+        server = GameServer()
+        done = server.create_task("alice")
+        running = server.create_task("alice")
+        server.complete_task(done.task_id)
+
+        app = FastAPI()
+        app.include_router(background_tasks_api_router)
+        app.dependency_overrides[get_game_server] = lambda: server
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            listed = await client.get("/api/tasks/v1/user/alice")
+            running_only = await client.get(
+                "/api/tasks/v1/user/alice", params={"running_only": True}
+            )
+
+        expected = [task.task_id for task in server.list_user_tasks("alice")]
+        assert expected == [done.task_id, running.task_id]
+        assert [task["task_id"] for task in listed.json()["tasks"]] == expected
+        assert [task["task_id"] for task in running_only.json()["tasks"]] == [
+            running.task_id
+        ]
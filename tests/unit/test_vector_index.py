@@ -0,0 +1,112 @@
+"""
+Tests for per-collection pgvector ANN index management.
+
+The engine and session are replaced with recorders so the generated DDL and
+per-query settings can be checked without Postgres.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+
+import pytest
+
+from src.ai_rpg.pgsql import (
+    VectorIndexConfig,
+    VectorSearchParams,
+    collection_index_name,
+    create_collection_index,
+    rebuild_collection_index,
+    vector_index,
+)
+
+
+class _RecordingConnection:
+    def __init__(self, statements: List[str]) -> None:
+        self._statements = statements
+
+    def execute(self, statement: Any, *args: Any) -> Any:
+        self._statements.append(str(statement))
+        return None
+
+
+class _RecordingEngine:
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.isolation_levels: List[str] = []
+
+    def connect(self) -> "_RecordingEngine":
+        return self
+
+    def execution_options(self, isolation_level: str) -> Any:
+        self.isolation_levels.append(isolation_level)
+
+        @contextmanager
+        def _conn() -> Iterator[_RecordingConnection]:
+            yield _RecordingConnection(self.statements)
+
+        return _conn()
+
+
+@pytest.fixture
+def recorder(monkeypatch: pytest.MonkeyPatch) -> _RecordingEngine:
+    engine = _RecordingEngine()
+    monkeypatch.setattr(vector_index, "engine", engine)
+    return engine
+
+
+class TestCollectionIndex:
+    """Test cases for creating and rebuilding collection indexes."""
+
+    def test_index_name_is_stable_and_safe(self) -> None:
+        """Test that any collection name maps to a short, valid identifier."""
+        name = collection_index_name("遗迹 'game'; DROP TABLE x")
+        assert name == collection_index_name("遗迹 'game'; DROP TABLE x")
+        assert name != collection_index_name("other")
+        assert name.isascii() and name.replace("_", "").isalnum()
+        assert len(name) <= 63
+
+    def test_create_hnsw_partial_index(self, recorder: _RecordingEngine) -> None:
+        """Test the default HNSW DDL with a cosine opclass and partial predicate."""
+        name = create_collection_index("it's a game")
+
+        (sql,) = recorder.statements
+        assert f"CREATE INDEX IF NOT EXISTS {name} ON vector_documents" in sql
+        assert "USING hnsw (embedding vector_cosine_ops)" in sql
+        assert "WITH (m = 16, ef_construction = 64)" in sql
+        assert "WHERE collection = 'it''s a game'" in sql
+        assert recorder.isolation_levels == ["AUTOCOMMIT"]
+
+    def test_ivfflat_lists_follow_row_count(
+        self, recorder: _RecordingEngine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that IVFFlat picks lists from the collection size when unset."""
+        monkeypatch.setattr(vector_index, "count_collection_rows", lambda c: 50_000)
+        create_collection_index("game", VectorIndexConfig(method="ivfflat"))
+        assert "USING ivfflat" in recorder.statements[0]
+        assert "WITH (lists = 50)" in recorder.statements[0]
+
+    def test_rebuild_drops_then_creates(self, recorder: _RecordingEngine) -> None:
+        """Test that a rebuild replaces the existing index."""
+        rebuild_collection_index("game", VectorIndexConfig(m=32))
+        drop, create = recorder.statements
+        assert drop == f"DROP INDEX IF EXISTS {collection_index_name('game')}"
+        assert "m = 32" in create
+
+
+class TestSearchParams:
+    """Test cases for per-query ANN settings."""
+
+    def test_settings_are_transaction_local(self) -> None:
+        """Test that ef_search and probes are applied with SET LOCAL."""
+        statements: List[str] = []
+        session = _RecordingConnection(statements)
+
+        vector_index.apply_search_params(session, None)  # type: ignore[arg-type]
+        vector_index.apply_search_params(
+            session, VectorSearchParams(ef_search=100, probes=8)  # type: ignore[arg-type]
+        )
+
+        assert statements == [
+            "SET LOCAL hnsw.ef_search = 100",
+            "SET LOCAL ivfflat.probes = 8",
+        ]
@@ -0,0 +1,364 @@
+"""
+Tests for sharded deployment: the consistent hash ring, request routing keys,
+the front router's placement/migration protocol and the worker-side
+release/adopt round trip through the .worlds archive.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.ai_rpg.game import game_server as game_server_module
+from src.ai_rpg.game.game_server import GameServer
+from src.ai_rpg.game.worker_shard import (
+    WorkerRing,
+    WorkerShardConfig,
+    make_task_id,
+    task_worker_id,
+)
+from src.ai_rpg.game.world_store import find_latest_save_dir
+from src.ai_rpg.models import (
+    AgentEvent,
+    RoomAdoptRequest,
+    RoomMigrationRequest,
+    RoomMigrationResponse,
+)
+from src.ai_rpg.services.worker_router import (
+    RouteKey,
+    create_worker_router_app,
+    route_key,
+)
+from tests.unit.test_room_hibernation import _room
+
+
+class TestWorkerRing:
+    """Test cases for WorkerRing and task id prefixes."""
+
+    def test_balance_and_minimal_movement(self) -> None:
+        """Test that keys spread over workers and only a dead worker's keys move."""
+        ring = WorkerRing(["w0", "w1", "w2"])
+        users = [f"user{index}" for index in range(3000)]
+        owners = {user: ring.owner(user) for user in users}
+
+        counts = {
+            worker: list(owners.values()).count(worker) for worker in "w0 w1 w2".split()
+        }
+        assert all(500 < count < 1500 for count in counts.values())
+
+        alive = {"w0", "w2"}
+        for user in users:
+            failover = ring.owner(user, alive=alive)
+            if owners[user] == "w1":
+                assert failover in alive
+            else:
+                assert failover == owners[user]
+
+        assert ring.owner("anyone", alive=set()) is None
+        assert WorkerRing([]).owner("anyone") is None
+
+    def test_task_id_prefix(self) -> None:
+        """Test that task ids carry the worker prefix only in sharded mode."""
+        assert task_worker_id(make_task_id("w1", "abc-123")) == "w1"
+        assert make_task_id("", "abc-123") == "abc-123"
+        assert task_worker_id("abc-123") is None
+
+        server = GameServer(worker_id="w3")
+        assert task_worker_id(server.create_task("alice").task_id) == "w3"
+
+    def test_parse_workers(self) -> None:
+        """Test the AI_RPG_WORKERS format."""
+        assert WorkerShardConfig.parse_workers(
+            "w0=http://127.0.0.1:8001/, w1=http://127.0.0.1:8002"
+        ) == {"w0": "http://127.0.0.1:8001", "w1": "http://127.0.0.1:8002"}
+        with pytest.raises(ValueError):
+            WorkerShardConfig.parse_workers("w0")
+        with pytest.raises(ValueError, match="w.0"):
+            WorkerShardConfig.parse_workers("w.0=http://127.0.0.1:8001")
+
+
+class TestRouteKey:
+    """Test cases for extracting the routing key from a request."""
+
+    def test_sources(self) -> None:
+        """Test path, task id, query and JSON body keys, in that priority."""
+        assert route_key(
+            "/api/session_messages/v1/al%20ice/game/stream", {}, b""
+        ) == RouteKey(user_name="al ice")
+        assert route_key("/api/tasks/v1/user/bob", {}, b"") == RouteKey(user_name="bob")
+        assert route_key("/api/tasks/v1/watch/w1.xyz", {}, b"") == RouteKey(
+            task_id="w1.xyz"
+        )
+        assert route_key(
+            "/api/debug/pipeline-profile/v1/recent", {"user_name": "carol"}, b""
+        ) == RouteKey(user_name="carol")
+        assert route_key(
+            "/api/home/advance/v1/",
+            {},
+            b'{"user_name": "dave", "game_name": "g"}',
+            "application/json",
+        ) == RouteKey(user_name="dave")
+        assert route_key("/api/home/advance/v1/", {}, b"{oops", "application/json") == (
+            RouteKey()
+        )
+        assert route_key("/api/game/blueprint-list/v1/", {}, b"") == RouteKey()
+
+
+def _fake_worker(worker_id: str, calls: List[Tuple[str, str]]) -> FastAPI:
+    """A stand-in worker that records cluster calls and echoes who served a request.
+
+    Calls are recorded as (worker_id, action) where an adopt that replaces a
+    stale room is recorded as "replace".
+    """
+    app = FastAPI()
+    app.state.alive = True
+    app.state.boot_id = "boot-1"
+    app.state.rooms = set()
+
+    @app.get("/api/cluster/v1/health")
+    async def health() -> Dict[str, object]:
+        if not app.state.alive:
+            raise RuntimeError("down")
+        return {
+            "worker_id": worker_id,
+            "boot_id": app.state.boot_id,
+            "rooms": len(app.state.rooms),
+            "resident_rooms": 0,
+        }
+
+    @app.post("/api/cluster/v1/release")
+    async def release(payload: RoomMigrationRequest) -> RoomMigrationResponse:
+        calls.append((worker_id, "release"))
+        changed = payload.user_name in app.state.rooms
+        app.state.rooms.discard(payload.user_name)
+        return RoomMigrationResponse(
+            user_name=payload.user_name, changed=changed, message=""
+        )
+
+    @app.post("/api/cluster/v1/adopt")
+    async def adopt(payload: RoomAdoptRequest) -> RoomMigrationResponse:
+        calls.append((worker_id, "replace" if payload.replace else "adopt"))
+        app.state.rooms.add(payload.user_name)
+        return RoomMigrationResponse(
+            user_name=payload.user_name, changed=True, message=""
+        )
+
+    @app.post("/api/home/advance/v1/")
+    async def advance() -> Dict[str, str]:
+        return {"worker": worker_id}
+
+    return app
+
+
+class TestWorkerRouter:
+    """Test cases for the front router's placement and migration."""
+
+    async def test_failover_and_recovery_migrate_rooms(self) -> None:
+        """Test placement on first request, failover to a survivor and return after recovery."""
+        calls: List[Tuple[str, str]] = []
+        workers = {
+            worker_id: _fake_worker(worker_id, calls) for worker_id in ("w0", "w1")
+        }
+        upstream = httpx.AsyncClient(
+            mounts={
+                f"http://{worker_id}": httpx.ASGITransport(
+                    app=app, raise_app_exceptions=False
+                )
+                for worker_id, app in workers.items()
+            }
+        )
+        config = WorkerShardConfig(
+            workers={worker_id: f"http://{worker_id}" for worker_id in workers}
+        )
+        router_app = create_worker_router_app(config, upstream)
+        router = router_app.state.worker_router
+        await router.check_health()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=router_app), base_url="http://router"
+        )
+
+        async def advance(user_name: str) -> str:
+            response = await client.post(
+                "/api/home/advance/v1/", json={"user_name": user_name, "game_name": "g"}
+            )
+            assert response.status_code == 200
+            return str(response.json()["worker"])
+
+        user = "alice"
+        home = router.owner(user)
+        other = "w1" if home == "w0" else "w0"
+
+        assert await advance(user) == home
+        assert calls == [(other, "release"), (home, "adopt")]
+        assert router._migration_locks == {}
+        calls.clear()
+        assert await advance(user) == home
+        assert calls == []
+
+        workers[home].state.alive = False
+        await router.check_health()
+        assert await advance(user) == other
+        assert calls == [(other, "replace")]
+        calls.clear()
+
+        workers[home].state.alive = True
+        workers[home].state.boot_id = "boot-2"
+        await router.check_health()
+        assert await advance(user) == home
+        assert calls == [(other, "release"), (home, "replace")]
+        assert router.stats.migrations == 3 and router.stats.worker_restarts == 0
+        calls.clear()
+
+        workers[home].state.boot_id = "boot-3"  # restarted between health checks
+        await router.check_health()
+        assert await advance(user) == home
+        assert calls == [(other, "release"), (home, "adopt")]
+        assert router.stats.worker_restarts == 1
+        calls.clear()
+
+        # missed health checks but kept running (same boot_id): its room is stale
+        workers[home].state.alive = False
+        await router.check_health()
+        assert await advance(user) == other
+        workers[home].state.alive = True
+        await router.check_health()
+        assert await advance(user) == home
+        assert calls == [(other, "replace"), (other, "release"), (home, "replace")]
+        assert router.stats.worker_restarts == 1
+
+        blocked = await client.post("/api/cluster/v1/release", json={"user_name": user})
+        assert blocked.status_code == 404
+
+        workers["w0"].state.alive = workers["w1"].state.alive = False
+        await router.check_health()
+        unavailable = await client.post(
+            "/api/home/advance/v1/", json={"user_name": user, "game_name": "g"}
+        )
+        assert unavailable.status_code == 503
+        await client.aclose()
+        await upstream.aclose()
+
+    async def test_only_connect_errors_mark_worker_down(self) -> None:
+        """Test that forwarding timeouts fail the request but keep the worker alive."""
+        errors: List[Exception] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/api/cluster/v1/health":
+                return httpx.Response(
+                    200,
+                    json={
+                        "worker_id": "w0",
+                        "boot_id": "boot-1",
+                        "rooms": 0,
+                        "resident_rooms": 0,
+                    },
+                )
+            raise errors.pop(0)
+
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        control = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        router_app = create_worker_router_app(
+            WorkerShardConfig(workers={"w0": "http://w0"}), upstream, control
+        )
+        router = router_app.state.worker_router
+        await router.check_health()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=router_app), base_url="http://router"
+        )
+
+        for error in (httpx.PoolTimeout("pool"), httpx.ReadTimeout("read")):
+            errors.append(error)
+            response = await client.get("/api/game/blueprint-list/v1/")
+            assert response.status_code == 504
+            assert list(router.alive_workers) == ["w0"]
+
+        errors.append(httpx.ConnectError("refused"))
+        response = await client.get("/api/game/blueprint-list/v1/")
+        assert response.status_code == 502
+        assert router.alive_workers == {}
+
+        await router.aclose()
+        assert upstream.is_closed and control.is_closed
+        await client.aclose()
+
+    async def test_placements_are_bounded(self) -> None:
+        """Test that the least recently used placement is evicted and re-placed later."""
+        calls: List[Tuple[str, str]] = []
+        upstream = httpx.AsyncClient(
+            transport=httpx.ASGITransport(
+                app=_fake_worker("w0", calls), raise_app_exceptions=False
+            )
+        )
+        config = WorkerShardConfig(workers={"w0": "http://w0"}, max_placements=2)
+        router_app = create_worker_router_app(config, upstream)
+        router = router_app.state.worker_router
+        await router.check_health()
+
+        for user in ("alice", "bob", "alice", "carol"):
+            assert await router.place(user) == "w0"
+        assert list(router._placements) == ["alice", "carol"]
+        assert router.stats.placements_evicted == 1
+        assert router._migration_locks == {}
+
+        calls.clear()
+        assert await router.place("bob") == "w0"
+        assert calls == [("w0", "adopt")]  # bob's room is still resident: a no-op adopt
+        await router.aclose()
+
+
+class TestReleaseAdopt:
+    """Test cases for GameServer.release_room and adopt_room."""
+
+    async def test_room_moves_between_workers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a released room is adopted from its archive by another worker."""
+        monkeypatch.setattr(game_server_module, "WORLDS_DIR", tmp_path)
+        old_worker = GameServer(worker_id="w0")
+        new_worker = GameServer(worker_id="w1")
+        save_dir = tmp_path / "erin" / "hibernate_test" / "2026-01-01_00-00-00"
+        old_worker._rooms["erin"] = _room("erin", save_dir)
+
+        assert not await new_worker.adopt_room("erin")
+        assert await old_worker.release_room("erin")
+        assert not old_worker.has_room("erin")
+        assert find_latest_save_dir(tmp_path, "erin") == save_dir
+
+        assert await new_worker.adopt_room("erin")
+        assert not await new_worker.adopt_room("erin")
+        room = await new_worker.acquire_room("erin")
+        assert room is not None and room._dbg_game is not None
+        assert room._dbg_game.get_actor_entity("hero") is not None
+        assert await old_worker.release_room("nobody")
+
+    async def test_replace_discards_stale_room(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that adopt(replace=True) drops a stale resident room unsaved and loads the newest save."""
+        monkeypatch.setattr(game_server_module, "WORLDS_DIR", tmp_path)
+        stale_worker = GameServer(worker_id="w0")
+        interim_worker = GameServer(worker_id="w1")
+        stale_dir = tmp_path / "fay" / "hibernate_test" / "2026-01-01_00-00-00"
+        newest_dir = tmp_path / "fay" / "hibernate_test" / "2026-01-02_00-00-00"
+
+        stale_room = _room("fay", stale_dir)
+        stale_worker._rooms["fay"] = stale_room
+        interim_room = _room("fay", newest_dir)
+        interim_game = interim_room._dbg_game
+        assert interim_game is not None
+        interim_game._player_session.add_agent_event(AgentEvent(message="newest"))
+        interim_worker._rooms["fay"] = interim_room
+        assert await interim_worker.release_room("fay")
+
+        assert not await stale_worker.adopt_room("fay")
+        assert stale_worker.get_room("fay") is stale_room
+
+        assert await stale_worker.adopt_room("fay", replace=True)
+        assert not stale_dir.exists()  # the stale game was dropped without saving
+        room = await stale_worker.acquire_room("fay")
+        assert room is not None and room is not stale_room
+        assert room._dbg_game is not None
+        last_event = room._dbg_game._player_session.session_messages[-1].agent_event
+        assert last_event is not None and last_event.message == "newest"
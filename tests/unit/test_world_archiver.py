@@ -0,0 +1,127 @@
+"""
+Tests for incremental world archiving (WorldArchiver).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+from src.ai_rpg.game.world_store import WorldArchiver, archive_world, restore_world
+from src.ai_rpg.models import AgentContext, PlayerSession, WorldState
+from src.ai_rpg.models.agent_event import AgentEvent
+from src.ai_rpg.models.messages import AIMessage, HumanMessage, SystemMessage
+from src.ai_rpg.models.serialization import (
+    ComponentSerialization,
+    EntitySerialization,
+)
+
+
+def _entity(name: str, hp: int) -> EntitySerialization:
+    return EntitySerialization(
+        name=name,
+        components=[ComponentSerialization(name="Hp", data={"hp": hp})],
+    )
+
+
+def _world() -> WorldState:
+    world = WorldState(entity_counter=2)
+    world.blueprint.name = "game"
+    world.dungeon.name = "dungeon"
+    world.entities = [_entity("hero", 10), _entity("goblin", 5)]
+    world.agents_context = {
+        "hero": AgentContext(
+            name="hero",
+            context=[SystemMessage(content="you are hero"), HumanMessage(content="hi")],
+        )
+    }
+    return world
+
+
+def _session() -> PlayerSession:
+    session = PlayerSession(name="player", actor="hero", game="game")
+    session.add_agent_event(AgentEvent(message="start"))
+    return session
+
+
+def _manifest(save_dir: Path) -> Dict[str, Any]:
+    manifest: Dict[str, Any] = json.loads(
+        (save_dir / "manifest.json").read_text(encoding="utf-8")
+    )
+    return manifest
+
+
+class TestWorldArchiver:
+    """Test cases for WorldArchiver."""
+
+    def test_incremental_checkpoint_writes_only_changes(self, tmp_path: Path) -> None:
+        """Test that the second checkpoint only touches what changed."""
+        world, session = _world(), _session()
+        archiver = WorldArchiver(tmp_path / "save")
+
+        assert archiver.archive(world, session)
+        first = _manifest(archiver.save_dir)
+        assert first["mode"] == "full"
+        assert sorted(first["entities_written"]) == ["goblin", "hero"]
+        assert first["blueprint_written"] and first["dungeon_written"]
+
+        world.entities = [_entity("hero", 7)]
+        world.agents_context["hero"].context.append(AIMessage(content="hello"))
+        session.add_agent_event(AgentEvent(message="hit"))
+
+        assert archiver.archive(world, session)
+        second = _manifest(archiver.save_dir)
+        assert second["mode"] == "incremental"
+        assert second["entities_written"] == ["hero"]
+        assert second["entities_removed"] == ["goblin"]
+        assert second["contexts_appended"] == {"hero": 1}
+        assert second["contexts_rewritten"] == []
+        assert second["session_events_appended"] == 1
+        assert not second["blueprint_written"] and not second["dungeon_written"]
+        assert not (archiver.save_dir / "entities" / "goblin.json").exists()
+
+        checkpoints = (archiver.save_dir / "checkpoints.jsonl").read_text()
+        assert len(checkpoints.strip().split("\n")) == 2
+
+    def test_replaced_context_is_rewritten(self, tmp_path: Path) -> None:
+        """Test that a truncated context falls back to a full rewrite."""
+        world, session = _world(), _session()
+        archiver = WorldArchiver(tmp_path / "save")
+        archiver.archive(world, session)
+
+        world.agents_context["hero"].context.pop()
+        archiver.archive(world, session)
+
+        assert _manifest(archiver.save_dir)["contexts_rewritten"] == ["hero"]
+        lines = (archiver.save_dir / "contexts" / "hero.jsonl").read_text()
+        assert len(lines.strip().split("\n")) == 1
+
+    def test_incremental_archive_matches_full_archive(self, tmp_path: Path) -> None:
+        """Test that restoring an incremental save equals restoring a full save."""
+        world, session = _world(), _session()
+        archiver = WorldArchiver(tmp_path / "incremental")
+        archiver.archive(world, session)
+
+        for i in range(3):
+            world.agents_context["hero"].context.append(AIMessage(content=f"a{i}"))
+            world.agents_context[f"npc{i}"] = AgentContext(
+                name=f"npc{i}", context=[SystemMessage(content=f"npc{i}")]
+            )
+            world.entities = [_entity("hero", i)]
+            world.dungeon.name = f"dungeon{i}"
+            session.add_agent_event(AgentEvent(message=f"e{i}"))
+            archiver.archive(world, session)
+
+        full_dir = tmp_path / "full"
+        assert archive_world(world, session, tmp_path, save_dir=full_dir)
+
+        inc_world, inc_session = restore_world(archiver.save_dir)
+        full_world, full_session = restore_world(full_dir)
+
+        assert inc_world.model_dump(exclude={"entities"}) == full_world.model_dump(
+            exclude={"entities"}
+        )
+        assert inc_world.entities == full_world.entities
+        assert inc_session.model_dump() == full_session.model_dump()
+        assert (archiver.save_dir / "contexts" / "hero_buffer.txt").read_text() == (
+            full_dir / "contexts" / "hero_buffer.txt"
+        ).read_text()